@@ -4,6 +4,7 @@ n8n Webhook Endpoints for Claude Code Integration
 Handles incoming webhooks from n8n workflows for parallel execution
 """
 
+import contextlib
 from datetime import datetime
 from typing import Optional
 
@@ -17,6 +18,7 @@ from app.core.claude_squad_orchestrator import (
     ClaudeTask,
     TaskComplexity,
 )
+from app.core.http_client import get_http_client_registry
 from app.core.scraper import WebScraper
 from app.core.session_memory import get_session_memory_manager
 from app.services.stripe_checkout_service import StripeCheckoutService
@@ -590,17 +592,15 @@ async def execute_batch_tasks_with_callback(
 
         # Send results to callback URL if provided
         if callback_url:
-            import aiohttp
-
-            async with aiohttp.ClientSession() as session:
-                await session.post(
-                    callback_url,
-                    json={
-                        "status": "completed",
-                        "results": results,
-                        "timestamp": datetime.now().isoformat(),
-                    },
-                )
+            await get_http_client_registry().post(
+                callback_url,
+                client="webhooks",
+                json={
+                    "status": "completed",
+                    "results": results,
+                    "timestamp": datetime.now().isoformat(),
+                },
+            )
 
         logger.info("Batch execution completed and results sent to callback")
 
@@ -609,20 +609,17 @@ async def execute_batch_tasks_with_callback(
 
         # Send error to callback URL if provided
         if callback_url:
-            try:
-                import aiohttp
-
-                async with aiohttp.ClientSession() as session:
-                    await session.post(
-                        callback_url,
-                        json={
-                            "status": "error",
-                            "error": str(e),
-                            "timestamp": datetime.now().isoformat(),
-                        },
-                    )
-            except Exception:
-                pass  # Don't fail on callback errors
+            # Don't fail on callback errors
+            with contextlib.suppress(Exception):
+                await get_http_client_registry().post(
+                    callback_url,
+                    client="webhooks",
+                    json={
+                        "status": "error",
+                        "error": str(e),
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                )
 
 
 async def execute_sequential_tasks(tasks: list[ClaudeTask]) -> dict:
@@ -1,11 +1,15 @@
 """
 Stripe webhook handlers for MCP system
-Handles all Stripe events and integrates with Supabase and Google Sheets
+Handles all Stripe events and integrates with Supabase and Google Sheets.
+The endpoint verifies and queues each event; side effects run in the
+webhook workers (see app.core.webhook_queue).
 """
 
+import asyncio
+import json
 import os
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 import gspread
 import stripe
@@ -13,7 +17,9 @@ from fastapi import APIRouter, HTTPException, Request, status
 from google.oauth2.service_account import Credentials
 
 from app.config.logging import get_logger
+from app.core.webhook_queue import WebhookEvent, get_webhook_dispatcher, run_step
 from app.mcp.stripe_server import MCPStripeServer
+from app.services.stripe_gateway import get_stripe_gateway
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/stripe", tags=["stripe-webhooks"])
@@ -22,104 +28,125 @@ router = APIRouter(prefix="/api/stripe", tags=["stripe-webhooks"])
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+# Errors worth retrying; anything else from Stripe will fail the same way again
+TRANSIENT_STRIPE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.RateLimitError,
+    stripe.error.APIError,
+)
+
 # Initialize MCP Stripe server
 mcp_stripe = MCPStripeServer(test_mode=False)
 
 
 async def log_payment_to_sheets(payment_data: dict[str, Any]) -> bool:
-    """Log payment data to Google Sheets for revenue tracking"""
+    """
+    Log payment data to Google Sheets for revenue tracking.
+
+    Returns False if Sheets is not configured; raises if the write fails so
+    the webhook worker can retry it.
+    """
+
+    # Google Sheets configuration
+    credentials_path = os.getenv("GSPREAD_CREDENTIALS_PATH")
+    if not credentials_path or not os.path.exists(credentials_path):
+        logger.warning("Google Sheets credentials not found")
+        return False
 
     try:
-        # Google Sheets configuration
-        credentials_path = os.getenv("GSPREAD_CREDENTIALS_PATH")
-        if not credentials_path or not os.path.exists(credentials_path):
-            logger.warning("Google Sheets credentials not found")
-            return False
-
-        # Authenticate with Google Sheets
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive",
-        ]
+        await asyncio.to_thread(_append_payment_row, credentials_path, payment_data)
+    except Exception as e:
+        logger.error(f"Failed to log payment to Google Sheets: {e}")
+        raise
 
-        creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
-        gc = gspread.authorize(creds)
+    logger.info(
+        f"Payment logged to Google Sheets: {payment_data.get('amount')} from {payment_data.get('customer_email')}"
+    )
+    return True
 
-        # Open or create revenue tracking spreadsheet
-        try:
-            sheet = gc.open("SaaS Growth Dispatch - Revenue Tracking").sheet1
-        except gspread.SpreadsheetNotFound:
-            # Create new spreadsheet
-            spreadsheet = gc.create("SaaS Growth Dispatch - Revenue Tracking")
-            sheet = spreadsheet.sheet1
-
-            # Add headers
-            headers = [
-                "Date",
-                "Customer ID",
-                "Customer Email",
-                "Amount",
-                "Currency",
-                "Subscription Tier",
-                "Payment Method",
-                "Invoice ID",
-                "Status",
-                "Trial Conversion",
-                "MRR Impact",
-                "Cumulative Revenue",
-            ]
-            sheet.append_row(headers)
-
-        # Prepare row data
-        row_data = [
-            payment_data.get("date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-            payment_data.get("customer_id", ""),
-            payment_data.get("customer_email", ""),
-            payment_data.get("amount", 0),
-            payment_data.get("currency", "USD"),
-            payment_data.get("tier", ""),
-            payment_data.get("payment_method", ""),
-            payment_data.get("invoice_id", ""),
-            payment_data.get("status", "succeeded"),
-            payment_data.get("trial_conversion", False),
-            payment_data.get("mrr_impact", 0),
-            payment_data.get("cumulative_revenue", 0),
-        ]
 
-        # Append row to sheet
-        sheet.append_row(row_data)
+def _append_payment_row(credentials_path: str, payment_data: dict[str, Any]) -> None:
+    """Blocking gspread calls behind log_payment_to_sheets"""
 
-        logger.info(
-            f"Payment logged to Google Sheets: {payment_data.get('amount')} from {payment_data.get('customer_email')}"
-        )
-        return True
+    # Authenticate with Google Sheets
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive",
+    ]
 
-    except Exception as e:
-        logger.error(f"Failed to log payment to Google Sheets: {e}")
-        return False
+    creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
+    gc = gspread.authorize(creds)
+
+    # Open or create revenue tracking spreadsheet
+    try:
+        sheet = gc.open("SaaS Growth Dispatch - Revenue Tracking").sheet1
+    except gspread.SpreadsheetNotFound:
+        # Create new spreadsheet
+        spreadsheet = gc.create("SaaS Growth Dispatch - Revenue Tracking")
+        sheet = spreadsheet.sheet1
+
+        # Add headers
+        headers = [
+            "Date",
+            "Customer ID",
+            "Customer Email",
+            "Amount",
+            "Currency",
+            "Subscription Tier",
+            "Payment Method",
+            "Invoice ID",
+            "Status",
+            "Trial Conversion",
+            "MRR Impact",
+            "Cumulative Revenue",
+        ]
+        sheet.append_row(headers)
+
+    # Prepare row data
+    row_data = [
+        payment_data.get("date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        payment_data.get("customer_id", ""),
+        payment_data.get("customer_email", ""),
+        payment_data.get("amount", 0),
+        payment_data.get("currency", "USD"),
+        payment_data.get("tier", ""),
+        payment_data.get("payment_method", ""),
+        payment_data.get("invoice_id", ""),
+        payment_data.get("status", "succeeded"),
+        payment_data.get("trial_conversion", False),
+        payment_data.get("mrr_impact", 0),
+        payment_data.get("cumulative_revenue", 0),
+    ]
+
+    # Append row to sheet
+    sheet.append_row(row_data)
 
 
 async def send_payment_confirmation_email(
     customer_email: str, payment_data: dict[str, Any]
 ) -> bool:
-    """Send payment confirmation email via Zoho SMTP"""
+    """
+    Send payment confirmation email via Zoho SMTP.
+
+    Returns False if SMTP is not configured; raises if sending fails so the
+    webhook worker can retry it.
+    """
+
+    # Zoho SMTP configuration
+    smtp_host = os.getenv("SMTP_HOST", "smtp.zoho.com")
+    smtp_port = int(os.getenv("SMTP_PORT", "587"))
+    smtp_username = os.getenv("SMTP_USERNAME")
+    smtp_password = os.getenv("ZOHO_APP_PASSWORD")
+    smtp_from = os.getenv("SMTP_FROM", "support@saasgrowthdispatch.com")
+
+    if not all([smtp_username, smtp_password]):
+        logger.error("SMTP credentials not configured")
+        return False
 
     try:
-        import smtplib
         from email.mime.multipart import MIMEMultipart
         from email.mime.text import MIMEText
 
-        # Zoho SMTP configuration
-        smtp_host = os.getenv("SMTP_HOST", "smtp.zoho.com")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_username = os.getenv("SMTP_USERNAME")
-        smtp_password = os.getenv("ZOHO_APP_PASSWORD")
-        smtp_from = os.getenv("SMTP_FROM", "support@saasgrowthdispatch.com")
-
-        if not all([smtp_username, smtp_password]):
-            logger.error("SMTP credentials not configured")
-            return False
-
         # Create payment confirmation email
         msg = MIMEMultipart("alternative")
         msg["Subject"] = f"Payment Confirmation - ${payment_data.get('amount', 0):.2f}"
@@ -158,21 +185,30 @@ async def send_payment_confirmation_email(
         msg.attach(html_part)
 
         # Send email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
-
-        logger.info(f"Payment confirmation email sent to {customer_email}")
-        return True
+        await asyncio.to_thread(
+            _send_smtp, smtp_host, smtp_port, smtp_username, smtp_password, msg
+        )
 
     except Exception as e:
         logger.error(f"Failed to send payment confirmation email: {e}")
-        return False
+        raise
+
+    logger.info(f"Payment confirmation email sent to {customer_email}")
+    return True
+
+
+def _send_smtp(host: str, port: int, username: str, password: str, msg) -> None:
+    """Blocking SMTP session behind send_payment_confirmation_email"""
+    import smtplib
+
+    with smtplib.SMTP(host, port) as server:
+        server.starttls()
+        server.login(username, password)
+        server.send_message(msg)
 
 
 async def update_supabase_subscription(customer_data: dict[str, Any]) -> bool:
-    """Update Supabase user subscription data"""
+    """Update Supabase user subscription data; raises on failure so it is retried"""
 
     try:
         # In production, update Supabase with subscription data:
@@ -198,12 +234,17 @@ async def update_supabase_subscription(customer_data: dict[str, Any]) -> bool:
 
     except Exception as e:
         logger.error(f"Failed to update Supabase subscription: {e}")
-        return False
+        raise
 
 
 @router.post("/webhooks")
 async def handle_stripe_webhook(request: Request):
-    """Handle all Stripe webhook events"""
+    """
+    Verify a Stripe webhook and queue it for the webhook workers.
+
+    Responds as soon as the event is stored; redelivered events are
+    acknowledged without being queued again.
+    """
 
     try:
         # Get request body and signature
@@ -230,46 +271,73 @@ async def handle_stripe_webhook(request: Request):
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature"
             )
 
+        # Queue the verified body as plain JSON rather than the SDK object
         event_type = event["type"]
-        event_data = event["data"]["object"]
+        body = json.loads(payload)
+        queued = get_webhook_dispatcher().enqueue(
+            "stripe",
+            event["id"],
+            event_type,
+            body,
+            ordering_key=stripe_ordering_key(body["data"]["object"]),
+        )
+        if not queued:
+            logger.info(f"Duplicate Stripe webhook ignored: {event['id']}")
 
-        logger.info(f"Processing Stripe webhook: {event_type}")
+        return {"status": "queued" if queued else "duplicate", "event_type": event_type}
 
-        # Handle different event types
-        if event_type == "checkout.session.completed":
-            await handle_checkout_completed(event_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Webhook processing failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Webhook processing failed",
+        )
 
-        elif event_type == "invoice.payment_succeeded":
-            await handle_payment_succeeded(event_data)
 
-        elif event_type == "customer.subscription.created":
-            await handle_subscription_created(event_data)
+def stripe_ordering_key(event_object: dict[str, Any]) -> Optional[str]:
+    """Customer an event belongs to, so its events are processed in order"""
+    if event_object.get("object") == "customer":
+        return event_object.get("id")
+    customer = event_object.get("customer")
+    if isinstance(customer, dict):
+        return customer.get("id")
+    return customer
 
-        elif event_type == "customer.subscription.updated":
-            await handle_subscription_updated(event_data)
 
-        elif event_type == "customer.subscription.deleted":
-            await handle_subscription_cancelled(event_data)
+async def process_stripe_event(event: WebhookEvent):
+    """Webhook worker handler for queued Stripe events"""
 
-        elif event_type == "customer.subscription.trial_will_end":
-            await handle_trial_ending(event_data)
+    event_type = event.event_type
+    event_data = event.payload["data"]["object"]
 
-        elif event_type == "invoice.payment_failed":
-            await handle_payment_failed(event_data)
+    logger.info(f"Processing Stripe webhook: {event_type}")
 
-        else:
-            logger.info(f"Unhandled webhook event: {event_type}")
+    # Handle different event types
+    if event_type == "checkout.session.completed":
+        await handle_checkout_completed(event_data)
 
-        return {"status": "success", "event_type": event_type}
+    elif event_type == "invoice.payment_succeeded":
+        await handle_payment_succeeded(event_data)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Webhook processing failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Webhook processing failed",
-        )
+    elif event_type == "customer.subscription.created":
+        await handle_subscription_created(event_data)
+
+    elif event_type == "customer.subscription.updated":
+        await handle_subscription_updated(event_data)
+
+    elif event_type == "customer.subscription.deleted":
+        await handle_subscription_cancelled(event_data)
+
+    elif event_type == "customer.subscription.trial_will_end":
+        await handle_trial_ending(event_data)
+
+    elif event_type == "invoice.payment_failed":
+        await handle_payment_failed(event_data)
+
+    else:
+        logger.info(f"Unhandled webhook event: {event_type}")
 
 
 async def handle_checkout_completed(session_data: dict[str, Any]):
@@ -295,20 +363,24 @@ async def handle_checkout_completed(session_data: dict[str, Any]):
     }
 
     # Log to Google Sheets
-    await log_payment_to_sheets(payment_data)
+    await run_step("sheets", log_payment_to_sheets, payment_data)
 
     # Send confirmation email
     if customer_email:
-        await send_payment_confirmation_email(customer_email, payment_data)
+        await run_step(
+            "email", send_payment_confirmation_email, customer_email, payment_data
+        )
 
     # Update Supabase
-    await update_supabase_subscription(
+    await run_step(
+        "supabase",
+        update_supabase_subscription,
         {
             "customer_id": customer_id,
             "email": customer_email,
             "status": "active",
             "tier": payment_data["tier"],
-        }
+        },
     )
 
     logger.info(f"Checkout completed: ${amount} from {customer_email}")
@@ -320,13 +392,18 @@ async def handle_payment_succeeded(invoice_data: dict[str, Any]):
     customer_id = invoice_data.get("customer")
     amount = invoice_data.get("amount_paid", 0) / 100
 
-    # Get customer email from Stripe
-    try:
-        customer = stripe.Customer.retrieve(customer_id)
-        customer_email = customer.email
-    except Exception as e:
-        logger.error(f"Failed to retrieve customer email: {e}")
-        customer_email = "unknown@example.com"
+    # Get customer email from Stripe; only transient failures are retried
+    customer_email = None
+    if customer_id:
+        try:
+            customer = await get_stripe_gateway().call(
+                stripe.Customer.retrieve, customer_id
+            )
+            customer_email = getattr(customer, "email", None)
+        except TRANSIENT_STRIPE_ERRORS:
+            raise
+        except stripe.error.StripeError as e:
+            logger.error(f"Failed to retrieve customer {customer_id}: {e}")
 
     # Prepare payment data
     payment_data = {
@@ -346,10 +423,15 @@ async def handle_payment_succeeded(invoice_data: dict[str, Any]):
     }
 
     # Log to Google Sheets
-    await log_payment_to_sheets(payment_data)
+    await run_step("sheets", log_payment_to_sheets, payment_data)
 
     # Send confirmation email
-    await send_payment_confirmation_email(customer_email, payment_data)
+    if customer_email:
+        await run_step(
+            "email", send_payment_confirmation_email, customer_email, payment_data
+        )
+    else:
+        logger.warning(f"No email for invoice {invoice_data.get('id')}; not sent")
 
     logger.info(f"Payment succeeded: ${amount} from {customer_email}")
 
@@ -1,18 +1,26 @@
 """
 Batch API Call Optimizer for Enterprise Performance
-Reduces overhead by batching multiple API calls into single requests.
+Micro-batches LLM API calls and dispatches them through provider adapters.
 """
 
 import asyncio
+import contextlib
+import hashlib
+import json
+import os
 import time
+from abc import ABC, abstractmethod
+from collections import deque
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional
 
 from app.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+PRIORITY_LANES = ("high", "normal", "low")
+
 
 @dataclass
 class APICall:
@@ -37,165 +45,436 @@ class BatchResult:
     cost_savings: float
 
 
+@dataclass
+class _PendingCall:
+    """A queued call plus everyone waiting on its result"""
+
+    call: APICall
+    key: str
+    future: asyncio.Future
+    enqueued_at: float
+    callbacks: list[Callable] = field(default_factory=list)
+
+
+class ProviderAdapter(ABC):
+    """
+    Base class for provider adapters.
+
+    An adapter receives every call of a flushed batch that targets its
+    provider and returns one result dict per call, in the same order.
+    """
+
+    name = "base"
+
+    def __init__(self, max_concurrency: int = 10):
+        self.max_concurrency = max_concurrency
+
+    async def execute(self, calls: list[APICall]) -> list[dict[str, Any]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(call: APICall) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    response = await self.execute_one(call)
+                    return {"success": True, "response": response}
+                except Exception as e:
+                    logger.error(f"{self.name} call failed: {e}")
+                    return {"success": False, "error": str(e)}
+
+        return list(await asyncio.gather(*(run(call) for call in calls)))
+
+    @abstractmethod
+    async def execute_one(self, call: APICall) -> dict[str, Any]:
+        """Send one call to the provider and return its response"""
+
+
+class OpenAIAdapter(ProviderAdapter):
+    """Chat completions through the async OpenAI SDK"""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 20):
+        super().__init__(max_concurrency)
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._client = None
+        self._http = None
+
+    async def execute_one(self, call: APICall) -> dict[str, Any]:
+        from app.core.http_client import get_http_client_registry
+
+        http = get_http_client_registry().get("llm")
+        if self._client is None or self._http is not http:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(api_key=self.api_key, http_client=http)
+            self._http = http
+        response = await self._client.chat.completions.create(**call.payload)
+        return response.model_dump()
+
+
+class AnthropicAdapter(ProviderAdapter):
+    """Messages API through the async Anthropic SDK"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 10):
+        super().__init__(max_concurrency)
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self._client = None
+        self._http = None
+
+    async def execute_one(self, call: APICall) -> dict[str, Any]:
+        from app.core.http_client import get_http_client_registry
+
+        http = get_http_client_registry().get("llm")
+        if self._client is None or self._http is not http:
+            from anthropic import AsyncAnthropic
+
+            self._client = AsyncAnthropic(api_key=self.api_key, http_client=http)
+            self._http = http
+        response = await self._client.messages.create(**call.payload)
+        return response.model_dump()
+
+
+class GeminiAdapter(ProviderAdapter):
+    """generateContent through google-generativeai"""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gemini-1.5-pro",
+        max_concurrency: int = 15,
+    ):
+        super().__init__(max_concurrency)
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model = model
+        self._configured = False
+
+    async def execute_one(self, call: APICall) -> dict[str, Any]:
+        import google.generativeai as genai
+
+        if not self._configured:
+            genai.configure(api_key=self.api_key)
+            self._configured = True
+
+        model = genai.GenerativeModel(call.payload.get("model", self.model))
+        response = await model.generate_content_async(
+            call.payload["contents"],
+            generation_config=call.payload.get("generationConfig"),
+        )
+        return {
+            "candidates": [{"content": {"parts": [{"text": response.text}]}}],
+        }
+
+
+class FakeAdapter(ProviderAdapter):
+    """
+    Local stand-in for tests and benchmarks.
+
+    Each dispatched batch costs ``batch_latency`` plus ``per_call_latency``
+    per call, mimicking a provider round trip, and echoes the payload back in
+    an OpenAI-shaped response.
+    """
+
+    name = "fake"
+
+    def __init__(self, batch_latency: float = 0.05, per_call_latency: float = 0.0):
+        super().__init__(max_concurrency=1)
+        self.batch_latency = batch_latency
+        self.per_call_latency = per_call_latency
+        self.batches: list[int] = []
+
+    async def execute(self, calls: list[APICall]) -> list[dict[str, Any]]:
+        self.batches.append(len(calls))
+        await asyncio.sleep(self.batch_latency + self.per_call_latency * len(calls))
+        return [
+            {"success": True, "response": await self.execute_one(call)}
+            for call in calls
+        ]
+
+    async def execute_one(self, call: APICall) -> dict[str, Any]:
+        messages = call.payload.get("messages", [])
+        content = messages[-1]["content"] if messages else json.dumps(call.payload)
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def default_adapters() -> dict[str, ProviderAdapter]:
+    """Adapters keyed by the first segment of ``APICall.endpoint``"""
+    anthropic = AnthropicAdapter()
+    return {
+        "openai": OpenAIAdapter(),
+        "anthropic": anthropic,
+        "claude": anthropic,
+        "gemini": GeminiAdapter(),
+        "fake": FakeAdapter(),
+    }
+
+
 class BatchAPIOptimizer:
     """
     Enterprise-grade API batching system for reducing overhead and costs.
 
     Features:
-    - Intelligent batching based on endpoint compatibility
-    - Priority-based execution
-    - Cost tracking and optimization
-    - Async processing for maximum throughput
+    - Per-call futures, so every caller gets its own real provider result
+    - Calls queued together with ``add_calls`` are dispatched at once
+    - Single calls flush on size, on a per-lane deadline, or when arrivals
+      go idle
+    - Priority lanes (high calls flush immediately, low calls linger longest)
+    - Deduplication of identical in-flight calls
+    - Pluggable provider adapters (OpenAI, Anthropic, Gemini, local fake)
     """
 
-    def __init__(self, max_batch_size: int = 50, batch_timeout: float = 5.0):
+    def __init__(
+        self,
+        max_batch_size: int = 50,
+        batch_timeout: float = 5.0,
+        adapters: Optional[dict[str, ProviderAdapter]] = None,
+        min_linger: float = 0.005,
+    ):
         self.max_batch_size = max_batch_size
         self.batch_timeout = batch_timeout
-        self.pending_calls: list[APICall] = []
-        self.batch_queue: asyncio.Queue = asyncio.Queue()
+        self.min_linger = min_linger
+        self.adapters = adapters if adapters is not None else default_adapters()
+        self.lane_deadlines = {
+            "high": 0.0,
+            "normal": batch_timeout,
+            "low": batch_timeout * 4,
+        }
         self.cost_savings = 0.0
         self.total_calls_processed = 0
-
-    async def add_call(self, call: APICall) -> None:
-        """Add an API call to the batch queue"""
-        self.pending_calls.append(call)
-        await self._check_batch_ready()
-
-    async def _check_batch_ready(self) -> None:
-        """Check if batch is ready for execution"""
-        if (
-            len(self.pending_calls) >= self.max_batch_size
-            or self._has_high_priority_calls()
-        ):
-            await self._execute_batch()
-
-    def _has_high_priority_calls(self) -> bool:
-        """Check if there are high priority calls that should be processed immediately"""
-        return any(call.priority == "high" for call in self.pending_calls)
-
-    async def _execute_batch(self) -> BatchResult:
-        """Execute the current batch of API calls"""
-        if not self.pending_calls:
+        self.batches_dispatched = 0
+        self.deduplicated_calls = 0
+        self.total_latency = 0.0
+        self._reset_queues()
+
+    def _reset_queues(self) -> None:
+        self.lanes: dict[str, deque[_PendingCall]] = {
+            lane: deque() for lane in PRIORITY_LANES
+        }
+        self.in_flight: dict[str, _PendingCall] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._dispatches: set[asyncio.Task] = set()
+        self._last_arrival = 0.0
+        self._arrival_gap = self.batch_timeout  # EWMA of inter-arrival time
+
+    @property
+    def pending_calls(self) -> list[APICall]:
+        """Calls queued but not yet dispatched"""
+        return [entry.call for lane in self.lanes.values() for entry in lane]
+
+    def register_adapter(self, endpoint_prefix: str, adapter: ProviderAdapter) -> None:
+        """Route calls whose endpoint starts with ``endpoint_prefix`` to an adapter"""
+        self.adapters[endpoint_prefix] = adapter
+
+    @staticmethod
+    def _call_key(call: APICall) -> str:
+        payload = json.dumps(
+            [call.endpoint, call.method.upper(), call.payload],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _ensure_loop_state(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures and tasks from a previous (closed) loop cannot be reused
+            if self._loop is not None and self.in_flight:
+                logger.warning(
+                    f"Dropping {len(self.in_flight)} calls queued on a previous event loop"
+                )
+            self._reset_queues()
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+
+    async def add_call(self, call: APICall) -> asyncio.Future:
+        """
+        Queue an API call for batched execution.
+
+        Returns:
+            Future resolving to the call's result dict. Identical calls already
+            queued or in flight share a single future.
+        """
+        self._ensure_loop_state()
+        key = self._call_key(call)
+
+        existing = self.in_flight.get(key)
+        if existing is not None:
+            self.deduplicated_calls += 1
+            if call.callback:
+                existing.callbacks.append(call.callback)
+            return existing.future
+
+        now = self._loop.time()
+        if self._last_arrival:
+            gap = now - self._last_arrival
+            self._arrival_gap = 0.8 * self._arrival_gap + 0.2 * gap
+        self._last_arrival = now
+
+        lane = call.priority if call.priority in self.lanes else "normal"
+        entry = _PendingCall(
+            call=call,
+            key=key,
+            future=self._loop.create_future(),
+            enqueued_at=now,
+            callbacks=[call.callback] if call.callback else [],
+        )
+        self.lanes[lane].append(entry)
+        self.in_flight[key] = entry
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        self._wakeup.set()
+        return entry.future
+
+    async def add_calls(self, calls: list[APICall]) -> list[asyncio.Future]:
+        """
+        Queue a caller's whole batch and dispatch it without lingering.
+
+        The calls go out together with anything else already queued, split
+        into batches of at most ``max_batch_size``.
+        """
+        futures = [await self.add_call(call) for call in calls]
+        self.dispatch_queued()
+        return futures
+
+    async def submit(self, call: APICall) -> dict[str, Any]:
+        """Queue an API call and wait for its result"""
+        return await (await self.add_call(call))
+
+    def _pending_count(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def _next_flush_time(self, now: float) -> float:
+        """When the next batch should go out, given size, deadlines and idleness"""
+        if self._pending_count() >= self.max_batch_size:
+            return now
+
+        # Flush early once arrivals have gone quiet for ~2 typical gaps
+        linger = max(self.min_linger, 2 * self._arrival_gap)
+        due = float("inf")
+        for lane, entries in self.lanes.items():
+            if entries:
+                deadline = entries[0].enqueued_at + self.lane_deadlines[lane]
+                idle = self._last_arrival + linger
+                due = min(due, deadline, idle)
+        return due
+
+    def _take_batch(self) -> list[_PendingCall]:
+        batch: list[_PendingCall] = []
+        for lane in PRIORITY_LANES:
+            entries = self.lanes[lane]
+            while entries and len(batch) < self.max_batch_size:
+                batch.append(entries.popleft())
+        return batch
+
+    async def _flush_loop(self) -> None:
+        """Background task that dispatches batches as they become due"""
+        while self._pending_count():
+            now = self._loop.time()
+            due = self._next_flush_time(now)
+            if due > now:
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=due - now)
+                continue
+            self._dispatch(self._take_batch())
+
+    def dispatch_queued(self) -> list[asyncio.Task]:
+        """Send every queued call now, in batches of at most max_batch_size"""
+        dispatched = []
+        while self._pending_count():
+            dispatched.append(self._dispatch(self._take_batch()))
+        return dispatched
+
+    def _dispatch(self, batch: list[_PendingCall]) -> asyncio.Task:
+        task = asyncio.create_task(self._execute_batch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+        return task
+
+    async def _execute_batch(self, batch: list[_PendingCall]) -> BatchResult:
+        """Execute a batch of API calls through their provider adapters"""
+        if not batch:
             return BatchResult(True, [], 0, 0.0, 0.0)
 
         start_time = time.time()
 
-        # Group calls by compatibility
-        batched_groups = self._group_compatible_calls()
-        results = []
+        # Group calls by provider adapter
+        groups: dict[str, list[_PendingCall]] = {}
+        for entry in batch:
+            groups.setdefault(entry.call.endpoint.split("/")[0], []).append(entry)
 
-        for group in batched_groups:
-            group_results = await self._execute_call_group(group)
-            results.extend(group_results)
+        group_outputs = await asyncio.gather(
+            *(
+                self._execute_group(prefix, entries)
+                for prefix, entries in groups.items()
+            )
+        )
 
-        execution_time = time.time() - start_time
-        cost_savings = self._calculate_cost_savings(len(self.pending_calls))
+        results = []
+        for entries, outputs in zip(groups.values(), group_outputs, strict=True):
+            for entry, output in zip(entries, outputs, strict=True):
+                await self._resolve(entry, output)
+                results.append(output)
 
-        # Clear processed calls
-        total_calls = len(self.pending_calls)
+        execution_time = time.time() - start_time
+        total_calls = len(batch)
+        cost_savings = self._calculate_cost_savings(total_calls)
         self.total_calls_processed += total_calls
+        self.batches_dispatched += 1
         self.cost_savings += cost_savings
-        self.pending_calls.clear()
+        self.total_latency += sum(
+            self._loop.time() - entry.enqueued_at for entry in batch
+        )
 
         logger.info(
             f"Batch executed: {total_calls} calls in {execution_time:.2f}s, saved ${cost_savings:.2f}"
         )
 
         return BatchResult(
-            success=True,
+            success=all(result.get("success") for result in results),
             results=results,
             total_calls=total_calls,
             execution_time=execution_time,
             cost_savings=cost_savings,
         )
 
-    def _group_compatible_calls(self) -> list[list[APICall]]:
-        """Group API calls that can be batched together"""
-        groups = {}
-
-        for call in self.pending_calls:
-            # Group by endpoint type and method
-            key = f"{call.endpoint.split('/')[0]}_{call.method}"
-            if key not in groups:
-                groups[key] = []
-            groups[key].append(call)
-
-        return list(groups.values())
-
-    async def _execute_call_group(self, calls: list[APICall]) -> list[dict[str, Any]]:
-        """Execute a group of compatible API calls"""
-        if not calls:
-            return []
-
-        # Determine the best batching strategy
-        if self._can_batch_natively(calls):
-            return await self._execute_native_batch(calls)
-        else:
-            return await self._execute_parallel_calls(calls)
-
-    def _can_batch_natively(self, calls: list[APICall]) -> bool:
-        """Check if calls can use native API batching"""
-        # Claude API, OpenAI API, etc. support native batching
-        endpoints = {call.endpoint.split("/")[0] for call in calls}
-        batchable_endpoints = {"claude", "openai", "gemini", "anthropic"}
-        return len(endpoints) == 1 and endpoints.pop() in batchable_endpoints
-
-    async def _execute_native_batch(self, calls: list[APICall]) -> list[dict[str, Any]]:
-        """Execute calls using native API batching"""
-        # Execute batch (simplified - would use actual API client)
-        results = []
-        for i, call in enumerate(calls):
-            result = {
-                "id": f"call_{i}",
-                "status": "completed",
-                "response": {
-                    "success": True,
-                    "data": f"Mock result for {call.endpoint}",
-                },
-            }
-            results.append(result)
-
-            # Execute callback if provided
-            if call.callback:
-                try:
-                    await call.callback(result)
-                except Exception as e:
-                    logger.error(f"Callback error: {e}")
-
-        return results
-
-    async def _execute_parallel_calls(
-        self, calls: list[APICall]
+    async def _execute_group(
+        self, prefix: str, entries: list[_PendingCall]
     ) -> list[dict[str, Any]]:
-        """Execute calls in parallel when native batching isn't available"""
-
-        async def execute_single_call(call: APICall) -> dict[str, Any]:
-            # Simulate API call execution
-            await asyncio.sleep(0.1)  # Simulate network latency
-            result = {"success": True, "data": f"Result for {call.endpoint}"}
-
-            if call.callback:
-                try:
-                    await call.callback(result)
-                except Exception as e:
-                    logger.error(f"Callback error: {e}")
-
-            return result
-
-        # Execute all calls concurrently
-        tasks = [execute_single_call(call) for call in calls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Handle any exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Call {i} failed: {result}")
-                processed_results.append({"success": False, "error": str(result)})
-            else:
-                processed_results.append(result)
-
-        return processed_results
+        adapter = self.adapters.get(prefix)
+        if adapter is None:
+            error = f"No provider adapter registered for '{prefix}'"
+            return [{"success": False, "error": error} for _ in entries]
+
+        try:
+            outputs = await adapter.execute([entry.call for entry in entries])
+        except Exception as e:
+            logger.error(f"Adapter {adapter.name} failed: {e}")
+            outputs = [{"success": False, "error": str(e)} for _ in entries]
+
+        return [
+            {"id": f"call_{i}", "status": "completed", **output}
+            for i, output in enumerate(outputs)
+        ]
+
+    async def _resolve(self, entry: _PendingCall, result: dict[str, Any]) -> None:
+        self.in_flight.pop(entry.key, None)
+        if not entry.future.done():
+            entry.future.set_result(result)
+
+        for callback in entry.callbacks:
+            try:
+                outcome = callback(result)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+            except Exception as e:
+                logger.error(f"Callback error: {e}")
 
     def _calculate_cost_savings(self, num_calls: int) -> float:
         """Calculate cost savings from batching"""
@@ -205,17 +484,44 @@ class BatchAPIOptimizer:
         return individual_cost - batched_cost
 
     async def flush_pending(self) -> BatchResult:
-        """Force execution of all pending calls"""
-        if self.pending_calls:
-            return await self._execute_batch()
-        return BatchResult(True, [], 0, 0.0, 0.0)
+        """Dispatch every queued call now and wait for all batches in flight"""
+        if self._loop is not asyncio.get_running_loop():
+            return BatchResult(True, [], 0, 0.0, 0.0)
+
+        start_time = time.time()
+        dispatched = self.dispatch_queued()
+
+        batch_results = await asyncio.gather(*dispatched)
+        if self._dispatches:
+            await asyncio.gather(*list(self._dispatches))
+
+        results = [result for batch in batch_results for result in batch.results]
+        return BatchResult(
+            success=all(batch.success for batch in batch_results),
+            results=results,
+            total_calls=len(results),
+            execution_time=time.time() - start_time,
+            cost_savings=sum(batch.cost_savings for batch in batch_results),
+        )
 
     def get_performance_stats(self) -> dict[str, Any]:
         """Get performance statistics"""
         return {
             "total_calls_processed": self.total_calls_processed,
             "total_cost_savings": self.cost_savings,
-            "pending_calls": len(self.pending_calls),
+            "pending_calls": self._pending_count(),
+            "batches_dispatched": self.batches_dispatched,
+            "deduplicated_calls": self.deduplicated_calls,
+            "average_batch_size": (
+                self.total_calls_processed / self.batches_dispatched
+                if self.batches_dispatched > 0
+                else 0
+            ),
+            "average_queue_latency": (
+                self.total_latency / self.total_calls_processed
+                if self.total_calls_processed > 0
+                else 0
+            ),
             "average_savings_per_call": (
                 self.cost_savings / self.total_calls_processed
                 if self.total_calls_processed > 0
@@ -236,63 +542,79 @@ def get_batch_optimizer() -> BatchAPIOptimizer:
     return _batch_optimizer
 
 
+async def _gather_calls(calls: list[APICall]) -> BatchResult:
+    """Submit calls to the global optimizer and collect their results in order"""
+    optimizer = get_batch_optimizer()
+    start_time = time.time()
+
+    futures = await optimizer.add_calls(calls)
+    results = list(await asyncio.gather(*futures))
+
+    return BatchResult(
+        success=all(result.get("success") for result in results),
+        results=results,
+        total_calls=len(results),
+        execution_time=time.time() - start_time,
+        cost_savings=optimizer._calculate_cost_savings(len(results)),
+    )
+
+
 # Convenience functions for common use cases
 async def batch_claude_calls(
     prompts: list[str], model: str = "claude-3-sonnet-20240229"
-) -> list[dict[str, Any]]:
+) -> BatchResult:
     """Batch multiple Claude API calls"""
-    optimizer = get_batch_optimizer()
-
-    for i, prompt in enumerate(prompts):
-        call = APICall(
-            endpoint="anthropic/messages",
-            method="POST",
-            payload={
-                "model": model,
-                "max_tokens": 4000,
-                "messages": [{"role": "user", "content": prompt}],
-            },
-            priority="high" if i == 0 else "normal",
-        )
-        await optimizer.add_call(call)
-
-    return await optimizer.flush_pending()
+    return await _gather_calls(
+        [
+            APICall(
+                endpoint="anthropic/messages",
+                method="POST",
+                payload={
+                    "model": model,
+                    "max_tokens": 4000,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+                priority="high" if i == 0 else "normal",
+            )
+            for i, prompt in enumerate(prompts)
+        ]
+    )
 
 
 async def batch_openai_calls(
-    prompts: list[str], model: str = "gpt-4"
-) -> list[dict[str, Any]]:
+    prompts: list[str],
+    model: str = "gpt-4",
+    max_tokens: int = 4000,
+    temperature: Optional[float] = None,
+) -> BatchResult:
     """Batch multiple OpenAI API calls"""
-    optimizer = get_batch_optimizer()
-
+    calls = []
     for prompt in prompts:
-        call = APICall(
-            endpoint="openai/chat/completions",
-            method="POST",
-            payload={
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 4000,
-            },
+        payload: dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+        calls.append(
+            APICall(endpoint="openai/chat/completions", method="POST", payload=payload)
         )
-        await optimizer.add_call(call)
+    return await _gather_calls(calls)
 
-    return await optimizer.flush_pending()
 
-
-async def batch_gemini_calls(prompts: list[str]) -> list[dict[str, Any]]:
+async def batch_gemini_calls(prompts: list[str]) -> BatchResult:
     """Batch multiple Gemini API calls"""
-    optimizer = get_batch_optimizer()
-
-    for prompt in prompts:
-        call = APICall(
-            endpoint="gemini/generateContent",
-            method="POST",
-            payload={
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {"maxOutputTokens": 4000},
-            },
-        )
-        await optimizer.add_call(call)
-
-    return await optimizer.flush_pending()
+    return await _gather_calls(
+        [
+            APICall(
+                endpoint="gemini/generateContent",
+                method="POST",
+                payload={
+                    "contents": [{"parts": [{"text": prompt}]}],
+                    "generationConfig": {"maxOutputTokens": 4000},
+                },
+            )
+            for prompt in prompts
+        ]
+    )
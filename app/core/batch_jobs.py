@@ -0,0 +1,487 @@
+"""
+Offline Bulk Batch Jobs
+Streams requests to provider batch files, polls the job and streams results
+back by custom_id. Every step is recorded in a local manifest so a crashed
+run resumes where it stopped instead of paying for the work twice.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_WORK_DIR = "data/batch_jobs"
+
+# Manifest states, in order
+STATE_WRITTEN = "written"
+STATE_UPLOADED = "uploaded"
+STATE_SUBMITTED = "submitted"
+STATE_COMPLETED = "completed"
+STATE_DOWNLOADED = "downloaded"
+STATE_FAILED = "failed"
+
+_STATE_ORDER = [
+    STATE_WRITTEN,
+    STATE_UPLOADED,
+    STATE_SUBMITTED,
+    STATE_COMPLETED,
+    STATE_DOWNLOADED,
+]
+
+
+class BulkJobError(Exception):
+    """Raised when a provider batch job fails or expires"""
+
+
+class BulkJobAdapter(ABC):
+    """
+    Provider batch API in file terms: upload an input JSONL, create a job,
+    poll it, and download output and error JSONL files.
+
+    Lines of both files follow the OpenAI batch format:
+    ``{"custom_id": ..., "response": {"status_code": ..., "body": ...}, "error": ...}``
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def format_request(self, request: Any) -> dict[str, Any]:
+        """Turn a BatchRequest into one input JSONL line"""
+
+    @abstractmethod
+    def upload(self, input_path: str) -> str:
+        """Upload the input JSONL and return its file id"""
+
+    @abstractmethod
+    def create_job(self, input_file_id: str) -> str:
+        """Start a batch job over an uploaded file and return the job id"""
+
+    @abstractmethod
+    def retrieve_job(self, job_id: str) -> dict[str, Any]:
+        """Return ``{"status": ..., "output_file_id": ..., "error_file_id": ...}``"""
+
+    @abstractmethod
+    def download(self, file_id: str, dest_path: str) -> None:
+        """Save an output or error file to ``dest_path``"""
+
+
+class OpenAIBulkAdapter(BulkJobAdapter):
+    """OpenAI Batch API (files with purpose=batch, 24h completion window)"""
+
+    name = "openai"
+    terminal_failures = frozenset({"failed", "expired", "cancelled"})
+
+    def __init__(self, api_key: Optional[str] = None):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+    def format_request(self, request: Any) -> dict[str, Any]:
+        return {
+            "custom_id": request.id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": request.model,
+                "messages": [{"role": "user", "content": request.prompt}],
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature,
+            },
+        }
+
+    def upload(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create_job(self, input_file_id: str) -> str:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def retrieve_job(self, job_id: str) -> dict[str, Any]:
+        batch = self.client.batches.retrieve(job_id)
+        status = batch.status
+        if status in self.terminal_failures:
+            status = STATE_FAILED
+        return {
+            "status": status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+        }
+
+    def download(self, file_id: str, dest_path: str) -> None:
+        self.client.files.content(file_id).write_to_file(dest_path)
+
+
+class AnthropicBulkAdapter(BulkJobAdapter):
+    """
+    Anthropic Message Batches API.
+
+    Requests are submitted inline rather than as a file, so ``upload`` only
+    records the local JSONL path; results are normalized to the OpenAI output
+    line format on download.
+    """
+
+    name = "anthropic"
+
+    def __init__(self, api_key: Optional[str] = None):
+        from anthropic import Anthropic
+
+        self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+
+    def format_request(self, request: Any) -> dict[str, Any]:
+        return {
+            "custom_id": request.id,
+            "params": {
+                "model": request.model,
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature,
+                "messages": [{"role": "user", "content": request.prompt}],
+            },
+        }
+
+    def upload(self, input_path: str) -> str:
+        return input_path
+
+    def create_job(self, input_file_id: str) -> str:
+        with open(input_file_id, encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        return self.client.messages.batches.create(requests=requests).id
+
+    def retrieve_job(self, job_id: str) -> dict[str, Any]:
+        batch = self.client.messages.batches.retrieve(job_id)
+        status = STATE_COMPLETED if batch.processing_status == "ended" else "running"
+        return {"status": status, "output_file_id": job_id}
+
+    def download(self, file_id: str, dest_path: str) -> None:
+        with open(dest_path, "w", encoding="utf-8") as out:
+            for entry in self.client.messages.batches.results(file_id):
+                succeeded = entry.result.type == "succeeded"
+                line = {
+                    "custom_id": entry.custom_id,
+                    "response": (
+                        {
+                            "status_code": 200,
+                            "body": entry.result.message.model_dump(),
+                        }
+                        if succeeded
+                        else None
+                    ),
+                    "error": None if succeeded else {"type": entry.result.type},
+                }
+                out.write(json.dumps(line) + "\n")
+
+
+def _echo_response(body: dict[str, Any]) -> dict[str, Any]:
+    content = body.get("messages", [{}])[-1].get("content", "")
+    return {
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "model": body.get("model"),
+    }
+
+
+class LocalBulkAdapter(OpenAIBulkAdapter):
+    """
+    Offline stand-in for a provider batch API.
+
+    Files and job state live under ``root_dir``, so a new adapter instance
+    sees jobs created by a previous (crashed) process. Jobs complete after
+    ``polls_until_complete`` status checks, answering each request with
+    ``responder(body)``; requests whose responder raises go to an error file,
+    as OpenAI reports them.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        root_dir: str = "data/batch_jobs/_local_provider",
+        responder: Callable[[dict[str, Any]], dict[str, Any]] = _echo_response,
+        polls_until_complete: int = 1,
+    ):
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+        self.polls_until_complete = polls_until_complete
+        self.calls: dict[str, int] = {"upload": 0, "create_job": 0, "download": 0}
+
+    def _job_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.job.json"
+
+    def upload(self, input_path: str) -> str:
+        self.calls["upload"] += 1
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        (self.root / file_id).write_bytes(Path(input_path).read_bytes())
+        return file_id
+
+    def create_job(self, input_file_id: str) -> str:
+        self.calls["create_job"] += 1
+        job_id = f"batch-{uuid.uuid4().hex[:12]}"
+        self._job_path(job_id).write_text(
+            json.dumps({"input_file_id": input_file_id, "polls": 0})
+        )
+        return job_id
+
+    def retrieve_job(self, job_id: str) -> dict[str, Any]:
+        job = json.loads(self._job_path(job_id).read_text())
+        job["polls"] += 1
+
+        if job["polls"] >= self.polls_until_complete and "completed" not in job:
+            outputs, errors = [], []
+            with open(self.root / job["input_file_id"], encoding="utf-8") as src:
+                for line in src:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    try:
+                        status_code, body = 200, self.responder(item["body"])
+                    except Exception as e:
+                        status_code, body = 500, {"error": {"message": str(e)}}
+                    result = {
+                        "custom_id": item["custom_id"],
+                        "response": {"status_code": status_code, "body": body},
+                        "error": None,
+                    }
+                    (outputs if status_code == 200 else errors).append(result)
+            job["output_file_id"] = self._write_file(outputs)
+            job["error_file_id"] = self._write_file(errors)
+            job["completed"] = True
+
+        self._job_path(job_id).write_text(json.dumps(job))
+        return {
+            "status": STATE_COMPLETED if job.get("completed") else "in_progress",
+            "output_file_id": job.get("output_file_id"),
+            "error_file_id": job.get("error_file_id"),
+        }
+
+    def _write_file(self, lines: list[dict[str, Any]]) -> Optional[str]:
+        """Store result lines as a provider file; no file when there are none"""
+        if not lines:
+            return None
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with open(self.root / file_id, "w", encoding="utf-8") as out:
+            for line in lines:
+                out.write(json.dumps(line) + "\n")
+        return file_id
+
+    def download(self, file_id: str, dest_path: str) -> None:
+        self.calls["download"] += 1
+        Path(dest_path).write_bytes((self.root / file_id).read_bytes())
+
+
+class BulkJobRunner:
+    """
+    Drives a bulk job through write → upload → submit → poll → download.
+
+    The manifest at ``<work_dir>/<job_name>/manifest.json`` is rewritten
+    atomically after every step, so calling ``run`` again with the same job
+    name after a crash skips everything that already happened.
+    """
+
+    def __init__(
+        self,
+        adapter: BulkJobAdapter,
+        work_dir: str = DEFAULT_WORK_DIR,
+        poll_interval: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.adapter = adapter
+        self.work_dir = Path(work_dir)
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+
+    def job_dir(self, job_name: str) -> Path:
+        return self.work_dir / job_name
+
+    def load_manifest(self, job_name: str) -> Optional[dict[str, Any]]:
+        path = self.job_dir(job_name) / "manifest.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def _save_manifest(self, job_name: str, manifest: dict[str, Any]) -> None:
+        path = self.job_dir(job_name) / "manifest.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        manifest["updated_at"] = time.time()
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _reached(manifest: dict[str, Any], state: str) -> bool:
+        current = manifest.get("state")
+        return current in _STATE_ORDER and _STATE_ORDER.index(
+            current
+        ) >= _STATE_ORDER.index(state)
+
+    def _input_lines(self, requests: Iterable[Any]) -> Iterator[str]:
+        for request in requests:
+            yield json.dumps(self.adapter.format_request(request)) + "\n"
+
+    def _input_sha256(self, requests: Iterable[Any]) -> str:
+        digest = hashlib.sha256()
+        for line in self._input_lines(requests):
+            digest.update(line.encode("utf-8"))
+        return digest.hexdigest()
+
+    def write_input(self, job_name: str, requests: Iterable[Any]) -> dict[str, Any]:
+        """Stream requests to the job's input JSONL without holding them all"""
+        job_dir = self.job_dir(job_name)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        input_path = job_dir / "input.jsonl"
+
+        digest = hashlib.sha256()
+        count = 0
+        with open(input_path, "w", encoding="utf-8") as f:
+            for line in self._input_lines(requests):
+                digest.update(line.encode("utf-8"))
+                f.write(line)
+                count += 1
+
+        manifest = {
+            "job_name": job_name,
+            "provider": self.adapter.name,
+            "state": STATE_WRITTEN,
+            "input_path": str(input_path),
+            "input_sha256": digest.hexdigest(),
+            "request_count": count,
+            "created_at": time.time(),
+        }
+        self._save_manifest(job_name, manifest)
+        logger.info(f"Bulk job {job_name}: wrote {count} requests to {input_path}")
+        return manifest
+
+    def submit(
+        self, job_name: str, requests: Optional[Iterable[Any]] = None
+    ) -> dict[str, Any]:
+        """Write (if needed), upload and create the provider job"""
+        manifest = self.load_manifest(job_name)
+        if manifest is None or manifest.get("state") == STATE_FAILED:
+            if requests is None:
+                raise BulkJobError(f"No manifest or requests for job {job_name}")
+            manifest = self.write_input(job_name, requests)
+        elif requests is not None:
+            # Resuming with different requests would return the old results
+            if self._input_sha256(requests) != manifest.get("input_sha256"):
+                raise BulkJobError(
+                    f"Job {job_name} was created from different requests; "
+                    "use a new job name"
+                )
+
+        if not self._reached(manifest, STATE_UPLOADED):
+            manifest["input_file_id"] = self.adapter.upload(manifest["input_path"])
+            manifest["state"] = STATE_UPLOADED
+            self._save_manifest(job_name, manifest)
+
+        if not self._reached(manifest, STATE_SUBMITTED):
+            manifest["job_id"] = self.adapter.create_job(manifest["input_file_id"])
+            manifest["state"] = STATE_SUBMITTED
+            self._save_manifest(job_name, manifest)
+            logger.info(f"Bulk job {job_name}: submitted as {manifest['job_id']}")
+
+        return manifest
+
+    def wait(self, job_name: str, timeout: Optional[float] = None) -> dict[str, Any]:
+        """Poll the provider until the job completes, then download its output"""
+        manifest = self.load_manifest(job_name)
+        if manifest is None or not self._reached(manifest, STATE_SUBMITTED):
+            raise BulkJobError(f"Job {job_name} has not been submitted")
+
+        waited = 0.0
+        while not self._reached(manifest, STATE_COMPLETED):
+            status = self.adapter.retrieve_job(manifest["job_id"])
+            if status["status"] == STATE_FAILED:
+                manifest["state"] = STATE_FAILED
+                self._save_manifest(job_name, manifest)
+                raise BulkJobError(f"Provider job {manifest['job_id']} failed")
+            if status["status"] == STATE_COMPLETED:
+                manifest["output_file_id"] = status.get("output_file_id")
+                manifest["error_file_id"] = status.get("error_file_id")
+                manifest["state"] = STATE_COMPLETED
+                self._save_manifest(job_name, manifest)
+                break
+            if timeout is not None and waited >= timeout:
+                raise TimeoutError(f"Bulk job {job_name} still running")
+            self.sleep(self.poll_interval)
+            waited += self.poll_interval
+
+        if not self._reached(manifest, STATE_DOWNLOADED):
+            # Failed requests are only listed in the error file
+            for file_key, path_key, filename in (
+                ("output_file_id", "output_path", "output.jsonl"),
+                ("error_file_id", "error_path", "errors.jsonl"),
+            ):
+                if manifest.get(file_key):
+                    path = self.job_dir(job_name) / filename
+                    self.adapter.download(manifest[file_key], str(path))
+                    manifest[path_key] = str(path)
+            manifest["state"] = STATE_DOWNLOADED
+            self._save_manifest(job_name, manifest)
+
+        return manifest
+
+    @staticmethod
+    def _read_jsonl(path: Optional[str]) -> Iterator[dict[str, Any]]:
+        if not path:
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_results(self, job_name: str) -> Iterator[dict[str, Any]]:
+        """
+        Stream downloaded results as ``{"id", "success", "response"|"error"}``.
+
+        Lines from the output and error files are reported in that order,
+        followed by a failure for every request the provider returned nothing
+        for.
+        """
+        manifest = self.load_manifest(job_name)
+        if manifest is None or not self._reached(manifest, STATE_DOWNLOADED):
+            raise BulkJobError(f"Results for job {job_name} are not downloaded")
+
+        seen: set[str] = set()
+        for path_key in ("output_path", "error_path"):
+            for item in self._read_jsonl(manifest.get(path_key)):
+                seen.add(item["custom_id"])
+                response = item.get("response") or {}
+                success = item.get("error") is None and (
+                    response.get("status_code") == 200
+                )
+                result = {"id": item["custom_id"], "success": success}
+                if success:
+                    result["response"] = response["body"]
+                else:
+                    result["error"] = item.get("error") or response
+                yield result
+
+        for item in self._read_jsonl(manifest["input_path"]):
+            if item["custom_id"] not in seen:
+                yield {
+                    "id": item["custom_id"],
+                    "success": False,
+                    "error": {"type": "missing_result"},
+                }
+
+    def run(
+        self,
+        job_name: str,
+        requests: Optional[Iterable[Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Submit (or resume) a job, wait for it and stream its results"""
+        self.submit(job_name, requests)
+        self.wait(job_name, timeout=timeout)
+        return self.iter_results(job_name)
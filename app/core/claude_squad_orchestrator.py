@@ -11,10 +11,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, Union
 
-import aiohttp
 from pydantic import BaseModel
 
 from app.config.logging import get_logger
+from app.core.http_client import get_http_client_registry
 from app.core.session_memory import get_session_memory
 
 logger = get_logger(__name__)
@@ -495,19 +495,19 @@ Provide JSON with: {"financial_model": {}, "unit_economics": {}, "pricing": {},
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        async with (
-            aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=timeout_seconds)
-            ) as session,
-            session.post(
-                self.anthropic_api_url, json=payload, headers=headers
-            ) as response,
-        ):
-            if response.status == 200:
-                return await response.json()
-            else:
-                error_text = await response.text()
-                raise Exception(f"Claude API error {response.status}: {error_text}")
+        response = await get_http_client_registry().post(
+            self.anthropic_api_url,
+            client="llm",
+            json=payload,
+            headers=headers,
+            timeout=timeout_seconds,
+        )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(
+                f"Claude API error {response.status_code}: {response.text}"
+            )
 
     def _calculate_cost(
         self, model: ClaudeModel, input_tokens: int, output_tokens: int
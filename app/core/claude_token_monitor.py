@@ -12,6 +12,7 @@ from pydantic import BaseModel
 
 from app.config.logging import get_logger
 from app.core.cost_tracker import CostTracker
+from app.core.usage_ledger import UsageLedger, get_usage_ledger
 
 logger = get_logger(__name__)
 
@@ -38,9 +39,15 @@ class ClaudeTokenMonitor:
         "claude-4-sonnet": {"input": 3.0, "output": 15.0},
     }
 
-    def __init__(self, cost_tracker: Optional[CostTracker] = None):
+    SOURCE = "claude_token_monitor"
+
+    def __init__(
+        self,
+        cost_tracker: Optional[CostTracker] = None,
+        ledger: Optional[UsageLedger] = None,
+    ):
         self.cost_tracker = cost_tracker or CostTracker()
-        self.usage_log: list[TokenUsage] = []
+        self.ledger = ledger or get_usage_ledger()
         self.daily_budget = float(os.getenv("CLAUDE_DAILY_BUDGET", "10.0"))
         self.session_memory_file = "data/claude_sessions.json"
 
@@ -83,7 +90,16 @@ class ClaudeTokenMonitor:
             task_type=task_type,
         )
 
-        self.usage_log.append(usage)
+        self.ledger.record(
+            source=self.SOURCE,
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=total_cost,
+            task_type=task_type,
+            session_id=session_id,
+            timestamp=usage.timestamp.timestamp(),
+        )
 
         # Track in cost tracker
         self.cost_tracker.add_cost_event(
@@ -123,10 +139,8 @@ class ClaudeTokenMonitor:
 
     def get_daily_spend(self) -> float:
         """Get total Claude spending for today"""
-        today = datetime.now().date()
-        return sum(
-            usage.cost for usage in self.usage_log if usage.timestamp.date() == today
-        )
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.ledger.total_cost(since=midnight.timestamp(), source=self.SOURCE)
 
     def get_session_context(self, session_id: str) -> dict:
         """Retrieve session context for memory continuity"""
@@ -150,8 +164,8 @@ class ClaudeTokenMonitor:
             sessions[session_id] = {
                 **context,
                 "last_updated": datetime.now().isoformat(),
-                "token_usage": sum(
-                    u.total_tokens for u in self.usage_log if u.session_id == session_id
+                "token_usage": self.ledger.session_tokens(
+                    session_id, source=self.SOURCE
                 ),
             }
 
@@ -191,43 +205,37 @@ class ClaudeTokenMonitor:
     def get_usage_analytics(self, days: int = 7) -> dict:
         """Get usage analytics for the last N days"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        recent_usage = [u for u in self.usage_log if u.timestamp >= cutoff_date]
+        summary = self.ledger.summarize(
+            since=cutoff_date.timestamp(), source=self.SOURCE
+        )
 
-        if not recent_usage:
+        if not summary["calls"]:
             return {"error": "No usage data available"}
 
-        total_cost = sum(u.cost for u in recent_usage)
-        total_tokens = sum(u.total_tokens for u in recent_usage)
-
-        # Usage by model
-        model_breakdown = {}
-        for usage in recent_usage:
-            if usage.model not in model_breakdown:
-                model_breakdown[usage.model] = {"tokens": 0, "cost": 0, "requests": 0}
-            model_breakdown[usage.model]["tokens"] += usage.total_tokens
-            model_breakdown[usage.model]["cost"] += usage.cost
-            model_breakdown[usage.model]["requests"] += 1
-
-        # Usage by task type
-        task_breakdown = {}
-        for usage in recent_usage:
-            if usage.task_type not in task_breakdown:
-                task_breakdown[usage.task_type] = {
-                    "tokens": 0,
-                    "cost": 0,
-                    "requests": 0,
+        total_cost = summary["cost"]
+        total_tokens = summary["tokens"]
+        total_requests = summary["calls"]
+
+        # Usage by model and by task type
+        model_breakdown, task_breakdown = (
+            {
+                key: {
+                    "tokens": bucket["tokens"],
+                    "cost": bucket["cost"],
+                    "requests": bucket["calls"],
                 }
-            task_breakdown[usage.task_type]["tokens"] += usage.total_tokens
-            task_breakdown[usage.task_type]["cost"] += usage.cost
-            task_breakdown[usage.task_type]["requests"] += 1
+                for key, bucket in summary[name].items()
+            }
+            for name in ("by_model", "by_task")
+        )
 
         return {
             "period_days": days,
             "total_cost": total_cost,
             "total_tokens": total_tokens,
-            "total_requests": len(recent_usage),
-            "avg_cost_per_request": total_cost / len(recent_usage),
-            "avg_tokens_per_request": total_tokens / len(recent_usage),
+            "total_requests": total_requests,
+            "avg_cost_per_request": total_cost / total_requests,
+            "avg_tokens_per_request": total_tokens / total_requests,
             "model_breakdown": model_breakdown,
             "task_breakdown": task_breakdown,
             "daily_average": total_cost / days,
@@ -289,13 +297,13 @@ class ClaudeTokenMonitor:
             },
             "detailed_usage": [
                 {
-                    "timestamp": usage.timestamp.isoformat(),
-                    "model": usage.model,
-                    "tokens": usage.total_tokens,
-                    "cost": usage.cost,
-                    "task_type": usage.task_type,
+                    "timestamp": datetime.fromtimestamp(event["ts"]).isoformat(),
+                    "model": event["model"],
+                    "tokens": event["input_tokens"] + event["output_tokens"],
+                    "cost": event["cost_usd"],
+                    "task_type": event["task_type"],
                 }
-                for usage in self.usage_log[-100:]  # Last 100 requests
+                for event in self.ledger.recent(100, source=self.SOURCE)
             ],
         }
 
@@ -4,12 +4,15 @@ Tracks API costs, revenue, and business metrics for $300/day target
 """
 
 import json
+import os
+from collections.abc import Iterator, Sequence
 from datetime import datetime, timedelta
 from typing import Optional
 
 from pydantic import BaseModel, Field, validator
 
 from app.config.logging import get_logger
+from app.core.event_store import CostEventStore
 
 logger = get_logger(__name__)
 
@@ -52,14 +55,54 @@ class CostEvent(BaseModel):
     metadata: dict = Field(default_factory=dict)
 
 
+class EventView(Sequence):
+    """Read-only list-like view of one stored event series, loaded on access"""
+
+    def __init__(self, store: CostEventStore, series: str, model: type[BaseModel]):
+        self._store = store
+        self._series = series
+        self._model = model
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        for record in self._store.records(self._series, offset=index, limit=1):
+            return self._model.model_validate(record)
+        raise IndexError(index)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for record in self._store.records(self._series):
+            yield self._model.model_validate(record)
+
+    def __len__(self) -> int:
+        return self._store.count(self._series)
+
+
 class CostTracker:
     """Tracks costs and revenue for business metrics"""
 
-    def __init__(self, test_mode: bool = False):
+    def __init__(self, test_mode: bool = False, db_path: Optional[str] = None):
+        """
+        Args:
+            test_mode: Skip Sentry tracking
+            db_path: Event database; defaults to ``COST_TRACKER_DB_PATH`` or
+                ``data/cost_tracker.db``. Use ``":memory:"`` for a throwaway store.
+        """
         self.test_mode = test_mode
-        self.revenue_events: list[RevenueEvent] = []
-        self.cost_events: list[CostEvent] = []
-        self.subscriptions: dict[str, dict] = {}
+        if db_path is None:
+            db_path = os.getenv("COST_TRACKER_DB_PATH", "data/cost_tracker.db")
+        self.store = CostEventStore(db_path)
+        self.revenue_events = EventView(self.store, "revenue", RevenueEvent)
+        self.cost_events = EventView(self.store, "cost", CostEvent)
+        self.subscriptions: dict[str, dict] = {
+            customer_id: {
+                **record,
+                "created_at": datetime.fromisoformat(record["created_at"]),
+            }
+            for customer_id, record in self.store.subscriptions().items()
+        }
 
     def add_revenue_event(self, event_data: dict):
         """Add a revenue event"""
@@ -68,7 +111,13 @@ class CostTracker:
         else:
             event = event_data
 
-        self.revenue_events.append(event)
+        self.store.append(
+            "revenue",
+            event.timestamp.timestamp(),
+            event.tier,
+            event.amount,
+            event.model_dump(mode="json"),
+        )
         logger.info(f"Revenue event tracked: ${event.amount} from {event.customer_id}")
 
         # Track in Sentry if not in test mode
@@ -83,7 +132,13 @@ class CostTracker:
     def add_cost_event(self, service: str, cost: float, metadata: dict | None = None):
         """Add a cost event"""
         event = CostEvent(service=service, cost=cost, metadata=metadata or {})
-        self.cost_events.append(event)
+        self.store.append(
+            "cost",
+            event.timestamp.timestamp(),
+            event.service,
+            event.cost,
+            event.model_dump(mode="json"),
+        )
         logger.info(f"Cost event tracked: ${cost} for {service}")
 
         # Special handling for Claude token costs
@@ -97,6 +152,7 @@ class CostTracker:
             "amount": amount,
             "created_at": datetime.now(),
         }
+        self.store.save_subscription(customer_id, self.subscriptions[customer_id])
 
         # Also track as revenue event
         self.add_revenue_event(
@@ -113,32 +169,16 @@ class CostTracker:
         if date is None:
             date = datetime.now()
 
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        daily_revenue = sum(
-            event.amount
-            for event in self.revenue_events
-            if start_of_day <= event.timestamp < end_of_day
-        )
-
-        return daily_revenue
+        index = self.store.index("revenue")
+        return index.day_totals.get(date.date(), 0.0)
 
     def get_daily_costs(self, date: Optional[datetime] = None) -> float:
         """Get costs for a specific day"""
         if date is None:
             date = datetime.now()
 
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        daily_costs = sum(
-            event.cost
-            for event in self.cost_events
-            if start_of_day <= event.timestamp < end_of_day
-        )
-
-        return daily_costs
+        index = self.store.index("cost")
+        return index.day_totals.get(date.date(), 0.0)
 
     def is_daily_target_met(self, target: float = 300.0) -> bool:
         """Check if daily revenue target is met"""
@@ -170,16 +210,12 @@ class CostTracker:
         start_date = end_date - timedelta(days=period_days)
 
         # Get revenue for start and end periods
-        start_revenue = sum(
-            event.amount
-            for event in self.revenue_events
-            if start_date <= event.timestamp < start_date + timedelta(days=1)
+        index = self.store.index("revenue")
+        start_revenue = index.total(
+            start_date.timestamp(), (start_date + timedelta(days=1)).timestamp()
         )
-
-        end_revenue = sum(
-            event.amount
-            for event in self.revenue_events
-            if end_date - timedelta(days=1) <= event.timestamp < end_date
+        end_revenue = index.total(
+            (end_date - timedelta(days=1)).timestamp(), end_date.timestamp()
         )
 
         if start_revenue == 0:
@@ -307,13 +343,13 @@ class CostTracker:
         """Get AI service cost breakdown"""
         ai_costs = {"claude": 0.0, "openai": 0.0, "gemini": 0.0, "total": 0.0}
 
-        for event in self.cost_events:
-            if event.service in ["claude_api", "anthropic"]:
-                ai_costs["claude"] += event.cost
-            elif event.service in ["openai_api", "openai"]:
-                ai_costs["openai"] += event.cost
-            elif event.service in ["gemini_api", "google"]:
-                ai_costs["gemini"] += event.cost
+        for service, cost in self.store.index("cost").key_totals.items():
+            if service in ["claude_api", "anthropic"]:
+                ai_costs["claude"] += cost
+            elif service in ["openai_api", "openai"]:
+                ai_costs["openai"] += cost
+            elif service in ["gemini_api", "google"]:
+                ai_costs["gemini"] += cost
 
         ai_costs["total"] = sum(
             [ai_costs["claude"], ai_costs["openai"], ai_costs["gemini"]]
@@ -0,0 +1,354 @@
+"""
+Persistent Embedding Cache
+Memory-mapped embedding matrices keyed by (model, sha256(text)).
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config.logging import get_logger
+from app.utils.env_utils import get_bool_env
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = "data/cache/embeddings"
+
+# SQLite caps bound parameters per statement; stay well under the limit
+_SQL_CHUNK = 500
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding store shared by every RAG path.
+
+    Each model gets one fixed-width matrix file opened with np.memmap, so
+    lookups touch only the rows they need and nothing is deserialized.
+    A SQLite index maps text hashes to row numbers and tracks last access
+    for LRU eviction once a model reaches ``max_entries`` rows. Evicted
+    rows are reused in place, so files never grow past the bound. Matrices
+    and index are kept per dtype, so switching dtype starts a fresh cache
+    instead of reading rows written in another format.
+
+    Writes are serialized with a lock; one writer process per cache
+    directory is assumed.
+    """
+
+    def __init__(
+        self,
+        root_dir: str = DEFAULT_CACHE_DIR,
+        dtype: str = "float32",
+        max_entries: int = 200_000,
+        initial_capacity: int = 1024,
+    ):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.root_dir = Path(root_dir)
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.initial_capacity = min(initial_capacity, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._matrices: dict[str, np.memmap] = {}
+        self._lock = threading.Lock()
+
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.root_dir / f"index.{self.dtype.name}.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS models (
+                model TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                capacity INTEGER NOT NULL,
+                next_row INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                last_accessed REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(model, last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _matrix_path(self, model: str) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        return self.root_dir / f"{slug}.{self.dtype.name}.mmap"
+
+    def _model_info(self, model: str) -> Optional[tuple[int, int, int]]:
+        return self._conn.execute(
+            "SELECT dim, capacity, next_row FROM models WHERE model = ?", (model,)
+        ).fetchone()
+
+    def _open_matrix(self, model: str, dim: int, capacity: int) -> np.memmap:
+        """Map the model's matrix file, extending it to ``capacity`` rows"""
+        matrix = self._matrices.get(model)
+        if matrix is not None and matrix.shape == (capacity, dim):
+            return matrix
+        if matrix is not None:
+            matrix.flush()
+
+        path = self._matrix_path(model)
+        needed = capacity * dim * self.dtype.itemsize
+        with open(path, "ab") as f:
+            if f.tell() < needed:
+                f.truncate(needed)
+
+        matrix = np.memmap(path, dtype=self.dtype, mode="r+", shape=(capacity, dim))
+        self._matrices[model] = matrix
+        return matrix
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Return a float32 vector per text, or None where it is not cached"""
+        keys = [self.make_key(text) for text in texts]
+        found: dict[str, int] = {}
+
+        with self._lock:
+            info = self._model_info(model)
+            if info is not None:
+                unique = list(dict.fromkeys(keys))
+                for start in range(0, len(unique), _SQL_CHUNK):
+                    batch = unique[start : start + _SQL_CHUNK]
+                    placeholders = ",".join("?" * len(batch))
+                    found.update(
+                        self._conn.execute(
+                            f"SELECT text_hash, row FROM entries "
+                            f"WHERE model = ? AND text_hash IN ({placeholders})",
+                            (model, *batch),
+                        ).fetchall()
+                    )
+
+            results: list[Optional[np.ndarray]] = [None] * len(keys)
+            if found:
+                dim, capacity, _ = info
+                matrix = self._open_matrix(model, dim, capacity)
+                for i, key in enumerate(keys):
+                    row = found.get(key)
+                    if row is not None:
+                        results[i] = np.array(matrix[row], dtype=np.float32)
+
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_accessed = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found],
+                )
+                self._conn.commit()
+
+        hits = sum(1 for vector in results if vector is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def _allocate_rows(self, model: str, count: int, dim: int) -> list[int]:
+        """Reserve ``count`` rows, growing the file or evicting LRU entries"""
+        info = self._model_info(model)
+        if info is None:
+            capacity, next_row = self.initial_capacity, 0
+            self._conn.execute(
+                "INSERT INTO models (model, dim, capacity, next_row) VALUES (?, ?, ?, 0)",
+                (model, dim, capacity),
+            )
+        else:
+            stored_dim, capacity, next_row = info
+            if stored_dim != dim:
+                raise ValueError(
+                    f"Embedding dimension {dim} does not match cached {stored_dim} "
+                    f"for model {model}"
+                )
+
+        while next_row + count > capacity and capacity < self.max_entries:
+            capacity = min(capacity * 2, self.max_entries)
+
+        fresh = list(range(next_row, min(next_row + count, capacity)))
+        next_row += len(fresh)
+        self._conn.execute(
+            "UPDATE models SET capacity = ?, next_row = ? WHERE model = ?",
+            (capacity, next_row, model),
+        )
+
+        reused: list[int] = []
+        shortfall = count - len(fresh)
+        if shortfall > 0:
+            victims = self._conn.execute(
+                "SELECT text_hash, row FROM entries WHERE model = ? "
+                "ORDER BY last_accessed ASC LIMIT ?",
+                (model, shortfall),
+            ).fetchall()
+            self._conn.executemany(
+                "DELETE FROM entries WHERE model = ? AND text_hash = ?",
+                [(model, text_hash) for text_hash, _ in victims],
+            )
+            reused = [row for _, row in victims]
+
+        shortfall -= len(reused)
+        if shortfall > 0:
+            # Rows no entry points at, e.g. left by an interrupted write
+            taken = {
+                row
+                for (row,) in self._conn.execute(
+                    "SELECT row FROM entries WHERE model = ?", (model,)
+                )
+            }
+            taken.update(fresh, reused)
+            reused += [row for row in range(next_row) if row not in taken][:shortfall]
+            if len(fresh) + len(reused) < count:
+                raise RuntimeError(
+                    f"Could not reserve {count} embedding cache rows for model {model}"
+                )
+
+        self._open_matrix(model, dim, capacity)
+        return fresh + reused
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Any) -> None:
+        """Store one vector per text; texts already cached are skipped"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError("vectors must be a 2-D array with one row per text")
+
+        pending: dict[str, np.ndarray] = {}
+        for text, vector in zip(texts, vectors, strict=True):
+            pending.setdefault(self.make_key(text), vector)
+
+        with self._lock:
+            if self._model_info(model) is not None:
+                keys = list(pending)
+                for start in range(0, len(keys), _SQL_CHUNK):
+                    batch = keys[start : start + _SQL_CHUNK]
+                    placeholders = ",".join("?" * len(batch))
+                    for (existing,) in self._conn.execute(
+                        f"SELECT text_hash FROM entries "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        (model, *batch),
+                    ).fetchall():
+                        pending.pop(existing, None)
+            if not pending:
+                return
+
+            # Keep at most max_entries of a single oversized batch
+            keys = list(pending)[-self.max_entries :]
+            dim = vectors.shape[1]
+            rows = self._allocate_rows(model, len(keys), dim)
+            matrix = self._matrices[model]
+            matrix[rows] = np.stack([pending[key] for key in keys]).astype(self.dtype)
+            matrix.flush()
+
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (model, text_hash, row, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                [(model, key, row, now) for key, row in zip(keys, rows, strict=True)],
+            )
+            self._conn.commit()
+
+    def get_or_compute(
+        self,
+        model: str,
+        texts: Sequence[str],
+        compute: Callable[[list[str]], Any],
+    ) -> np.ndarray:
+        """
+        Return an (n, dim) float32 matrix for ``texts``.
+
+        Only texts missing from the cache are passed to ``compute``, once
+        each, and its results are stored before returning.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        cached = self.get_many(model, texts)
+        missing = list(
+            dict.fromkeys(t for t, v in zip(texts, cached, strict=True) if v is None)
+        )
+        if missing:
+            computed = np.asarray(compute(missing), dtype=np.float32)
+            self.put_many(model, missing, computed)
+            by_text = dict(zip(missing, computed, strict=True))
+            cached = [
+                v if v is not None else by_text[t]
+                for t, v in zip(texts, cached, strict=True)
+            ]
+
+        return np.stack(cached)
+
+    def clear(self, model: Optional[str] = None) -> None:
+        """Drop cached vectors for one model, or for all models"""
+        with self._lock:
+            models = (
+                [model]
+                if model is not None
+                else [m for (m,) in self._conn.execute("SELECT model FROM models")]
+            )
+            for name in models:
+                self._conn.execute("DELETE FROM entries WHERE model = ?", (name,))
+                self._conn.execute("DELETE FROM models WHERE model = ?", (name,))
+                matrix = self._matrices.pop(name, None)
+                del matrix
+                self._matrix_path(name).unlink(missing_ok=True)
+            self._conn.commit()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            per_model = dict(
+                self._conn.execute(
+                    "SELECT model, COUNT(*) FROM entries GROUP BY model"
+                ).fetchall()
+            )
+        lookups = self.hits + self.misses
+        return {
+            "entries": per_model,
+            "dtype": self.dtype.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Flush mapped matrices and close the index"""
+        with self._lock:
+            for matrix in self._matrices.values():
+                matrix.flush()
+            self._matrices.clear()
+            self._conn.close()
+
+
+# Global cache instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the global embedding cache, or None when disabled"""
+    global _embedding_cache
+    if not get_bool_env("EMBEDDING_CACHE_ENABLED", True):
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            root_dir=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_DIR),
+            dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float32"),
+        )
+    return _embedding_cache
@@ -5,26 +5,43 @@ Implements context-aware RAG for enterprise SaaS documentation and market intell
 
 import hashlib
 import time
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
-# Vector database and embedding imports
 try:
-    import chromadb
     import numpy as np
-    from sentence_transformers import SentenceTransformer
 except ImportError:
-    # Fallback for environments without these dependencies
+    np = None
+
+# Vector database and embedding imports; each falls back independently
+try:
+    import chromadb
+except ImportError:
     chromadb = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
     SentenceTransformer = None
-    np = None
 
 from app.config.logging import get_logger
+from app.core.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.core.query_cache import query_cache_from_env
+from app.utils.keyword_classifier import BUSINESS_KEYWORDS, count_keywords
+
+try:
+    from app.core.embedding_cache import get_embedding_cache
+except ImportError:
+    get_embedding_cache = None
 
 logger = get_logger(__name__)
 
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+CHROMA_PERSIST_DIR = "./data/chroma_db"
+
 
 @dataclass
 class DocumentChunk:
@@ -49,6 +66,8 @@ class RAGQuery:
     document_types: Optional[list[str]] = None
     business_context: Optional[str] = None
     user_role: str = "general"
+    filters: Optional[dict[str, Any]] = None  # Chroma-style metadata filter
+    hybrid: bool = True  # fuse BM25 with vector search
 
 
 @dataclass
@@ -76,13 +95,36 @@ class EnterpriseRAGSystem:
     - Cost-optimized retrieval
     """
 
-    def __init__(self, collection_name: str = "enterprise_knowledge"):
+    def __init__(
+        self,
+        collection_name: str = "enterprise_knowledge",
+        embedding_batch_size: int = 64,
+        persist_dir: str = CHROMA_PERSIST_DIR,
+        embedding_model: Any = None,
+        cache_namespace: Optional[str] = None,
+    ):
+        """
+        Args:
+            embedding_model: Encoder to use instead of loading the default
+                sentence-transformers model
+            cache_namespace: Embedding cache key for ``embedding_model``;
+                injected models without one bypass the embedding cache so
+                they never read vectors produced by another model
+        """
         self.collection_name = collection_name
+        self.embedding_batch_size = embedding_batch_size
+        self.persist_dir = persist_dir
         self.chroma_client = None
         self.collection = None
-        self.embedding_model = None
+        self.lexical_index: Optional[BM25Index] = None
+        self.embedding_model = embedding_model
+        if cache_namespace is None and embedding_model is None:
+            cache_namespace = EMBEDDING_MODEL_NAME
+        self.cache_namespace = cache_namespace
         self.document_cache = {}
-        self.query_cache = {}
+        self._known_chunk_hashes: set[str] = set()
+        self.embedding_cache = get_embedding_cache() if get_embedding_cache else None
+        self.query_cache = query_cache_from_env()
         self.performance_metrics = {
             "queries_processed": 0,
             "avg_response_time": 0.0,
@@ -101,7 +143,7 @@ class EnterpriseRAGSystem:
                 logger.warning("ChromaDB not available, using mock implementation")
                 return
 
-            self.chroma_client = chromadb.PersistentClient(path="./data/chroma_db")
+            self.chroma_client = chromadb.PersistentClient(path=self.persist_dir)
 
             # Create or get collection
             try:
@@ -118,11 +160,20 @@ class EnterpriseRAGSystem:
                 )
                 logger.info(f"Created new collection: {self.collection_name}")
 
+            # BM25 sidecar for exact-term matches that embeddings rank poorly
+            self.lexical_index = BM25Index(
+                f"{self.persist_dir}/bm25/{self.collection_name}.db"
+            )
+            self.lexical_index.ensure_synced(self.collection)
+
         except Exception as e:
             logger.error(f"Failed to initialize vector database: {e}")
 
     def _initialize_embedding_model(self) -> None:
         """Initialize sentence transformer model for embeddings"""
+        if self.embedding_model is not None:
+            return
+
         try:
             if SentenceTransformer is None:
                 logger.warning(
@@ -131,8 +182,8 @@ class EnterpriseRAGSystem:
                 return
 
             # Use a business-optimized embedding model
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-            logger.info("Initialized embedding model: all-MiniLM-L6-v2")
+            self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+            logger.info(f"Initialized embedding model: {EMBEDDING_MODEL_NAME}")
 
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {e}")
@@ -150,6 +201,32 @@ class EnterpriseRAGSystem:
             logger.error(f"Failed to generate embedding: {e}")
             return [0.1] * 384
 
+    def _generate_embeddings(self, texts: list[str]) -> Any:
+        """Encode texts in batches; returns an (n, dim) float32 array"""
+        if not texts:
+            return []
+        if self.embedding_model is None:
+            mock = [[0.1] * 384 for _ in texts]
+            return np.asarray(mock, dtype=np.float32) if np is not None else mock
+
+        def encode(batch: list[str]) -> Any:
+            return self.embedding_model.encode(
+                batch,
+                batch_size=self.embedding_batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            ).astype("float32", copy=False)
+
+        try:
+            if self.embedding_cache is not None and self.cache_namespace:
+                return self.embedding_cache.get_or_compute(
+                    self.cache_namespace, texts, encode
+                )
+            return encode(texts)
+        except Exception as e:
+            logger.error(f"Failed to generate batch embeddings: {e}")
+            return [self._generate_embedding(text) for text in texts]
+
     def _chunk_document(self, content: str, max_chunk_size: int = 1000) -> list[str]:
         """Chunk document into manageable pieces"""
         # Simple sentence-based chunking
@@ -173,32 +250,10 @@ class EnterpriseRAGSystem:
         self, content: str, metadata: dict[str, Any]
     ) -> float:
         """Calculate business relevance score for content"""
-        business_keywords = [
-            "revenue",
-            "customer",
-            "saas",
-            "enterprise",
-            "roi",
-            "profit",
-            "market",
-            "competitor",
-            "growth",
-            "strategy",
-            "pricing",
-            "subscription",
-            "mrr",
-            "arr",
-            "churn",
-            "acquisition",
-        ]
-
-        content_lower = content.lower()
-        keyword_matches = sum(
-            1 for keyword in business_keywords if keyword in content_lower
-        )
+        keyword_matches = count_keywords(content, BUSINESS_KEYWORDS)
 
         # Base relevance from keyword matching
-        relevance = min(keyword_matches / len(business_keywords), 1.0)
+        relevance = min(keyword_matches / len(BUSINESS_KEYWORDS), 1.0)
 
         # Boost for specific document types
         doc_type = metadata.get("document_type", "general")
@@ -224,6 +279,102 @@ class EnterpriseRAGSystem:
 
         return min(relevance, 1.0)
 
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _prepare_chunks(
+        self, doc_id: str, content: str, metadata: dict[str, Any], document_type: str
+    ) -> list[DocumentChunk]:
+        """Chunk a document and attach metadata; embeddings are filled in later"""
+        ingested_at = datetime.now().isoformat()
+        chunks = []
+
+        for i, chunk_content in enumerate(self._chunk_document(content)):
+            business_relevance = self._calculate_business_relevance(
+                chunk_content, metadata
+            )
+            chunk_metadata = {
+                **metadata,
+                "document_id": doc_id,
+                "chunk_index": i,
+                "document_type": document_type,
+                "business_relevance": business_relevance,
+                "ingested_at": ingested_at,
+                "chunk_length": len(chunk_content),
+                "content_hash": self._content_hash(chunk_content),
+            }
+            chunks.append(
+                DocumentChunk(
+                    id=f"{doc_id}_chunk_{i}",
+                    content=chunk_content,
+                    metadata=chunk_metadata,
+                    chunk_index=i,
+                    document_type=document_type,
+                    business_relevance=business_relevance,
+                )
+            )
+
+        return chunks
+
+    def _filter_known_chunks(self, chunks: list[DocumentChunk]) -> list[DocumentChunk]:
+        """Drop chunks whose content is already embedded in the collection"""
+        fresh: dict[str, DocumentChunk] = {}
+        for chunk in chunks:
+            content_hash = chunk.metadata["content_hash"]
+            if content_hash not in self._known_chunk_hashes:
+                fresh.setdefault(content_hash, chunk)
+
+        if fresh and self.collection is not None:
+            try:
+                existing = self.collection.get(
+                    where={"content_hash": {"$in": list(fresh)}},
+                    include=["metadatas"],
+                )
+                for stored in existing.get("metadatas") or []:
+                    content_hash = stored.get("content_hash")
+                    self._known_chunk_hashes.add(content_hash)
+                    fresh.pop(content_hash, None)
+            except Exception as e:
+                logger.warning(f"Content hash lookup failed, embedding all: {e}")
+
+        return list(fresh.values())
+
+    def _embed_and_store(self, chunks: list[DocumentChunk]) -> int:
+        """Batch-embed new chunks and add them to the collection"""
+        new_chunks = self._filter_known_chunks(chunks)
+        if not new_chunks:
+            return 0
+
+        embeddings = self._generate_embeddings([c.content for c in new_chunks])
+        for chunk, embedding in zip(new_chunks, embeddings, strict=True):
+            chunk.embedding = embedding
+
+        if self.collection is not None:
+            try:
+                self.collection.add(
+                    embeddings=embeddings,
+                    documents=[chunk.content for chunk in new_chunks],
+                    metadatas=[chunk.metadata for chunk in new_chunks],
+                    ids=[chunk.id for chunk in new_chunks],
+                )
+                logger.info(f"Stored {len(new_chunks)} chunks in vector database")
+            except Exception as e:
+                logger.error(f"Failed to store in vector database: {e}")
+                return 0
+
+            if self.lexical_index is not None:
+                self.lexical_index.upsert(
+                    [chunk.id for chunk in new_chunks],
+                    [chunk.content for chunk in new_chunks],
+                    [chunk.metadata for chunk in new_chunks],
+                )
+
+        self._known_chunk_hashes.update(c.metadata["content_hash"] for c in new_chunks)
+        # New chunks can change any answer over this collection
+        self.query_cache.invalidate(self.collection_name)
+        return len(new_chunks)
+
     async def ingest_document(
         self, content: str, metadata: dict[str, Any], document_type: str = "general"
     ) -> dict[str, Any]:
@@ -248,65 +399,9 @@ class EnterpriseRAGSystem:
             logger.info(f"Document {doc_id} already in cache")
             return {"success": True, "cached": True, "doc_id": doc_id}
 
-        # Chunk the document
-        chunks = self._chunk_document(content)
-        logger.info(f"Document chunked into {len(chunks)} pieces")
-
-        # Process each chunk
-        document_chunks = []
-        embeddings = []
-        chunk_ids = []
-        chunk_metadatas = []
-
-        for i, chunk_content in enumerate(chunks):
-            chunk_id = f"{doc_id}_chunk_{i}"
-
-            # Calculate business relevance
-            business_relevance = self._calculate_business_relevance(
-                chunk_content, metadata
-            )
-
-            # Create chunk metadata
-            chunk_metadata = {
-                **metadata,
-                "document_id": doc_id,
-                "chunk_index": i,
-                "document_type": document_type,
-                "business_relevance": business_relevance,
-                "ingested_at": datetime.now().isoformat(),
-                "chunk_length": len(chunk_content),
-            }
-
-            # Generate embedding
-            embedding = self._generate_embedding(chunk_content)
-
-            chunk = DocumentChunk(
-                id=chunk_id,
-                content=chunk_content,
-                metadata=chunk_metadata,
-                embedding=embedding,
-                chunk_index=i,
-                document_type=document_type,
-                business_relevance=business_relevance,
-            )
-
-            document_chunks.append(chunk)
-            embeddings.append(embedding)
-            chunk_ids.append(chunk_id)
-            chunk_metadatas.append(chunk_metadata)
-
-        # Store in vector database
-        if self.collection is not None:
-            try:
-                self.collection.add(
-                    embeddings=embeddings,
-                    documents=[chunk.content for chunk in document_chunks],
-                    metadatas=chunk_metadatas,
-                    ids=chunk_ids,
-                )
-                logger.info(f"Stored {len(chunks)} chunks in vector database")
-            except Exception as e:
-                logger.error(f"Failed to store in vector database: {e}")
+        document_chunks = self._prepare_chunks(doc_id, content, metadata, document_type)
+        logger.info(f"Document chunked into {len(document_chunks)} pieces")
+        chunks_embedded = self._embed_and_store(document_chunks)
 
         # Cache document
         self.document_cache[doc_id] = {
@@ -318,17 +413,73 @@ class EnterpriseRAGSystem:
         processing_time = time.time() - start_time
 
         # Update metrics
-        self.performance_metrics["knowledge_base_size"] += len(chunks)
+        self.performance_metrics["knowledge_base_size"] += chunks_embedded
 
         return {
             "success": True,
             "doc_id": doc_id,
-            "chunks_created": len(chunks),
+            "chunks_created": len(document_chunks),
+            "chunks_embedded": chunks_embedded,
             "processing_time": processing_time,
-            "business_relevance_avg": sum(c.business_relevance for c in document_chunks)
-            / len(document_chunks),
+            "business_relevance_avg": (
+                sum(c.business_relevance for c in document_chunks)
+                / len(document_chunks)
+                if document_chunks
+                else 0.0
+            ),
         }
 
+    async def ingest_documents(
+        self,
+        documents: Iterable[tuple[str, dict[str, Any]]],
+        document_type: str = "general",
+        flush_size: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Bulk-ingest (content, metadata) pairs from any iterable or generator.
+
+        Chunks are buffered until flush_size is reached, then embedded in
+        batches and written in one collection call, so memory stays bounded
+        by the buffer rather than the corpus. Documents seen before and
+        chunks whose content is already stored are skipped.
+        """
+        start_time = time.time()
+        flush_size = flush_size or self.embedding_batch_size * 8
+        pending: list[DocumentChunk] = []
+        stats = {"documents": 0, "skipped_documents": 0, "chunks": 0, "embedded": 0}
+
+        for content, metadata in documents:
+            doc_id = hashlib.md5(content.encode()).hexdigest()
+            if doc_id in self.document_cache:
+                stats["skipped_documents"] += 1
+                continue
+
+            chunks = self._prepare_chunks(doc_id, content, metadata, document_type)
+
+            self.document_cache[doc_id] = {
+                "chunk_count": len(chunks),
+                "metadata": metadata,
+                "ingested_at": time.time(),
+            }
+            stats["documents"] += 1
+            stats["chunks"] += len(chunks)
+            pending.extend(chunks)
+
+            if len(pending) >= flush_size:
+                stats["embedded"] += self._embed_and_store(pending)
+                pending = []
+
+        stats["embedded"] += self._embed_and_store(pending)
+        self.performance_metrics["knowledge_base_size"] += stats["embedded"]
+
+        processing_time = time.time() - start_time
+        logger.info(
+            f"Bulk ingested {stats['documents']} documents "
+            f"({stats['embedded']}/{stats['chunks']} chunks embedded) "
+            f"in {processing_time:.2f}s"
+        )
+        return {"success": True, **stats, "processing_time": processing_time}
+
     async def query_knowledge_base(self, rag_query: RAGQuery) -> RAGResponse:
         """
         Query the knowledge base with enhanced context awareness.
@@ -341,62 +492,49 @@ class EnterpriseRAGSystem:
         """
         start_time = time.time()
 
-        # Check query cache
-        query_hash = hashlib.md5(rag_query.query.encode()).hexdigest()
-        if query_hash in self.query_cache:
-            cached_response = self.query_cache[query_hash]
-            if time.time() - cached_response["timestamp"] < 3600:  # 1 hour cache
-                logger.info("Returning cached query result")
-                self.performance_metrics["queries_processed"] += 1
-                return cached_response["response"]
+        # Check query cache; every field but the text must match exactly
+        cache_params = {k: v for k, v in asdict(rag_query).items() if k != "query"}
+        semantic_embedding = None
+        if self.query_cache.semantic_enabled and self.embedding_model is not None:
+            semantic_embedding = self._generate_embedding(rag_query.query)
 
-        # Generate query embedding
-        query_embedding = self._generate_embedding(rag_query.query)
+        cached_response = self.query_cache.get(
+            self.collection_name, rag_query.query, cache_params, semantic_embedding
+        )
+        self.performance_metrics["cache_hit_rate"] = self.query_cache.hit_rate
+        if cached_response is not None:
+            logger.info("Returning cached query result")
+            self.performance_metrics["queries_processed"] += 1
+            return cached_response
 
-        # Search vector database
-        search_results = []
-        if self.collection is not None:
-            try:
-                results = self.collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=rag_query.max_results * 2,  # Get more for filtering
-                    include=["documents", "metadatas", "distances"],
+        # Generate query embedding
+        query_embedding = semantic_embedding or self._generate_embedding(
+            rag_query.query
+        )
+        where = self._build_where(rag_query)
+
+        # Over-fetch candidates on both sides, then fuse by rank
+        candidates = rag_query.max_results * 4
+        hits = self._vector_search(rag_query, query_embedding, where, candidates)
+        rankings = [list(hits)]
+        if rag_query.hybrid and self.lexical_index is not None:
+            rankings.append(
+                self._lexical_search(
+                    rag_query, query_embedding, where, candidates, hits
                 )
+            )
 
-                # Process and filter results
-                for doc, metadata, distance in zip(
-                    results["documents"][0],
-                    results["metadatas"][0],
-                    results["distances"][0],
-                    strict=False,
-                ):
-                    if distance < rag_query.min_relevance_score:
-                        # Convert distance to similarity score
-                        similarity_score = 1.0 - distance
-
-                    if similarity_score >= rag_query.min_relevance_score:
-                        # Apply document type filter
-                        if (
-                            rag_query.document_types is None
-                            or metadata.get("document_type") in rag_query.document_types
-                        ):
-                            search_results.append(
-                                {
-                                    "content": doc,
-                                    "metadata": metadata,
-                                    "similarity_score": similarity_score,
-                                    "business_relevance": metadata.get(
-                                        "business_relevance", 0.5
-                                    ),
-                                }
-                            )
-
-            except Exception as e:
-                logger.error(f"Vector search failed: {e}")
+        fused = reciprocal_rank_fusion(rankings)
+        best = fused[0][1] if fused else 1.0
+        search_results = []
+        for chunk_id, score in fused:
+            result = hits[chunk_id]
+            result["fusion_score"] = score / best
+            search_results.append(result)
 
         # Sort by combined relevance and business importance
         search_results.sort(
-            key=lambda x: (x["similarity_score"] * 0.7 + x["business_relevance"] * 0.3),
+            key=lambda x: (x["fusion_score"] * 0.7 + x["business_relevance"] * 0.3),
             reverse=True,
         )
 
@@ -446,10 +584,13 @@ class EnterpriseRAGSystem:
         )
 
         # Cache response
-        self.query_cache[query_hash] = {
-            "response": rag_response,
-            "timestamp": time.time(),
-        }
+        self.query_cache.set(
+            self.collection_name,
+            rag_query.query,
+            cache_params,
+            rag_response,
+            semantic_embedding,
+        )
 
         # Update metrics
         self.performance_metrics["queries_processed"] += 1
@@ -461,6 +602,106 @@ class EnterpriseRAGSystem:
 
         return rag_response
 
+    @staticmethod
+    def _build_where(rag_query: RAGQuery) -> Optional[dict[str, Any]]:
+        """Combine document_types and free-form filters into one pre-filter"""
+        clauses = []
+        if rag_query.document_types:
+            clauses.append({"document_type": {"$in": list(rag_query.document_types)}})
+        if rag_query.filters:
+            clauses.append(rag_query.filters)
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    @staticmethod
+    def _search_result(
+        content: str, metadata: dict[str, Any], similarity_score: float
+    ) -> dict[str, Any]:
+        return {
+            "content": content,
+            "metadata": metadata,
+            "similarity_score": similarity_score,
+            "business_relevance": metadata.get("business_relevance", 0.5),
+        }
+
+    def _vector_search(
+        self,
+        rag_query: RAGQuery,
+        query_embedding: list[float],
+        where: Optional[dict[str, Any]],
+        candidates: int,
+    ) -> dict[str, dict[str, Any]]:
+        """Ranked vector hits above ``min_relevance_score``, keyed by chunk id"""
+        hits: dict[str, dict[str, Any]] = {}
+        if self.collection is None:
+            return hits
+
+        try:
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=candidates,
+                where=where,
+                include=["documents", "metadatas", "distances"],
+            )
+            for chunk_id, doc, metadata, distance in zip(
+                results["ids"][0],
+                results["documents"][0],
+                results["metadatas"][0],
+                results["distances"][0],
+                strict=False,
+            ):
+                # Convert distance to similarity score
+                similarity_score = 1.0 - distance
+                if similarity_score >= rag_query.min_relevance_score:
+                    hits[chunk_id] = self._search_result(
+                        doc, metadata, similarity_score
+                    )
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+
+        return hits
+
+    def _lexical_search(
+        self,
+        rag_query: RAGQuery,
+        query_embedding: list[float],
+        where: Optional[dict[str, Any]],
+        candidates: int,
+        hits: dict[str, dict[str, Any]],
+    ) -> list[str]:
+        """
+        Ranked BM25 chunk ids; rows the vector side missed are added to ``hits``.
+
+        Lexical matches bypass ``min_relevance_score`` on purpose: an exact
+        product-name hit is evidence even when the embedding scores it low.
+        """
+        try:
+            lexical_hits = self.lexical_index.search(rag_query.query, candidates, where)
+            missing = [chunk_id for chunk_id, _ in lexical_hits if chunk_id not in hits]
+            if missing:
+                fetched = self.collection.get(
+                    ids=missing, include=["documents", "metadatas", "embeddings"]
+                )
+                query_vector = np.asarray(query_embedding, dtype=np.float32)
+                for chunk_id, doc, metadata, embedding in zip(
+                    fetched["ids"],
+                    fetched["documents"],
+                    fetched["metadatas"],
+                    fetched["embeddings"],
+                    strict=True,
+                ):
+                    # Chroma's default space is squared L2, as used by query()
+                    distance = float(
+                        np.sum((np.asarray(embedding) - query_vector) ** 2)
+                    )
+                    hits[chunk_id] = self._search_result(doc, metadata, 1.0 - distance)
+        except Exception as e:
+            logger.error(f"Lexical search failed: {e}")
+            return []
+
+        return [chunk_id for chunk_id, _ in lexical_hits if chunk_id in hits]
+
     async def _generate_contextual_response(
         self,
         query: str,
@@ -590,13 +831,7 @@ This analysis is based on {len(search_results)} relevant sources from our enterp
                 "total_chunks": self.performance_metrics["knowledge_base_size"],
                 "cache_size": len(self.query_cache),
             },
-            "recent_queries": len(
-                [
-                    q
-                    for q in self.query_cache.values()
-                    if time.time() - q["timestamp"] < 3600
-                ]
-            ),
+            "recent_queries": self.query_cache.count_since(time.time() - 3600),
             "system_health": {
                 "vector_db_available": self.collection is not None,
                 "embedding_model_available": self.embedding_model is not None,
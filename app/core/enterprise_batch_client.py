@@ -4,14 +4,22 @@ Implements CTO-recommended batch processing for reduced overhead.
 """
 
 import asyncio
+import hashlib
 import time
 from dataclasses import dataclass
 from typing import Any, Optional
 
-import httpx
-
 from app.config.logging import get_logger
 from app.core.batch_api_optimizer import get_batch_optimizer
+from app.core.batch_jobs import (
+    AnthropicBulkAdapter,
+    BulkJobAdapter,
+    BulkJobRunner,
+    LocalBulkAdapter,
+    OpenAIBulkAdapter,
+)
+from app.core.llm_cache import get_llm_cache
+from app.utils.env_utils import get_bool_env
 
 logger = get_logger(__name__)
 
@@ -34,12 +42,14 @@ class EnterpriseBatchClient:
     Optimizes for cost, latency, and throughput.
     """
 
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None):
         self.anthropic_api_key = None
         self.openai_api_key = None
         self.gemini_api_key = None
         self.batch_optimizer = get_batch_optimizer()
-        self.client = httpx.AsyncClient(timeout=30.0)
+        if use_cache is None:
+            use_cache = get_bool_env("LLM_CACHE_ENABLED")
+        self.cache = get_llm_cache() if use_cache else None
 
     async def process_batch_prompts(
         self, requests: list[BatchRequest], provider: str = "anthropic"
@@ -58,15 +68,22 @@ class EnterpriseBatchClient:
 
         logger.info(f"Processing batch of {len(requests)} requests with {provider}")
 
+        # Serve repeated prompts from the response cache
+        all_results = self._lookup_cached(requests, provider)
+        pending = [i for i, result in enumerate(all_results) if result is None]
+
         # Group requests by similarity for optimal batching
-        grouped_requests = self._group_similar_requests(requests)
+        grouped_positions = self._group_similar_requests(requests, pending)
 
-        all_results = []
         total_cost_savings = 0.0
 
-        for group in grouped_requests:
+        for positions in grouped_positions:
+            group = [requests[i] for i in positions]
             group_results = await self._process_request_group(group, provider)
-            all_results.extend(group_results)
+            self._store_cached(group, group_results, provider)
+            # Keep results in the order the requests were given
+            for i, result in zip(positions, group_results, strict=True):
+                all_results[i] = result
 
         execution_time = time.time() - start_time
         cost_savings = self._calculate_batch_savings(len(requests), execution_time)
@@ -80,22 +97,160 @@ class EnterpriseBatchClient:
             "cost_savings": total_cost_savings,
             "throughput": len(requests) / execution_time,
             "provider": provider,
+            "cache_hits": len(requests) - len(pending),
         }
 
+    async def process_bulk_job(
+        self,
+        requests: list[BatchRequest],
+        job_name: str,
+        provider: str = "openai",
+        adapter: Optional[BulkJobAdapter] = None,
+        timeout: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """
+        Process prompts through the provider's offline batch tier.
+
+        Requests are streamed to a JSONL file, submitted and polled through a
+        bulk adapter, and results are read back by custom_id. Re-running with
+        the same job name resumes from the local manifest after a crash.
+
+        Args:
+            requests: List of batch requests
+            job_name: Stable name for the job (used for resume)
+            provider: AI provider (openai, anthropic, local)
+            adapter: Bulk adapter override, e.g. LocalBulkAdapter for tests
+            timeout: Maximum seconds to wait for the provider job
+
+        Returns:
+            Batch processing results in the same shape as process_batch_prompts
+        """
+        start_time = time.time()
+        runner = BulkJobRunner(adapter or self._bulk_adapter(provider))
+        metadata = {request.id: request.metadata for request in requests}
+
+        logger.info(f"Running bulk job {job_name} with {len(requests)} requests")
+
+        def run_job() -> list[dict[str, Any]]:
+            return [
+                {**result, "metadata": metadata.get(result["id"])}
+                for result in runner.run(job_name, requests, timeout=timeout)
+            ]
+
+        results = await asyncio.to_thread(run_job)
+        execution_time = time.time() - start_time
+
+        return {
+            "success": all(result["success"] for result in results),
+            "results": results,
+            "total_requests": len(results),
+            "execution_time": execution_time,
+            "cost_savings": self._calculate_batch_savings(len(results), execution_time),
+            "throughput": len(results) / execution_time if execution_time else 0.0,
+            "provider": provider,
+            "mode": "bulk",
+            "job_name": job_name,
+        }
+
+    @staticmethod
+    def bulk_job_name(prefix: str, requests: list[BatchRequest]) -> str:
+        """
+        Job name derived only from the request set, so a run resumed after a
+        crash (even past midnight) finds its job, and an identical request
+        set reuses finished results instead of paying for them again.
+        """
+        digest = hashlib.sha256()
+        for request in requests:
+            digest.update(
+                f"{request.id}\0{request.model}\0{request.prompt}\0"
+                f"{request.max_tokens}\0{request.temperature}\0".encode()
+            )
+        return f"{prefix}_{digest.hexdigest()[:16]}"
+
+    def _bulk_adapter(self, provider: str) -> BulkJobAdapter:
+        if provider == "openai":
+            return OpenAIBulkAdapter(api_key=self.openai_api_key)
+        elif provider == "anthropic":
+            return AnthropicBulkAdapter(api_key=self.anthropic_api_key)
+        elif provider == "local":
+            return LocalBulkAdapter()
+        else:
+            raise ValueError(f"Unsupported bulk provider: {provider}")
+
+    @staticmethod
+    def _cache_args(request: BatchRequest, provider: str) -> tuple:
+        return (
+            f"{provider}/{request.model}",
+            [{"role": "user", "content": request.prompt}],
+        )
+
+    def _lookup_cached(
+        self, requests: list[BatchRequest], provider: str
+    ) -> list[Optional[dict[str, Any]]]:
+        """Cached result for each request, or None where it still has to be sent"""
+        if not self.cache:
+            return [None] * len(requests)
+
+        cached_results: list[Optional[dict[str, Any]]] = []
+        for request in requests:
+            model, messages = self._cache_args(request, provider)
+            response = self.cache.get(
+                model, messages, request.temperature, request.max_tokens
+            )
+            if response is None:
+                cached_results.append(None)
+            else:
+                cached_results.append(
+                    {
+                        "id": request.id,
+                        "success": True,
+                        "response": response,
+                        "metadata": request.metadata,
+                        "cached": True,
+                    }
+                )
+        return cached_results
+
+    def _store_cached(
+        self,
+        requests: list[BatchRequest],
+        results: list[dict[str, Any]],
+        provider: str,
+    ) -> None:
+        """
+        Cache the responses of successful provider calls. Simulated results
+        are never cached, so placeholder text cannot reach real clients
+        sharing the cache.
+        """
+        if not self.cache:
+            return
+
+        for request, result in zip(requests, results, strict=True):
+            if result.get("success") and not result.get("simulated"):
+                model, messages = self._cache_args(request, provider)
+                self.cache.set(
+                    model,
+                    messages,
+                    result["response"],
+                    request.temperature,
+                    request.max_tokens,
+                )
+
     def _group_similar_requests(
-        self, requests: list[BatchRequest]
-    ) -> list[list[BatchRequest]]:
-        """Group similar requests for optimal batching"""
+        self, requests: list[BatchRequest], positions: list[int]
+    ) -> list[list[int]]:
+        """Group the requests at ``positions`` for optimal batching"""
         groups = {}
 
-        for request in requests:
+        for position in positions:
+            request = requests[position]
             # Group by model and approximate prompt length
             prompt_length_category = "short" if len(request.prompt) < 500 else "long"
             key = f"{request.model}_{prompt_length_category}"
 
             if key not in groups:
                 groups[key] = []
-            groups[key].append(request)
+            groups[key].append(position)
 
         return list(groups.values())
 
@@ -155,6 +310,7 @@ class EnterpriseBatchClient:
                         },
                     },
                     "metadata": request.metadata,
+                    "simulated": True,
                 }
 
         tasks = [process_single_request(req) for req in requests]
@@ -204,6 +360,7 @@ class EnterpriseBatchClient:
                     },
                 },
                 "metadata": request.metadata,
+                "simulated": True,
             }
             results.append(result)
 
@@ -242,6 +399,7 @@ class EnterpriseBatchClient:
                         },
                     },
                     "metadata": request.metadata,
+                    "simulated": True,
                 }
 
         tasks = [process_gemini_request(req) for req in requests]
@@ -311,8 +469,7 @@ class EnterpriseBatchClient:
         return result
 
     async def close(self):
-        """Clean up resources"""
-        await self.client.aclose()
+        """Clean up resources; pooled connections are closed at app shutdown"""
 
 
 # Global client instance
@@ -329,9 +486,9 @@ def get_enterprise_batch_client() -> EnterpriseBatchClient:
 
 # Convenience functions for common enterprise patterns
 async def batch_generate_code_components(
-    component_specs: list[str], framework: str = "fastapi"
+    component_specs: list[str], framework: str = "fastapi", bulk: bool = False
 ) -> dict[str, Any]:
-    """Batch generate multiple code components"""
+    """Batch generate multiple code components (bulk=True uses the batch tier)"""
     client = get_enterprise_batch_client()
 
     requests = []
@@ -345,13 +502,19 @@ async def batch_generate_code_components(
             )
         )
 
+    if bulk:
+        return await client.process_bulk_job(
+            requests,
+            job_name=client.bulk_job_name(f"components_{framework}", requests),
+            provider="anthropic",
+        )
     return await client.process_batch_prompts(requests, provider="anthropic")
 
 
 async def batch_analyze_prospects(
-    prospect_data: list[dict[str, Any]],
+    prospect_data: list[dict[str, Any]], bulk: bool = False
 ) -> dict[str, Any]:
-    """Batch analyze multiple enterprise prospects"""
+    """Batch analyze multiple enterprise prospects (bulk=True uses the batch tier)"""
     client = get_enterprise_batch_client()
 
     requests = []
@@ -374,4 +537,10 @@ async def batch_analyze_prospects(
             )
         )
 
+    if bulk:
+        return await client.process_bulk_job(
+            requests,
+            job_name=client.bulk_job_name("prospects", requests),
+            provider="anthropic",
+        )
     return await client.process_batch_prompts(requests, provider="anthropic")
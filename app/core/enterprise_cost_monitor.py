@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from app.config.logging import get_logger
 from app.core.session_memory import get_session_memory_manager
+from app.core.usage_ledger import UsageLedger, get_usage_ledger
 
 logger = get_logger(__name__)
 
@@ -17,8 +18,11 @@ logger = get_logger(__name__)
 class EnterpriseCostMonitor:
     """Enterprise-grade cost monitoring for Claude Code optimization"""
 
-    def __init__(self):
+    SOURCE = "enterprise_cost_monitor"
+
+    def __init__(self, ledger: UsageLedger | None = None):
         self.memory = get_session_memory_manager()
+        self.ledger = ledger or get_usage_ledger()
         self.cost_data_file = "data/memory/enterprise_cost_tracking.json"
 
         # CEO Strategy Parameters
@@ -127,6 +131,15 @@ class EnterpriseCostMonitor:
             "model_efficiency_score": self._calculate_model_efficiency(model, cost),
         }
 
+        self.ledger.record(
+            source=self.SOURCE,
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost,
+            task_type=operation,
+        )
+
         # Load current tracking data
         tracking_data = self._load_cost_tracking_data()
 
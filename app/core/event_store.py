@@ -0,0 +1,263 @@
+"""
+Cost Event Store
+Persistent, time-indexed storage for CostTracker revenue and cost events,
+so dashboard metrics cost the same at ten events or a million.
+"""
+
+import json
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+SERIES = ("revenue", "cost")
+
+
+class TimeSeriesIndex:
+    """
+    In-memory index over one series of (timestamp, key, amount) events.
+
+    - Timestamps are kept sorted in a compact array with running prefix sums,
+      so the total over any time range is two bisects and a subtraction
+    - Per-day and per-key totals are maintained on every insert
+    - Appends in time order are O(1); a late event is inserted in place and
+      the prefix sums after it are rebuilt on the next range query
+    """
+
+    def __init__(self):
+        self._ts = array("d")
+        self._amounts = array("d")
+        self._prefix = array("d", [0.0])
+        self.day_totals: dict[date, float] = {}
+        self.key_totals: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def add(self, ts: float, key: str, amount: float) -> None:
+        if not self._ts or ts >= self._ts[-1]:
+            self._ts.append(ts)
+            self._amounts.append(amount)
+            if len(self._prefix) == len(self._ts):
+                self._prefix.append(self._prefix[-1] + amount)
+        else:
+            position = bisect_left(self._ts, ts)
+            self._ts.insert(position, ts)
+            self._amounts.insert(position, amount)
+            del self._prefix[position + 1 :]
+
+        day = date.fromtimestamp(ts)
+        self.day_totals[day] = self.day_totals.get(day, 0.0) + amount
+        self.key_totals[key] = self.key_totals.get(key, 0.0) + amount
+
+    @classmethod
+    def from_sorted(cls, rows: Iterable[tuple[float, str, float]]) -> "TimeSeriesIndex":
+        """Build an index from (ts, key, amount) rows already in time order"""
+        index = cls()
+        day, day_end = None, float("-inf")
+        day_totals, key_totals = index.day_totals, index.key_totals
+        for ts, key, amount in rows:
+            index._ts.append(ts)
+            index._amounts.append(amount)
+            # Only look up the calendar day when crossing midnight
+            if ts >= day_end:
+                day = date.fromtimestamp(ts)
+                day_end = datetime.combine(
+                    day + timedelta(days=1), datetime.min.time()
+                ).timestamp()
+            day_totals[day] = day_totals.get(day, 0.0) + amount
+            key_totals[key] = key_totals.get(key, 0.0) + amount
+        index._build_prefix()
+        return index
+
+    def total(self, start: float, end: float) -> float:
+        """Sum of amounts with ``start <= ts < end``"""
+        self._build_prefix()
+        return (
+            self._prefix[bisect_left(self._ts, end)]
+            - self._prefix[bisect_left(self._ts, start)]
+        )
+
+    def _build_prefix(self) -> None:
+        built = len(self._prefix) - 1
+        if built < len(self._ts):
+            sums = accumulate(self._amounts[built:], initial=self._prefix[-1])
+            next(sums)
+            self._prefix.extend(sums)
+
+
+class CostEventStore:
+    """
+    SQLite-backed store for revenue events, cost events and subscriptions.
+
+    Events are exchanged as records: the event model's JSON-mode dump. Each
+    write appends one row; the in-memory ``TimeSeriesIndex`` for a series is
+    built from a single ordered scan the first time it is queried. Later
+    reads add only rows past the last indexed id, so the index also picks up
+    events written by other stores or processes sharing the database.
+    """
+
+    def __init__(self, db_path: str | Path = ":memory:"):
+        self.db_path = str(db_path)
+        self._indexes: dict[str, TimeSeriesIndex] = {}
+        self._indexed_ids: dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for series in SERIES:
+            self._conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS {series}_events (
+                    id INTEGER PRIMARY KEY,
+                    ts REAL NOT NULL,
+                    key TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    record TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_{series}_events_ts
+                    ON {series}_events(ts, key, amount);
+                """
+            )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                customer_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _table(series: str) -> str:
+        if series not in SERIES:
+            raise ValueError(f"Unknown event series: {series}")
+        return f"{series}_events"
+
+    def append(
+        self, series: str, ts: float, key: str, amount: float, record: dict[str, Any]
+    ) -> None:
+        """Persist one event and add it to the series index"""
+        self.append_many(series, [(ts, key, amount, record)])
+
+    def append_many(
+        self, series: str, events: Iterable[tuple[float, str, float, dict[str, Any]]]
+    ) -> int:
+        """Persist (ts, key, amount, record) events in a single transaction"""
+        events = list(events)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO {self._table(series)} (ts, key, amount, record) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (ts, key, amount, json.dumps(record))
+                        for ts, key, amount, record in events
+                    ],
+                )
+            if series in self._indexes:
+                self._refresh(series)
+        return len(events)
+
+    def _refresh(self, series: str) -> TimeSeriesIndex:
+        """Add rows appended since the index was last brought up to date"""
+        index = self._indexes[series]
+        rows = self._conn.execute(
+            f"SELECT id, ts, key, amount FROM {self._table(series)} "
+            "WHERE id > ? ORDER BY id",
+            (self._indexed_ids[series],),
+        ).fetchall()
+        for _, ts, key, amount in rows:
+            index.add(ts, key, amount)
+        if rows:
+            self._indexed_ids[series] = rows[-1][0]
+        return index
+
+    def index(self, series: str) -> TimeSeriesIndex:
+        """The series index, loaded from disk on first use and refreshed after"""
+        with self._lock:
+            if series in self._indexes:
+                return self._refresh(series)
+
+            table = self._table(series)
+            last_id = self._conn.execute(
+                f"SELECT COALESCE(MAX(id), 0) FROM {table}"
+            ).fetchone()[0]
+            index = TimeSeriesIndex.from_sorted(
+                self._conn.execute(
+                    f"SELECT ts, key, amount FROM {table} WHERE id <= ? ORDER BY ts",
+                    (last_id,),
+                )
+            )
+            self._indexes[series] = index
+            self._indexed_ids[series] = last_id
+            logger.debug(f"Indexed {len(index)} {series} events")
+            return index
+
+    def count(self, series: str) -> int:
+        with self._lock:
+            if series in self._indexes:
+                return len(self._refresh(series))
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self._table(series)}"
+            ).fetchone()[0]
+
+    def records(
+        self, series: str, offset: int = 0, limit: Optional[int] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Stored event records in insertion order, read a page at a time"""
+        table = self._table(series)
+        remaining = -1 if limit is None else limit
+        last_id = None
+        while remaining:
+            page_size = 1000 if remaining < 0 else min(remaining, 1000)
+            with self._lock:
+                if last_id is None:
+                    rows = self._conn.execute(
+                        f"SELECT id, record FROM {table} ORDER BY id LIMIT ? OFFSET ?",
+                        (page_size, offset),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"SELECT id, record FROM {table} WHERE id > ? "
+                        "ORDER BY id LIMIT ?",
+                        (last_id, page_size),
+                    ).fetchall()
+            for _, record in rows:
+                yield json.loads(record)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+            remaining -= 0 if remaining < 0 else len(rows)
+
+    def save_subscription(self, customer_id: str, record: dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subscriptions (customer_id, record) "
+                "VALUES (?, ?)",
+                (customer_id, json.dumps(record, default=str)),
+            )
+
+    def subscriptions(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT customer_id, record FROM subscriptions"
+            ).fetchall()
+        return {customer_id: json.loads(record) for customer_id, record in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -18,6 +18,9 @@ except ImportError:
 
 from dotenv import load_dotenv
 
+from app.core.llm_cache import get_llm_cache
+from app.utils.env_utils import get_bool_env
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -26,16 +29,27 @@ logger = logging.getLogger(__name__)
 class GeminiClient:
     """Client for Google Gemini Ultra API via Vertex AI."""
 
-    def __init__(self, api_key: Optional[str] = None, project_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        project_id: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+    ):
         """
         Initialize Gemini client with Vertex AI (paid) or fallback to free tier.
 
         Args:
             api_key: Gemini API key. If None, loads from GEMINI_API_KEY env var
             project_id: Google Cloud Project ID. If None, loads from GOOGLE_CLOUD_PROJECT env var
+            use_cache: Serve repeated prompts from the persistent LLM response cache.
+                If None, loads from LLM_CACHE_ENABLED env var
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.model_name = "gemini-1.5-pro"
+        if use_cache is None:
+            use_cache = get_bool_env("LLM_CACHE_ENABLED")
+        self.cache = get_llm_cache() if use_cache else None
 
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
@@ -55,7 +69,7 @@ class GeminiClient:
         try:
             # Initialize Vertex AI
             vertexai.init(project=self.project_id, location="us-central1")
-            self.model = GenerativeModel("gemini-1.5-pro")
+            self.model = GenerativeModel(self.model_name)
             self.use_vertex = True
             logger.info(
                 f"Vertex AI Gemini client initialized successfully (Project: {self.project_id})"
@@ -72,7 +86,7 @@ class GeminiClient:
             import google.generativeai as genai
 
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel("gemini-1.5-pro")
+            self.model = genai.GenerativeModel(self.model_name)
             self.use_vertex = False
             logger.info("Free tier Gemini client initialized (may have quota limits)")
         except Exception as e:
@@ -103,6 +117,12 @@ CRITICAL: Respond with ONLY valid JSON. No explanations, no markdown formatting,
 Start your response with {{ and end with }}. Do not include anything else.
 """
 
+            cache_messages = [{"role": "user", "content": full_prompt}]
+            if self.cache:
+                cached = self.cache.get(self.model_name, cache_messages)
+                if cached is not None:
+                    return cached
+
             if hasattr(self, "use_vertex") and self.use_vertex:
                 # Vertex AI call
                 response = self.model.generate_content(full_prompt)
@@ -128,7 +148,10 @@ Start your response with {{ and end with }}. Do not include anything else.
 
                 # Try to parse JSON
                 if clean_text:
-                    return json.loads(clean_text)
+                    parsed = json.loads(clean_text)
+                    if self.cache:
+                        self.cache.set(self.model_name, cache_messages, parsed)
+                    return parsed
                 else:
                     logger.warning("Empty response from Gemini")
                     return {"error": "Empty response", "raw_response": response_text}
@@ -0,0 +1,240 @@
+"""
+Shared HTTP Client Registry for LLM and SaaS Integrations
+Pooled keep-alive httpx clients with per-host limits, timeouts and retries.
+"""
+
+import asyncio
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.config.logging import get_logger
+from app.core.politeness_scheduler import IDEMPOTENT_METHODS, PolitenessScheduler
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+@dataclass
+class HTTPClientConfig:
+    """Pool, timeout and retry settings for a named client"""
+
+    timeout: float = 30.0
+    connect_timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    per_host_limit: int = 10
+    http2: bool = True
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_cap: float = 10.0
+
+
+# LLM calls are long-running; webhooks and health checks should fail fast
+DEFAULT_CLIENT_CONFIGS: dict[str, HTTPClientConfig] = {
+    "default": HTTPClientConfig(),
+    "llm": HTTPClientConfig(timeout=300.0, per_host_limit=20),
+    "webhooks": HTTPClientConfig(timeout=30.0, max_retries=1),
+    "monitoring": HTTPClientConfig(timeout=5.0, connect_timeout=2.0, max_retries=0),
+}
+
+
+class HTTPClientRegistry:
+    """
+    App-wide registry of pooled async HTTP clients.
+
+    One httpx.AsyncClient is kept per named profile so TCP and TLS sessions
+    are reused across calls instead of being renegotiated per request.
+    Clients are bound to the event loop that created them and rebuilt if
+    a different loop asks for them.
+    """
+
+    def __init__(self, configs: Optional[dict[str, HTTPClientConfig]] = None):
+        self.configs = dict(configs or DEFAULT_CLIENT_CONFIGS)
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._host_limits: dict[tuple[str, str], asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "clients_created": 0}
+
+    def register(self, name: str, config: HTTPClientConfig) -> None:
+        """Add or replace a client profile; takes effect on next creation"""
+        self.configs[name] = config
+
+    def _build_client(self, name: str) -> httpx.AsyncClient:
+        config = self.configs.get(name) or self.configs["default"]
+        self._stats["clients_created"] += 1
+        return httpx.AsyncClient(
+            http2=config.http2 and HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+
+    def _check_loop(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is not self._loop:
+            # Connections from a closed loop cannot be reused or closed cleanly
+            self._clients.clear()
+            self._host_limits.clear()
+            self._loop = loop
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for a profile, creating it on first use"""
+        with self._lock:
+            self._check_loop()
+            client = self._clients.get(name)
+            if client is None or client.is_closed:
+                client = self._build_client(name)
+                self._clients[name] = client
+            return client
+
+    def _host_limit(self, name: str, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        key = (name, host)
+        semaphore = self._host_limits.get(key)
+        if semaphore is None:
+            config = self.configs.get(name) or self.configs["default"]
+            semaphore = asyncio.Semaphore(config.per_host_limit)
+            self._host_limits[key] = semaphore
+        return semaphore
+
+    def _retry_delay(
+        self, config: HTTPClientConfig, attempt: int, response: Any = None
+    ) -> float:
+        if response is not None:
+            retry_after = PolitenessScheduler.parse_retry_after(
+                response.headers.get("Retry-After")
+            )
+            if retry_after is not None:
+                return min(retry_after, config.backoff_cap)
+        ceiling = min(config.backoff_cap, config.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        client: str = "default",
+        retry_unsafe: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request through a pooled client.
+
+        Idempotent methods, and requests carrying an ``Idempotency-Key``
+        header, are retried on connection errors and 429/5xx gateway
+        responses with jittered exponential backoff, honouring Retry-After.
+        Other methods (e.g. a billed LLM POST) are only retried when the
+        request never reached the server, or on a 429 with Retry-After;
+        pass ``retry_unsafe=True`` if the endpoint deduplicates requests.
+        The last response is returned as-is so callers keep their own
+        status handling.
+        """
+        http = self.get(client)
+        config = self.configs.get(client) or self.configs["default"]
+        headers = httpx.Headers(kwargs.get("headers"))
+        retry_any = (
+            retry_unsafe
+            or method.upper() in IDEMPOTENT_METHODS
+            or "Idempotency-Key" in headers
+        )
+        self._stats["requests"] += 1
+
+        for attempt in range(config.max_retries + 1):
+            last = attempt >= config.max_retries
+            # Hold the host slot for the request only, not while backing off
+            async with self._host_limit(client, url):
+                try:
+                    response = await http.request(method, url, **kwargs)
+                except (httpx.ConnectError, httpx.ConnectTimeout):
+                    if last:
+                        self._stats["errors"] += 1
+                        raise
+                    delay = self._retry_delay(config, attempt)
+                except httpx.RemoteProtocolError:
+                    # The server may already have acted on the request
+                    if last or not retry_any:
+                        self._stats["errors"] += 1
+                        raise
+                    delay = self._retry_delay(config, attempt)
+                else:
+                    if response.status_code not in RETRYABLE_STATUS_CODES or last:
+                        return response
+                    if not retry_any and not (
+                        response.status_code == 429
+                        and "Retry-After" in response.headers
+                    ):
+                        return response
+                    delay = self._retry_delay(config, attempt, response)
+                    await response.aclose()
+
+            self._stats["retries"] += 1
+            logger.debug(
+                f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt + 1})"
+            )
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def get_json(self, url: str, client: str = "default", **kwargs) -> Any:
+        response = await self.request("GET", url, client=client, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def post(self, url: str, client: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("POST", url, client=client, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close every pooled client; safe to call more than once"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._host_limits.clear()
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "open_clients": sorted(self._clients),
+            "http2": HTTP2_AVAILABLE,
+        }
+
+
+# Global registry instance
+_http_registry = None
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """Get the global HTTP client registry"""
+    global _http_registry
+    if _http_registry is None:
+        _http_registry = HTTPClientRegistry()
+    return _http_registry
+
+
+async def close_http_clients() -> None:
+    """Close pooled connections at application shutdown"""
+    if _http_registry is not None:
+        await _http_registry.aclose()
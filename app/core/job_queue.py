@@ -0,0 +1,255 @@
+"""
+Durable Job Queue
+Persistent priority queue with dependency tracking for MCPCoordinator, so
+submitting, dispatching and completing a job costs O(log n) however long the
+queue grows.
+"""
+
+import heapq
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Dependencies in these states can never be met
+_DEAD = (FAILED, CANCELLED)
+
+
+class DurableJobQueue:
+    """
+    SQLite-backed job queue with in-memory scheduling state.
+
+    Jobs are exchanged as records (JSON-serializable dicts) plus a lane
+    (the agent that runs them), an integer priority and dependency ids.
+
+    Features:
+    - One row per job; submitting and finishing a job are single-row
+      writes, and dispatch is in-memory only
+    - A ready heap per lane ordered by priority, then submission order, so
+      dispatch can skip lanes that are at their concurrency limit
+    - Dependencies form a DAG tracked by indegree counting: completing a
+      job decrements its dependents and pushes the ones that reach zero
+    - Failing a job cancels everything that transitively depends on it, and
+      a job submitted after one of its dependencies failed is cancelled
+      straight away
+    - Finished jobs are only kept on disk; dependency states are looked up
+      by primary key, so memory holds unfinished jobs only
+    - On startup, unfinished jobs (including any that were running when the
+      process died) are rescheduled
+    """
+
+    def __init__(self, db_path: str | Path = ":memory:"):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._heaps: dict[str, list[tuple[int, int, str]]] = {}
+        self._indegree: dict[str, int] = {}
+        self._dependents: dict[str, list[str]] = {}
+        self._entries: dict[str, tuple[str, int, int]] = {}  # id -> lane, prio, seq
+        self._seq = 0
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                lane TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                dependencies TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, seq);
+            """)
+        self._conn.commit()
+        self._restore()
+
+    def _restore(self) -> None:
+        self._seq = self._conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM jobs"
+        ).fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT id, seq, lane, priority, dependencies FROM jobs "
+            "WHERE status = ? ORDER BY seq",
+            (PENDING,),
+        ).fetchall()
+        for job_id, seq, lane, priority, dependencies in rows:
+            self._schedule(job_id, lane, priority, seq, json.loads(dependencies))
+        if rows:
+            logger.info(f"Restored {len(rows)} pending jobs")
+
+    def _states(self, job_ids: Iterable[str]) -> dict[str, str]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ",".join("?" * len(job_ids))
+        return dict(
+            self._conn.execute(
+                f"SELECT id, status FROM jobs WHERE id IN ({placeholders})", job_ids
+            ).fetchall()
+        )
+
+    def _schedule(
+        self, job_id: str, lane: str, priority: int, seq: int, dependencies: list[str]
+    ) -> bool:
+        states = self._states(set(dependencies))
+        dead = [dep for dep, state in states.items() if state in _DEAD]
+        if dead:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ? WHERE id = ?", (CANCELLED, job_id)
+                )
+            logger.warning(f"Cancelled job {job_id}: dependency {dead[0]} failed")
+            return False
+
+        self._entries[job_id] = (lane, priority, seq)
+        unmet = [dep for dep in set(dependencies) if states.get(dep) != COMPLETED]
+        if unmet:
+            self._indegree[job_id] = len(unmet)
+            for dep in unmet:
+                self._dependents.setdefault(dep, []).append(job_id)
+            return False
+        heapq.heappush(self._heaps.setdefault(lane, []), (-priority, seq, job_id))
+        return True
+
+    def push(
+        self,
+        job_id: str,
+        lane: str,
+        priority: int,
+        record: dict[str, Any],
+        dependencies: Iterable[str] = (),
+    ) -> bool:
+        """Persist a new job; returns True if it is ready to run now"""
+        dependencies = list(dependencies)
+        with self._lock:
+            self._seq += 1
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, seq, lane, priority, status, "
+                    "dependencies, record) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id,
+                        self._seq,
+                        lane,
+                        priority,
+                        PENDING,
+                        json.dumps(dependencies),
+                        json.dumps(record, default=str),
+                    ),
+                )
+            return self._schedule(job_id, lane, priority, self._seq, dependencies)
+
+    def pop(self, lanes: Iterable[str] | None = None) -> str | None:
+        """Take the highest-priority ready job from the given lanes"""
+        with self._lock:
+            candidates = self._heaps if lanes is None else lanes
+            best_lane = None
+            for lane in candidates:
+                heap = self._heaps.get(lane)
+                if heap and (best_lane is None or heap[0] < self._heaps[best_lane][0]):
+                    best_lane = lane
+            if best_lane is None:
+                return None
+            return heapq.heappop(self._heaps[best_lane])[2]
+
+    def requeue(self, job_id: str, record: dict[str, Any]) -> None:
+        """Put a dispatched job back on its ready heap, e.g. for a retry"""
+        with self._lock:
+            lane, priority, seq = self._entries[job_id]
+            self._write(job_id, PENDING, record)
+            heapq.heappush(self._heaps.setdefault(lane, []), (-priority, seq, job_id))
+
+    def complete(self, job_id: str, record: dict[str, Any]) -> list[str]:
+        """Mark a job completed; returns dependents that became ready"""
+        with self._lock:
+            self._write(job_id, COMPLETED, record)
+            self._entries.pop(job_id, None)
+            released = []
+            for dependent in self._dependents.pop(job_id, []):
+                if dependent not in self._indegree:
+                    continue  # cancelled by another failed dependency
+                self._indegree[dependent] -= 1
+                if self._indegree[dependent] == 0:
+                    del self._indegree[dependent]
+                    lane, priority, seq = self._entries[dependent]
+                    heapq.heappush(
+                        self._heaps.setdefault(lane, []), (-priority, seq, dependent)
+                    )
+                    released.append(dependent)
+            return released
+
+    def fail(self, job_id: str, record: dict[str, Any]) -> list[str]:
+        """Mark a job failed; returns the dependents cancelled because of it"""
+        with self._lock:
+            self._write(job_id, FAILED, record)
+            self._entries.pop(job_id, None)
+            cancelled = []
+            stack = self._dependents.pop(job_id, [])
+            while stack:
+                dependent = stack.pop()
+                if self._indegree.pop(dependent, None) is None:
+                    continue
+                self._entries.pop(dependent, None)
+                cancelled.append(dependent)
+                stack.extend(self._dependents.pop(dependent, []))
+            if cancelled:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE jobs SET status = ? WHERE id = ?",
+                        [(CANCELLED, dependent) for dependent in cancelled],
+                    )
+            return cancelled
+
+    def _write(self, job_id: str, status: str, record: dict[str, Any]) -> None:
+        with self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, record = ? WHERE id = ?",
+                (status, json.dumps(record, default=str), job_id),
+            )
+
+    def pending_records(self) -> list[dict[str, Any]]:
+        """Records of jobs not yet completed or failed, in submission order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM jobs WHERE status = ? ORDER BY seq", (PENDING,)
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def status(self, job_id: str) -> str | None:
+        with self._lock:
+            return self._states([job_id]).get(job_id)
+
+    def is_completed(self, job_id: str) -> bool:
+        return self.status(job_id) == COMPLETED
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            ready = sum(len(heap) for heap in self._heaps.values())
+            completed = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (COMPLETED,)
+            ).fetchone()[0]
+            return {
+                "pending": len(self._entries),
+                "ready": ready,
+                "blocked": len(self._indegree),
+                "completed": completed,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
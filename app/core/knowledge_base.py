@@ -4,164 +4,396 @@ Knowledge Base Ingestion System for Agentic RAG
 Converts existing data sources into structured documents for vector indexing
 """
 
+import hashlib
 import json
+import os
 import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from itertools import compress
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import pandas as pd
 from llama_index.core import Document
 
 from app.utils.analytics import performance_monitor
+from app.utils.keyword_classifier import (
+    COMPANY_SIZES,
+    PAIN_POINT_CATEGORIES,
+    URGENCY_LEVELS,
+    analyze_sentiment,
+    classify_frame,
+)
+
+DEFAULT_MANIFEST_PATH = "data/vector_stores/kb_manifest.json"
+
+
+def _hash_json(entry: Any) -> str:
+    payload = json.dumps(entry, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class IncrementalUpdate:
+    """Documents to upsert and ids to delete for one index since the last build"""
+
+    index_name: str
+    upserts: list[Document] = field(default_factory=list)
+    deletes: list[str] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
+    removed_files: list[str] = field(default_factory=list)
+    unchanged_files: int = 0
+    manifest_entries: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+class KnowledgeBaseManifest:
+    """
+    Per-index record of (path, mtime, size, sha256, doc_ids) for each source
+    file, persisted as JSON so the next build can skip unchanged files.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.indices: dict[str, dict[str, dict[str, Any]]] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.indices = json.load(f)
+
+    def files(self, index_name: str) -> dict[str, dict[str, Any]]:
+        return self.indices.setdefault(index_name, {})
+
+    def reset(self, index_name: str) -> None:
+        self.indices[index_name] = {}
+
+    def save(self) -> None:
+        """Write atomically so a crash never leaves a truncated manifest"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.indices, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+# A loader reads one source file and returns the hashes of every row it
+# currently holds plus Documents for the rows whose hash is not in ``known``
+SourceLoader = Callable[[Path, set[str]], tuple[list[str], list[Document]]]
 
 
 class KnowledgeBaseBuilder:
     """Builds knowledge base from existing data sources"""
 
-    def __init__(self):
+    def __init__(self, manifest_path: str = DEFAULT_MANIFEST_PATH):
         """Initialize the knowledge base builder"""
 
         self.data_dir = Path("data")
         self.reports_dir = Path("reports")
         self.logs_dir = Path("logs")
+        self.manifest = KnowledgeBaseManifest(manifest_path)
 
         print("📚 Knowledge Base Builder initialized")
 
-    @performance_monitor
-    async def build_reddit_knowledge_base(self) -> list[Document]:
-        """Build Reddit pain points knowledge base from existing data"""
+    def _index_sources(self) -> dict[str, list[tuple[Path, str, SourceLoader]]]:
+        """Source file patterns and their loaders for each index"""
+        return {
+            "reddit_pain_points": [
+                (self.data_dir, "metrics-*.csv", self._load_reddit_csv),
+                (self.data_dir, "reddit_*.json", self._load_reddit_json),
+            ],
+            "market_trends": [
+                (self.data_dir, "serpapi_*.json", self._load_serpapi),
+                (self.data_dir, "metrics-daily-*.csv", self._load_trend_csv),
+            ],
+            "github_insights": [
+                (
+                    Path("."),
+                    "github_prospects_database.json",
+                    self._load_github_prospects,
+                ),
+                (Path("."), "prospects_database.json", self._load_github_prospects),
+                (self.data_dir, "github_repos_*.json", self._load_github_repos),
+            ],
+            "historical_reports": [
+                (self.reports_dir, "insight_daily_*.md", self._load_insight_report),
+                (self.reports_dir, "weekly_*.md", self._load_weekly_report),
+            ],
+        }
 
-        print("🔧 Building Reddit pain points knowledge base...")
+    @staticmethod
+    def _doc_id(path: Path, row_hash: str) -> str:
+        """Stable id so re-ingesting an unchanged row is a no-op"""
+        return f"{path.as_posix()}#{row_hash}"
+
+    @staticmethod
+    def _file_sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
 
+    def _build_documents(self, index_name: str) -> list[Document]:
         documents = []
+        for base_dir, pattern, loader in self._index_sources()[index_name]:
+            for path in sorted(base_dir.glob(pattern)):
+                try:
+                    documents.extend(loader(path, set())[1])
+                except Exception as e:
+                    print(f"⚠️ Error processing {path}: {e}")
+        return documents
 
-        # Load from metrics CSV files
-        metrics_files = list(self.data_dir.glob("metrics-*.csv"))
-
-        for metrics_file in metrics_files:
-            try:
-                df = pd.read_csv(metrics_file)
-
-                # Process each pain point entry
-                for _, row in df.iterrows():
-                    if pd.notna(row.get("pain_point", "")):
-                        doc_text = self._format_reddit_document(row)
-
-                        metadata = {
-                            "source": "reddit",
-                            "data_type": "pain_point",
-                            "date": row.get("date", ""),
-                            "subreddit": row.get("subreddit", ""),
-                            "score": row.get("score", 0),
-                            "comment_count": row.get("comment_count", 0),
-                            "category": self._categorize_pain_point(
-                                row.get("pain_point", "")
-                            ),
-                            "urgency": self._assess_urgency(row.get("pain_point", "")),
-                            "company_size": self._infer_company_size(
-                                row.get("pain_point", "")
-                            ),
-                        }
-
-                        documents.append(Document(text=doc_text, metadata=metadata))
-
-            except Exception as e:
-                print(f"⚠️ Error processing {metrics_file}: {e}")
-
-        # Load from manual Reddit data if exists
-        reddit_data_files = list(self.data_dir.glob("reddit_*.json"))
-
-        for reddit_file in reddit_data_files:
-            try:
-                with open(reddit_file) as f:
-                    reddit_data = json.load(f)
-
-                for entry in reddit_data:
-                    doc_text = self._format_reddit_json_document(entry)
-
-                    metadata = {
-                        "source": "reddit",
-                        "data_type": "discussion",
-                        "subreddit": entry.get("subreddit", ""),
-                        "author": entry.get("author", ""),
-                        "score": entry.get("score", 0),
-                        "created_utc": entry.get("created_utc", ""),
-                        "category": self._categorize_pain_point(entry.get("text", "")),
-                        "sentiment": self._analyze_sentiment(entry.get("text", "")),
+    async def build_incremental(
+        self, index_name: str, full: bool = False
+    ) -> IncrementalUpdate:
+        """
+        Diff an index's source files against the manifest.
+
+        Files whose mtime and size match are skipped without being read;
+        files whose content hash matches are skipped without being parsed.
+        Changed files are parsed, but only rows with new hashes become
+        Documents; rows that disappeared are returned as ids to delete.
+        Call commit_incremental() once the update has been applied.
+        """
+        update = IncrementalUpdate(index_name=index_name)
+        if index_name not in self._index_sources():
+            return update
+        previous = {} if full else dict(self.manifest.files(index_name))
+        seen: set[str] = set()
+
+        for base_dir, pattern, loader in self._index_sources()[index_name]:
+            for path in sorted(base_dir.glob(pattern)):
+                key = path.as_posix()
+                seen.add(key)
+                stat = path.stat()
+                entry = previous.get(key)
+
+                if entry and (entry["mtime"], entry["size"]) == (
+                    stat.st_mtime,
+                    stat.st_size,
+                ):
+                    update.unchanged_files += 1
+                    continue
+
+                sha256 = self._file_sha256(path)
+                if entry and entry["sha256"] == sha256:
+                    update.unchanged_files += 1
+                    update.manifest_entries[key] = {
+                        **entry,
+                        "mtime": stat.st_mtime,
+                        "size": stat.st_size,
                     }
+                    continue
+
+                old_ids = set(entry["doc_ids"]) if entry else set()
+                known_rows = {doc_id.rpartition("#")[2] for doc_id in old_ids}
+                try:
+                    row_hashes, documents = loader(path, known_rows)
+                except Exception as e:
+                    print(f"⚠️ Error processing {path}: {e}")
+                    continue
+
+                doc_ids = sorted({self._doc_id(path, h) for h in row_hashes})
+                update.upserts.extend(documents)
+                update.deletes.extend(sorted(old_ids - set(doc_ids)))
+                update.changed_files.append(key)
+                update.manifest_entries[key] = {
+                    "mtime": stat.st_mtime,
+                    "size": stat.st_size,
+                    "sha256": sha256,
+                    "doc_ids": doc_ids,
+                }
+
+        for key in sorted(set(previous) - seen):
+            update.removed_files.append(key)
+            update.deletes.extend(previous[key]["doc_ids"])
 
-                    documents.append(Document(text=doc_text, metadata=metadata))
+        print(
+            f"🔁 {index_name}: {len(update.changed_files)} changed, "
+            f"{len(update.removed_files)} removed, {update.unchanged_files} unchanged "
+            f"files -> {len(update.upserts)} upserts, {len(update.deletes)} deletes"
+        )
+        return update
+
+    def commit_incremental(self, update: IncrementalUpdate, full: bool = False) -> None:
+        """Record an applied update so the next build starts from it"""
+        if full:
+            self.manifest.reset(update.index_name)
+        files = self.manifest.files(update.index_name)
+        files.update(update.manifest_entries)
+        for key in update.removed_files:
+            files.pop(key, None)
+        self.manifest.save()
 
-            except Exception as e:
-                print(f"⚠️ Error processing {reddit_file}: {e}")
+    @performance_monitor
+    async def build_reddit_knowledge_base(self) -> list[Document]:
+        """Build Reddit pain points knowledge base from existing data"""
+
+        print("🔧 Building Reddit pain points knowledge base...")
+
+        documents = self._build_documents("reddit_pain_points")
 
         print(f"✅ Reddit knowledge base built: {len(documents)} documents")
         return documents
 
-    @performance_monitor
-    async def build_market_trends_knowledge_base(self) -> list[Document]:
-        """Build market trends knowledge base from SerpAPI and metrics data"""
+    def _load_reddit_csv(
+        self, metrics_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        df = pd.read_csv(metrics_file)
+        if "pain_point" not in df.columns:
+            return [], []
+        df = df[df["pain_point"].notna()]
 
-        print("🔧 Building market trends knowledge base...")
+        # Hash all rows in one vectorized pass, then format only the new ones
+        row_hashes = [f"{h:016x}" for h in pd.util.hash_pandas_object(df, index=False)]
+        is_new = [row_hash not in known for row_hash in row_hashes]
+        new_rows = df[is_new]
+        enrichment = classify_frame(new_rows, "pain_point")
+
+        documents = []
+        for row_hash, (_, row), labels in zip(
+            compress(row_hashes, is_new),
+            new_rows.iterrows(),
+            enrichment.to_dict("records"),
+            strict=True,
+        ):
+            if row_hash in known:
+                continue  # duplicate row within the file
+            known.add(row_hash)
+
+            doc_text = self._format_reddit_document(row)
+
+            metadata = {
+                "source": "reddit",
+                "data_type": "pain_point",
+                "date": row.get("date", ""),
+                "subreddit": row.get("subreddit", ""),
+                "score": row.get("score", 0),
+                "comment_count": row.get("comment_count", 0),
+                "category": labels["category"],
+                "urgency": labels["urgency"],
+                "company_size": labels["company_size"],
+            }
+
+            documents.append(
+                Document(
+                    text=doc_text,
+                    metadata=metadata,
+                    id_=self._doc_id(metrics_file, row_hash),
+                )
+            )
 
+        return row_hashes, documents
+
+    def _load_json_rows(
+        self,
+        path: Path,
+        rows: list[Any],
+        known: set[str],
+        to_document: Callable[[Any], Optional[tuple[str, dict[str, Any]]]],
+    ) -> tuple[list[str], list[Document]]:
+        """Shared row loop for JSON sources: hash, skip known, format the rest"""
+        row_hashes = []
         documents = []
+        for entry in rows:
+            row_hash = _hash_json(entry)
+            if row_hash in known:
+                row_hashes.append(row_hash)
+                continue
+            formatted = to_document(entry)
+            if formatted is None:
+                continue
+            row_hashes.append(row_hash)
+            known.add(row_hash)
+            doc_text, metadata = formatted
+            documents.append(
+                Document(
+                    text=doc_text, metadata=metadata, id_=self._doc_id(path, row_hash)
+                )
+            )
+        return row_hashes, documents
+
+    def _load_reddit_json(
+        self, reddit_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        with open(reddit_file) as f:
+            reddit_data = json.load(f)
+
+        def to_document(entry: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+            return self._format_reddit_json_document(entry), {
+                "source": "reddit",
+                "data_type": "discussion",
+                "subreddit": entry.get("subreddit", ""),
+                "author": entry.get("author", ""),
+                "score": entry.get("score", 0),
+                "created_utc": entry.get("created_utc", ""),
+                "category": self._categorize_pain_point(entry.get("text", "")),
+                "sentiment": self._analyze_sentiment(entry.get("text", "")),
+            }
+
+        return self._load_json_rows(reddit_file, reddit_data, known, to_document)
 
-        # Load from SerpAPI results if available
-        serpapi_files = list(self.data_dir.glob("serpapi_*.json"))
-
-        for serpapi_file in serpapi_files:
-            try:
-                with open(serpapi_file) as f:
-                    serpapi_data = json.load(f)
-
-                for result in serpapi_data.get("organic_results", []):
-                    doc_text = self._format_serpapi_document(result)
-
-                    metadata = {
-                        "source": "serpapi",
-                        "data_type": "search_result",
-                        "title": result.get("title", ""),
-                        "link": result.get("link", ""),
-                        "position": result.get("position", 0),
-                        "snippet": result.get("snippet", ""),
-                        "domain": self._extract_domain(result.get("link", "")),
-                        "relevance_score": self._calculate_relevance_score(result),
-                    }
+    @performance_monitor
+    async def build_market_trends_knowledge_base(self) -> list[Document]:
+        """Build market trends knowledge base from SerpAPI and metrics data"""
 
-                    documents.append(Document(text=doc_text, metadata=metadata))
+        print("🔧 Building market trends knowledge base...")
 
-            except Exception as e:
-                print(f"⚠️ Error processing {serpapi_file}: {e}")
+        documents = self._build_documents("market_trends")
 
-        # Load from daily metrics for trend analysis
-        metrics_files = list(self.data_dir.glob("metrics-daily-*.csv"))
+        print(f"✅ Market trends knowledge base built: {len(documents)} documents")
+        return documents
 
-        for metrics_file in metrics_files:
-            try:
-                df = pd.read_csv(metrics_file)
+    def _load_serpapi(
+        self, serpapi_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        with open(serpapi_file) as f:
+            serpapi_data = json.load(f)
+
+        def to_document(result: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+            return self._format_serpapi_document(result), {
+                "source": "serpapi",
+                "data_type": "search_result",
+                "title": result.get("title", ""),
+                "link": result.get("link", ""),
+                "position": result.get("position", 0),
+                "snippet": result.get("snippet", ""),
+                "domain": self._extract_domain(result.get("link", "")),
+                "relevance_score": self._calculate_relevance_score(result),
+            }
+
+        return self._load_json_rows(
+            serpapi_file, serpapi_data.get("organic_results", []), known, to_document
+        )
 
-                # Aggregate by date for trend analysis
-                trend_summary = self._create_trend_summary(df)
+    def _load_trend_csv(
+        self, metrics_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        # One aggregate document per file, so the file hash is its row hash
+        file_hash = self._file_sha256(metrics_file)[:16]
+        if file_hash in known:
+            return [file_hash], []
 
-                doc_text = self._format_trend_document(trend_summary, metrics_file.name)
+        df = pd.read_csv(metrics_file)
 
-                metadata = {
-                    "source": "metrics",
-                    "data_type": "trend_analysis",
-                    "file": metrics_file.name,
-                    "date_range": f"{df['date'].min()} to {df['date'].max()}",
-                    "total_entries": len(df),
-                    "trend_direction": trend_summary.get("direction", "stable"),
-                    "growth_rate": trend_summary.get("growth_rate", 0),
-                }
+        # Aggregate by date for trend analysis
+        trend_summary = self._create_trend_summary(df)
 
-                documents.append(Document(text=doc_text, metadata=metadata))
+        doc_text = self._format_trend_document(trend_summary, metrics_file.name)
 
-            except Exception as e:
-                print(f"⚠️ Error processing {metrics_file}: {e}")
+        metadata = {
+            "source": "metrics",
+            "data_type": "trend_analysis",
+            "file": metrics_file.name,
+            "date_range": f"{df['date'].min()} to {df['date'].max()}",
+            "total_entries": len(df),
+            "trend_direction": trend_summary.get("direction", "stable"),
+            "growth_rate": trend_summary.get("growth_rate", 0),
+        }
 
-        print(f"✅ Market trends knowledge base built: {len(documents)} documents")
-        return documents
+        document = Document(
+            text=doc_text, metadata=metadata, id_=self._doc_id(metrics_file, file_hash)
+        )
+        return [file_hash], [document]
 
     @performance_monitor
     async def build_github_knowledge_base(self) -> list[Document]:
@@ -169,148 +401,132 @@ class KnowledgeBaseBuilder:
 
         print("🔧 Building GitHub insights knowledge base...")
 
-        documents = []
-
-        # Load from GitHub prospects database if exists
-        github_files = [
-            "github_prospects_database.json",
-            "prospects_database.json",  # May contain GitHub data
-        ]
-
-        for github_file in github_files:
-            github_path = Path(github_file)
-            if github_path.exists():
-                try:
-                    with open(github_path) as f:
-                        github_data = json.load(f)
-
-                    for prospect in github_data:
-                        if prospect.get("source") == "github_discovery":
-                            doc_text = self._format_github_document(prospect)
-
-                            metadata = {
-                                "source": "github",
-                                "data_type": "developer_profile",
-                                "username": prospect.get("username", ""),
-                                "company": prospect.get("company", ""),
-                                "bio": prospect.get("bio", ""),
-                                "location": prospect.get("location", ""),
-                                "followers": prospect.get("followers", 0),
-                                "repositories": prospect.get("repositories", 0),
-                                "repo_language": prospect.get("repo_language", ""),
-                                "prospect_score": prospect.get("prospect_score", 0),
-                                "tech_stack": self._extract_tech_stack(prospect),
-                                "experience_level": self._assess_experience_level(
-                                    prospect
-                                ),
-                            }
-
-                            documents.append(Document(text=doc_text, metadata=metadata))
-
-                except Exception as e:
-                    print(f"⚠️ Error processing {github_file}: {e}")
-
-        # Load from repository analysis data if available
-        repo_files = list(self.data_dir.glob("github_repos_*.json"))
-
-        for repo_file in repo_files:
-            try:
-                with open(repo_file) as f:
-                    repo_data = json.load(f)
-
-                for repo in repo_data:
-                    doc_text = self._format_repository_document(repo)
-
-                    metadata = {
-                        "source": "github",
-                        "data_type": "repository",
-                        "name": repo.get("name", ""),
-                        "language": repo.get("language", ""),
-                        "stars": repo.get("stargazers_count", 0),
-                        "forks": repo.get("forks_count", 0),
-                        "description": repo.get("description", ""),
-                        "topics": repo.get("topics", []),
-                        "complexity": self._assess_repo_complexity(repo),
-                        "business_potential": self._assess_business_potential(repo),
-                    }
-
-                    documents.append(Document(text=doc_text, metadata=metadata))
-
-            except Exception as e:
-                print(f"⚠️ Error processing {repo_file}: {e}")
+        documents = self._build_documents("github_insights")
 
         print(f"✅ GitHub knowledge base built: {len(documents)} documents")
         return documents
 
+    def _load_github_prospects(
+        self, github_path: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        with open(github_path) as f:
+            github_data = json.load(f)
+
+        def to_document(
+            prospect: dict[str, Any],
+        ) -> Optional[tuple[str, dict[str, Any]]]:
+            if prospect.get("source") != "github_discovery":
+                return None
+            return self._format_github_document(prospect), {
+                "source": "github",
+                "data_type": "developer_profile",
+                "username": prospect.get("username", ""),
+                "company": prospect.get("company", ""),
+                "bio": prospect.get("bio", ""),
+                "location": prospect.get("location", ""),
+                "followers": prospect.get("followers", 0),
+                "repositories": prospect.get("repositories", 0),
+                "repo_language": prospect.get("repo_language", ""),
+                "prospect_score": prospect.get("prospect_score", 0),
+                "tech_stack": self._extract_tech_stack(prospect),
+                "experience_level": self._assess_experience_level(prospect),
+            }
+
+        return self._load_json_rows(github_path, github_data, known, to_document)
+
+    def _load_github_repos(
+        self, repo_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        with open(repo_file) as f:
+            repo_data = json.load(f)
+
+        def to_document(repo: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+            return self._format_repository_document(repo), {
+                "source": "github",
+                "data_type": "repository",
+                "name": repo.get("name", ""),
+                "language": repo.get("language", ""),
+                "stars": repo.get("stargazers_count", 0),
+                "forks": repo.get("forks_count", 0),
+                "description": repo.get("description", ""),
+                "topics": repo.get("topics", []),
+                "complexity": self._assess_repo_complexity(repo),
+                "business_potential": self._assess_business_potential(repo),
+            }
+
+        return self._load_json_rows(repo_file, repo_data, known, to_document)
+
     @performance_monitor
     async def build_historical_reports_knowledge_base(self) -> list[Document]:
         """Build knowledge base from historical reports and insights"""
 
         print("🔧 Building historical reports knowledge base...")
 
-        documents = []
-
-        # Load daily insight reports
-        insight_files = list(self.reports_dir.glob("insight_daily_*.md"))
-
-        for insight_file in insight_files:
-            try:
-                with open(insight_file, encoding="utf-8") as f:
-                    content = f.read()
-
-                # Parse structured sections
-                parsed_content = self._parse_insight_report(content)
-
-                doc_text = self._format_insight_document(
-                    parsed_content, insight_file.name
-                )
-
-                # Extract date from filename
-                date_match = re.search(r"(\d{4}-\d{2}-\d{2})", insight_file.name)
-                report_date = date_match.group(1) if date_match else ""
-
-                metadata = {
-                    "source": "historical_reports",
-                    "data_type": "daily_insight",
-                    "filename": insight_file.name,
-                    "report_date": report_date,
-                    "word_count": len(content.split()),
-                    "pain_points_count": len(parsed_content.get("pain_points", [])),
-                    "themes_count": len(parsed_content.get("themes", [])),
-                    "opportunities_count": len(parsed_content.get("opportunities", [])),
-                    "report_quality": self._assess_report_quality(parsed_content),
-                }
-
-                documents.append(Document(text=doc_text, metadata=metadata))
-
-            except Exception as e:
-                print(f"⚠️ Error processing {insight_file}: {e}")
+        documents = self._build_documents("historical_reports")
 
-        # Load weekly reports
-        weekly_files = list(self.reports_dir.glob("weekly_*.md"))
-
-        for weekly_file in weekly_files:
-            try:
-                with open(weekly_file, encoding="utf-8") as f:
-                    content = f.read()
-
-                doc_text = self._format_weekly_document(content, weekly_file.name)
-
-                metadata = {
-                    "source": "historical_reports",
-                    "data_type": "weekly_summary",
-                    "filename": weekly_file.name,
-                    "word_count": len(content.split()),
-                    "report_type": "weekly_analysis",
-                }
+        print(f"✅ Historical reports knowledge base built: {len(documents)} documents")
+        return documents
 
-                documents.append(Document(text=doc_text, metadata=metadata))
+    def _load_insight_report(
+        self, insight_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        file_hash = self._file_sha256(insight_file)[:16]
+        if file_hash in known:
+            return [file_hash], []
+
+        with open(insight_file, encoding="utf-8") as f:
+            content = f.read()
+
+        # Parse structured sections
+        parsed_content = self._parse_insight_report(content)
+
+        doc_text = self._format_insight_document(parsed_content, insight_file.name)
+
+        # Extract date from filename
+        date_match = re.search(r"(\d{4}-\d{2}-\d{2})", insight_file.name)
+        report_date = date_match.group(1) if date_match else ""
+
+        metadata = {
+            "source": "historical_reports",
+            "data_type": "daily_insight",
+            "filename": insight_file.name,
+            "report_date": report_date,
+            "word_count": len(content.split()),
+            "pain_points_count": len(parsed_content.get("pain_points", [])),
+            "themes_count": len(parsed_content.get("themes", [])),
+            "opportunities_count": len(parsed_content.get("opportunities", [])),
+            "report_quality": self._assess_report_quality(parsed_content),
+        }
 
-            except Exception as e:
-                print(f"⚠️ Error processing {weekly_file}: {e}")
+        document = Document(
+            text=doc_text, metadata=metadata, id_=self._doc_id(insight_file, file_hash)
+        )
+        return [file_hash], [document]
+
+    def _load_weekly_report(
+        self, weekly_file: Path, known: set[str]
+    ) -> tuple[list[str], list[Document]]:
+        file_hash = self._file_sha256(weekly_file)[:16]
+        if file_hash in known:
+            return [file_hash], []
+
+        with open(weekly_file, encoding="utf-8") as f:
+            content = f.read()
+
+        doc_text = self._format_weekly_document(content, weekly_file.name)
+
+        metadata = {
+            "source": "historical_reports",
+            "data_type": "weekly_summary",
+            "filename": weekly_file.name,
+            "word_count": len(content.split()),
+            "report_type": "weekly_analysis",
+        }
 
-        print(f"✅ Historical reports knowledge base built: {len(documents)} documents")
-        return documents
+        document = Document(
+            text=doc_text, metadata=metadata, id_=self._doc_id(weekly_file, file_hash)
+        )
+        return [file_hash], [document]
 
     def _format_reddit_document(self, row: pd.Series) -> str:
         """Format Reddit data into a structured document"""
@@ -444,81 +660,15 @@ Domain authority and content quality suggest {self._analyze_competition(result)}
 
     def _categorize_pain_point(self, pain_point: str) -> str:
         """Categorize pain point by type"""
-
-        pain_point_lower = pain_point.lower()
-
-        if any(
-            word in pain_point_lower
-            for word in ["integration", "api", "connect", "sync"]
-        ):
-            return "integration"
-        elif any(
-            word in pain_point_lower
-            for word in ["automation", "manual", "automate", "workflow"]
-        ):
-            return "automation"
-        elif any(
-            word in pain_point_lower
-            for word in ["data", "analytics", "reporting", "dashboard"]
-        ):
-            return "data_analytics"
-        elif any(
-            word in pain_point_lower
-            for word in ["customer", "user", "client", "support"]
-        ):
-            return "customer_management"
-        elif any(
-            word in pain_point_lower
-            for word in ["payment", "billing", "invoice", "pricing"]
-        ):
-            return "payments"
-        elif any(
-            word in pain_point_lower
-            for word in ["security", "auth", "compliance", "gdpr"]
-        ):
-            return "security"
-        else:
-            return "general"
+        return PAIN_POINT_CATEGORIES.classify(pain_point)
 
     def _assess_urgency(self, pain_point: str) -> str:
         """Assess urgency level of pain point"""
-
-        pain_point_lower = pain_point.lower()
-
-        if any(
-            word in pain_point_lower
-            for word in ["urgent", "critical", "breaking", "emergency", "asap"]
-        ):
-            return "high"
-        elif any(
-            word in pain_point_lower for word in ["need", "important", "soon", "help"]
-        ):
-            return "medium"
-        else:
-            return "low"
+        return URGENCY_LEVELS.classify(pain_point)
 
     def _infer_company_size(self, pain_point: str) -> str:
         """Infer company size from pain point context"""
-
-        pain_point_lower = pain_point.lower()
-
-        if any(
-            word in pain_point_lower
-            for word in ["startup", "founding", "early stage", "bootstrapped"]
-        ):
-            return "startup"
-        elif any(
-            word in pain_point_lower
-            for word in ["team", "small business", "smb", "growing"]
-        ):
-            return "smb"
-        elif any(
-            word in pain_point_lower
-            for word in ["enterprise", "large", "corporation", "scale"]
-        ):
-            return "enterprise"
-        else:
-            return "unknown"
+        return COMPANY_SIZES.classify(pain_point)
 
     def _parse_insight_report(self, content: str) -> dict[str, Any]:
         """Parse structured insight report content"""
@@ -882,29 +1032,7 @@ This indicates {self._interpret_trend(trend_summary)} market conditions.
 
     def _analyze_sentiment(self, text: str) -> str:
         """Simple sentiment analysis"""
-
-        positive_words = ["good", "great", "excellent", "love", "amazing", "perfect"]
-        negative_words = [
-            "bad",
-            "terrible",
-            "hate",
-            "awful",
-            "frustrat",
-            "problem",
-            "issue",
-        ]
-
-        text_lower = text.lower()
-
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-
-        if positive_count > negative_count:
-            return "positive"
-        elif negative_count > positive_count:
-            return "negative"
-        else:
-            return "neutral"
+        return analyze_sentiment(text)
 
 
 async def main():
@@ -0,0 +1,305 @@
+"""
+Lexical Index
+Persistent BM25 sidecar for Chroma collections and reciprocal-rank fusion.
+"""
+
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# SQLite caps bound parameters per statement; stay well under the limit
+_SQL_CHUNK = 500
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in is it its of on or "
+    "our so that the their this to was we what when which with you your".split()
+)
+
+_COMPARISONS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased alphanumeric tokens without stopwords; no stemming"""
+    return [
+        token
+        for token in _TOKEN_RE.findall(str(text).lower())
+        if token not in STOPWORDS
+    ]
+
+
+def where_to_sql(where: Optional[dict[str, Any]]) -> tuple[str, list[Any]]:
+    """
+    Translate a Chroma-style ``where`` filter into SQL over ``docs.metadata``.
+
+    Supports field equality, ``$eq/$ne/$gt/$gte/$lt/$lte/$in/$nin`` and
+    ``$and/$or``, so one filter can be handed to both the vector and the
+    lexical side of a hybrid query.
+    """
+    if not where:
+        return "1", []
+
+    clauses: list[str] = []
+    params: list[Any] = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(sub) for sub in condition]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+            for _, sub_params in parts:
+                params.extend(sub_params)
+            continue
+
+        # Bound as a parameter so keys never reach the SQL text; SQLite paths
+        # have no escape for '"' inside a quoted label, so it is dropped
+        path = '$."' + key.replace('"', "") + '"'
+        field = "json_extract(metadata, ?)"
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, value in condition.items():
+            if operator in ("$in", "$nin"):
+                values = list(value)
+                if not values:
+                    clauses.append("0" if operator == "$in" else "1")
+                    continue
+                negate = "NOT " if operator == "$nin" else ""
+                placeholders = ",".join("?" * len(values))
+                clauses.append(f"{field} {negate}IN ({placeholders})")
+                params.append(path)
+                params.extend(values)
+            elif operator in _COMPARISONS:
+                clauses.append(f"{field} {_COMPARISONS[operator]} ?")
+                params.extend([path, value])
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+
+    return " AND ".join(clauses) or "1", params
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> list[tuple[str, float]]:
+    """
+    Fuse ranked id lists with RRF: ``score(d) = sum(w / (k + rank(d)))``.
+
+    Ranks are 1-based. Only positions are used, so BM25 scores and vector
+    distances need no calibration against each other.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights, strict=True):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    SQLite-backed inverted index scored with Okapi BM25.
+
+    Postings live in a ``(term, doc_id)`` keyed table, so a query reads only
+    the rows of its own terms. Document metadata is stored as JSON to allow
+    Chroma-style pre-filtering inside the same SQL statement. Writes are
+    serialized with a lock; one writer process per file is assumed.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                id TEXT PRIMARY KEY,
+                length INTEGER NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id)"
+        )
+        self._conn.commit()
+        self._doc_count, self._total_length = self._load_totals()
+
+    def _load_totals(self) -> tuple[int, int]:
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+        return count, total
+
+    def count(self) -> int:
+        return self._doc_count
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[dict[str, Any]]]] = None,
+    ) -> None:
+        """Index or re-index documents; existing postings for ``ids`` are replaced"""
+        metadatas = metadatas or [None] * len(ids)
+        docs = []
+        postings = []
+        for doc_id, text, metadata in zip(ids, texts, metadatas, strict=True):
+            terms = Counter(tokenize(text or ""))
+            # Skip private keys such as LlamaIndex's serialized "_node_content"
+            metadata = {
+                k: v for k, v in (metadata or {}).items() if not k.startswith("_")
+            }
+            metadata_json = json.dumps(metadata, default=str)
+            docs.append((doc_id, sum(terms.values()), metadata_json))
+            postings.extend((term, doc_id, tf) for term, tf in terms.items())
+
+        with self._lock:
+            self._delete_ids(list(ids))
+            self._conn.executemany(
+                "INSERT INTO docs (id, length, metadata) VALUES (?, ?, ?)", docs
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", postings
+            )
+            self._conn.commit()
+            self._doc_count, self._total_length = self._load_totals()
+
+    def delete(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Remove documents by id and/or by metadata filter"""
+        with self._lock:
+            if where:
+                sql, params = where_to_sql(where)
+                matched = [
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT id FROM docs WHERE {sql}", params
+                    )
+                ]
+                self._delete_ids(matched)
+            if ids:
+                self._delete_ids(list(ids))
+            self._conn.commit()
+            self._doc_count, self._total_length = self._load_totals()
+
+    def _delete_ids(self, ids: list[str]) -> None:
+        for start in range(0, len(ids), _SQL_CHUNK):
+            batch = ids[start : start + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(
+                f"DELETE FROM postings WHERE doc_id IN ({placeholders})", batch
+            )
+            self._conn.execute(f"DELETE FROM docs WHERE id IN ({placeholders})", batch)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self._conn.commit()
+            self._doc_count, self._total_length = 0, 0
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        where: Optional[dict[str, Any]] = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to ``top_k`` (id, bm25_score) pairs, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_count:
+            return []
+
+        filter_sql, filter_params = where_to_sql(where)
+        placeholders = ",".join("?" * len(terms))
+
+        with self._lock:
+            doc_freq = dict(
+                self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings "
+                    f"WHERE term IN ({placeholders}) GROUP BY term",
+                    terms,
+                ).fetchall()
+            )
+            rows = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                f"JOIN docs d ON d.id = p.doc_id "
+                f"WHERE p.term IN ({placeholders}) AND ({filter_sql})",
+                [*terms, *filter_params],
+            ).fetchall()
+
+        n = self._doc_count
+        avg_length = self._total_length / n or 1.0
+        idf = {
+            term: math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+        scores: dict[str, float] = {}
+        for term, doc_id, tf, length in rows:
+            norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf[term] * tf * (
+                self.k1 + 1.0
+            ) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def rebuild(self, collection: Any, page_size: int = 1000) -> int:
+        """Re-index every row of a Chroma collection, reading it in pages"""
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(
+                limit=page_size, offset=offset, include=["documents", "metadatas"]
+            )
+            if not page["ids"]:
+                break
+            self.upsert(page["ids"], page["documents"], page["metadatas"])
+            offset += len(page["ids"])
+        logger.info(f"Rebuilt BM25 index {self.path.name} with {offset} documents")
+        return offset
+
+    def ensure_synced(self, collection: Any) -> None:
+        """Rebuild when the sidecar has drifted from the collection's row count"""
+        if self.count() != collection.count():
+            self.rebuild(collection)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
@@ -0,0 +1,230 @@
+"""
+Content-Addressed LLM Response Cache
+Persists real LLM provider responses in SQLite so repeated prompts skip the call.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+try:
+    from app.observability.metrics import track_llm_cache_lookup
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = "data/cache/llm_responses.db"
+
+
+class LLMResponseCache:
+    """
+    Persistent response cache keyed by (model, normalized messages,
+    temperature, max_tokens).
+
+    Features:
+    - SQLite backend shared across processes and runs
+    - TTL expiry checked on read
+    - LRU eviction once ``max_entries`` is exceeded
+    - Hit/miss counters, also exported to Prometheus when available
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 50_000,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses(last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _normalize_messages(
+        messages: list[dict[str, str]],
+    ) -> list[dict[str, str]]:
+        """Collapse whitespace so cosmetic prompt changes share a cache entry"""
+        return [
+            {
+                "role": message.get("role", "user"),
+                "content": " ".join(str(message.get("content", "")).split()),
+            }
+            for message in messages
+        ]
+
+    def make_key(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Build the content address for a request"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": self._normalize_messages(messages),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, model: str, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if METRICS_AVAILABLE:
+            track_llm_cache_lookup(model=model, hit=hit)
+
+    def get(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Return the cached response, or None on a miss or expired entry"""
+        key = self.make_key(model, messages, temperature, max_tokens)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+
+        self._record(model, hit=row is not None)
+        return json.loads(row[0]) if row is not None else None
+
+    def set(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        response: Any,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        """Store a JSON-serializable response"""
+        key = self.make_key(model, messages, temperature, max_tokens)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, model, response, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, model, json.dumps(response), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries beyond ``max_entries``"""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_accessed ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry and return how many were removed"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (cutoff,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+# Global cache instance
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the global LLM response cache instance"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            db_path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        )
+    return _llm_cache
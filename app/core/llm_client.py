@@ -1,19 +1,29 @@
 import json
 import os
-from typing import Any
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from app.core.batch_api_optimizer import batch_openai_calls, get_batch_optimizer
+from app.core.llm_cache import get_llm_cache
+from app.utils.env_utils import get_bool_env
 
 load_dotenv()
 
 
 class GPT4Client:
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None):
+        """
+        Args:
+            use_cache: Serve repeated requests from the persistent LLM response
+                cache. Defaults to the LLM_CACHE_ENABLED environment variable.
+        """
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.batch_optimizer = get_batch_optimizer()
+        if use_cache is None:
+            use_cache = get_bool_env("LLM_CACHE_ENABLED")
+        self.cache = get_llm_cache() if use_cache else None
 
     def chat(
         self,
@@ -34,6 +44,11 @@ class GPT4Client:
         Returns:
             String response from GPT-4
         """
+        if self.cache:
+            cached = self.cache.get(model, messages, temperature, max_tokens)
+            if cached is not None:
+                return cached
+
         try:
             response = self.client.chat.completions.create(
                 model=model,
@@ -41,10 +56,15 @@ class GPT4Client:
                 max_tokens=max_tokens,
                 temperature=temperature,
             )
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content.strip()
         except Exception as e:
             return f"GPT-4 API error: {e!s}"
 
+        # API errors are returned as text above and are never cached
+        if self.cache:
+            self.cache.set(model, messages, content, temperature, max_tokens)
+        return content
+
     def simple_json(self, prompt: str) -> dict:
         """
         Send a prompt to GPT-4 and get a JSON response with retry logic.
@@ -102,8 +122,10 @@ class GPT4Client:
         Returns:
             List of response dictionaries with results and metadata
         """
-        result = await batch_openai_calls(prompts, model)
-        return result.results if hasattr(result, "results") else result
+        result = await batch_openai_calls(
+            prompts, model, max_tokens=max_tokens, temperature=temperature
+        )
+        return result.results
 
     async def batch_json_analysis(
         self, prompts: list[str], context: str = ""
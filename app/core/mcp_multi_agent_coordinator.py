@@ -11,10 +11,11 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-import aiohttp
 from pydantic import BaseModel
 
 from app.config.logging import get_logger
+from app.core.http_client import get_http_client_registry
+from app.core.job_queue import DurableJobQueue
 from app.core.session_memory import get_session_memory_manager
 
 logger = get_logger(__name__)
@@ -73,10 +74,10 @@ class AgentJob(BaseModel):
 class MCPCoordinator:
     """Multi-agent coordinator using MCP servers"""
 
-    def __init__(self):
+    def __init__(self, data_dir: str = "data/memory"):
         self.memory = get_session_memory_manager()
-        self.job_queue_file = "data/memory/mcp_job_queue.json"
-        self.status_log_file = "data/memory/mcp_status_log.json"
+        self.job_queue_file = os.path.join(data_dir, "mcp_job_queue.json")
+        self.status_log_file = os.path.join(data_dir, "mcp_status_log.json")
 
         # Agent configurations
         self.agents = {
@@ -113,8 +114,12 @@ class MCPCoordinator:
             },
         }
 
-        # Job queue and status tracking
-        self.job_queue: list[AgentJob] = []
+        # Job queue and status tracking; the durable queue owns scheduling
+        self.queue = DurableJobQueue(os.path.join(data_dir, "mcp_jobs.db"))
+        self.pending_jobs: dict[str, AgentJob] = {
+            record["id"]: AgentJob.model_validate(record)
+            for record in self.queue.pending_records()
+        }
         self.active_jobs: dict[str, AgentJob] = {}
         self.completed_jobs: list[AgentJob] = []
 
@@ -152,82 +157,138 @@ class MCPCoordinator:
             tags=tags or [],
         )
 
-        # Add to queue
-        self.job_queue.append(job)
-
-        # Sort queue by priority
-        self.job_queue.sort(key=lambda x: x.priority.value, reverse=True)
-
-        # Save queue
-        self._save_job_queue()
+        # Add to queue; it persists the job and orders it by priority
+        self.pending_jobs[job_id] = job
+        ready = self.queue.push(
+            job_id,
+            agent_type.value,
+            priority.value,
+            job.model_dump(mode="json"),
+            job.dependencies,
+        )
 
         # Log job submission
         self._log_status(f"Job {job_id} submitted to {agent_type.value} queue")
+        if not ready and self.queue.status(job_id) == JobStatus.CANCELLED.value:
+            self._cancel_job(job_id, "a dependency already failed")
 
         logger.info(f"Job submitted: {job_id} - {title}")
 
         return job_id
 
+    @property
+    def job_queue(self) -> list[AgentJob]:
+        """Unfinished jobs, highest priority first"""
+        return sorted(
+            self.pending_jobs.values(), key=lambda x: x.priority.value, reverse=True
+        )
+
     async def execute_parallel_jobs(self, max_concurrent: int = 10) -> dict:
-        """Execute jobs in parallel across all agents"""
+        """
+        Execute jobs in parallel across all agents until none are ready.
+
+        A new job is dispatched as soon as one finishes, as long as fewer
+        than ``max_concurrent`` jobs are running and its agent is under the
+        agent's own ``max_concurrent`` limit. Completing a job releases any
+        jobs that were waiting on it.
+        """
 
         logger.info(
             f"Starting parallel job execution with max {max_concurrent} concurrent jobs"
         )
 
         start_time = datetime.now()
-        results = {"completed": [], "failed": [], "execution_stats": {}}
+        results = {
+            "completed": [],
+            "failed": [],
+            "cancelled": [],
+            "execution_stats": {},
+        }
+        agent_slots = {
+            agent: asyncio.Semaphore(config["max_concurrent"])
+            for agent, config in self.agents.items()
+        }
+        running: dict[asyncio.Task, AgentJob] = {}
+        executed = 0
+
+        while True:
+            # Fill free slots with the best ready job from agents that have room
+            while len(running) < max_concurrent:
+                open_agents = [
+                    agent.value
+                    for agent, slots in agent_slots.items()
+                    if not slots.locked()
+                ]
+                job_id = self.queue.pop(open_agents)
+                if job_id is None:
+                    break
+                job = self.pending_jobs[job_id]
+                slots = agent_slots[job.agent_type]
+                await slots.acquire()
+                self.active_jobs[job_id] = job
+                task = asyncio.create_task(
+                    self._execute_job_in_slot(job, slots), name=job.id
+                )
+                running[task] = job
 
-        # Get ready jobs (no unmet dependencies)
-        ready_jobs = self._get_ready_jobs()
+            if not running:
+                break
 
-        if not ready_jobs:
-            logger.info("No jobs ready for execution")
-            return results
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job = running.pop(task)
+                self.active_jobs.pop(job.id, None)
+                executed += 1
 
-        # Create execution tasks
-        tasks = []
-        for job in ready_jobs[:max_concurrent]:
-            task = asyncio.create_task(self._execute_job(job), name=job.id)
-            tasks.append(task)
+                if job.status == JobStatus.PENDING:
+                    # Re-queued for retry; it will be dispatched again
+                    continue
 
-        # Execute jobs concurrently
-        job_results = await asyncio.gather(*tasks, return_exceptions=True)
+                error = task.exception()
+                job.completed_at = datetime.now()
+                cancelled = []
+                if error is not None:
+                    job.status = JobStatus.FAILED
+                    job.error = str(error)
+                    cancelled = self.queue.fail(job.id, job.model_dump(mode="json"))
+                    results["failed"].append({"job_id": job.id, "error": str(error)})
+                    logger.error(f"Job {job.id} failed: {error}")
+                else:
+                    job.status = JobStatus.COMPLETED
+                    job.result = task.result()
+                    self.queue.complete(job.id, job.model_dump(mode="json"))
+                    results["completed"].append(
+                        {"job_id": job.id, "result": job.result}
+                    )
+                    logger.info(f"Job {job.id} completed successfully")
 
-        # Process results
-        for i, result in enumerate(job_results):
-            job = ready_jobs[i]
+                # Move to completed jobs
+                self.completed_jobs.append(job)
+                self.pending_jobs.pop(job.id, None)
 
-            if isinstance(result, Exception):
-                job.status = JobStatus.FAILED
-                job.error = str(result)
-                job.completed_at = datetime.now()
-                results["failed"].append({"job_id": job.id, "error": str(result)})
-                logger.error(f"Job {job.id} failed: {result}")
-            else:
-                job.status = JobStatus.COMPLETED
-                job.result = result
-                job.completed_at = datetime.now()
-                results["completed"].append({"job_id": job.id, "result": result})
-                logger.info(f"Job {job.id} completed successfully")
+                # Jobs waiting on a failed job can never run
+                for dependent in cancelled:
+                    self._cancel_job(dependent, f"dependency {job.id} failed")
+                    results["cancelled"].append(
+                        {"job_id": dependent, "dependency": job.id}
+                    )
 
-            # Move to completed jobs
-            self.completed_jobs.append(job)
-            if job in self.job_queue:
-                self.job_queue.remove(job)
+        if not executed:
+            logger.info("No jobs ready for execution")
+            return results
 
         execution_time = (datetime.now() - start_time).total_seconds()
 
         results["execution_stats"] = {
-            "total_jobs_executed": len(job_results),
+            "total_jobs_executed": executed,
             "execution_time_seconds": execution_time,
             "jobs_completed": len(results["completed"]),
             "jobs_failed": len(results["failed"]),
-            "remaining_queue_size": len(self.job_queue),
+            "jobs_cancelled": len(results["cancelled"]),
+            "remaining_queue_size": len(self.pending_jobs),
         }
 
         # Save updated state
-        self._save_job_queue()
         self._save_status_log()
 
         logger.info(
@@ -236,6 +297,26 @@ class MCPCoordinator:
 
         return results
 
+    def _cancel_job(self, job_id: str, reason: str) -> None:
+        """Retire a pending job the queue cancelled because it can never run"""
+        job = self.pending_jobs.pop(job_id, None)
+        if job is None:
+            return
+        job.status = JobStatus.CANCELLED
+        job.error = f"Cancelled: {reason}"
+        job.completed_at = datetime.now()
+        self.completed_jobs.append(job)
+        self._log_status(f"Job {job_id} cancelled: {reason}")
+
+    async def _execute_job_in_slot(
+        self, job: AgentJob, slots: asyncio.Semaphore
+    ) -> dict:
+        """Run a job on a slot already acquired from its agent's semaphore"""
+        try:
+            return await self._execute_job(job)
+        finally:
+            slots.release()
+
     async def _execute_job(self, job: AgentJob) -> dict:
         """Execute a single job"""
 
@@ -265,7 +346,7 @@ class MCPCoordinator:
             if job.retry_count < job.max_retries:
                 job.retry_count += 1
                 job.status = JobStatus.PENDING
-                self.job_queue.append(job)  # Re-queue for retry
+                self.queue.requeue(job.id, job.model_dump(mode="json"))
                 self._log_status(
                     f"Job {job.id} queued for retry ({job.retry_count}/{job.max_retries})"
                 )
@@ -292,26 +373,22 @@ class MCPCoordinator:
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        async with (
-            aiohttp.ClientSession() as session,
-            session.post(
-                self.agents[AgentType.CLAUDE]["api_url"],
-                json=payload,
-                headers=headers,
-                timeout=300,
-            ) as response,
-        ):
-            if response.status == 200:
-                result = await response.json()
-                return {
-                    "agent": "claude",
-                    "content": result.get("content", [{}])[0].get("text", ""),
-                    "usage": result.get("usage", {}),
-                    "job_type": job.job_type,
-                }
-            else:
-                error_text = await response.text()
-                raise Exception(f"Claude API error {response.status}: {error_text}")
+        response = await get_http_client_registry().post(
+            self.agents[AgentType.CLAUDE]["api_url"],
+            client="llm",
+            json=payload,
+            headers=headers,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            return {
+                "agent": "claude",
+                "content": result.get("content", [{}])[0].get("text", ""),
+                "usage": result.get("usage", {}),
+                "job_type": job.job_type,
+            }
+        else:
+            raise Exception(f"Claude API error {response.status_code}: {response.text}")
 
     async def _execute_gemini_job(self, job: AgentJob) -> dict:
         """Execute job using Gemini"""
@@ -329,33 +406,31 @@ class MCPCoordinator:
         url = f"{self.agents[AgentType.GEMINI]['api_url']}?key={self.agents[AgentType.GEMINI]['api_key']}"
 
         try:
-            async with (
-                aiohttp.ClientSession() as session,
-                session.post(
-                    url, json=payload, headers=headers, timeout=300
-                ) as response,
-            ):
-                if response.status == 200:
-                    result = await response.json()
-                    candidates = result.get("candidates", [])
-                    if candidates:
-                        content = (
-                            candidates[0]
-                            .get("content", {})
-                            .get("parts", [{}])[0]
-                            .get("text", "")
-                        )
-                        return {
-                            "agent": "gemini",
-                            "content": content,
-                            "usage": result.get("usageMetadata", {}),
-                            "job_type": job.job_type,
-                        }
-                    else:
-                        raise Exception("No candidates returned from Gemini")
+            response = await get_http_client_registry().post(
+                url, client="llm", json=payload, headers=headers
+            )
+            if response.status_code == 200:
+                result = response.json()
+                candidates = result.get("candidates", [])
+                if candidates:
+                    content = (
+                        candidates[0]
+                        .get("content", {})
+                        .get("parts", [{}])[0]
+                        .get("text", "")
+                    )
+                    return {
+                        "agent": "gemini",
+                        "content": content,
+                        "usage": result.get("usageMetadata", {}),
+                        "job_type": job.job_type,
+                    }
                 else:
-                    error_text = await response.text()
-                    raise Exception(f"Gemini API error {response.status}: {error_text}")
+                    raise Exception("No candidates returned from Gemini")
+            else:
+                raise Exception(
+                    f"Gemini API error {response.status_code}: {response.text}"
+                )
         except Exception as e:
             logger.error(f"Error executing Gemini job: {e!s}")
             raise
@@ -377,33 +452,27 @@ class MCPCoordinator:
                 "temperature": 0.7,
             }
 
-            async with (
-                aiohttp.ClientSession() as session,
-                session.post(
-                    self.agents[AgentType.CHATGPT]["api_url"],
-                    json=payload,
-                    headers=headers,
-                    timeout=300,
-                ) as response,
-            ):
-                if response.status == 200:
-                    result = await response.json()
-                    content = (
-                        result.get("choices", [{}])[0]
-                        .get("message", {})
-                        .get("content", "")
-                    )
-                    return {
-                        "agent": "chatgpt",
-                        "content": content,
-                        "usage": result.get("usage", {}),
-                        "job_type": job.job_type,
-                    }
-                else:
-                    error_text = await response.text()
-                    raise Exception(
-                        f"ChatGPT API error {response.status}: {error_text}"
-                    )
+            response = await get_http_client_registry().post(
+                self.agents[AgentType.CHATGPT]["api_url"],
+                client="llm",
+                json=payload,
+                headers=headers,
+            )
+            if response.status_code == 200:
+                result = response.json()
+                content = (
+                    result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                )
+                return {
+                    "agent": "chatgpt",
+                    "content": content,
+                    "usage": result.get("usage", {}),
+                    "job_type": job.job_type,
+                }
+            else:
+                raise Exception(
+                    f"ChatGPT API error {response.status_code}: {response.text}"
+                )
         except Exception as e:
             logger.error(f"Error executing ChatGPT job: {e!s}")
             raise
@@ -445,26 +514,6 @@ Context information:
 Please provide a detailed analysis with creative solutions and practical next steps.
 """
 
-    def _get_ready_jobs(self) -> list[AgentJob]:
-        """Get jobs ready for execution (no unmet dependencies)"""
-        ready_jobs = []
-
-        for job in self.job_queue:
-            if job.status == JobStatus.PENDING:
-                # Check if all dependencies are completed
-                dependencies_met = all(
-                    any(
-                        completed_job.id == dep_id
-                        for completed_job in self.completed_jobs
-                    )
-                    for dep_id in job.dependencies
-                )
-
-                if dependencies_met:
-                    ready_jobs.append(job)
-
-        return ready_jobs
-
     def _log_status(self, message: str):
         """Log status message"""
         log_entry = {"timestamp": datetime.now().isoformat(), "message": message}
@@ -480,25 +529,50 @@ Please provide a detailed analysis with creative solutions and practical next st
         logger.info(message)
 
     def _load_job_queue(self):
-        """Load job queue from file"""
+        """Import and retire mcp_job_queue.json from the full-rewrite format"""
         if os.path.exists(self.job_queue_file):
             try:
                 with open(self.job_queue_file) as f:
                     queue_data = json.load(f)
-                    self.job_queue = [AgentJob(**job_data) for job_data in queue_data]
-                logger.info(f"Loaded {len(self.job_queue)} jobs from queue")
+                for job_data in queue_data:
+                    job = self._legacy_job(job_data)
+                    if (
+                        job.id in self.pending_jobs
+                        or self.queue.is_completed(job.id)
+                        or job.status not in (JobStatus.PENDING, JobStatus.IN_PROGRESS)
+                    ):
+                        continue
+                    job.status = JobStatus.PENDING
+                    self.pending_jobs[job.id] = job
+                    ready = self.queue.push(
+                        job.id,
+                        job.agent_type.value,
+                        job.priority.value,
+                        job.model_dump(mode="json"),
+                        job.dependencies,
+                    )
+                    if (
+                        not ready
+                        and self.queue.status(job.id) == JobStatus.CANCELLED.value
+                    ):
+                        self._cancel_job(job.id, "a dependency already failed")
+                os.replace(self.job_queue_file, f"{self.job_queue_file}.migrated")
+                logger.info(f"Migrated {len(queue_data)} jobs from queue file")
             except Exception as e:
                 logger.error(f"Error loading job queue: {e}")
 
-    def _save_job_queue(self):
-        """Save job queue to file"""
-        try:
-            os.makedirs(os.path.dirname(self.job_queue_file), exist_ok=True)
-            queue_data = [job.dict() for job in self.job_queue]
-            with open(self.job_queue_file, "w") as f:
-                json.dump(queue_data, f, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Error saving job queue: {e}")
+    @staticmethod
+    def _legacy_job(job_data: dict) -> AgentJob:
+        """Parse a queue file entry, whose enums were saved as "JobStatus.X" strings"""
+        for field, enum in (
+            ("agent_type", AgentType),
+            ("priority", JobPriority),
+            ("status", JobStatus),
+        ):
+            value = job_data.get(field)
+            if isinstance(value, str) and value.startswith(f"{enum.__name__}."):
+                job_data[field] = enum[value.split(".", 1)[1]]
+        return AgentJob(**job_data)
 
     def _load_status_log(self):
         """Load status log from file"""
@@ -524,19 +598,26 @@ Please provide a detailed analysis with creative solutions and practical next st
 
     def get_queue_status(self) -> dict:
         """Get current queue status"""
+        queue_stats = self.queue.stats()
         return {
-            "queue_size": len(self.job_queue),
+            "queue_size": len(self.pending_jobs),
             "active_jobs": len(self.active_jobs),
             "completed_jobs": len(self.completed_jobs),
+            "ready_jobs": queue_stats["ready"],
+            "blocked_jobs": queue_stats["blocked"],
             "jobs_by_agent": {
                 agent.value: len(
-                    [job for job in self.job_queue if job.agent_type == agent]
+                    [
+                        job
+                        for job in self.pending_jobs.values()
+                        if job.agent_type == agent
+                    ]
                 )
                 for agent in AgentType
             },
             "jobs_by_status": {
                 status.value: len(
-                    [job for job in self.job_queue if job.status == status]
+                    [job for job in self.pending_jobs.values() if job.status == status]
                 )
                 for status in JobStatus
             },
@@ -0,0 +1,220 @@
+"""
+Memory Node Store
+Log-structured SQLite storage for session memory nodes, so each write costs
+the same whether the store holds ten nodes or hundreds of thousands.
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+FIELDS = (
+    "id",
+    "category",
+    "created_at",
+    "updated_at",
+    "access_count",
+    "importance_score",
+    "tags",
+    "content",
+)
+_COLUMNS = ", ".join(FIELDS)
+
+
+class MemoryNodeStore:
+    """
+    SQLite-backed memory node storage.
+
+    Nodes are exchanged as records: dicts with the MemoryNode fields and
+    ISO-8601 timestamps, the same shape as the legacy JSON file.
+
+    Features:
+    - Write-ahead log: a write appends one record to the WAL instead of
+      rewriting the whole store, and the WAL is checkpointed (compacted
+      into the main file) every ``checkpoint_every`` writes
+    - Secondary indexes on category and on tags (one row per node/tag pair)
+    - Nothing is loaded at startup; nodes are read on demand
+    - ``compact`` rebuilds the file to reclaim space from replaced nodes; it
+      also runs automatically every ``compact_every`` writes (0 disables)
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        checkpoint_every: int = 1000,
+        compact_every: int = 50_000,
+    ):
+        self.db_path = str(db_path)
+        self.checkpoint_every = checkpoint_every
+        self.compact_every = compact_every
+        self._writes = 0
+        self._writes_since_compact = 0
+        self._lock = threading.Lock()
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                id TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                access_count INTEGER NOT NULL DEFAULT 0,
+                importance_score REAL NOT NULL DEFAULT 1.0,
+                tags TEXT NOT NULL,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_nodes_category
+                ON nodes(category, updated_at);
+            CREATE TABLE IF NOT EXISTS node_tags (
+                tag TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                PRIMARY KEY (tag, node_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_node_tags_node ON node_tags(node_id);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row(record: dict[str, Any]) -> tuple:
+        return (
+            record["id"],
+            record["category"],
+            record["created_at"],
+            record["updated_at"],
+            record.get("access_count", 0),
+            record.get("importance_score", 1.0),
+            json.dumps(record.get("tags") or []),
+            json.dumps(record["content"], default=str),
+        )
+
+    @staticmethod
+    def _record(row: tuple) -> dict[str, Any]:
+        record = dict(zip(FIELDS, row, strict=True))
+        record["tags"] = json.loads(record["tags"])
+        record["content"] = json.loads(record["content"])
+        return record
+
+    def _write(self, records: Iterable[dict[str, Any]]) -> int:
+        written = 0
+        for record in records:
+            # Re-storing a node keeps its creation time and access count
+            self._conn.execute(
+                f"""
+                INSERT INTO nodes ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    category = excluded.category,
+                    updated_at = excluded.updated_at,
+                    importance_score = excluded.importance_score,
+                    tags = excluded.tags,
+                    content = excluded.content
+                """,
+                self._row(record),
+            )
+            node_id = record["id"]
+            self._conn.execute("DELETE FROM node_tags WHERE node_id = ?", (node_id,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO node_tags (tag, node_id) VALUES (?, ?)",
+                [(tag, node_id) for tag in record.get("tags") or []],
+            )
+            written += 1
+        return written
+
+    def upsert(self, record: dict[str, Any]) -> None:
+        """Insert or replace one node"""
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[dict[str, Any]]) -> int:
+        """Insert or replace nodes in a single transaction"""
+        with self._lock:
+            written = self._write(records)
+            self._conn.commit()
+            self._writes += written
+            self._writes_since_compact += written
+            if self.compact_every and self._writes_since_compact >= self.compact_every:
+                logger.info(
+                    f"Compacting memory store after {self._writes_since_compact} writes"
+                )
+                self._compact()
+            elif self._writes >= self.checkpoint_every:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                self._writes = 0
+        return written
+
+    def get(self, node_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM nodes WHERE id = ?", (node_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def find(
+        self,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """Nodes matching a category and/or tag, most recently updated first"""
+        sql = f"SELECT {_COLUMNS} FROM nodes"
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if tag is not None:
+            clauses.append("id IN (SELECT node_id FROM node_tags WHERE tag = ?)")
+            params.append(tag)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY updated_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM nodes")]
+
+    def count(self, category: Optional[str] = None) -> int:
+        with self._lock:
+            if category is None:
+                return self._conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM nodes WHERE category = ?", (category,)
+            ).fetchone()[0]
+
+    def _compact(self) -> None:
+        # VACUUM writes through the WAL, so checkpoint after it
+        self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._writes = 0
+        self._writes_since_compact = 0
+
+    def compact(self) -> None:
+        """Fold the WAL into the main file and reclaim free pages"""
+        with self._lock:
+            self._compact()
+
+    def import_json(self, json_path: Path) -> int:
+        """One-off import of a legacy ``memory_nodes.json`` file"""
+        with open(json_path) as f:
+            return self.upsert_many(json.load(f))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,179 @@
+"""
+Multi-Index Retriever
+Fans one query out to several knowledge-base indices concurrently and merges
+the hits into a single ranked, deduplicated list.
+"""
+
+import asyncio
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.tools import FunctionTool
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+SOURCE_KEY = "source_index"
+
+
+def _min_max(scores: list[float]) -> list[float]:
+    """Scale one source's scores to [0, 1]; a flat list maps to 1.0"""
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+class MultiIndexRetriever(BaseRetriever):
+    """
+    Retriever that queries several indices in one call.
+
+    Features:
+    - Concurrent fan-out with ``asyncio.gather``; the query is embedded once
+      and the embedding is shared with every vector retriever
+    - Per-source min-max score normalization, so sources whose raw scores
+      live on different scales can be ranked together
+    - Deduplication by node content hash; a node found by several sources
+      keeps its best score and lists every source
+    - ``as_tool`` wraps the retriever as one agent tool, replacing a
+      separate tool (and a separate reasoning step) per index
+    """
+
+    def __init__(
+        self,
+        retrievers: dict[str, BaseRetriever],
+        embed_model: Optional[BaseEmbedding] = None,
+        top_k: int = 8,
+    ):
+        super().__init__()
+        self.retrievers = retrievers
+        self.embed_model = embed_model
+        self.top_k = top_k
+        self.stats = {"calls": 0, "sources_queried": 0, "hits": 0, "duplicates": 0}
+
+    def _select(self, sources: Optional[Sequence[str]]) -> list[str]:
+        if not sources:
+            return list(self.retrievers)
+        unknown = [name for name in sources if name not in self.retrievers]
+        if unknown:
+            raise ValueError(
+                f"Unknown sources {unknown}; choose from {list(self.retrievers)}"
+            )
+        return list(dict.fromkeys(sources))
+
+    def _merge(self, results: dict[str, list[NodeWithScore]]) -> list[NodeWithScore]:
+        """Normalize per source, dedupe by content hash and rank"""
+        merged: dict[str, NodeWithScore] = {}
+        for source, hits in results.items():
+            if not hits:
+                continue
+            normalized = _min_max([hit.score or 0.0 for hit in hits])
+            for hit, score in zip(hits, normalized, strict=True):
+                key = hit.node.hash
+                existing = merged.get(key)
+                if existing is None:
+                    node = hit.node.model_copy()
+                    node.metadata = {**node.metadata, SOURCE_KEY: [source]}
+                    merged[key] = NodeWithScore(node=node, score=score)
+                    continue
+                self.stats["duplicates"] += 1
+                existing.node.metadata[SOURCE_KEY].append(source)
+                existing.score = max(existing.score, score)
+
+        ranked = sorted(merged.values(), key=lambda hit: hit.score, reverse=True)
+        self.stats["hits"] += len(ranked)
+        return ranked[: self.top_k]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        return self.retrieve_sources(query_bundle)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        return await self.aretrieve_sources(query_bundle)
+
+    def retrieve_sources(
+        self, query: str | QueryBundle, sources: Optional[Sequence[str]] = None
+    ) -> list[NodeWithScore]:
+        """Sequential fallback for synchronous callers"""
+        names = self._select(sources)
+        bundle = self._bundle(query)
+        if bundle.embedding is None and self.embed_model is not None:
+            bundle.embedding = self.embed_model.get_query_embedding(bundle.query_str)
+
+        self.stats["calls"] += 1
+        self.stats["sources_queried"] += len(names)
+        return self._merge(
+            {name: self.retrievers[name].retrieve(bundle) for name in names}
+        )
+
+    async def aretrieve_sources(
+        self, query: str | QueryBundle, sources: Optional[Sequence[str]] = None
+    ) -> list[NodeWithScore]:
+        """Query ``sources`` (default: all) concurrently and merge the hits"""
+        names = self._select(sources)
+        bundle = self._bundle(query)
+        if bundle.embedding is None and self.embed_model is not None:
+            bundle.embedding = await self.embed_model.aget_query_embedding(
+                bundle.query_str
+            )
+
+        results = await asyncio.gather(
+            *(self.retrievers[name].aretrieve(bundle) for name in names),
+            return_exceptions=True,
+        )
+        by_source = {}
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Retrieval from {name} failed: {result}")
+                continue
+            by_source[name] = result
+
+        self.stats["calls"] += 1
+        self.stats["sources_queried"] += len(names)
+        return self._merge(by_source)
+
+    @staticmethod
+    def _bundle(query: str | QueryBundle) -> QueryBundle:
+        if isinstance(query, QueryBundle):
+            return QueryBundle(query_str=query.query_str, embedding=query.embedding)
+        return QueryBundle(query_str=query)
+
+    @staticmethod
+    def format_hits(hits: list[NodeWithScore], max_chars: int = 600) -> str:
+        """Render merged hits as a single agent observation"""
+        if not hits:
+            return "No relevant information found."
+        lines = []
+        for rank, hit in enumerate(hits, 1):
+            sources = ", ".join(hit.node.metadata.get(SOURCE_KEY, []))
+            text = " ".join(hit.node.get_content().split())[:max_chars]
+            lines.append(f"[{rank}] ({sources}; score {hit.score:.2f}) {text}")
+        return "\n".join(lines)
+
+    def as_tool(self, name: str = "multi_source_retrieve") -> FunctionTool:
+        """Agent tool that searches many indices in one step"""
+        source_list = ", ".join(self.retrievers)
+
+        def retrieve(query: str, sources: Optional[list[str]] = None) -> str:
+            return self.format_hits(self.retrieve_sources(query, sources))
+
+        async def aretrieve(query: str, sources: Optional[list[str]] = None) -> str:
+            return self.format_hits(await self.aretrieve_sources(query, sources))
+
+        return FunctionTool.from_defaults(
+            fn=retrieve,
+            async_fn=aretrieve,
+            name=name,
+            description=(
+                "Search several knowledge bases at once and return the merged, "
+                "deduplicated top results tagged with their source. Pass "
+                f"`sources` to restrict the search to some of: {source_list}. "
+                "Omit it to search all of them."
+            ),
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        return dict(self.stats)
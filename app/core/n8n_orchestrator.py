@@ -8,11 +8,11 @@ import asyncio
 import os
 from datetime import datetime
 
-import aiohttp
 from pydantic import BaseModel
 
 from app.config.logging import get_logger
 from app.core.cost_tracker import CostTracker
+from app.core.http_client import get_http_client_registry
 from app.core.scraper import WebScraper
 from app.services.stripe_checkout_service import StripeCheckoutService
 
@@ -162,41 +162,41 @@ class N8nOrchestrator:
         """Execute a single n8n workflow"""
 
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {"Content-Type": "application/json"}
+            headers = {"Content-Type": "application/json"}
 
-                if self.n8n_api_key:
-                    headers["Authorization"] = f"Bearer {self.n8n_api_key}"
+            if self.n8n_api_key:
+                headers["Authorization"] = f"Bearer {self.n8n_api_key}"
 
-                payload = {
-                    "workflow_id": workflow.id,
-                    "context": context,
-                    "parallel_nodes": workflow.parallel_nodes,
-                    "timestamp": datetime.now().isoformat(),
-                }
+            payload = {
+                "workflow_id": workflow.id,
+                "context": context,
+                "parallel_nodes": workflow.parallel_nodes,
+                "timestamp": datetime.now().isoformat(),
+            }
 
-                async with session.post(
-                    workflow.webhook_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=300,  # 5 minute timeout
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"Workflow {workflow.name} completed successfully")
-                        return {
-                            "status": "success",
-                            "workflow": workflow.name,
-                            "result": result,
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Workflow {workflow.name} failed: {error_text}")
-                        return {
-                            "status": "error",
-                            "workflow": workflow.name,
-                            "error": error_text,
-                        }
+            response = await get_http_client_registry().post(
+                workflow.webhook_url,
+                client="webhooks",
+                json=payload,
+                headers=headers,
+                timeout=300,  # 5 minute timeout
+            )
+            if response.status_code == 200:
+                result = response.json()
+                logger.info(f"Workflow {workflow.name} completed successfully")
+                return {
+                    "status": "success",
+                    "workflow": workflow.name,
+                    "result": result,
+                }
+            else:
+                error_text = response.text
+                logger.error(f"Workflow {workflow.name} failed: {error_text}")
+                return {
+                    "status": "error",
+                    "workflow": workflow.name,
+                    "error": error_text,
+                }
 
         except Exception as e:
             logger.error(f"Error executing workflow {workflow.name}: {e}")
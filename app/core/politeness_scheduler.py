@@ -0,0 +1,290 @@
+"""
+Politeness Scheduler for Outbound Scrapers and API Clients
+Per-domain token buckets with Retry-After handling and jittered backoff.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Requests/second and burst size per provider, kept just under published limits
+DEFAULT_DOMAIN_LIMITS: dict[str, tuple[float, int]] = {
+    "reddit.com": (1.5, 5),  # OAuth clients get 100 QPM
+    "serpapi.com": (5.0, 5),
+    "github.com": (1.0, 3),  # Secondary limit on content-creating requests
+    "twitter.com": (0.5, 2),
+}
+
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# A 429 means the request was rejected unprocessed, so any method may be
+# retried; a 503 may follow partial processing, so only these are by default
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket state for a single domain"""
+
+    rate: float  # tokens added per second
+    capacity: int
+    tokens: float
+    updated_at: float
+    blocked_until: float = 0.0
+
+
+class PolitenessScheduler:
+    """
+    Shared per-domain rate limiter for everything that talks to third parties.
+
+    Features:
+    - Token bucket per registered domain, so bursts are allowed up to the cap
+    - Retry-After / 429 handling that pauses a domain for every caller
+    - Exponential backoff with jitter for retries
+    - Same state usable from threads (``acquire``) and coroutines (``aacquire``)
+    - Injectable clock and sleep functions for deterministic tests
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 2.0,
+        default_burst: int = 2,
+        domain_limits: Optional[dict[str, tuple[float, int]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Any] = asyncio.sleep,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.domain_limits = dict(DEFAULT_DOMAIN_LIMITS)
+        if domain_limits:
+            self.domain_limits.update(domain_limits)
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.rng = rng or random.Random()
+        self.buckets: dict[str, TokenBucket] = {}
+        self.total_wait_time = 0.0
+        self.throttled_responses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def domain_for(target: str) -> str:
+        """Normalize a URL or host name to its registered domain"""
+        host = urlparse(target).netloc if "://" in target else target
+        host = host.split("@")[-1].split(":")[0].lower()
+        labels = [label for label in host.split(".") if label]
+        return ".".join(labels[-2:]) if len(labels) >= 2 else host or "default"
+
+    def configure(self, domain: str, rate: float, burst: int = 1) -> None:
+        """Set the request rate (per second) and burst size for a domain"""
+        domain = self.domain_for(domain)
+        with self._lock:
+            self.domain_limits[domain] = (rate, burst)
+            self.buckets.pop(domain, None)
+
+    def _bucket(self, domain: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            rate, burst = self.domain_limits.get(
+                domain, (self.default_rate, self.default_burst)
+            )
+            bucket = TokenBucket(
+                rate=rate, capacity=burst, tokens=float(burst), updated_at=now
+            )
+            self.buckets[domain] = bucket
+        return bucket
+
+    def reserve(self, target: str) -> float:
+        """
+        Take one token for the target's domain.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        domain = self.domain_for(target)
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(domain, now)
+
+            if bucket.blocked_until > now:
+                # Paused by Retry-After: one request may go when the pause ends,
+                # and refilling only resumes from that point
+                bucket.tokens = min(bucket.tokens, 1.0)
+                bucket.updated_at = max(bucket.updated_at, bucket.blocked_until)
+            elif now > bucket.updated_at:
+                elapsed = now - bucket.updated_at
+                bucket.tokens = min(
+                    bucket.capacity, bucket.tokens + elapsed * bucket.rate
+                )
+                bucket.updated_at = now
+
+            # Tokens may go negative: each waiter reserves its own future slot
+            bucket.tokens -= 1.0
+            deficit_wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            wait = max(0.0, bucket.updated_at - now) + deficit_wait
+            self.total_wait_time += wait
+            return wait
+
+    def acquire(self, target: str) -> float:
+        """Block until a request to the target's domain is allowed"""
+        wait = self.reserve(target)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def aacquire(self, target: str) -> float:
+        """Await until a request to the target's domain is allowed"""
+        wait = self.reserve(target)
+        if wait > 0:
+            await self.async_sleep(wait)
+        return wait
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter for the given retry attempt"""
+        ceiling = min(self.backoff_cap, self.backoff_base * (2**attempt))
+        return ceiling / 2 + self.rng.uniform(0, ceiling / 2)
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either as seconds or an HTTP date"""
+        if not value:
+            return None
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def penalize(
+        self, target: str, retry_after: Optional[float] = None, attempt: int = 0
+    ) -> float:
+        """
+        Pause a domain after a throttling response.
+
+        Args:
+            target: URL or domain that throttled us
+            retry_after: Server-provided delay in seconds, if any
+            attempt: Zero-based retry attempt, used for backoff when no delay given
+
+        Returns:
+            Seconds the domain is paused for
+        """
+        domain = self.domain_for(target)
+        delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(domain, now)
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            self.throttled_responses += 1
+
+        logger.warning(f"Throttled by {domain}, pausing requests for {delay:.2f}s")
+        return delay
+
+    def observe_response(self, target: str, response: Any, attempt: int = 0) -> bool:
+        """
+        Inspect an HTTP response and pause the domain if it was throttled.
+
+        Returns:
+            True if the request should be retried
+        """
+        if self._status_code(response) not in RETRYABLE_STATUS_CODES:
+            return False
+
+        headers = getattr(response, "headers", None) or {}
+        retry_after = self.parse_retry_after(headers.get("Retry-After"))
+        self.penalize(target, retry_after=retry_after, attempt=attempt)
+        return True
+
+    @staticmethod
+    def _status_code(response: Any) -> Optional[int]:
+        return getattr(response, "status_code", None) or getattr(
+            response, "status", None
+        )
+
+    def request(
+        self,
+        session: Any,
+        method: str,
+        url: str,
+        max_retries: int = 3,
+        retry_unsafe: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Send a request through a requests-compatible session with throttling.
+
+        Args:
+            session: Object exposing ``request(method, url, **kwargs)``
+            method: HTTP method
+            url: Target URL
+            max_retries: Retries allowed after 429/503 responses
+            retry_unsafe: Also retry non-idempotent methods (e.g. POST) after a
+                503; only safe if the endpoint deduplicates requests
+
+        Returns:
+            The final response object
+        """
+        retry_unavailable = retry_unsafe or method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(max_retries + 1):
+            self.acquire(url)
+            response = session.request(method, url, **kwargs)
+            if attempt == max_retries or not self.observe_response(
+                url, response, attempt
+            ):
+                return response
+            if self._status_code(response) == 503 and not retry_unavailable:
+                return response
+        return response
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get scheduler statistics"""
+        with self._lock:
+            return {
+                "domains": {
+                    domain: {
+                        "rate": bucket.rate,
+                        "capacity": bucket.capacity,
+                        "tokens": bucket.tokens,
+                        "blocked_until": bucket.blocked_until,
+                    }
+                    for domain, bucket in self.buckets.items()
+                },
+                "total_wait_time": self.total_wait_time,
+                "throttled_responses": self.throttled_responses,
+            }
+
+
+# Global scheduler instance
+_politeness_scheduler = None
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    """Get the global politeness scheduler instance"""
+    global _politeness_scheduler
+    if _politeness_scheduler is None:
+        _politeness_scheduler = PolitenessScheduler()
+    return _politeness_scheduler
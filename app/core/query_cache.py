@@ -0,0 +1,227 @@
+"""
+Query Result Cache
+Bounded in-process LRU for RAG query results, with optional semantic matching.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    collection: str
+    scope: str
+    generation: int
+    created_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+class QueryResultCache:
+    """
+    LRU cache of query results keyed on the full query, not just its text.
+
+    Features:
+    - Exact key: normalized query text plus every other query parameter
+    - TTL expiry checked on read, LRU eviction past ``max_entries``
+    - Per-collection invalidation by generation counter, so ingest can
+      drop stale answers without touching other collections
+    - Optional near-duplicate matching: when ``similarity_threshold`` is set
+      and a query embedding is supplied, a cached entry with the same
+      parameters and cosine similarity at or above the threshold is a hit
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        similarity_threshold: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.split()).lower()
+
+    @staticmethod
+    def make_scope(collection: str, params: dict[str, Any]) -> str:
+        """Hash of everything except the query text"""
+        payload = json.dumps([collection, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def make_key(self, collection: str, query: str, params: dict[str, Any]) -> str:
+        scope = self.make_scope(collection, params)
+        payload = f"{scope}:{self._normalize(query)}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity_threshold is not None
+
+    def _is_live(self, entry: _CacheEntry, now: float) -> bool:
+        return (
+            now - entry.created_at < self.ttl_seconds
+            and entry.generation == self._generations.get(entry.collection, 0)
+        )
+
+    def get(
+        self,
+        collection: str,
+        query: str,
+        params: dict[str, Any],
+        embedding: Optional[Any] = None,
+    ) -> Optional[Any]:
+        """Cached value for an exact or near-duplicate query, else None"""
+        key = self.make_key(collection, query, params)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_live(entry, now):
+                del self._entries[key]
+                entry = None
+
+            if entry is None and embedding is not None and self.semantic_enabled:
+                key, entry = self._nearest(
+                    self.make_scope(collection, params), embedding, now
+                )
+                if entry is not None:
+                    self.semantic_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def _nearest(
+        self, scope: str, embedding: Any, now: float
+    ) -> tuple[Optional[str], Optional[_CacheEntry]]:
+        """Most similar live entry in ``scope`` above the threshold"""
+        candidates = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if entry.scope == scope
+            and entry.embedding is not None
+            and self._is_live(entry, now)
+        ]
+        if not candidates:
+            return None, None
+
+        query_vector = self._unit(embedding)
+        matrix = np.stack([entry.embedding for _, entry in candidates])
+        if matrix.shape[1] != query_vector.shape[0]:
+            return None, None
+        similarities = matrix @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None, None
+        return candidates[best]
+
+    @staticmethod
+    def _unit(embedding: Any) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def set(
+        self,
+        collection: str,
+        query: str,
+        params: dict[str, Any],
+        value: Any,
+        embedding: Optional[Any] = None,
+    ) -> None:
+        """Store a result; evicts least recently used entries past the bound"""
+        key = self.make_key(collection, query, params)
+        with self._lock:
+            self._entries[key] = _CacheEntry(
+                value=value,
+                collection=collection,
+                scope=self.make_scope(collection, params),
+                generation=self._generations.get(collection, 0),
+                created_at=time.time(),
+                embedding=(
+                    self._unit(embedding)
+                    if embedding is not None and self.semantic_enabled
+                    else None
+                ),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection: str) -> int:
+        """Drop every cached result for ``collection``; returns entries removed"""
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            stale = [k for k, e in self._entries.items() if e.collection == collection]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached queries for {collection}")
+        return len(stale)
+
+    def count_since(self, timestamp: float) -> int:
+        """Number of live entries created at or after ``timestamp``"""
+        now = time.time()
+        with self._lock:
+            return sum(
+                1
+                for entry in self._entries.values()
+                if entry.created_at >= timestamp and self._is_live(entry, now)
+            )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def query_cache_from_env() -> QueryResultCache:
+    """Build a cache from QUERY_CACHE_* settings; semantic matching is opt-in"""
+    threshold = os.getenv("QUERY_CACHE_SIMILARITY_THRESHOLD")
+    return QueryResultCache(
+        max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024")),
+        ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600")),
+        similarity_threshold=float(threshold) if threshold else None,
+    )
@@ -0,0 +1,199 @@
+"""
+Embedding Query Router
+Routes queries to knowledge-base indices by embedding similarity, not an LLM call.
+"""
+
+import os
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import numpy as np
+from llama_index.core.base.base_selector import (
+    BaseSelector,
+    SelectorResult,
+    SingleSelection,
+)
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import QueryBundle
+from llama_index.core.tools.types import ToolMetadata
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Route descriptions double as the tool descriptions shown to the LLM fallback
+INDEX_DESCRIPTIONS = {
+    "reddit_pain_points": (
+        "Expert at finding SaaS founder pain points, frustrations, and specific "
+        "problems from Reddit discussions. Use for understanding customer problems "
+        "and needs."
+    ),
+    "market_trends": (
+        "Expert at market sizing, search trends, SEO data, and quantitative "
+        "opportunity analysis. Use for market research and demand validation."
+    ),
+    "github_insights": (
+        "Expert at technical requirements, developer tools, and technical "
+        "feasibility analysis from GitHub activity. Use for understanding "
+        "implementation complexity."
+    ),
+    "competitor_analysis": (
+        "Expert at competitive landscape, pricing strategies, and market "
+        "positioning analysis. Use for competitive intelligence and positioning."
+    ),
+    "historical_reports": (
+        "Expert at historical patterns, trend analysis, and previous market "
+        "intelligence insights. Use for context and pattern recognition."
+    ),
+}
+
+
+def _unit(vector: Any) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class EmbeddingRouterSelector(BaseSelector):
+    """
+    Selector for RouterQueryEngine that scores each choice by cosine similarity.
+
+    Each choice's prototype is its description embedding, optionally blended
+    with the centroid of the index's stored vectors. Prototypes are embedded
+    once and reused, so a routing decision costs one query embedding.
+
+    Every choice within ``fanout_margin`` of the best score is selected, up to
+    ``top_k``, and RouterQueryEngine queries them in parallel. When the best
+    score is below ``min_similarity`` the decision is handed to
+    ``fallback_selector`` (typically an LLMSingleSelector), if one is set.
+    """
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        top_k: int = 1,
+        fanout_margin: float = 0.03,
+        min_similarity: float = 0.2,
+        centroid_weight: float = 0.5,
+        fallback_selector: Optional[BaseSelector] = None,
+    ):
+        self.embed_model = embed_model
+        self.top_k = top_k
+        self.fanout_margin = fanout_margin
+        self.min_similarity = min_similarity
+        self.centroid_weight = centroid_weight
+        self.fallback_selector = fallback_selector
+        self._description_vectors: dict[str, np.ndarray] = {}
+        self._centroids: dict[str, np.ndarray] = {}
+        self.stats = {"embedding": 0, "fanout": 0, "fallback": 0}
+
+    def set_centroids(self, centroids: dict[str, Any]) -> None:
+        """Blend per-index centroids (keyed by choice name) into the prototypes"""
+        self._centroids = {name: _unit(vector) for name, vector in centroids.items()}
+
+    def _missing_descriptions(self, choices: Sequence[ToolMetadata]) -> list[str]:
+        return list(
+            dict.fromkeys(
+                choice.description
+                for choice in choices
+                if choice.description not in self._description_vectors
+            )
+        )
+
+    def _store_descriptions(
+        self, descriptions: list[str], vectors: list[list[float]]
+    ) -> None:
+        for description, vector in zip(descriptions, vectors, strict=True):
+            self._description_vectors[description] = _unit(vector)
+
+    def _prototype(self, choice: ToolMetadata) -> np.ndarray:
+        prototype = self._description_vectors[choice.description]
+        centroid = self._centroids.get(choice.name)
+        if centroid is not None and centroid.shape == prototype.shape:
+            weight = self.centroid_weight
+            prototype = _unit((1.0 - weight) * prototype + weight * centroid)
+        return prototype
+
+    def score(
+        self, choices: Sequence[ToolMetadata], query_embedding: Any
+    ) -> np.ndarray:
+        """Cosine similarity of the query with every choice prototype"""
+        prototypes = np.stack([self._prototype(choice) for choice in choices])
+        return prototypes @ _unit(query_embedding)
+
+    def _decide(
+        self, choices: Sequence[ToolMetadata], query_embedding: Any
+    ) -> Optional[SelectorResult]:
+        """Selections by score, or None when confidence is too low"""
+        scores = self.score(choices, query_embedding)
+        order = np.argsort(-scores)
+        best = float(scores[order[0]])
+        if best < self.min_similarity and self.fallback_selector is not None:
+            return None
+
+        selected = [
+            int(i)
+            for i in order[: self.top_k]
+            if best - scores[i] <= self.fanout_margin
+        ]
+        self.stats["embedding"] += 1
+        if len(selected) > 1:
+            self.stats["fanout"] += 1
+        logger.debug(
+            "Routed to "
+            + ", ".join(f"{choices[i].name}={scores[i]:.3f}" for i in selected)
+        )
+        return SelectorResult(
+            selections=[
+                SingleSelection(index=i, reason=f"cosine similarity {scores[i]:.3f}")
+                for i in selected
+            ]
+        )
+
+    def _select(
+        self, choices: Sequence[ToolMetadata], query: QueryBundle
+    ) -> SelectorResult:
+        missing = self._missing_descriptions(choices)
+        if missing:
+            self._store_descriptions(
+                missing, self.embed_model.get_text_embedding_batch(missing)
+            )
+        query_embedding = self.embed_model.get_query_embedding(query.query_str)
+
+        result = self._decide(choices, query_embedding)
+        if result is None:
+            self.stats["fallback"] += 1
+            return self.fallback_selector.select(choices, query)
+        return result
+
+    async def _aselect(
+        self, choices: Sequence[ToolMetadata], query: QueryBundle
+    ) -> SelectorResult:
+        missing = self._missing_descriptions(choices)
+        if missing:
+            self._store_descriptions(
+                missing, await self.embed_model.aget_text_embedding_batch(missing)
+            )
+        query_embedding = await self.embed_model.aget_query_embedding(query.query_str)
+
+        result = self._decide(choices, query_embedding)
+        if result is None:
+            self.stats["fallback"] += 1
+            return await self.fallback_selector.aselect(choices, query)
+        return result
+
+    def _get_prompts(self) -> dict[str, Any]:
+        return {}
+
+    def _update_prompts(self, prompts: dict[str, Any]) -> None:
+        pass
+
+
+def router_settings_from_env() -> dict[str, Any]:
+    """EmbeddingRouterSelector keyword arguments from ROUTER_* settings"""
+    return {
+        "top_k": int(os.getenv("ROUTER_TOP_K", "2")),
+        "fanout_margin": float(os.getenv("ROUTER_FANOUT_MARGIN", "0.03")),
+        "min_similarity": float(os.getenv("ROUTER_MIN_SIMILARITY", "0.2")),
+        "centroid_weight": float(os.getenv("ROUTER_CENTROID_WEIGHT", "0.5")),
+    }
@@ -6,6 +6,7 @@ Multi-source, intelligent retrieval and analysis system
 
 import asyncio
 import os
+import time
 from typing import Any, Optional
 
 from llama_index.core import Settings, VectorStoreIndex
@@ -14,12 +15,57 @@ from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.core.query_engine import RouterQueryEngine
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.selectors import LLMSingleSelector
-from llama_index.core.tools import QueryEngineTool, RetrieverTool
+from llama_index.core.tools import QueryEngineTool
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 
+from app.core.embedding_cache import get_embedding_cache
+from app.core.knowledge_base import KnowledgeBaseBuilder
+from app.core.multi_index_retriever import MultiIndexRetriever
+from app.core.query_router import (
+    INDEX_DESCRIPTIONS,
+    EmbeddingRouterSelector,
+    router_settings_from_env,
+)
 from app.core.vector_store import VectorStoreManager
 from app.utils.analytics import performance_monitor
+from app.utils.env_utils import get_bool_env
+
+
+class CachedOpenAIEmbedding(OpenAIEmbedding):
+    """OpenAIEmbedding that serves unchanged text from the on-disk embedding cache"""
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        cache = get_embedding_cache()
+        if cache is None:
+            return super()._get_text_embeddings(texts)
+        return cache.get_or_compute(
+            self.model_name, texts, super()._get_text_embeddings
+        ).tolist()
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        cache = get_embedding_cache()
+        if cache is None:
+            return await super()._aget_text_embeddings(texts)
+
+        cached = cache.get_many(self.model_name, texts)
+        missing = list(
+            dict.fromkeys(t for t, v in zip(texts, cached, strict=True) if v is None)
+        )
+        computed = await super()._aget_text_embeddings(missing) if missing else []
+        if missing:
+            cache.put_many(self.model_name, missing, computed)
+        by_text = dict(zip(missing, computed, strict=True))
+        return [
+            vector.tolist() if vector is not None else list(by_text[text])
+            for text, vector in zip(texts, cached, strict=True)
+        ]
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return (await self._aget_text_embeddings([text]))[0]
 
 
 class SaaSMarketIntelligenceRAG:
@@ -34,13 +80,14 @@ class SaaSMarketIntelligenceRAG:
             api_key=openai_api_key or os.getenv("OPENAI_API_KEY"),
             temperature=0.1,
         )
-        Settings.embed_model = OpenAIEmbedding(
+        Settings.embed_model = CachedOpenAIEmbedding(
             model="text-embedding-3-large",
             api_key=openai_api_key or os.getenv("OPENAI_API_KEY"),
         )
 
-        # Initialize vector store manager
+        # Initialize vector store manager and incremental source builder
         self.vector_store_manager = VectorStoreManager()
+        self.kb_builder = KnowledgeBaseBuilder()
 
         # Storage for indices and tools
         self.indices: dict[str, VectorStoreIndex] = {}
@@ -48,11 +95,43 @@ class SaaSMarketIntelligenceRAG:
         self.retrieval_tools: list[QueryEngineTool] = []
 
         # Agent and routing components
+        self.router_selector: Optional[EmbeddingRouterSelector] = None
         self.router_query_engine: Optional[RouterQueryEngine] = None
         self.react_agent: Optional[ReActAgent] = None
+        self.multi_retriever: Optional[MultiIndexRetriever] = None
+        self.analysis_stats = {"calls": 0, "iterations": 0, "wall_time": 0.0}
 
         print("🚀 SaaS Market Intelligence RAG Engine initialized")
 
+    async def sync_index(self, index_name: str) -> VectorStoreIndex:
+        """
+        Bring an index up to date with its source files.
+
+        The first build embeds everything; later builds upsert new or
+        changed rows and delete vanished ones, as found by the builder's
+        manifest, so a daily refresh only pays for the new data.
+        """
+        exists = await self.vector_store_manager.index_exists(index_name)
+        update = await self.kb_builder.build_incremental(index_name, full=not exists)
+
+        if not exists:
+            index = await self.vector_store_manager.create_index(
+                index_name, update.upserts
+            )
+        else:
+            index = await self.vector_store_manager.load_index(index_name)
+            if update.deletes:
+                await self.vector_store_manager.delete_documents(
+                    index_name, update.deletes
+                )
+            if update.upserts:
+                await self.vector_store_manager.upsert_documents(
+                    index_name, update.upserts
+                )
+
+        self.kb_builder.commit_incremental(update, full=not exists)
+        return index
+
     async def initialize_knowledge_base(self) -> None:
         """Initialize all knowledge bases and indices"""
 
@@ -76,17 +155,8 @@ class SaaSMarketIntelligenceRAG:
 
         index_name = "reddit_pain_points"
 
-        # Load existing or create new index
-        if await self.vector_store_manager.index_exists(index_name):
-            self.indices[index_name] = await self.vector_store_manager.load_index(
-                index_name
-            )
-        else:
-            # Create from Reddit data
-            reddit_docs = await self._load_reddit_documents()
-            self.indices[index_name] = await self.vector_store_manager.create_index(
-                index_name, reddit_docs
-            )
+        # Create on first run, then apply only new or changed source rows
+        self.indices[index_name] = await self.sync_index(index_name)
 
         # Create query engine with specialized prompt
         self.query_engines[index_name] = self.indices[index_name].as_query_engine(
@@ -112,16 +182,8 @@ class SaaSMarketIntelligenceRAG:
 
         index_name = "market_trends"
 
-        if await self.vector_store_manager.index_exists(index_name):
-            self.indices[index_name] = await self.vector_store_manager.load_index(
-                index_name
-            )
-        else:
-            # Create from SerpAPI and market data
-            market_docs = await self._load_market_trend_documents()
-            self.indices[index_name] = await self.vector_store_manager.create_index(
-                index_name, market_docs
-            )
+        # Create on first run, then apply only new or changed source rows
+        self.indices[index_name] = await self.sync_index(index_name)
 
         self.query_engines[index_name] = self.indices[index_name].as_query_engine(
             similarity_top_k=8,
@@ -146,16 +208,8 @@ class SaaSMarketIntelligenceRAG:
 
         index_name = "github_insights"
 
-        if await self.vector_store_manager.index_exists(index_name):
-            self.indices[index_name] = await self.vector_store_manager.load_index(
-                index_name
-            )
-        else:
-            # Create from GitHub data
-            github_docs = await self._load_github_documents()
-            self.indices[index_name] = await self.vector_store_manager.create_index(
-                index_name, github_docs
-            )
+        # Create on first run, then apply only new or changed source rows
+        self.indices[index_name] = await self.sync_index(index_name)
 
         self.query_engines[index_name] = self.indices[index_name].as_query_engine(
             similarity_top_k=6,
@@ -180,16 +234,8 @@ class SaaSMarketIntelligenceRAG:
 
         index_name = "competitor_analysis"
 
-        if await self.vector_store_manager.index_exists(index_name):
-            self.indices[index_name] = await self.vector_store_manager.load_index(
-                index_name
-            )
-        else:
-            # Create from competitor data
-            competitor_docs = await self._load_competitor_documents()
-            self.indices[index_name] = await self.vector_store_manager.create_index(
-                index_name, competitor_docs
-            )
+        # Create on first run, then apply only new or changed source rows
+        self.indices[index_name] = await self.sync_index(index_name)
 
         self.query_engines[index_name] = self.indices[index_name].as_query_engine(
             similarity_top_k=10,
@@ -214,16 +260,8 @@ class SaaSMarketIntelligenceRAG:
 
         index_name = "historical_reports"
 
-        if await self.vector_store_manager.index_exists(index_name):
-            self.indices[index_name] = await self.vector_store_manager.load_index(
-                index_name
-            )
-        else:
-            # Create from existing reports
-            report_docs = await self._load_historical_reports()
-            self.indices[index_name] = await self.vector_store_manager.create_index(
-                index_name, report_docs
-            )
+        # Create on first run, then apply only new or changed source rows
+        self.indices[index_name] = await self.sync_index(index_name)
 
         self.query_engines[index_name] = self.indices[index_name].as_query_engine(
             similarity_top_k=5,
@@ -249,30 +287,35 @@ class SaaSMarketIntelligenceRAG:
         # Create query engine tools for routing
         tools = [
             QueryEngineTool.from_defaults(
-                query_engine=self.query_engines["reddit_pain_points"],
-                description="Expert at finding SaaS founder pain points, frustrations, and specific problems from Reddit discussions. Use for understanding customer problems and needs.",
-            ),
-            QueryEngineTool.from_defaults(
-                query_engine=self.query_engines["market_trends"],
-                description="Expert at market sizing, search trends, SEO data, and quantitative opportunity analysis. Use for market research and demand validation.",
-            ),
-            QueryEngineTool.from_defaults(
-                query_engine=self.query_engines["github_insights"],
-                description="Expert at technical requirements, developer tools, and technical feasibility analysis from GitHub activity. Use for understanding implementation complexity.",
-            ),
-            QueryEngineTool.from_defaults(
-                query_engine=self.query_engines["competitor_analysis"],
-                description="Expert at competitive landscape, pricing strategies, and market positioning analysis. Use for competitive intelligence and positioning.",
-            ),
-            QueryEngineTool.from_defaults(
-                query_engine=self.query_engines["historical_reports"],
-                description="Expert at historical patterns, trend analysis, and previous market intelligence insights. Use for context and pattern recognition.",
-            ),
+                query_engine=self.query_engines[index_name],
+                name=index_name,
+                description=description,
+            )
+            for index_name, description in INDEX_DESCRIPTIONS.items()
         ]
 
-        # Create router with LLM-based selection
+        # Route by embedding similarity; the LLM selector only breaks
+        # low-confidence ties instead of costing a round trip per query
+        fallback = (
+            LLMSingleSelector.from_defaults()
+            if get_bool_env("ROUTER_LLM_FALLBACK", True)
+            else None
+        )
+        self.router_selector = EmbeddingRouterSelector(
+            embed_model=Settings.embed_model,
+            fallback_selector=fallback,
+            **router_settings_from_env(),
+        )
+
+        centroids = {}
+        for index_name in INDEX_DESCRIPTIONS:
+            centroid = await self.vector_store_manager.collection_centroid(index_name)
+            if centroid is not None:
+                centroids[index_name] = centroid
+        self.router_selector.set_centroids(centroids)
+
         self.router_query_engine = RouterQueryEngine(
-            selector=LLMSingleSelector.from_defaults(),
+            selector=self.router_selector,
             query_engine_tools=tools,
             verbose=True,
         )
@@ -282,20 +325,16 @@ class SaaSMarketIntelligenceRAG:
     async def _setup_react_agent(self) -> None:
         """Set up ReAct agent for complex multi-step reasoning"""
 
-        # Create retriever tools for the agent
-        retriever_tools = []
-
-        for index_name, index in self.indices.items():
-            retriever = VectorIndexRetriever(
-                index=index,
-                similarity_top_k=3,
-            )
-
-            retriever_tool = RetrieverTool.from_defaults(
-                retriever=retriever,
-                description=f"Retrieve relevant information from {index_name} knowledge base",
-            )
-            retriever_tools.append(retriever_tool)
+        # One composite tool searches every index concurrently, so the agent
+        # gathers multi-source evidence in a single reasoning step
+        self.multi_retriever = MultiIndexRetriever(
+            retrievers={
+                index_name: VectorIndexRetriever(index=index, similarity_top_k=3)
+                for index_name, index in self.indices.items()
+            },
+            embed_model=Settings.embed_model,
+        )
+        retriever_tools = [self.multi_retriever.as_tool()]
 
         # Add query engine tools
         query_tools = [
@@ -323,7 +362,8 @@ class SaaSMarketIntelligenceRAG:
             5. Competitive positioning analysis
 
             When analyzing opportunities:
-            1. Gather information from multiple relevant sources
+            1. Gather information from multiple relevant sources in one
+               multi_source_retrieve call
             2. Validate findings across different data types
             3. Provide confidence levels and supporting evidence
             4. Consider technical feasibility and market timing
@@ -342,6 +382,7 @@ class SaaSMarketIntelligenceRAG:
         """Analyze market opportunity using agentic retrieval"""
 
         print(f"🔍 Analyzing market opportunity: {query}")
+        start = time.perf_counter()
 
         if use_agent and self.react_agent:
             # Use ReAct agent for complex multi-step analysis
@@ -350,6 +391,12 @@ class SaaSMarketIntelligenceRAG:
             # Use router query engine for direct analysis
             response = await self._router_analysis(query, sources)
 
+        wall_time = time.perf_counter() - start
+        iterations = self._count_iterations(response)
+        self.analysis_stats["calls"] += 1
+        self.analysis_stats["iterations"] += iterations
+        self.analysis_stats["wall_time"] += wall_time
+
         # Extract and structure the analysis
         analysis = {
             "query": query,
@@ -359,6 +406,8 @@ class SaaSMarketIntelligenceRAG:
             "sources_used": self._extract_sources_used(response),
             "recommendations": self._extract_recommendations(response),
             "opportunity_score": self._calculate_opportunity_score(response),
+            "iterations": iterations,
+            "wall_time_seconds": round(wall_time, 3),
         }
 
         print("✅ Market opportunity analysis complete")
@@ -379,6 +428,20 @@ class SaaSMarketIntelligenceRAG:
         else:
             return await self.router_query_engine.aquery(query)
 
+    @staticmethod
+    def _count_iterations(response: Any) -> int:
+        """
+        Reasoning steps taken: one per agent tool call, or per index the router
+        queried, plus the final answer
+        """
+        steps = getattr(response, "sources", None)
+        if steps is None:
+            selector_result = (getattr(response, "metadata", None) or {}).get(
+                "selector_result"
+            )
+            steps = selector_result.inds if selector_result is not None else []
+        return len(steps) + 1
+
     def _calculate_confidence_score(self, response: Any) -> float:
         """Calculate confidence score based on response quality"""
         # Placeholder - implement based on response analysis
@@ -386,6 +449,12 @@ class SaaSMarketIntelligenceRAG:
 
     def _extract_sources_used(self, response: Any) -> list[str]:
         """Extract which sources were used in the analysis"""
+        selector_result = (getattr(response, "metadata", None) or {}).get(
+            "selector_result"
+        )
+        if selector_result is not None:
+            index_names = list(INDEX_DESCRIPTIONS)
+            return [index_names[i] for i in selector_result.inds]
         # Placeholder - implement based on response metadata
         return ["reddit_pain_points", "market_trends"]
 
@@ -402,31 +471,6 @@ class SaaSMarketIntelligenceRAG:
         # Placeholder - implement based on response analysis
         return 7.8
 
-    async def _load_reddit_documents(self) -> list[Any]:
-        """Load Reddit documents for indexing"""
-        # Placeholder - implement document loading
-        return []
-
-    async def _load_market_trend_documents(self) -> list[Any]:
-        """Load market trend documents for indexing"""
-        # Placeholder - implement document loading
-        return []
-
-    async def _load_github_documents(self) -> list[Any]:
-        """Load GitHub documents for indexing"""
-        # Placeholder - implement document loading
-        return []
-
-    async def _load_competitor_documents(self) -> list[Any]:
-        """Load competitor analysis documents for indexing"""
-        # Placeholder - implement document loading
-        return []
-
-    async def _load_historical_reports(self) -> list[Any]:
-        """Load historical reports for indexing"""
-        # Placeholder - implement document loading
-        return []
-
     async def add_documents_to_index(
         self, index_name: str, documents: list[Any]
     ) -> None:
@@ -445,6 +489,16 @@ class SaaSMarketIntelligenceRAG:
 
         print(f"✅ Added {len(documents)} documents to {index_name}")
 
+    def _analysis_summary(self) -> dict[str, Any]:
+        calls = self.analysis_stats["calls"]
+        return {
+            "calls": calls,
+            "avg_iterations": self.analysis_stats["iterations"] / calls if calls else 0,
+            "avg_wall_time_seconds": (
+                self.analysis_stats["wall_time"] / calls if calls else 0.0
+            ),
+        }
+
     async def get_system_status(self) -> dict[str, Any]:
         """Get comprehensive system status"""
 
@@ -452,7 +506,12 @@ class SaaSMarketIntelligenceRAG:
             "indices_loaded": len(self.indices),
             "query_engines_ready": len(self.query_engines),
             "router_configured": self.router_query_engine is not None,
+            "routing": self.router_selector.stats if self.router_selector else {},
             "agent_ready": self.react_agent is not None,
+            "analysis": self._analysis_summary(),
+            "multi_source_retrieval": (
+                self.multi_retriever.get_stats() if self.multi_retriever else {}
+            ),
             "indices": {},
         }
 
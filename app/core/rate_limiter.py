@@ -0,0 +1,242 @@
+"""
+Rate Limiter for Inbound API Requests
+GCRA limits over several windows checked and consumed atomically, in one
+Redis round trip or in-process when Redis is unavailable.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+WINDOW_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS: one theoretical-arrival-time key per window
+# ARGV: cost, then limit and period (ms) for each window
+# Returns: allowed, retry_after_ms, then remaining and reset_ms per window
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local windows = {}
+local retry_after = 0
+for i = 1, #KEYS do
+    local limit = tonumber(ARGV[2 * i])
+    local period = tonumber(ARGV[2 * i + 1])
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+    if tat < now then tat = now end
+    local new_tat = tat + interval * cost
+    local wait = new_tat - period - now
+    if wait > retry_after then retry_after = wait end
+    windows[i] = {tat, new_tat, interval, period}
+end
+local allowed = 0
+if retry_after <= 0 then allowed = 1 end
+local result = {allowed, math.ceil(math.max(0, retry_after))}
+for i = 1, #KEYS do
+    local tat, new_tat, interval, period = unpack(windows[i])
+    if allowed == 1 and cost > 0 then
+        redis.call('SET', KEYS[i], new_tat, 'PX', math.ceil(new_tat - now))
+        tat = new_tat
+    end
+    table.insert(result, math.max(0, math.floor((period - (tat - now)) / interval)))
+    table.insert(result, math.ceil(tat - now))
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """At most ``limit`` requests per ``period`` seconds"""
+
+    name: str
+    limit: int
+    period: float
+
+
+@dataclass
+class WindowState:
+    name: str
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the window is fully replenished
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate-limit check; falsy when the request was rejected"""
+
+    allowed: bool
+    retry_after: float = 0.0
+    windows: list[WindowState] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.allowed
+
+    @property
+    def tightest(self) -> Optional[WindowState]:
+        """The window with the least quota left"""
+        if not self.windows:
+            return None
+        return min(self.windows, key=lambda w: (w.remaining, -w.reset_after))
+
+    def headers(self) -> dict[str, str]:
+        """X-RateLimit-* headers for the tightest window, plus Retry-After"""
+        headers = {}
+        window = self.tightest
+        if window is not None:
+            headers["X-RateLimit-Limit"] = str(window.limit)
+            headers["X-RateLimit-Remaining"] = str(window.remaining)
+            headers["X-RateLimit-Reset"] = str(math.ceil(window.reset_after))
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+    def message(self) -> str:
+        window = min(
+            (w for w in self.windows if w.remaining == 0),
+            key=lambda w: -w.reset_after,
+            default=self.tightest,
+        )
+        if window is None:
+            return "Rate limit exceeded"
+        return f"Rate limit exceeded: {window.limit} requests per {window.name}"
+
+
+def limits_from_config(config: dict[str, Any]) -> list[RateLimit]:
+    """Build windows from ``requests_per_minute``/``_hour``/``_day`` settings"""
+    return [
+        RateLimit(name, int(config[f"requests_per_{name}"]), period)
+        for name, period in WINDOW_SECONDS.items()
+        if config.get(f"requests_per_{name}")
+    ]
+
+
+class LocalGCRA:
+    """In-process GCRA store with the same semantics as ``GCRA_SCRIPT``"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._tats: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def run(self, keys: list[str], limits: list[RateLimit], cost: int) -> list:
+        with self._lock:
+            now = self.clock() * 1000
+            windows = []
+            retry_after = 0.0
+            for key, limit in zip(keys, limits, strict=True):
+                period = limit.period * 1000
+                interval = period / limit.limit
+                tat = max(self._tats.get(key, now), now)
+                new_tat = tat + interval * cost
+                retry_after = max(retry_after, new_tat - period - now)
+                windows.append((key, tat, new_tat, interval, period))
+
+            allowed = retry_after <= 0
+            result = [int(allowed), math.ceil(max(0.0, retry_after))]
+            for key, tat, new_tat, interval, period in windows:
+                if allowed and cost > 0:
+                    self._tats[key] = tat = new_tat
+                result.append(max(0, math.floor((period - (tat - now)) / interval)))
+                result.append(math.ceil(tat - now))
+
+            self._calls += 1
+            if self._calls % 10_000 == 0:
+                # Drop keys whose windows have fully replenished
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+            return result
+
+
+class _RateLimiterBase:
+    def __init__(self, redis_client: Any = None, prefix: str = "rate_limit"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.local = LocalGCRA()
+        self._script = (
+            redis_client.register_script(GCRA_SCRIPT) if redis_client else None
+        )
+
+    def _keys(self, identity: str, limits: Iterable[RateLimit]) -> list[str]:
+        return [f"{self.prefix}:{identity}:{limit.name}" for limit in limits]
+
+    @staticmethod
+    def _args(limits: list[RateLimit], cost: int) -> list:
+        args: list = [cost]
+        for limit in limits:
+            args += [limit.limit, int(limit.period * 1000)]
+        return args
+
+    @staticmethod
+    def _result(raw: list, limits: list[RateLimit]) -> RateLimitResult:
+        raw = [int(value) for value in raw]
+        return RateLimitResult(
+            allowed=bool(raw[0]),
+            retry_after=raw[1] / 1000,
+            windows=[
+                WindowState(
+                    limit.name, limit.limit, raw[2 + 2 * i], raw[3 + 2 * i] / 1000
+                )
+                for i, limit in enumerate(limits)
+            ],
+        )
+
+
+class RateLimiter(_RateLimiterBase):
+    """
+    Multi-window GCRA rate limiter for synchronous Redis clients.
+
+    Features:
+    - Every window is checked before any is consumed, so a rejected request
+      costs no quota
+    - One EVALSHA round trip per check, atomic across concurrent callers
+    - Falls back to an in-process limiter with identical semantics when
+      there is no Redis client or a Redis call fails
+    """
+
+    def hit(
+        self, identity: str, limits: list[RateLimit], cost: int = 1
+    ) -> RateLimitResult:
+        """Consume ``cost`` requests if every window allows it"""
+        keys = self._keys(identity, limits)
+        if self._script is not None:
+            try:
+                raw = self._script(keys=keys, args=self._args(limits, cost))
+                return self._result(raw, limits)
+            except Exception as e:
+                logger.warning(f"Redis rate limit failed, using local limiter: {e}")
+        return self._result(self.local.run(keys, limits, cost), limits)
+
+    def peek(self, identity: str, limits: list[RateLimit]) -> RateLimitResult:
+        """Current quota without consuming any"""
+        return self.hit(identity, limits, cost=0)
+
+
+class AsyncRateLimiter(_RateLimiterBase):
+    """``RateLimiter`` for ``redis.asyncio`` clients"""
+
+    async def hit(
+        self, identity: str, limits: list[RateLimit], cost: int = 1
+    ) -> RateLimitResult:
+        """Consume ``cost`` requests if every window allows it"""
+        keys = self._keys(identity, limits)
+        if self._script is not None:
+            try:
+                raw = await self._script(keys=keys, args=self._args(limits, cost))
+                return self._result(raw, limits)
+            except Exception as e:
+                logger.warning(f"Redis rate limit failed, using local limiter: {e}")
+        return self._result(self.local.run(keys, limits, cost), limits)
+
+    async def peek(self, identity: str, limits: list[RateLimit]) -> RateLimitResult:
+        """Current quota without consuming any"""
+        return await self.hit(identity, limits, cost=0)
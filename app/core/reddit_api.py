@@ -3,6 +3,8 @@ import os
 import praw
 from dotenv import load_dotenv
 
+from app.core.politeness_scheduler import get_politeness_scheduler
+
 load_dotenv()
 
 
@@ -17,11 +19,17 @@ class RedditClient:
         )
 
     def fetch_comments(self, post_url: str, limit: int = 10) -> list[str]:
+        scheduler = get_politeness_scheduler()
+        scheduler.acquire("reddit.com")
         try:
             submission = self.reddit.submission(url=post_url)
             submission.comments.replace_more(limit=0)
             comments = [c.body for c in submission.comments.list()[:limit]]
             return comments
         except Exception as e:
+            # prawcore exceptions carry the HTTP response; honour 429 Retry-After
+            response = getattr(e, "response", None)
+            if response is not None:
+                scheduler.observe_response("reddit.com", response)
             print(f"❌ Reddit API error: {e}")
             return []
@@ -6,12 +6,14 @@ Maintains context across sessions using local files and structured memory nodes.
 import hashlib
 import json
 import time
+from collections.abc import Iterator, Mapping
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from app.config.logging import get_logger
+from app.core.memory_store import MemoryNodeStore
 
 logger = get_logger(__name__)
 
@@ -33,6 +35,41 @@ class MemoryNode:
         if self.tags is None:
             self.tags = []
 
+    def to_record(self) -> dict[str, Any]:
+        record = asdict(self)
+        record["created_at"] = self.created_at.isoformat()
+        record["updated_at"] = self.updated_at.isoformat()
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "MemoryNode":
+        return cls(
+            **{
+                **record,
+                "created_at": datetime.fromisoformat(record["created_at"]),
+                "updated_at": datetime.fromisoformat(record["updated_at"]),
+            }
+        )
+
+
+class MemoryNodeView(Mapping):
+    """Read-only dict-like view of stored nodes, loaded on access"""
+
+    def __init__(self, store: MemoryNodeStore):
+        self._store = store
+
+    def __getitem__(self, node_id: str) -> MemoryNode:
+        record = self._store.get(node_id)
+        if record is None:
+            raise KeyError(node_id)
+        return MemoryNode.from_record(record)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids())
+
+    def __len__(self) -> int:
+        return self._store.count()
+
 
 @dataclass
 class SessionContext:
@@ -66,11 +103,12 @@ class SessionMemoryManager:
         self.memory_dir = Path(memory_dir)
         self.memory_dir.mkdir(parents=True, exist_ok=True)
 
-        # Memory organization
-        self.memory_nodes: dict[str, MemoryNode] = {}
+        # Memory organization; nodes stay on disk until they are read
+        self.store = MemoryNodeStore(self.memory_dir / "memory_nodes.db")
+        self.memory_nodes = MemoryNodeView(self.store)
         self.session_contexts: dict[str, SessionContext] = {}
 
-        # Load existing memory on startup
+        # Migrate a legacy JSON file once
         self._load_persistent_memory()
 
     def create_session_context(
@@ -131,13 +169,28 @@ class SessionMemoryManager:
             importance_score=importance_score,
         )
 
-        self.memory_nodes[node_id] = memory_node
         self._persist_memory_node(memory_node)
 
         logger.info(f"Stored memory node: {node_id} in category: {category}")
 
         return node_id
 
+    def find_memory_nodes(
+        self,
+        category: str | None = None,
+        tag: str | None = None,
+        limit: int | None = None,
+    ) -> list[MemoryNode]:
+        """Look up nodes through the category and tag indexes, newest first"""
+        return [
+            MemoryNode.from_record(record)
+            for record in self.store.find(category=category, tag=tag, limit=limit)
+        ]
+
+    def compact(self) -> None:
+        """Reclaim space left by replaced nodes"""
+        self.store.compact()
+
     def _generate_session_id(self, user_id: str, project_name: str) -> str:
         """Generate unique session ID"""
         timestamp = str(int(time.time()))
@@ -152,46 +205,22 @@ class SessionMemoryManager:
         return f"{category}:{content_hash}"
 
     def _load_persistent_memory(self) -> None:
-        """Load persistent memory from disk"""
+        """Import and retire memory_nodes.json from the full-rewrite format"""
         memory_file = self.memory_dir / "memory_nodes.json"
 
         if memory_file.exists():
             try:
-                with open(memory_file) as f:
-                    memory_data = json.load(f)
-
-                for node_data in memory_data:
-                    # Convert datetime strings back to datetime objects
-                    node_data["created_at"] = datetime.fromisoformat(
-                        node_data["created_at"]
-                    )
-                    node_data["updated_at"] = datetime.fromisoformat(
-                        node_data["updated_at"]
-                    )
-
-                    memory_node = MemoryNode(**node_data)
-                    self.memory_nodes[memory_node.id] = memory_node
-
-                logger.info(f"Loaded {len(self.memory_nodes)} memory nodes from disk")
+                imported = self.store.import_json(memory_file)
+                memory_file.rename(memory_file.with_suffix(".json.migrated"))
+                logger.info(f"Migrated {imported} memory nodes from {memory_file}")
 
             except Exception as e:
                 logger.error(f"Failed to load persistent memory: {e}")
 
     def _persist_memory_node(self, memory_node: MemoryNode) -> None:
         """Persist memory node to disk"""
-        memory_file = self.memory_dir / "memory_nodes.json"
-
         try:
-            # Convert all memory nodes to serializable format
-            serializable_nodes = []
-            for node in self.memory_nodes.values():
-                node_dict = asdict(node)
-                node_dict["created_at"] = node.created_at.isoformat()
-                node_dict["updated_at"] = node.updated_at.isoformat()
-                serializable_nodes.append(node_dict)
-
-            with open(memory_file, "w") as f:
-                json.dump(serializable_nodes, f, indent=2)
+            self.store.upsert(memory_node.to_record())
 
         except Exception as e:
             logger.error(f"Failed to persist memory node: {e}")
@@ -232,11 +232,7 @@ class StripeAutoEmbed:
         """Generate analytics on Stripe pitch embeddings"""
 
         # Get all embedding data from memory
-        embedding_nodes = [
-            node
-            for node in self.memory.memory_nodes.values()
-            if node.category == "stripe_embeddings"
-        ]
+        embedding_nodes = self.memory.find_memory_nodes(category="stripe_embeddings")
 
         analytics = {
             "total_embeddings": len(embedding_nodes),
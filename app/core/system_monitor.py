@@ -13,9 +13,9 @@ from datetime import datetime
 from typing import Any
 
 import psutil
-import requests
 
 from app.config.logging import get_logger
+from app.core.http_client import get_http_client_registry
 
 logger = get_logger(__name__)
 
@@ -124,7 +124,9 @@ class SystemMonitor:
             start_time = time.time()
 
             # Test health endpoint
-            response = requests.get("http://localhost:8000/health", timeout=5)
+            response = await get_http_client_registry().request(
+                "GET", "http://localhost:8000/health", client="monitoring"
+            )
 
             end_time = time.time()
             response_time_ms = (end_time - start_time) * 1000
@@ -12,6 +12,8 @@ from typing import Any, ClassVar, Optional
 
 import structlog
 
+from app.core.usage_ledger import UsageLedger, get_usage_ledger
+
 # Configure logging
 logger = structlog.get_logger(__name__)
 
@@ -69,17 +71,24 @@ class TokenMonitor:
         },
     }
 
-    def __init__(self, data_dir: str = "./data/token_usage"):
+    SOURCE = "token_monitor"
+
+    def __init__(
+        self,
+        data_dir: str = "./data/token_usage",
+        ledger: Optional[UsageLedger] = None,
+    ):
         """
         Initialize token monitoring system.
 
         Args:
             data_dir: Directory for storing usage data
+            ledger: Usage ledger; defaults to the process-wide shared ledger
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
-        self.usage_records: list[TokenUsage] = []
+        self.ledger = ledger or get_usage_ledger()
         self.budget_alerts: dict[str, BudgetAlert] = {}
 
         # Load existing data
@@ -128,10 +137,18 @@ class TokenMonitor:
             user_id=user_id,
         )
 
-        self.usage_records.append(usage_record)
-
-        # Persist usage data
-        self._persist_usage_data()
+        # Append to the ledger; it batches writes to disk
+        self.ledger.record(
+            source=self.SOURCE,
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost_usd,
+            task_type=task_type,
+            user_id=user_id,
+            session_id=session_id,
+            timestamp=usage_record.timestamp.timestamp(),
+        )
 
         # Check budget alerts
         self._check_budget_alerts()
@@ -160,54 +177,29 @@ class TokenMonitor:
             Usage summary with costs and optimization recommendations
         """
         cutoff_date = datetime.now() - timedelta(days=period_days)
+        summary = self.ledger.summarize(
+            since=cutoff_date.timestamp(),
+            source=self.SOURCE,
+            user_id=user_id,
+            task_type=task_type,
+        )
 
-        # Filter records
-        filtered_records = [
-            record for record in self.usage_records if record.timestamp >= cutoff_date
-        ]
-
-        if user_id:
-            filtered_records = [r for r in filtered_records if r.user_id == user_id]
-
-        if task_type:
-            filtered_records = [r for r in filtered_records if r.task_type == task_type]
-
-        if not filtered_records:
+        if not summary["calls"]:
             return {"error": "No usage data found for specified filters"}
 
-        # Calculate metrics
-        total_tokens = sum(r.total_tokens for r in filtered_records)
-        total_cost = sum(r.cost_usd for r in filtered_records)
-        total_calls = len(filtered_records)
-
-        # Model breakdown
-        model_usage = {}
-        for record in filtered_records:
-            if record.model not in model_usage:
-                model_usage[record.model] = {"calls": 0, "tokens": 0, "cost": 0.0}
-            model_usage[record.model]["calls"] += 1
-            model_usage[record.model]["tokens"] += record.total_tokens
-            model_usage[record.model]["cost"] += record.cost_usd
-
-        # Task type breakdown
-        task_usage = {}
-        for record in filtered_records:
-            task = record.task_type or "unknown"
-            if task not in task_usage:
-                task_usage[task] = {"calls": 0, "tokens": 0, "cost": 0.0}
-            task_usage[task]["calls"] += 1
-            task_usage[task]["tokens"] += record.total_tokens
-            task_usage[task]["cost"] += record.cost_usd
-
-        # Daily usage trend
-        daily_usage = {}
-        for record in filtered_records:
-            date_key = record.timestamp.strftime("%Y-%m-%d")
-            if date_key not in daily_usage:
-                daily_usage[date_key] = {"calls": 0, "tokens": 0, "cost": 0.0}
-            daily_usage[date_key]["calls"] += 1
-            daily_usage[date_key]["tokens"] += record.total_tokens
-            daily_usage[date_key]["cost"] += record.cost_usd
+        total_tokens = summary["tokens"]
+        total_cost = summary["cost"]
+        total_calls = summary["calls"]
+
+        def breakdown(name: str) -> dict[str, dict[str, Any]]:
+            return {
+                key: {
+                    "calls": bucket["calls"],
+                    "tokens": bucket["tokens"],
+                    "cost": bucket["cost"],
+                }
+                for key, bucket in summary[name].items()
+            }
 
         return {
             "period_summary": {
@@ -222,11 +214,11 @@ class TokenMonitor:
                     round(total_tokens / total_calls, 0) if total_calls > 0 else 0
                 ),
             },
-            "model_breakdown": model_usage,
-            "task_breakdown": task_usage,
-            "daily_usage_trend": daily_usage,
+            "model_breakdown": breakdown("by_model"),
+            "task_breakdown": breakdown("by_task"),
+            "daily_usage_trend": breakdown("by_day"),
             "cost_optimization_insights": self._generate_optimization_insights(
-                filtered_records
+                summary
             ),
         }
 
@@ -244,14 +236,7 @@ class TokenMonitor:
                 continue
 
             # Calculate usage for alert period
-            cutoff_date = datetime.now() - timedelta(days=alert.period_days)
-            period_records = [
-                record
-                for record in self.usage_records
-                if record.timestamp >= cutoff_date
-            ]
-
-            period_cost = sum(record.cost_usd for record in period_records)
+            period_cost = self._period_cost(alert.period_days)
             percentage_used = (period_cost / alert.threshold_usd) * 100
 
             budget_status[alert_id] = {
@@ -312,37 +297,26 @@ class TokenMonitor:
             Optimization recommendations
         """
         # Analyze usage patterns for task type
-        task_records = [
-            record for record in self.usage_records if record.task_type == task_type
-        ]
+        summary = self.ledger.summarize(source=self.SOURCE, task_type=task_type)
+        calls = summary["calls"]
 
-        if not task_records:
+        if not calls:
             return {"error": f"No usage data found for task type: {task_type}"}
 
         # Calculate metrics
-        avg_input_tokens = sum(r.input_tokens for r in task_records) / len(task_records)
-        avg_output_tokens = sum(r.output_tokens for r in task_records) / len(
-            task_records
-        )
-        avg_cost = sum(r.cost_usd for r in task_records) / len(task_records)
+        avg_input_tokens = summary["input_tokens"] / calls
+        avg_output_tokens = summary["output_tokens"] / calls
+        avg_cost = summary["cost"] / calls
 
         # Model performance analysis
-        model_performance = {}
-        for record in task_records:
-            if record.model not in model_performance:
-                model_performance[record.model] = {
-                    "count": 0,
-                    "avg_cost": 0.0,
-                    "avg_tokens": 0.0,
-                }
-            model_performance[record.model]["count"] += 1
-            model_performance[record.model]["avg_cost"] += record.cost_usd
-            model_performance[record.model]["avg_tokens"] += record.total_tokens
-
-        # Finalize averages
-        for perf in model_performance.values():
-            perf["avg_cost"] = perf["avg_cost"] / perf["count"]
-            perf["avg_tokens"] = perf["avg_tokens"] / perf["count"]
+        model_performance = {
+            model: {
+                "count": bucket["calls"],
+                "avg_cost": bucket["cost"] / bucket["calls"],
+                "avg_tokens": bucket["tokens"] / bucket["calls"],
+            }
+            for model, bucket in summary["by_model"].items()
+        }
 
         # Generate recommendations
         recommendations = self._generate_task_recommendations(
@@ -355,7 +329,7 @@ class TokenMonitor:
                 "average_input_tokens": round(avg_input_tokens, 0),
                 "average_output_tokens": round(avg_output_tokens, 0),
                 "average_cost_per_call": round(avg_cost, 4),
-                "total_calls_analyzed": len(task_records),
+                "total_calls_analyzed": calls,
             },
             "model_performance": model_performance,
             "optimization_recommendations": recommendations,
@@ -400,18 +374,17 @@ class TokenMonitor:
             if not alert.is_active:
                 continue
 
-            cutoff_date = datetime.now() - timedelta(days=alert.period_days)
-            period_records = [
-                record
-                for record in self.usage_records
-                if record.timestamp >= cutoff_date
-            ]
-
-            period_cost = sum(record.cost_usd for record in period_records)
+            period_cost = self._period_cost(alert.period_days)
 
             if period_cost >= alert.threshold_usd:
                 self._trigger_budget_alert(alert, period_cost)
 
+    def _period_cost(self, period_days: int) -> float:
+        cutoff_date = datetime.now() - timedelta(days=period_days)
+        return self.ledger.total_cost(
+            since=cutoff_date.timestamp(), source=self.SOURCE
+        )
+
     def _trigger_budget_alert(self, alert: BudgetAlert, current_cost: float):
         """Trigger budget alert"""
         # Only trigger once per period
@@ -440,29 +413,22 @@ class TokenMonitor:
         else:
             return "NORMAL"
 
-    def _generate_optimization_insights(self, records: list[TokenUsage]) -> list[str]:
-        """Generate optimization insights from usage patterns"""
+    def _generate_optimization_insights(self, summary: dict[str, Any]) -> list[str]:
+        """Generate optimization insights from a ledger summary"""
         insights = []
 
-        if not records:
+        if not summary["calls"]:
             return insights
 
         # Model efficiency analysis
-        model_costs = {}
-        for record in records:
-            if record.model not in model_costs:
-                model_costs[record.model] = []
-            model_costs[record.model].append(record.cost_usd)
+        model_costs = {
+            model: bucket["cost"] / bucket["calls"]
+            for model, bucket in summary["by_model"].items()
+        }
 
         if len(model_costs) > 1:
-            most_expensive_model = max(
-                model_costs.keys(),
-                key=lambda m: sum(model_costs[m]) / len(model_costs[m]),
-            )
-            least_expensive_model = min(
-                model_costs.keys(),
-                key=lambda m: sum(model_costs[m]) / len(model_costs[m]),
-            )
+            most_expensive_model = max(model_costs, key=model_costs.get)
+            least_expensive_model = min(model_costs, key=model_costs.get)
 
             if most_expensive_model != least_expensive_model:
                 insights.append(
@@ -471,15 +437,15 @@ class TokenMonitor:
                 )
 
         # Token usage patterns
-        avg_tokens = sum(r.total_tokens for r in records) / len(records)
+        avg_tokens = summary["tokens"] / summary["calls"]
         if avg_tokens > 10000:
             insights.append(
                 "High token usage detected. Consider breaking down complex tasks into smaller prompts"
             )
 
         # Output/input ratio analysis
-        total_input = sum(r.input_tokens for r in records)
-        total_output = sum(r.output_tokens for r in records)
+        total_input = summary["input_tokens"]
+        total_output = summary["output_tokens"]
 
         if total_output > total_input * 2:
             insights.append(
@@ -559,25 +525,8 @@ class TokenMonitor:
 
         return recommendations
 
-    def _persist_usage_data(self):
-        """Persist usage data to disk"""
-        usage_file = self.data_dir / "token_usage.json"
-
-        try:
-            serializable_records = []
-            for record in self.usage_records[-1000:]:  # Keep last 1000 records
-                record_dict = asdict(record)
-                record_dict["timestamp"] = record.timestamp.isoformat()
-                serializable_records.append(record_dict)
-
-            with open(usage_file, "w") as f:
-                json.dump(serializable_records, f, indent=2)
-
-        except Exception as e:
-            logger.error(f"Failed to persist usage data: {e}")
-
     def _load_usage_data(self):
-        """Load usage data from disk"""
+        """Import the legacy token_usage.json file into the ledger once"""
         usage_file = self.data_dir / "token_usage.json"
 
         if usage_file.exists():
@@ -586,13 +535,23 @@ class TokenMonitor:
                     usage_data = json.load(f)
 
                 for record_data in usage_data:
-                    record_data["timestamp"] = datetime.fromisoformat(
-                        record_data["timestamp"]
+                    self.ledger.record(
+                        source=self.SOURCE,
+                        model=record_data["model"],
+                        input_tokens=record_data["input_tokens"],
+                        output_tokens=record_data["output_tokens"],
+                        cost_usd=record_data["cost_usd"],
+                        task_type=record_data.get("task_type"),
+                        user_id=record_data.get("user_id"),
+                        session_id=record_data.get("session_id"),
+                        timestamp=datetime.fromisoformat(
+                            record_data["timestamp"]
+                        ).timestamp(),
                     )
-                    usage_record = TokenUsage(**record_data)
-                    self.usage_records.append(usage_record)
+                self.ledger.flush()
+                usage_file.rename(usage_file.with_suffix(".json.migrated"))
 
-                logger.info(f"Loaded {len(self.usage_records)} usage records")
+                logger.info(f"Migrated {len(usage_data)} usage records to the ledger")
 
             except Exception as e:
                 logger.error(f"Failed to load usage data: {e}")
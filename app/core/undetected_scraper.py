@@ -20,6 +20,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
 from app.config.logging import get_logger
+from app.core.politeness_scheduler import get_politeness_scheduler
 
 logger = get_logger(__name__)
 
@@ -37,16 +38,23 @@ else:  # Linux
 class UndetectedChromeScraper:
     """A web scraper that uses undetected_chromedriver to bypass anti-bot measures"""
 
-    def __init__(self, headless: bool = False, user_agent: Optional[str] = None):
+    def __init__(
+        self,
+        headless: bool = False,
+        user_agent: Optional[str] = None,
+        settle_delay: float = 1.0,
+    ):
         """
         Initialize the undetected Chrome scraper.
 
         Args:
             headless: Whether to run in headless mode
             user_agent: Custom user agent to use (optional)
+            settle_delay: Seconds to let JavaScript run when no selector is awaited
         """
         self.headless = headless
         self.user_agent = user_agent
+        self.settle_delay = settle_delay
         self.driver = None
         self._setup_driver()
 
@@ -124,15 +132,16 @@ class UndetectedChromeScraper:
             return None
 
         try:
+            get_politeness_scheduler().acquire(url)
             self.driver.get(url)
 
             if wait_for:
                 WebDriverWait(self.driver, timeout).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, wait_for))
                 )
-
-            # Add a small delay to ensure all JavaScript has executed
-            time.sleep(2)
+            else:
+                # Without a selector to wait on, give JavaScript a moment to run
+                time.sleep(self.settle_delay)
 
             return self.driver.page_source
 
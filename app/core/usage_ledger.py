@@ -0,0 +1,334 @@
+"""
+Token Usage Ledger
+Durable, append-only record of LLM calls with hourly rollups, shared by the
+token and cost monitors.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LEDGER_PATH = "data/token_usage/usage_ledger.db"
+
+_EVENT_FIELDS = (
+    "ts",
+    "source",
+    "model",
+    "task_type",
+    "user_id",
+    "session_id",
+    "input_tokens",
+    "output_tokens",
+    "cost_usd",
+)
+# Rollup dimensions; session_id is too high-cardinality to roll up
+_DIMENSIONS = ("source", "model", "task_type", "user_id")
+
+
+class UsageLedger:
+    """
+    SQLite usage ledger with pre-aggregated rollups.
+
+    Features:
+    - ``record`` only appends to an in-memory buffer; the buffer is flushed
+      in one transaction once it holds ``flush_size`` events or is older than
+      ``flush_interval`` seconds, and at interpreter exit
+    - Events are never truncated; every flush also folds the batch into
+      hourly rollups keyed by source, model, task type and user
+    - Summaries read the rollups for whole hours and only scan raw events
+      for the partial hour at the start of the window, plus the unflushed
+      buffer, so a 30-day summary costs the same at a thousand or a
+      million calls
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = DEFAULT_LEDGER_PATH,
+        flush_size: int = 200,
+        flush_interval: float = 2.0,
+    ):
+        self.db_path = str(db_path)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS usage_events (
+                ts REAL NOT NULL,
+                source TEXT NOT NULL,
+                model TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost_usd REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_usage_events_ts ON usage_events(ts);
+            CREATE INDEX IF NOT EXISTS idx_usage_events_session
+                ON usage_events(session_id);
+            CREATE TABLE IF NOT EXISTS usage_rollups (
+                hour INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                source TEXT NOT NULL,
+                model TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost_usd REAL NOT NULL,
+                PRIMARY KEY (hour, source, model, task_type, user_id)
+            );
+            """
+        )
+        self._conn.commit()
+        atexit.register(self.flush)
+
+    def record(
+        self,
+        source: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost_usd: float,
+        task_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Buffer one call; flushes when the batch is full or old enough"""
+        event = (
+            time.time() if timestamp is None else timestamp,
+            source,
+            model,
+            task_type or "unknown",
+            user_id or "",
+            session_id or "",
+            int(input_tokens),
+            int(output_tokens),
+            float(cost_usd),
+        )
+        with self._lock:
+            self._buffer.append(event)
+            if (
+                len(self._buffer) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+
+    def flush(self) -> int:
+        """Write buffered events and fold them into the rollups"""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not events:
+                return 0
+            try:
+                self._write(events)
+            except sqlite3.Error as e:
+                # Keep the batch so the next flush retries it
+                self._buffer = events + self._buffer
+                logger.error(f"Failed to flush {len(events)} usage events: {e}")
+                return 0
+        return len(events)
+
+    def _write(self, events: list[tuple]) -> None:
+        rollups: dict[tuple, list] = {}
+        for ts, source, model, task, user, _, tokens_in, tokens_out, cost in events:
+            hour = int(ts // 3600)
+            day = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+            totals = rollups.setdefault(
+                (hour, day, source, model, task, user), [0, 0, 0, 0.0]
+            )
+            totals[0] += 1
+            totals[1] += tokens_in
+            totals[2] += tokens_out
+            totals[3] += cost
+
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO usage_events ({', '.join(_EVENT_FIELDS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                events,
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO usage_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(hour, source, model, task_type, user_id) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    input_tokens = input_tokens + excluded.input_tokens,
+                    output_tokens = output_tokens + excluded.output_tokens,
+                    cost_usd = cost_usd + excluded.cost_usd
+                """,
+                [key + tuple(totals) for key, totals in rollups.items()],
+            )
+
+    @staticmethod
+    def _filters(filters: dict[str, Optional[str]]) -> tuple[str, list]:
+        clauses, params = [], []
+        for column in _DIMENSIONS:
+            value = filters.get(column)
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def _grouped(
+        self, since: Optional[float], filters: dict[str, Optional[str]]
+    ) -> Iterable[tuple]:
+        """(day, model, task_type, calls, input, output, cost) rows in the window"""
+        where, params = self._filters(filters)
+        if since is None:
+            yield from self._conn.execute(
+                "SELECT day, model, task_type, SUM(calls), SUM(input_tokens), "
+                "SUM(output_tokens), SUM(cost_usd) FROM usage_rollups "
+                f"WHERE 1 = 1{where} GROUP BY day, model, task_type",
+                params,
+            )
+        else:
+            # Whole hours come from the rollups, the partial first hour from
+            # raw events
+            first_full_hour = int(since // 3600) + 1
+            yield from self._conn.execute(
+                "SELECT day, model, task_type, SUM(calls), SUM(input_tokens), "
+                "SUM(output_tokens), SUM(cost_usd) FROM usage_rollups "
+                f"WHERE hour >= ?{where} GROUP BY day, model, task_type",
+                [first_full_hour, *params],
+            )
+            for row in self._conn.execute(
+                "SELECT ts, model, task_type, input_tokens, output_tokens, cost_usd "
+                f"FROM usage_events WHERE ts >= ? AND ts < ?{where}",
+                [since, first_full_hour * 3600, *params],
+            ):
+                yield self._event_row(row[0], *row[1:])
+
+        for event in self._buffer:
+            if since is not None and event[0] < since:
+                continue
+            event_fields = dict(zip(_EVENT_FIELDS, event, strict=True))
+            if any(
+                filters.get(column) is not None
+                and event_fields[column] != filters[column]
+                for column in _DIMENSIONS
+            ):
+                continue
+            yield self._event_row(event[0], *event[2:4], *event[6:])
+
+    @staticmethod
+    def _event_row(ts: float, model, task_type, tokens_in, tokens_out, cost) -> tuple:
+        day = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+        return (day, model, task_type, 1, tokens_in, tokens_out, cost)
+
+    def summarize(
+        self,
+        since: Optional[float] = None,
+        source: Optional[str] = None,
+        model: Optional[str] = None,
+        task_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Totals plus per-model, per-task and per-day breakdowns since ``since``"""
+        filters = {
+            "source": source,
+            "model": model,
+            "task_type": task_type,
+            "user_id": user_id,
+        }
+        totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+        breakdowns: dict[str, dict[str, dict[str, Any]]] = {
+            "by_model": {},
+            "by_task": {},
+            "by_day": {},
+        }
+
+        with self._lock:
+            rows = list(self._grouped(since, filters))
+
+        for day, row_model, task, calls, tokens_in, tokens_out, cost in rows:
+            for name, key in (
+                ("by_model", row_model),
+                ("by_task", task),
+                ("by_day", day),
+            ):
+                bucket = breakdowns[name].setdefault(
+                    key,
+                    {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0},
+                )
+                bucket["calls"] += calls
+                bucket["input_tokens"] += tokens_in
+                bucket["output_tokens"] += tokens_out
+                bucket["cost"] += cost
+            totals["calls"] += calls
+            totals["input_tokens"] += tokens_in
+            totals["output_tokens"] += tokens_out
+            totals["cost"] += cost
+
+        totals["tokens"] = totals["input_tokens"] + totals["output_tokens"]
+        for breakdown in breakdowns.values():
+            for bucket in breakdown.values():
+                bucket["tokens"] = bucket["input_tokens"] + bucket["output_tokens"]
+        breakdowns["by_day"] = dict(sorted(breakdowns["by_day"].items()))
+        return {**totals, **breakdowns}
+
+    def total_cost(self, since: Optional[float] = None, **filters: str) -> float:
+        return self.summarize(since=since, **filters)["cost"]
+
+    def session_tokens(self, session_id: str, source: Optional[str] = None) -> int:
+        """Total tokens recorded for one session"""
+        self.flush()
+        where, params = self._filters({"source": source})
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT SUM(input_tokens + output_tokens) FROM usage_events "
+                f"WHERE session_id = ?{where}",
+                [session_id, *params],
+            ).fetchone()
+        return row[0] or 0
+
+    def recent(self, limit: int = 100, source: Optional[str] = None) -> list[dict]:
+        """Most recent raw events, oldest first"""
+        self.flush()
+        where, params = self._filters({"source": source})
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_EVENT_FIELDS)} FROM usage_events "
+                f"WHERE 1 = 1{where} ORDER BY ts DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [dict(zip(_EVENT_FIELDS, row, strict=True)) for row in reversed(rows)]
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.flush)
+        with self._lock:
+            self._conn.close()
+
+
+_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the process-wide ledger shared by the usage monitors"""
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger(os.getenv("USAGE_LEDGER_PATH", DEFAULT_LEDGER_PATH))
+    return _ledger
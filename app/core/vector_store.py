@@ -5,19 +5,94 @@ Handles ChromaDB integration and document management
 """
 
 import asyncio
+import hashlib
+import json
+import shutil
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import chromadb
-from llama_index.core import Document, VectorStoreIndex
+import numpy as np
+from llama_index.core import Document, Settings, VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode, MetadataMode
 from llama_index.core.storage.storage_context import StorageContext
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
+from app.core.lexical_index import BM25Index, reciprocal_rank_fusion
+
+DEFAULT_EMBED_BATCH_SIZE = 256
+DEFAULT_WRITE_BATCH_SIZE = 2048
+DOCUMENT_WINDOW = 512
+
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+BACKUP_FORMAT_VERSION = 1
+BACKUP_MANIFEST_FILE = "manifest.json"
+BACKUP_EMBEDDINGS_FILE = "embeddings.npy"
+BACKUP_RECORDS_FILE = "records.jsonl"
+
+
+@dataclass
+class UpsertReport:
+    """Outcome of one bulk upsert"""
+
+    index_name: str
+    documents: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.embedded / self.seconds if self.seconds else 0.0
+
+
+def chunk_node_id(i: int, doc: BaseNode) -> str:
+    """Chunk ids derive from the source document id and chunk position"""
+    return f"{doc.doc_id}:{i}"
+
+
+def stable_doc_id(doc: Document) -> str:
+    """
+    Keep caller-assigned ids; replace LlamaIndex's random uuid4 default with a
+    content hash so re-ingesting the same document maps onto the same rows.
+    """
+    try:
+        uuid.UUID(doc.doc_id)
+    except ValueError:
+        return doc.doc_id
+    payload = json.dumps(
+        {"text": doc.text, "metadata": doc.metadata}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class VectorStoreManager:
     """Manages vector stores and indices for the agentic RAG system"""
 
-    def __init__(self, persist_dir: str = "data/vector_stores"):
+    def __init__(
+        self,
+        persist_dir: str = "data/vector_stores",
+        embed_model: Optional[BaseEmbedding] = None,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    ):
         """Initialize the vector store manager"""
 
         self.persist_dir = Path(persist_dir)
@@ -31,6 +106,19 @@ class VectorStoreManager:
         # Track active collections and indices
         self.collections: dict[str, Any] = {}
         self.vector_stores: dict[str, ChromaVectorStore] = {}
+        self.lexical_indices: dict[str, BM25Index] = {}
+
+        # Bulk ingest settings; embed_model falls back to Settings.embed_model
+        self._embed_model = embed_model
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = min(
+            write_batch_size, self.chroma_client.get_max_batch_size()
+        )
+        self.node_parser = SentenceSplitter(
+            chunk_size=Settings.chunk_size,
+            chunk_overlap=Settings.chunk_overlap,
+            id_func=chunk_node_id,
+        )
 
         print(f"🗄️ Vector Store Manager initialized at {self.persist_dir}")
 
@@ -60,16 +148,18 @@ class VectorStoreManager:
         vector_store = ChromaVectorStore(chroma_collection=collection)
         storage_context = StorageContext.from_defaults(vector_store=vector_store)
 
-        # Create and persist index
-        index = VectorStoreIndex.from_documents(
-            documents,
-            storage_context=storage_context,
-            show_progress=True,
-        )
-
         # Store references
         self.collections[index_name] = collection
         self.vector_stores[index_name] = vector_store
+        self._lexical_index(index_name).ensure_synced(collection)
+
+        # Bulk-load the collection, then wrap it in an index
+        await self.upsert_documents(index_name, documents)
+        index = VectorStoreIndex.from_vector_store(
+            vector_store=vector_store,
+            storage_context=storage_context,
+            embed_model=self.embed_model,
+        )
 
         print(f"✅ Index created: {index_name} with {len(documents)} documents")
         return index
@@ -90,37 +180,164 @@ class VectorStoreManager:
         index = VectorStoreIndex.from_vector_store(
             vector_store=vector_store,
             storage_context=storage_context,
+            embed_model=self.embed_model,
         )
 
         # Store references
         self.collections[index_name] = collection
         self.vector_stores[index_name] = vector_store
+        self._lexical_index(index_name).ensure_synced(collection)
 
         document_count = collection.count()
         print(f"✅ Index loaded: {index_name} with {document_count} documents")
         return index
 
-    async def add_documents(self, index_name: str, documents: list[Document]) -> None:
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        return self._embed_model or Settings.embed_model
+
+    async def add_documents(
+        self, index_name: str, documents: Iterable[Document]
+    ) -> UpsertReport:
         """Add documents to an existing index"""
 
+        return await self.upsert_documents(index_name, documents)
+
+    async def upsert_documents(
+        self,
+        index_name: str,
+        documents: Iterable[Document],
+        show_progress: bool = True,
+    ) -> UpsertReport:
+        """
+        Chunk, embed and write documents in bulk, keyed by stable ids.
+
+        Chunk ids are ``<doc_id>:<position>``, so re-ingesting a document
+        overwrites its rows instead of duplicating them. Chunks whose content
+        hash is already stored are not re-embedded, and leftover chunks from
+        a longer previous version of a document are removed.
+        """
+
         if index_name not in self.vector_stores:
             raise ValueError(f"Vector store {index_name} not found")
 
-        print(f"📝 Adding {len(documents)} documents to {index_name}")
+        collection = self.collections[index_name]
+        report = UpsertReport(index_name=index_name)
+        started = time.perf_counter()
+
+        for window in _batched(documents, DOCUMENT_WINDOW):
+            await self._upsert_window(index_name, collection, window, report)
+            report.seconds = time.perf_counter() - started
+            if show_progress:
+                print(
+                    f"📝 {index_name}: {report.documents} documents, "
+                    f"{report.embedded} chunks embedded, {report.unchanged} unchanged "
+                    f"({report.chunks_per_second:.0f} chunks/s)"
+                )
+
+        report.seconds = time.perf_counter() - started
+        print(
+            f"✅ Upserted {report.documents} documents ({report.chunks} chunks) "
+            f"into {index_name} in {report.seconds:.1f}s"
+        )
+        return report
+
+    async def _upsert_window(
+        self,
+        index_name: str,
+        collection: Any,
+        documents: list[Document],
+        report: UpsertReport,
+    ) -> None:
+        """Upsert one window of documents; updates ``report`` in place"""
+
+        # Work on copies so callers' documents keep their ids; a document
+        # repeated within the window (same id or same anonymous content) is
+        # written once, the last copy winning as a later upsert would
+        by_id: dict[str, Document] = {}
+        for doc in documents:
+            doc_id = stable_doc_id(doc)
+            by_id.pop(doc_id, None)
+            by_id[doc_id] = doc.model_copy(update={"id_": doc_id})
+        doc_ids = list(by_id)
+        nodes = self.node_parser.get_nodes_from_documents(list(by_id.values()))
+        node_hashes = {
+            node.node_id: hashlib.sha256(
+                node.get_content(metadata_mode=MetadataMode.ALL).encode()
+            ).hexdigest()
+            for node in nodes
+        }
 
-        # Get vector store and create temporary index for new documents
-        vector_store = self.vector_stores[index_name]
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        # One round trip fetches every chunk already stored for this window
+        existing = collection.get(
+            where={"document_id": {"$in": doc_ids}}, include=["metadatas"]
+        )
+        stored_hashes = {
+            chunk_id: (metadata or {}).get("content_hash")
+            for chunk_id, metadata in zip(
+                existing["ids"], existing["metadatas"] or [], strict=False
+            )
+        }
 
-        # Add documents to existing vector store
-        for doc in documents:
-            # Create temporary index to insert the document
-            VectorStoreIndex.from_documents(
-                [doc],
-                storage_context=storage_context,
+        stale = [chunk_id for chunk_id in stored_hashes if chunk_id not in node_hashes]
+        lexical = self._lexical_index(index_name)
+        for batch in _batched(stale, self.write_batch_size):
+            collection.delete(ids=batch)
+            lexical.delete(ids=batch)
+
+        pending = [
+            node
+            for node in nodes
+            if stored_hashes.get(node.node_id) != node_hashes[node.node_id]
+        ]
+        for batch in _batched(pending, self.write_batch_size):
+            embeddings = await self._embed_nodes(batch)
+            metadatas = []
+            for node in batch:
+                metadata = node_to_metadata_dict(
+                    node, remove_text=True, flat_metadata=True
+                )
+                metadata = {k: "" if v is None else v for k, v in metadata.items()}
+                metadata["content_hash"] = node_hashes[node.node_id]
+                metadatas.append(metadata)
+
+            ids = [node.node_id for node in batch]
+            texts = [
+                node.get_content(metadata_mode=MetadataMode.NONE) for node in batch
+            ]
+            collection.upsert(
+                ids=ids, embeddings=embeddings, metadatas=metadatas, documents=texts
             )
+            lexical.upsert(ids, texts, metadatas)
+
+        report.documents += len(doc_ids)
+        report.chunks += len(nodes)
+        report.embedded += len(pending)
+        report.unchanged += len(nodes) - len(pending)
+        report.deleted += len(stale)
+
+    async def _embed_nodes(self, nodes: list[BaseNode]) -> list[list[float]]:
+        """Embed node texts in ``embed_batch_size`` requests"""
 
-        print(f"✅ Documents added to {index_name}")
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        embeddings: list[list[float]] = []
+        for batch in _batched(texts, self.embed_batch_size):
+            embeddings.extend(await self.embed_model.aget_text_embedding_batch(batch))
+        return embeddings
+
+    async def delete_documents(self, index_name: str, doc_ids: list[str]) -> None:
+        """Remove every node that was created from the given source documents"""
+
+        if index_name not in self.vector_stores:
+            raise ValueError(f"Vector store {index_name} not found")
+
+        collection = self.collections[index_name]
+        lexical = self._lexical_index(index_name)
+        for batch in _batched(doc_ids, self.write_batch_size):
+            collection.delete(where={"document_id": {"$in": batch}})
+            lexical.delete(where={"document_id": {"$in": batch}})
+
+        print(f"🗑️ Deleted {len(doc_ids)} documents from {index_name}")
 
     async def delete_index(self, index_name: str) -> None:
         """Delete an entire index"""
@@ -133,6 +350,7 @@ class VectorStoreManager:
                 del self.collections[index_name]
             if index_name in self.vector_stores:
                 del self.vector_stores[index_name]
+            self._lexical_index(index_name).clear()
 
             print(f"🗑️ Index deleted: {index_name}")
 
@@ -162,79 +380,278 @@ class VectorStoreManager:
         except Exception as e:
             return {"error": f"Could not get stats for {index_name}: {e}"}
 
+    def _lexical_index(self, index_name: str) -> BM25Index:
+        """BM25 sidecar kept next to the Chroma data for ``index_name``"""
+
+        if index_name not in self.lexical_indices:
+            self.lexical_indices[index_name] = BM25Index(
+                str(self.persist_dir / "bm25" / f"{index_name}.db")
+            )
+        return self.lexical_indices[index_name]
+
     async def search_documents(
-        self, index_name: str, query: str, top_k: int = 5
+        self,
+        index_name: str,
+        query: str,
+        top_k: int = 5,
+        where: Optional[dict[str, Any]] = None,
+        mode: str = "hybrid",
+        candidates: Optional[int] = None,
+        lexical_weight: float = 1.0,
     ) -> list[dict[str, Any]]:
-        """Search documents in a specific index"""
+        """
+        Search documents in a specific index.
+
+        ``hybrid`` fuses the vector and BM25 rankings with reciprocal-rank
+        fusion, so exact product names and jargon that embeddings rank
+        poorly still surface. ``lexical_weight`` scales the BM25 side of the
+        fusion. ``where`` is a Chroma-style metadata filter applied before
+        ranking on both sides.
+        """
 
         if index_name not in self.collections:
             raise ValueError(f"Collection {index_name} not found")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode}; expected {SEARCH_MODES}")
 
         collection = self.collections[index_name]
+        candidates = candidates or max(top_k * 4, 20)
+        rows: dict[str, dict[str, Any]] = {}
+        rankings: list[list[str]] = []
+        weights: list[float] = []
+
+        if mode in ("vector", "hybrid"):
+            query_embedding = await self.embed_model.aget_query_embedding(query)
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=candidates,
+                where=where or None,
+                include=["documents", "metadatas", "distances"],
+            )
+            for chunk_id, document, metadata, distance in zip(
+                results["ids"][0],
+                results["documents"][0],
+                results["metadatas"][0],
+                results["distances"][0],
+                strict=True,
+            ):
+                rows[chunk_id] = {
+                    "id": chunk_id,
+                    "document": document,
+                    "metadata": metadata or {},
+                    "distance": distance,
+                    "bm25_score": None,
+                }
+            rankings.append(results["ids"][0])
+            weights.append(1.0)
 
-        # Perform similarity search
-        results = collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"],
-        )
+        if mode in ("lexical", "hybrid"):
+            lexical_hits = self._lexical_index(index_name).search(
+                query, candidates, where
+            )
+            missing = [chunk_id for chunk_id, _ in lexical_hits if chunk_id not in rows]
+            if missing:
+                fetched = collection.get(
+                    ids=missing, include=["documents", "metadatas"]
+                )
+                for chunk_id, document, metadata in zip(
+                    fetched["ids"],
+                    fetched["documents"],
+                    fetched["metadatas"],
+                    strict=True,
+                ):
+                    rows[chunk_id] = {
+                        "id": chunk_id,
+                        "document": document,
+                        "metadata": metadata or {},
+                        "distance": None,
+                        "bm25_score": None,
+                    }
+            for chunk_id, score in lexical_hits:
+                if chunk_id in rows:
+                    rows[chunk_id]["bm25_score"] = score
+            rankings.append(
+                [chunk_id for chunk_id, _ in lexical_hits if chunk_id in rows]
+            )
+            weights.append(lexical_weight)
+
+        fused = reciprocal_rank_fusion(rankings, weights=weights)
+        return [{**rows[chunk_id], "score": score} for chunk_id, score in fused[:top_k]]
+
+    async def collection_centroid(
+        self, index_name: str, limit: int = 5000, page_size: int = 1000
+    ) -> Optional[np.ndarray]:
+        """Mean of the unit-normalized vectors of up to ``limit`` rows"""
+
+        collection = self.collections.get(index_name)
+        if collection is None:
+            return None
+
+        total = 0
+        accumulated = None
+        for offset in range(0, min(collection.count(), limit), page_size):
+            page = collection.get(
+                limit=min(page_size, limit - offset),
+                offset=offset,
+                include=["embeddings"],
+            )
+            if not page["ids"]:
+                break
+            vectors = np.asarray(page["embeddings"], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+            summed = vectors.sum(axis=0)
+            accumulated = summed if accumulated is None else accumulated + summed
+            total += len(vectors)
+
+        return accumulated / total if total else None
+
+    async def backup_index(
+        self, index_name: str, backup_path: str, page_size: int = 1000
+    ) -> Path:
+        """
+        Back up an index, embeddings included, to ``<backup_path>/<index_name>/``.
+
+        The collection is read in pages of ``page_size`` rows until a page
+        comes back empty, so rows added while paging are included. Vectors go
+        into one float32 ``embeddings.npy`` matrix. Ids, documents and metadata
+        go into ``records.jsonl``, one compact line per row, in the same order.
+        """
+
+        collection = self.collections.get(index_name)
+        if collection is None:
+            collection = self.chroma_client.get_collection(name=index_name)
+        backup_dir = Path(backup_path) / index_name
+        backup_dir.mkdir(parents=True, exist_ok=True)
 
-        # Format results
-        formatted_results = []
-        for i in range(len(results["documents"][0])):
-            formatted_results.append(
+        # Vectors are appended raw and wrapped in an .npy header once the
+        # final row count is known
+        raw_path = backup_dir / f"{BACKUP_EMBEDDINGS_FILE}.part"
+        dimension = 0
+        rows = 0
+
+        with (
+            open(backup_dir / BACKUP_RECORDS_FILE, "w") as records,
+            open(raw_path, "wb") as raw,
+        ):
+            while True:
+                page = collection.get(
+                    limit=page_size,
+                    offset=rows,
+                    include=["documents", "metadatas", "embeddings"],
+                )
+                if not page["ids"]:
+                    break
+                embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+                dimension = embeddings.shape[1]
+                embeddings.tofile(raw)
+                rows += len(embeddings)
+
+                for chunk_id, document, metadata in zip(
+                    page["ids"], page["documents"], page["metadatas"], strict=True
+                ):
+                    record = {"id": chunk_id, "document": document}
+                    record["metadata"] = metadata
+                    records.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+        with (
+            open(backup_dir / BACKUP_EMBEDDINGS_FILE, "wb") as out,
+            open(raw_path, "rb") as raw,
+        ):
+            np.lib.format.write_array_header_1_0(
+                out,
                 {
-                    "document": results["documents"][0][i],
-                    "metadata": (
-                        results["metadatas"][0][i] if results["metadatas"][0] else {}
-                    ),
-                    "distance": (
-                        results["distances"][0][i] if results["distances"][0] else 0.0
-                    ),
-                }
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                    "fortran_order": False,
+                    "shape": (rows, dimension),
+                },
             )
-
-        return formatted_results
-
-    async def backup_index(self, index_name: str, backup_path: str) -> None:
-        """Backup an index to a specified path"""
+            shutil.copyfileobj(raw, out)
+        raw_path.unlink()
+
+        manifest = {
+            "format_version": BACKUP_FORMAT_VERSION,
+            "name": index_name,
+            "metadata": collection.metadata,
+            "count": rows,
+            "dimension": dimension,
+            "dtype": "float32",
+            "created_at": time.time(),
+        }
+        (backup_dir / BACKUP_MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        print(f"💾 Index backed up: {index_name} ({rows} rows) -> {backup_dir}")
+        return backup_dir
+
+    async def restore_index(
+        self,
+        backup_path: str,
+        index_name: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> str:
+        """
+        Restore an index from a backup directory without re-embedding.
+
+        Vectors are memory-mapped from ``embeddings.npy`` and written back page
+        by page alongside their records. Restoring into an existing collection
+        removes rows the backup does not contain. Legacy ``*_backup.json``
+        files carry no embeddings, so they still go through ``create_index``.
+        """
 
         backup_dir = Path(backup_path)
-        backup_dir.mkdir(parents=True, exist_ok=True)
-
-        # Export collection data
-        if index_name in self.collections:
-            collection = self.collections[index_name]
-
-            # Get all documents
-            results = collection.get(include=["documents", "metadatas", "embeddings"])
-
-            # Save to backup file
-            import json
-
-            backup_file = backup_dir / f"{index_name}_backup.json"
-
-            backup_data = {
-                "name": index_name,
-                "metadata": collection.metadata,
-                "documents": results.get("documents", []),
-                "metadatas": results.get("metadatas", []),
-                "ids": results.get("ids", []),
-            }
-
-            with open(backup_file, "w") as f:
-                json.dump(backup_data, f, indent=2)
-
-            print(f"💾 Index backed up: {index_name} -> {backup_file}")
+        if not backup_dir.exists():
+            raise FileNotFoundError(f"Backup file not found: {backup_path}")
+        if backup_dir.is_file():
+            return await self._restore_legacy_json(backup_dir)
 
-    async def restore_index(self, backup_path: str) -> str:
-        """Restore an index from backup"""
+        manifest = json.loads((backup_dir / BACKUP_MANIFEST_FILE).read_text())
+        if manifest.get("format_version") != BACKUP_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported backup format: {manifest.get('format_version')}"
+            )
+        index_name = index_name or manifest["name"]
 
-        import json
+        collection = self.chroma_client.get_or_create_collection(
+            name=index_name, metadata=manifest.get("metadata")
+        )
+        self.collections[index_name] = collection
+        self.vector_stores[index_name] = ChromaVectorStore(chroma_collection=collection)
+
+        lexical = self._lexical_index(index_name)
+        restored: set[str] = set()
+        rows = 0
+        if manifest["count"]:
+            matrix = np.load(backup_dir / BACKUP_EMBEDDINGS_FILE, mmap_mode="r")
+            with open(backup_dir / BACKUP_RECORDS_FILE) as records:
+                for page in _batched(map(json.loads, records), page_size):
+                    ids = [record["id"] for record in page]
+                    documents = [record["document"] for record in page]
+                    metadatas = [record["metadata"] for record in page]
+                    collection.upsert(
+                        ids=ids,
+                        embeddings=np.asarray(matrix[rows : rows + len(page)]),
+                        documents=documents,
+                        metadatas=metadatas,
+                    )
+                    lexical.upsert(ids, documents, metadatas)
+                    restored.update(ids)
+                    rows += len(page)
+
+        if collection.count() != len(restored):
+            stale = []
+            for offset in range(0, collection.count(), page_size):
+                ids = collection.get(limit=page_size, offset=offset, include=[])["ids"]
+                stale.extend(chunk_id for chunk_id in ids if chunk_id not in restored)
+            for batch in _batched(stale, self.write_batch_size):
+                collection.delete(ids=batch)
+                lexical.delete(ids=batch)
+        lexical.ensure_synced(collection)
+
+        print(f"📥 Index restored: {index_name} ({rows} rows) from {backup_dir}")
+        return index_name
 
-        backup_file = Path(backup_path)
-        if not backup_file.exists():
-            raise FileNotFoundError(f"Backup file not found: {backup_path}")
+    async def _restore_legacy_json(self, backup_file: Path) -> str:
+        """Re-embed a pre-binary JSON backup, which stored no vectors"""
 
         with open(backup_file) as f:
             backup_data = json.load(f)
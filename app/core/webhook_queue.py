@@ -0,0 +1,425 @@
+"""
+Webhook Ingestion Queue
+Durable queue for inbound webhook events, so endpoints can acknowledge as
+soon as an event is stored and side effects run in background workers.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+DEAD = "dead"
+
+DEFAULT_QUEUE_PATH = "data/webhooks.db"
+
+
+@dataclass
+class WebhookEvent:
+    seq: int
+    source: str
+    event_id: str
+    event_type: str
+    ordering_key: str
+    payload: dict[str, Any]
+    attempts: int = 0
+    steps: set[str] = field(default_factory=set)  # side effects already done
+
+
+class WebhookQueue:
+    """
+    SQLite-backed webhook event queue with per-key ordering.
+
+    Features:
+    - ``push`` is a single insert keyed on (source, event_id), so redelivered
+      events are detected and dropped at ingestion
+    - Events sharing an ordering key (e.g. a Stripe customer) are handed out
+      one at a time in arrival order; a retrying event holds back the ones
+      behind it until it succeeds or is dead-lettered
+    - Retries back off exponentially; events that exhaust ``max_attempts``
+      are marked dead and kept for inspection
+    - Handlers checkpoint side effects with ``run_step``, so a retry skips
+      the steps that already succeeded (no duplicate emails or sheet rows)
+    - On startup, pending events (including any that were in flight when
+      the process died) are rescheduled
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = ":memory:",
+        max_attempts: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = str(db_path)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._keys: dict[str, deque[int]] = {}  # ordering key -> pending seqs
+        self._due: dict[int, float] = {}
+        self._ready: list[tuple[float, int, str]] = []  # heads of idle keys
+        self._busy: set[str] = set()
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                ordering_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                steps TEXT NOT NULL DEFAULT '[]',
+                next_attempt_at REAL NOT NULL,
+                received_at REAL NOT NULL,
+                last_error TEXT,
+                UNIQUE (source, event_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_webhook_events_status
+                ON webhook_events(status, seq);
+            """)
+        self._conn.commit()
+        self._restore()
+
+    def _restore(self) -> None:
+        rows = self._conn.execute(
+            "SELECT seq, ordering_key, next_attempt_at FROM webhook_events "
+            "WHERE status = ? ORDER BY seq",
+            (PENDING,),
+        ).fetchall()
+        for seq, key, due in rows:
+            self._schedule(seq, key, due)
+        if rows:
+            logger.info(f"Restored {len(rows)} pending webhook events")
+
+    def _schedule(self, seq: int, key: str, due: float) -> None:
+        self._due[seq] = due
+        pending = self._keys.setdefault(key, deque())
+        pending.append(seq)
+        if len(pending) == 1 and key not in self._busy:
+            heapq.heappush(self._ready, (due, seq, key))
+
+    def _release(self, key: str) -> None:
+        self._busy.discard(key)
+        pending = self._keys.get(key)
+        if pending:
+            head = pending[0]
+            heapq.heappush(self._ready, (self._due[head], head, key))
+        else:
+            self._keys.pop(key, None)
+
+    def push(
+        self,
+        source: str,
+        event_id: str,
+        event_type: str,
+        payload: dict[str, Any],
+        ordering_key: Optional[str] = None,
+    ) -> bool:
+        """Persist an event; returns False if it was already received"""
+        key = f"{source}:{ordering_key or event_id}"
+        now = self.clock()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO webhook_events (source, event_id, "
+                    "event_type, ordering_key, payload, status, next_attempt_at, "
+                    "received_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        event_id,
+                        event_type,
+                        key,
+                        json.dumps(payload, default=str),
+                        PENDING,
+                        now,
+                        now,
+                    ),
+                )
+            if cursor.rowcount == 0:
+                return False
+            self._schedule(cursor.lastrowid, key, now)
+            return True
+
+    def claim(self) -> Optional[WebhookEvent]:
+        """Take the next due event whose ordering key has none in flight"""
+        with self._lock:
+            if not self._ready or self._ready[0][0] > self.clock():
+                return None
+            _, seq, key = heapq.heappop(self._ready)
+            self._busy.add(key)
+            row = self._conn.execute(
+                "SELECT source, event_id, event_type, payload, attempts, steps "
+                "FROM webhook_events WHERE seq = ?",
+                (seq,),
+            ).fetchone()
+        source, event_id, event_type, payload, attempts, steps = row
+        return WebhookEvent(
+            seq,
+            source,
+            event_id,
+            event_type,
+            key,
+            json.loads(payload),
+            attempts,
+            set(json.loads(steps)),
+        )
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest scheduled event becomes due, if any"""
+        with self._lock:
+            return self._ready[0][0] if self._ready else None
+
+    def mark_step(self, event: WebhookEvent, step: str) -> None:
+        """Record that one side effect of ``event`` has been carried out"""
+        event.steps.add(step)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE webhook_events SET steps = ? WHERE seq = ?",
+                (json.dumps(sorted(event.steps)), event.seq),
+            )
+
+    def complete(self, event: WebhookEvent) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE webhook_events SET status = ?, attempts = ? "
+                    "WHERE seq = ?",
+                    (DONE, event.attempts + 1, event.seq),
+                )
+            self._finish(event)
+
+    def fail(self, event: WebhookEvent, error: str) -> bool:
+        """Record a failed attempt; returns True if the event will be retried"""
+        attempts = event.attempts + 1
+        retry = attempts < self.max_attempts
+        due = self.clock() + min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE webhook_events SET status = ?, attempts = ?, "
+                    "next_attempt_at = ?, last_error = ? WHERE seq = ?",
+                    (PENDING if retry else DEAD, attempts, due, error, event.seq),
+                )
+            if retry:
+                self._due[event.seq] = due
+                self._release(event.ordering_key)
+            else:
+                self._finish(event)
+        return retry
+
+    def requeue(self, event: WebhookEvent) -> None:
+        """Hand back a claimed event without using up an attempt, e.g. on shutdown"""
+        with self._lock:
+            self._release(event.ordering_key)
+
+    def _finish(self, event: WebhookEvent) -> None:
+        self._due.pop(event.seq, None)
+        self._keys[event.ordering_key].popleft()
+        self._release(event.ordering_key)
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished events received before ``older_than``"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM webhook_events WHERE status = ? AND received_at < ?",
+                (DONE, older_than),
+            ).rowcount
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM webhook_events GROUP BY status"
+                ).fetchall()
+            )
+            return {
+                "pending": counts.get(PENDING, 0),
+                "in_flight": len(self._busy),
+                "done": counts.get(DONE, 0),
+                "dead": counts.get(DEAD, 0),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+Handler = Callable[[WebhookEvent], Awaitable[Any]]
+
+_current: ContextVar[Optional[tuple[WebhookQueue, WebhookEvent]]] = ContextVar(
+    "webhook_event", default=None
+)
+
+
+async def run_step(name: str, func: Callable[..., Awaitable[Any]], *args, **kwargs):
+    """
+    Run one side effect of the webhook event being processed.
+
+    Inside a dispatcher worker the step is checkpointed once it returns, and
+    skipped (returning None) when the event is retried. Outside a worker it
+    simply runs ``func``.
+    """
+    current = _current.get()
+    if current is None:
+        return await func(*args, **kwargs)
+    queue, event = current
+    if name in event.steps:
+        return None
+    result = await func(*args, **kwargs)
+    queue.mark_step(event, name)
+    return result
+
+
+class WebhookDispatcher:
+    """
+    Worker pool that drains a ``WebhookQueue``.
+
+    Handlers are registered per source; a handler that raises is retried
+    with backoff by the queue. Workers sleep until an event is pushed or the
+    next retry is due.
+    """
+
+    def __init__(
+        self,
+        queue: WebhookQueue,
+        workers: int = 8,
+        retention: float = 30 * 86400,
+    ):
+        self.queue = queue
+        self.workers = workers
+        self.retention = retention
+        self.handlers: dict[str, Handler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_purge = 0.0
+
+    def register(self, source: str, handler: Handler) -> None:
+        self.handlers[source] = handler
+
+    def enqueue(
+        self,
+        source: str,
+        event_id: str,
+        event_type: str,
+        payload: dict[str, Any],
+        ordering_key: Optional[str] = None,
+    ) -> bool:
+        """Persist an event and wake a worker; False for duplicates"""
+        queued = self.queue.push(source, event_id, event_type, payload, ordering_key)
+        if queued and self._wakeup is not None:
+            self._wakeup.set()
+        return queued
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} webhook workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait until no events are pending or in flight"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self.queue.stats()
+            if not stats["pending"] and not stats["in_flight"]:
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Webhook queue not drained: {stats}")
+            await asyncio.sleep(0.01)
+
+    async def _worker(self) -> None:
+        while True:
+            # Clear before claiming so a push that lands in between still wakes us
+            self._wakeup.clear()
+            event = self.queue.claim()
+            if event is None:
+                await self._idle()
+                continue
+            await self._process(event)
+
+    async def _idle(self) -> None:
+        now = self.queue.clock()
+        if now - self._last_purge > 3600:
+            self._last_purge = now
+            purged = self.queue.purge(now - self.retention)
+            if purged:
+                logger.info(f"Purged {purged} processed webhook events")
+
+        due = self.queue.next_due()
+        timeout = 1.0 if due is None else min(max(due - now, 0.0), 1.0)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    async def _process(self, event: WebhookEvent) -> None:
+        handler = self.handlers.get(event.source)
+        token = _current.set((self.queue, event))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for {event.source}")
+            await handler(event)
+        except asyncio.CancelledError:
+            # Stopped mid-event (e.g. a deploy); not a failure of the event
+            self.queue.requeue(event)
+            raise
+        except Exception as e:
+            retry = self.queue.fail(event, f"{type(e).__name__}: {e}")
+            log = logger.warning if retry else logger.error
+            log(
+                f"Webhook {event.source}/{event.event_id} ({event.event_type}) "
+                f"failed on attempt {event.attempts + 1}"
+                f"{', will retry' if retry else ', dead-lettered'}: {e}"
+            )
+        else:
+            self.queue.complete(event)
+        finally:
+            _current.reset(token)
+
+
+_dispatcher: Optional[WebhookDispatcher] = None
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Get the process-wide dispatcher shared by the webhook endpoints"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = WebhookDispatcher(
+            WebhookQueue(os.getenv("WEBHOOK_QUEUE_PATH", DEFAULT_QUEUE_PATH)),
+            workers=int(os.getenv("WEBHOOK_WORKERS", "8")),
+        )
+    return _dispatcher
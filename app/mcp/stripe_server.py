@@ -15,6 +15,7 @@ from pydantic import BaseModel
 from app.config.logging import get_logger
 from app.core.cost_tracker import CostTracker
 from app.models.customer import Customer
+from app.services.stripe_gateway import get_stripe_gateway
 
 logger = get_logger(__name__)
 
@@ -95,6 +96,7 @@ class MCPStripeServer:
         """Initialize MCP Stripe server"""
         self.test_mode = test_mode
         self.cost_tracker = CostTracker()
+        self.gateway = get_stripe_gateway()
 
         if not test_mode:
             stripe.api_key = os.getenv("STRIPE_API_KEY")
@@ -162,7 +164,9 @@ class MCPStripeServer:
                     "metadata": {"tier": session_request.tier, "trial": "true"},
                 }
 
-            session = stripe.checkout.Session.create(**session_params)
+            session = await self.gateway.call(
+                stripe.checkout.Session.create, **session_params
+            )
 
             logger.info(
                 f"Created checkout session {session.id} for {session_request.customer_email}"
@@ -193,7 +197,8 @@ class MCPStripeServer:
                     "status": "created",
                 }
 
-            session = stripe.billing_portal.Session.create(
+            session = await self.gateway.call(
+                stripe.billing_portal.Session.create,
                 customer=customer_id,
                 return_url="https://saasgrowthdispatch.com/dashboard",
             )
@@ -452,8 +457,8 @@ class MCPStripeServer:
                     }
                 ]
 
-            subscriptions = stripe.Subscription.list(
-                customer=stripe_customer_id, status="all"
+            subscriptions = await self.gateway.call(
+                stripe.Subscription.list, customer=stripe_customer_id, status="all"
             )
 
             return [
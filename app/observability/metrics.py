@@ -39,6 +39,13 @@ llm_latency = Histogram(
     registry=registry,
 )
 
+llm_cache_lookups_total = Counter(
+    "llm_cache_lookups_total",
+    "LLM response cache lookups",
+    ["model", "result"],
+    registry=registry,
+)
+
 job_duration = Histogram(
     "job_duration_seconds",
     "Background job duration in seconds",
@@ -81,8 +88,8 @@ def setup_metrics_instrumentation(app):
 
     # Add custom metrics
     instrumentator.add(lambda: llm_calls_total).add(lambda: llm_cost_total).add(
-        lambda: job_duration
-    ).add(lambda: revenue_events)
+        lambda: llm_cache_lookups_total
+    ).add(lambda: job_duration).add(lambda: revenue_events)
 
     # Instrument the app
     instrumentator.instrument(app)
@@ -106,6 +113,13 @@ def track_llm_call(
         llm_latency.labels(agent_role=agent_role, model=model).observe(latency)
 
 
+def track_llm_cache_lookup(model: str, hit: bool):
+    """Track an LLM response cache hit or miss"""
+    result = "hit" if hit else "miss"
+
+    llm_cache_lookups_total.labels(model=model, result=result).inc()
+
+
 def track_job_completion(job_type: str, duration: float, success: bool = True):
     """Track background job completion"""
     status = "success" if success else "error"
@@ -3,11 +3,12 @@ Reddit Scraper - Searches Reddit for posts related to user pain points,
 summarizes key insights, and logs results into a Google Sheets spreadsheet.
 """
 
+import asyncio
 import json
 import logging
 import os
-import time
 from typing import Any
+from urllib.parse import urlparse
 
 import serpapi
 from bs4 import BeautifulSoup
@@ -17,6 +18,7 @@ from security import safe_requests
 
 from app.core.gemini_client import GeminiClient
 from app.core.llm_client import GPT4Client
+from app.core.politeness_scheduler import get_politeness_scheduler
 from app.core.utils.audit import safe_requests
 from app.utils.analytics import calculate_pain_point_metrics, format_enhanced_email_body
 from app.utils.query_rotation import get_daily_query
@@ -84,6 +86,7 @@ class RedditScraper:
         }
 
         try:
+            get_politeness_scheduler().acquire("serpapi.com")
             results = serpapi.search(search_params)
 
             reddit_posts = []
@@ -118,18 +121,50 @@ class RedditScraper:
 
         try:
             # Try Reddit API first for better comment extraction
-            from app.core.reddit_api import RedditClient
+            comments = self.fetch_post_comments(url)
+            top_3 = self.extract_pain_points(comments)
+            return self._build_post_data(url, comments, top_3)
 
-            client = RedditClient()
-            comments = client.fetch_comments(url, limit=10)
-            print(comments)
+        except Exception as e:
+            logger.error(
+                f"Error scraping Reddit post with API: {e}, falling back to web scraping"
+            )
+            return self.scrape_post_html(url)
+
+    def fetch_post_comments(self, url: str) -> list[str]:
+        """
+        Fetch the top comments of a Reddit post through the Reddit API.
+
+        Args:
+            url: URL of the Reddit post
+
+        Returns:
+            List of comment bodies
+        """
+        from app.core.reddit_api import RedditClient
 
-            # Initialize GPT client
-            llm = GPT4Client()
+        client = RedditClient()
+        comments = client.fetch_comments(url, limit=10)
+        print(comments)
+        return comments
 
-            # Compose summarization prompt
-            combined_comments = "\n\n".join(comments)
-            prompt = f"""
+    def extract_pain_points(self, comments: list[str]) -> list[dict[str, str]]:
+        """
+        Extract the top 3 pain points from Reddit comments with GPT-4,
+        falling back to Gemini.
+
+        Args:
+            comments: Comment bodies of a Reddit post
+
+        Returns:
+            List of pain point dictionaries (empty if both LLMs fail)
+        """
+        # Initialize GPT client
+        llm = GPT4Client()
+
+        # Compose summarization prompt
+        combined_comments = "\n\n".join(comments)
+        prompt = f"""
 You are an expert SaaS market researcher analyzing Reddit discussions to identify business pain points and opportunities.
 
 CONTEXT: Analyzing discussions about "{self.search_term}" to find actionable business insights.
@@ -169,104 +204,111 @@ Reddit Comments:
 \"\"\"
 """
 
-            # Try GPT-4 first
+        # Try GPT-4 first
+        try:
+            top_3 = llm.simple_json(prompt)
+            print("🔍 GPT-4 extracted top_3 pain points:")
+            print(json.dumps(top_3, indent=2))
+
+            # Validate GPT response
+            if not isinstance(top_3, list) or len(top_3) == 0:
+                raise ValueError("Invalid GPT response format")
+
+        except Exception as gpt_error:
+            print(f"⚠️ GPT-4 failed: {gpt_error}, trying Gemini...")
+
+            # Fallback to Gemini
             try:
-                top_3 = llm.simple_json(prompt)
-                print("🔍 GPT-4 extracted top_3 pain points:")
+                gemini = GeminiClient()
+                top_3 = gemini.summarize_reddit_thread(comments, self.search_term)
+                print("🔍 Gemini extracted top_3 pain points:")
                 print(json.dumps(top_3, indent=2))
 
-                # Validate GPT response
-                if not isinstance(top_3, list) or len(top_3) == 0:
-                    raise ValueError("Invalid GPT response format")
+                if not top_3:
+                    raise ValueError("No insights from Gemini")
+
+            except Exception as gemini_error:
+                print(f"⚠️ Gemini also failed: {gemini_error}")
+                top_3 = []
+
+        return top_3
+
+    def _build_post_data(
+        self, url: str, comments: list[str], top_3: list[dict[str, str]]
+    ) -> dict[str, Any]:
+        """Assemble the post dictionary returned by the API scraping path."""
+        # Get post title from URL or use a fallback
+        post_title = (
+            url.split("/")[-2].replace("_", " ").title() if "/" in url else "Reddit Post"
+        )
+
+        logger.info(
+            f"Extracted {len(top_3) if isinstance(top_3, list) else 'unknown'} pain points from {len(comments)} comments"
+        )
+
+        return {
+            "title": post_title,
+            "url": url,
+            "comments": comments,
+            "pain_point_summaries": top_3,
+        }
 
-            except Exception as gpt_error:
-                print(f"⚠️ GPT-4 failed: {gpt_error}, trying Gemini...")
+    def scrape_post_html(self, url: str) -> dict[str, Any]:
+        """
+        Scrape a Reddit post page directly when the Reddit API is unavailable.
 
-                # Fallback to Gemini
-                try:
-                    gemini = GeminiClient()
-                    top_3 = gemini.summarize_reddit_thread(comments, self.search_term)
-                    print("🔍 Gemini extracted top_3 pain points:")
-                    print(json.dumps(top_3, indent=2))
-
-                    if not top_3:
-                        raise ValueError("No insights from Gemini")
-
-                except Exception as gemini_error:
-                    print(f"⚠️ Gemini also failed: {gemini_error}")
-                    top_3 = []
-
-            # Get post title from URL or use a fallback
-            post_title = (
-                url.split("/")[-2].replace("_", " ").title()
-                if "/" in url
-                else "Reddit Post"
+        Args:
+            url: URL of the Reddit post
+
+        Returns:
+            Dictionary containing post title and comments (no pain point analysis)
+        """
+        headers = {
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/91.0.4472.124 Safari/537.36"
             )
+        }
+
+        try:
+            get_politeness_scheduler().acquire(url)
+            response = safe_requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
 
-            logger.info(
-                f"Extracted {len(top_3) if isinstance(top_3, list) else 'unknown'} pain points from {len(comments)} comments"
+            soup = BeautifulSoup(response.text, "html.parser")
+
+            # Extract post title
+            title_element = soup.find("h1")
+            title = title_element.text.strip() if title_element else "No title found"
+
+            # Extract post content and comments
+            comments = []
+            comment_elements = soup.find_all(
+                "div", class_=lambda c: c and "Comment" in c
             )
 
+            for comment in comment_elements[:10]:  # Limit to first 10 comments
+                comment_text = comment.get_text(strip=True)
+                if comment_text and len(comment_text) > 50:
+                    comments.append(comment_text)
+
             return {
-                "title": post_title,
+                "title": title,
                 "url": url,
                 "comments": comments,
-                "pain_point_summaries": top_3,
+                "pain_point_summaries": [],
             }
 
-        except Exception as e:
-            logger.error(
-                f"Error scraping Reddit post with API: {e}, falling back to web scraping"
-            )
-
-            # Fallback to web scraping if Reddit API fails
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/91.0.4472.124 Safari/537.36"
-                )
+        except Exception as fallback_error:
+            logger.error(f"Error with fallback scraping: {fallback_error}")
+            return {
+                "title": "Error",
+                "url": url,
+                "comments": [],
+                "pain_point_summaries": [],
             }
 
-            try:
-                response = safe_requests.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Extract post title
-                title_element = soup.find("h1")
-                title = (
-                    title_element.text.strip() if title_element else "No title found"
-                )
-
-                # Extract post content and comments
-                comments = []
-                comment_elements = soup.find_all(
-                    "div", class_=lambda c: c and "Comment" in c
-                )
-
-                for comment in comment_elements[:10]:  # Limit to first 10 comments
-                    comment_text = comment.get_text(strip=True)
-                    if comment_text and len(comment_text) > 50:
-                        comments.append(comment_text)
-
-                return {
-                    "title": title,
-                    "url": url,
-                    "comments": comments,
-                    "pain_point_summaries": [],
-                }
-
-            except Exception as fallback_error:
-                logger.error(f"Error with fallback scraping: {fallback_error}")
-                return {
-                    "title": "Error",
-                    "url": url,
-                    "comments": [],
-                    "pain_point_summaries": [],
-                }
-
     def summarize_pain_points(self, post_data: dict[str, Any]) -> str:
         """
         Use OpenAI to summarize pain points from a Reddit post.
@@ -321,16 +363,12 @@ Reddit Comments:
             List of dictionaries containing post data and summaries
         """
         results = []
-        all_pain_points = []  # Accumulate pain points from all posts
 
         # Step 1: Search for Reddit URLs
         reddit_posts = self.search_reddit_urls()
 
-        # Step 2: Scrape each Reddit post
+        # Step 2: Scrape each Reddit post (rate limited by the shared scheduler)
         for post in reddit_posts:
-            # Add a delay to avoid rate limiting
-            time.sleep(2)
-
             # Scrape the post
             post_data = self.scrape_reddit_post(post["url"])
 
@@ -342,7 +380,86 @@ Reddit Comments:
             # Add to results
             results.append({"post": post_data, "summary": summary})
 
-            # Accumulate pain points from this post
+        # Step 5: Log daily metrics with accumulated pain points from all posts
+        self._log_daily_metrics(results)
+
+        return results
+
+    async def arun(
+        self, concurrency: int = 5, per_host_limit: int = 2
+    ) -> list[dict[str, Any]]:
+        """
+        Run the Reddit scraper pipeline with overlapping, bounded-concurrency stages.
+
+        Each post moves through comment fetching, LLM pain point extraction and
+        summarization independently, so the slow network and LLM round trips of
+        different posts overlap instead of running back to back. The blocking
+        SerpAPI, praw and OpenAI clients are driven from worker threads, and
+        request rates per host are enforced by the shared politeness scheduler.
+
+        Args:
+            concurrency: Maximum number of posts in flight at any stage
+            per_host_limit: Maximum concurrent requests to the same host
+
+        Returns:
+            List of dictionaries containing post data and summaries, in the same
+            shape and order as ``run()``
+        """
+        reddit_posts = await asyncio.to_thread(self.search_reddit_urls)
+
+        stage_slots = asyncio.Semaphore(concurrency)
+        llm_slots = asyncio.Semaphore(concurrency)
+        host_slots: dict[str, asyncio.Semaphore] = {}
+
+        def host_slot(url: str) -> asyncio.Semaphore:
+            host = urlparse(url).netloc or "default"
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(per_host_limit)
+            return host_slots[host]
+
+        async def process(url: str) -> dict[str, Any]:
+            async with stage_slots:
+                logger.info(f"Scraping Reddit post: {url}")
+                try:
+                    async with host_slot(url):
+                        comments = await asyncio.to_thread(
+                            self.fetch_post_comments, url
+                        )
+                    async with llm_slots:
+                        top_3 = await asyncio.to_thread(
+                            self.extract_pain_points, comments
+                        )
+                    post_data = self._build_post_data(url, comments, top_3)
+                except Exception as e:
+                    logger.error(
+                        f"Error scraping Reddit post with API: {e}, falling back to web scraping"
+                    )
+                    async with host_slot(url):
+                        post_data = await asyncio.to_thread(self.scrape_post_html, url)
+
+            async with llm_slots:
+                summary = await asyncio.to_thread(self.summarize_pain_points, post_data)
+
+            return {"post": post_data, "summary": summary}
+
+        results = list(
+            await asyncio.gather(*(process(post["url"]) for post in reddit_posts))
+        )
+
+        await asyncio.to_thread(self._log_daily_metrics, results)
+
+        return results
+
+    def _log_daily_metrics(self, results: list[dict[str, Any]]) -> None:
+        """
+        Log daily metrics with the pain points accumulated from all posts.
+
+        Args:
+            results: Post data and summaries produced by ``run()`` or ``arun()``
+        """
+        all_pain_points = []  # Accumulate pain points from all posts
+        for result in results:
+            post_data = result["post"]
             if post_data.get("pain_point_summaries"):
                 summary_data = post_data["pain_point_summaries"]
                 if not isinstance(summary_data, list):
@@ -350,7 +467,6 @@ Reddit Comments:
                     continue
                 all_pain_points.extend(summary_data)
 
-        # Step 5: Log daily metrics with accumulated pain points from all posts
         try:
             from app.utils.top_insights import append_daily_metrics_row
 
@@ -383,8 +499,6 @@ Reddit Comments:
         except Exception as e:
             logger.error(f"Error logging daily metrics: {e}")
 
-        return results
-
 
 def main():
     """Main function to run the Reddit scraper."""
@@ -403,12 +517,21 @@ def main():
         default=5,
         help="Maximum number of Reddit posts to analyze",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Scrape posts concurrently with this many in flight (0 = serial run)",
+    )
 
     args = parser.parse_args()
 
     try:
         scraper = RedditScraper(args.search_term, args.max_results)
-        results = scraper.run()
+        if args.concurrency > 0:
+            results = asyncio.run(scraper.arun(concurrency=args.concurrency))
+        else:
+            results = scraper.run()
 
         # Print results
         print(f"\nAnalyzed {len(results)} Reddit posts about '{args.search_term}':")
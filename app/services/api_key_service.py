@@ -1,30 +1,83 @@
 """API Key management service."""
 
+import atexit
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import redis
 
 from app.config.logging import get_logger
+from app.core.rate_limiter import RateLimiter, RateLimitResult, limits_from_config
 from app.models.api_key import APIKey, APIKeyUsage
 from app.models.customer import Customer, Subscription
 
 logger = get_logger(__name__)
 
+API_KEY_TTL = timedelta(days=30)
+USAGE_RETENTION = timedelta(days=400)
+LAST_USED_KEY = "api_key_last_used"
+MAX_CACHED_KEYS = 10_000
+
 
 class RateLimitExceeded(Exception):
     """Exception raised when rate limit is exceeded."""
 
-    pass
+    def __init__(self, message: str, result: Optional[RateLimitResult] = None):
+        super().__init__(message)
+        self.result = result
 
 
 class APIKeyService:
-    """Service for managing API keys and rate limiting."""
-
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
+    """
+    Service for managing API keys and rate limiting.
+
+    Validation is served from a short-lived cache (unknown keys included),
+    and ``last_used`` timestamps and usage records are buffered in memory,
+    then written in one Redis pipeline once ``flush_size`` items are pending,
+    every ``flush_interval`` seconds from a background thread, and at
+    interpreter exit. ``last_used`` is stored per key and expires with it.
+
+    Usage is aggregated at write time into per-customer, per-month hashes of
+    request counts and costs keyed by day and endpoint, so monthly
+    statistics are exact and cost O(days x endpoints), however many requests
+    were made. Only the latest ``raw_event_limit`` raw records per customer
+    and month are kept (none when 0).
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        cache_ttl: float = 30.0,
+        negative_cache_ttl: float = 5.0,
+        flush_interval: float = 5.0,
+        flush_size: int = 500,
+        raw_event_limit: int = 1000,
+    ):
         """Initialize API key service."""
         self.redis = redis_client or self._init_redis()
+        self.rate_limiter = RateLimiter(self.redis)
         self.api_keys: dict[str, APIKey] = {}  # In-memory cache
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.raw_event_limit = raw_event_limit
+
+        self._lock = threading.RLock()
+        self._validated: dict[str, tuple[float, Optional[APIKey]]] = {}
+        self._last_used: dict[str, datetime] = {}
+        self._usage: list[tuple[APIKey, APIKeyUsage]] = []
+        self._last_flush = time.monotonic()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if self.redis and flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="api-key-flush", daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
 
     def _init_redis(self) -> redis.Redis:
         """Initialize Redis connection."""
@@ -55,13 +108,18 @@ class APIKeyService:
         """Store API key in Redis and memory."""
         # Store in memory
         self.api_keys[api_key.key] = api_key
+        with self._lock:
+            self._validated[api_key.key] = (
+                time.monotonic() + self.cache_ttl,
+                api_key,
+            )
 
         # Store in Redis with expiration
         if self.redis:
             key = f"api_key:{api_key.key}"
             self.redis.setex(
                 key,
-                timedelta(days=30),  # Refresh cache every 30 days
+                API_KEY_TTL,  # Refreshed on use by flush()
                 api_key.json(),
             )
 
@@ -84,9 +142,42 @@ class APIKeyService:
 
         return None
 
+    def _load_api_key(self, key: str) -> Optional[APIKey]:
+        """Read a key from Redis in one round trip, falling back to memory."""
+        if self.redis:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.get(f"api_key:{key}")
+                pipe.get(f"{LAST_USED_KEY}:{key}")
+                data, last_used = pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Failed to load API key from Redis: {e}")
+            else:
+                if data:
+                    api_key = APIKey.parse_raw(data)
+                    if last_used:
+                        api_key.last_used = datetime.fromisoformat(last_used)
+                    self.api_keys[key] = api_key
+                    return api_key
+
+        return self.api_keys.get(key)
+
     def validate_api_key(self, key: str) -> Optional[APIKey]:
         """Validate API key and return details if valid."""
-        api_key = self.get_api_key(key)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._validated.get(key)
+        if cached and cached[0] > now:
+            api_key = cached[1]
+        else:
+            api_key = self._load_api_key(key)
+            ttl = self.cache_ttl if api_key else self.negative_cache_ttl
+            with self._lock:
+                if len(self._validated) >= MAX_CACHED_KEYS:
+                    self._validated = {
+                        k: v for k, v in self._validated.items() if v[0] > now
+                    }
+                self._validated[key] = (now + ttl, api_key)
 
         if not api_key:
             return None
@@ -94,126 +185,178 @@ class APIKeyService:
         if not api_key.is_valid():
             return None
 
-        # Update last used
+        # Update last used; persisted by the next flush
         api_key.last_used = datetime.now()
-        self._store_api_key(api_key)
+        with self._lock:
+            self._last_used[key] = api_key.last_used
+            due = self._flush_due()
+        if due:
+            self.flush()
 
         return api_key
 
-    def check_rate_limit(self, api_key: APIKey, endpoint: str) -> bool:
-        """Check if request is within rate limits."""
-        if not self.redis:
-            # If no Redis, allow all requests (not recommended for production)
-            return True
-
-        limits = api_key.get_rate_limits()
-        now = datetime.now()
-
-        # Check per-minute limit
-        minute_key = f"rate_limit:{api_key.key}:minute:{now.strftime('%Y-%m-%d-%H-%M')}"
-        minute_count = self.redis.incr(minute_key)
-        self.redis.expire(minute_key, 60)
-
-        if minute_count > limits["requests_per_minute"]:
-            raise RateLimitExceeded(
-                f"Rate limit exceeded: {limits['requests_per_minute']} requests per minute"
-            )
-
-        # Check per-hour limit
-        hour_key = f"rate_limit:{api_key.key}:hour:{now.strftime('%Y-%m-%d-%H')}"
-        hour_count = self.redis.incr(hour_key)
-        self.redis.expire(hour_key, 3600)
-
-        if hour_count > limits["requests_per_hour"]:
-            raise RateLimitExceeded(
-                f"Rate limit exceeded: {limits['requests_per_hour']} requests per hour"
-            )
-
-        # Check per-day limit
-        day_key = f"rate_limit:{api_key.key}:day:{now.strftime('%Y-%m-%d')}"
-        day_count = self.redis.incr(day_key)
-        self.redis.expire(day_key, 86400)
-
-        if day_count > limits["requests_per_day"]:
-            raise RateLimitExceeded(
-                f"Rate limit exceeded: {limits['requests_per_day']} requests per day"
-            )
-
-        return True
+    def check_rate_limit(self, api_key: APIKey, endpoint: str) -> RateLimitResult:
+        """Check if request is within rate limits and consume one request."""
+        result = self.rate_limiter.hit(
+            api_key.key, limits_from_config(api_key.get_rate_limits())
+        )
+        if not result:
+            raise RateLimitExceeded(result.message(), result)
+        return result
 
     def track_usage(self, api_key: APIKey, usage: APIKeyUsage):
         """Track API usage for billing and analytics."""
-        # Store usage record
+        # Buffer usage record; written by the next flush
         if self.redis:
-            # Store in sorted set by timestamp
-            usage_key = (
-                f"usage:{api_key.customer_id}:{datetime.now().strftime('%Y-%m')}"
-            )
-            self.redis.zadd(usage_key, {usage.json(): usage.timestamp.timestamp()})
-
-            # Update monthly counters
-            month_key = (
-                f"usage_count:{api_key.customer_id}:{datetime.now().strftime('%Y-%m')}"
-            )
-            self.redis.incr(month_key)
-
-            # Update cost tracking
-            cost_key = (
-                f"usage_cost:{api_key.customer_id}:{datetime.now().strftime('%Y-%m')}"
-            )
-            self.redis.incrbyfloat(cost_key, usage.calculate_cost())
+            with self._lock:
+                self._usage.append((api_key, usage))
+                due = self._flush_due()
+            if due:
+                self.flush()
 
         logger.info(
             f"Tracked usage for {api_key.customer_id}: "
             f"{usage.endpoint} - {usage.status_code} - {usage.response_time_ms}ms"
         )
 
+    def _flush_due(self) -> bool:
+        return (
+            len(self._last_used) + len(self._usage) >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered last-used times and usage records in one pipeline."""
+        with self._lock:
+            last_used, self._last_used = self._last_used, {}
+            usage, self._usage = self._usage, []
+            self._last_flush = time.monotonic()
+        if not self.redis or not (last_used or usage):
+            return 0
+
+        pipe = self.redis.pipeline()
+        for key, ts in last_used.items():
+            pipe.set(f"{LAST_USED_KEY}:{key}", ts.isoformat(), ex=API_KEY_TTL)
+            pipe.expire(f"api_key:{key}", API_KEY_TTL)
+
+        records: dict[str, dict[str, float]] = {}
+        totals: dict[str, list] = {}  # customer/month -> [count, cost]
+        daily: dict[str, dict[str, list]] = {}  # customer/month -> day+endpoint
+        for api_key, record in usage:
+            month = record.timestamp.strftime("%Y-%m")
+            day = record.timestamp.strftime("%Y-%m-%d")
+            cost = record.calculate_cost()
+            customer_month = f"{api_key.customer_id}:{month}"
+            if self.raw_event_limit:
+                records.setdefault(f"usage:{customer_month}", {})[
+                    record.json()
+                ] = record.timestamp.timestamp()
+            total = totals.setdefault(customer_month, [0, 0.0])
+            total[0] += 1
+            total[1] += cost
+            endpoint = daily.setdefault(customer_month, {}).setdefault(
+                f"{day} {record.endpoint}", [0, 0.0]
+            )
+            endpoint[0] += 1
+            endpoint[1] += cost
+        for usage_key, mapping in records.items():
+            # Store recent raw records in sorted set by timestamp
+            pipe.zadd(usage_key, mapping)
+            pipe.zremrangebyrank(usage_key, 0, -self.raw_event_limit - 1)
+        for customer_month, (count, cost) in totals.items():
+            # Update monthly counters and cost tracking
+            pipe.incrby(f"usage_count:{customer_month}", count)
+            pipe.incrbyfloat(f"usage_cost:{customer_month}", cost)
+        for customer_month, fields in daily.items():
+            # Update per-day breakdown by endpoint
+            requests_key = f"usage_requests:{customer_month}"
+            costs_key = f"usage_costs:{customer_month}"
+            for field, (count, cost) in fields.items():
+                pipe.hincrby(requests_key, field, count)
+                pipe.hincrbyfloat(costs_key, field, cost)
+            pipe.expire(requests_key, USAGE_RETENTION)
+            pipe.expire(costs_key, USAGE_RETENTION)
+
+        # MULTI/EXEC: if execute() raises, the transaction was aborted or EXEC
+        # never reached Redis, so the batch is put back for the next flush (a
+        # connection lost while reading the EXEC reply is the one case that
+        # can still count a batch twice). Commands that
+        # Redis rejects inside EXEC (e.g. WRONGTYPE) fail on their own while
+        # the rest are applied; those are logged and dropped, since retrying
+        # the batch would count the applied ones twice.
+        try:
+            results = pipe.execute(raise_on_error=False)
+        except redis.RedisError as e:
+            with self._lock:
+                for key, ts in last_used.items():
+                    self._last_used.setdefault(key, ts)
+                self._usage = usage + self._usage
+            logger.error(f"Failed to flush API key usage: {e}")
+            return 0
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.error(
+                f"{len(errors)} of {len(results)} API key usage writes failed: "
+                f"{errors[0]}"
+            )
+        return len(last_used) + len(usage)
+
+    def close(self):
+        """Stop the background flusher and write what is still buffered."""
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        atexit.unregister(self.flush)
+        self.flush()
+
     def get_usage_stats(self, customer_id: str, period: str = "current_month") -> dict:
         """Get usage statistics for a customer."""
         if not self.redis:
             return {"requests": 0, "cost": 0.0, "by_endpoint": {}, "by_day": {}}
 
-        now = datetime.now()
-        month_key = now.strftime("%Y-%m")
-
-        # Get total requests
-        count_key = f"usage_count:{customer_id}:{month_key}"
-        total_requests = int(self.redis.get(count_key) or 0)
+        self.flush()
 
-        # Get total cost
-        cost_key = f"usage_cost:{customer_id}:{month_key}"
-        total_cost = float(self.redis.get(cost_key) or 0)
-
-        # Get detailed usage (last 100 records)
-        usage_key = f"usage:{customer_id}:{month_key}"
-        usage_records = self.redis.zrevrange(usage_key, 0, 99, withscores=True)
-
-        # Analyze by endpoint
+        now = datetime.now()
+        month_key = now.strftime("%Y-%m") if period == "current_month" else period
+        customer_month = f"{customer_id}:{month_key}"
+
+        # Monthly totals and the day/endpoint breakdown, in one round trip
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(f"usage_count:{customer_month}")
+        pipe.get(f"usage_cost:{customer_month}")
+        pipe.hgetall(f"usage_requests:{customer_month}")
+        pipe.hgetall(f"usage_costs:{customer_month}")
+        total_requests, total_cost, requests, costs = pipe.execute()
+
+        # Analyze by endpoint and by day
         by_endpoint = {}
         by_day = {}
 
-        for record, _score in usage_records:
-            usage = APIKeyUsage.parse_raw(record)
+        for field, count in requests.items():
+            day, endpoint = field.split(" ", 1)
+            count = int(count)
+            cost = float(costs.get(field, 0))
+            for stats in (
+                by_endpoint.setdefault(endpoint, {"count": 0, "cost": 0.0}),
+                by_day.setdefault(day, {"count": 0, "cost": 0.0}),
+            ):
+                stats["count"] += count
+                stats["cost"] += cost
 
-            # By endpoint
-            if usage.endpoint not in by_endpoint:
-                by_endpoint[usage.endpoint] = {"count": 0, "cost": 0}
-            by_endpoint[usage.endpoint]["count"] += 1
-            by_endpoint[usage.endpoint]["cost"] += usage.calculate_cost()
-
-            # By day
-            day = usage.timestamp.strftime("%Y-%m-%d")
-            if day not in by_day:
-                by_day[day] = {"count": 0, "cost": 0}
-            by_day[day]["count"] += 1
-            by_day[day]["cost"] += usage.calculate_cost()
+        for stats in (*by_endpoint.values(), *by_day.values()):
+            stats["cost"] = round(stats["cost"], 6)
 
         return {
             "period": month_key,
-            "total_requests": total_requests,
-            "total_cost": round(total_cost, 4),
+            "total_requests": int(total_requests or 0),
+            "total_cost": round(float(total_cost or 0), 4),
             "by_endpoint": by_endpoint,
-            "by_day": by_day,
+            "by_day": dict(sorted(by_day.items())),
         }
 
     def rotate_api_key(self, customer_id: str) -> Optional[APIKey]:
@@ -263,3 +406,14 @@ class APIKeyService:
                     keys.append(api_key)
 
         return keys
+
+
+_service: Optional[APIKeyService] = None
+
+
+def get_api_key_service() -> APIKeyService:
+    """Get the process-wide service shared by authentication and billing"""
+    global _service
+    if _service is None:
+        _service = APIKeyService()
+    return _service
@@ -20,6 +20,12 @@ from pydantic import BaseModel, Field
 from supabase import Client, create_client
 
 from app.config.logging import get_logger
+from app.core.rate_limiter import (
+    AsyncRateLimiter,
+    RateLimit,
+    RateLimitResult,
+    limits_from_config,
+)
 
 logger = get_logger(__name__)
 
@@ -62,6 +68,7 @@ class JWTAPIManager:
     def __init__(self):
         self.db_pool = None
         self.redis_client = None
+        self.rate_limiter = AsyncRateLimiter()
         self.jwt_secret = os.getenv("JWT_SECRET_KEY", "your-secret-key")
         self.jwt_algorithm = "HS256"
         self.jwt_expiration_hours = 24
@@ -112,6 +119,7 @@ class JWTAPIManager:
             self.redis_client = await aioredis.from_url(
                 os.getenv("REDIS_URL", "redis://localhost:6379"), decode_responses=True
             )
+            self.rate_limiter = AsyncRateLimiter(self.redis_client)
 
     async def create_api_key(
         self, user_id: str, request: APIKeyRequest
@@ -259,51 +267,18 @@ class JWTAPIManager:
             logger.error(f"API key authentication failed: {e}")
             raise HTTPException(status_code=401, detail="Authentication failed")
 
-    async def check_rate_limit(self, user_id: str, plan_id: str = "starter") -> bool:
-        """Check rate limiting for user"""
-
-        await self.init_services()
-
-        try:
-            limits = self.tier_limits.get(plan_id, self.tier_limits["starter"])
-            current_time = int(time.time())
-
-            # Check minute limit
-            minute_key = f"rate_limit:{user_id}:minute:{current_time // 60}"
-            minute_count = await self.redis_client.get(minute_key)
-
-            if minute_count and int(minute_count) >= limits.requests_per_minute:
-                return False
-
-            # Check hour limit
-            hour_key = f"rate_limit:{user_id}:hour:{current_time // 3600}"
-            hour_count = await self.redis_client.get(hour_key)
-
-            if hour_count and int(hour_count) >= limits.requests_per_hour:
-                return False
-
-            # Check day limit
-            day_key = f"rate_limit:{user_id}:day:{current_time // 86400}"
-            day_count = await self.redis_client.get(day_key)
-
-            if day_count and int(day_count) >= limits.requests_per_day:
-                return False
-
-            # Increment counters
-            pipe = self.redis_client.pipeline()
-            pipe.incr(minute_key)
-            pipe.expire(minute_key, 60)
-            pipe.incr(hour_key)
-            pipe.expire(hour_key, 3600)
-            pipe.incr(day_key)
-            pipe.expire(day_key, 86400)
-            await pipe.execute()
+    def rate_limits(self, plan_id: str) -> list[RateLimit]:
+        """Rate limit windows for a subscription tier"""
+        config = self.tier_limits.get(plan_id, self.tier_limits["starter"])
+        return limits_from_config(config.model_dump())
 
-            return True
+    async def check_rate_limit(
+        self, user_id: str, plan_id: str = "starter"
+    ) -> RateLimitResult:
+        """Check rate limiting for user; the result is falsy when rejected"""
 
-        except Exception as e:
-            logger.error(f"Rate limit check failed: {e}")
-            return True  # Allow on error
+        await self.init_services()
+        return await self.rate_limiter.hit(user_id, self.rate_limits(plan_id))
 
     async def generate_jwt_token(self, user_id: str, email: str, role: str) -> str:
         """Generate JWT token for user"""
@@ -401,7 +376,11 @@ async def verify_jwt_token(
     )
 
     if not rate_limit_ok:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+        raise HTTPException(
+            status_code=429,
+            detail=rate_limit_ok.message(),
+            headers=rate_limit_ok.headers(),
+        )
 
     return user_info
 
@@ -424,7 +403,11 @@ async def verify_api_key(
     )
 
     if not rate_limit_ok:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+        raise HTTPException(
+            status_code=429,
+            detail=rate_limit_ok.message(),
+            headers=rate_limit_ok.headers(),
+        )
 
     return user_info
 
@@ -482,30 +465,14 @@ async def rate_limit_status_endpoint(
     """Get current rate limit status"""
 
     plan_id = user_info.get("plan_id", "starter")
-    limits = jwt_manager.tier_limits.get(plan_id)
+    limits = jwt_manager.tier_limits.get(plan_id, jwt_manager.tier_limits["starter"])
 
-    # Get current usage from Redis
+    # Read current quota without consuming any
     await jwt_manager.init_services()
-    current_time = int(time.time())
-
-    minute_count = (
-        await jwt_manager.redis_client.get(
-            f"rate_limit:{user_info['user_id']}:minute:{current_time // 60}"
-        )
-        or 0
-    )
-    hour_count = (
-        await jwt_manager.redis_client.get(
-            f"rate_limit:{user_info['user_id']}:hour:{current_time // 3600}"
-        )
-        or 0
-    )
-    day_count = (
-        await jwt_manager.redis_client.get(
-            f"rate_limit:{user_info['user_id']}:day:{current_time // 86400}"
-        )
-        or 0
+    quota = await jwt_manager.rate_limiter.peek(
+        user_info["user_id"], jwt_manager.rate_limits(plan_id)
     )
+    windows = {window.name: window for window in quota.windows}
 
     return JSONResponse(
         content={
@@ -517,14 +484,13 @@ async def rate_limit_status_endpoint(
                 "requests_per_day": limits.requests_per_day,
             },
             "current_usage": {
-                "minute": int(minute_count),
-                "hour": int(hour_count),
-                "day": int(day_count),
+                name: window.limit - window.remaining
+                for name, window in windows.items()
             },
-            "remaining": {
-                "minute": max(0, limits.requests_per_minute - int(minute_count)),
-                "hour": max(0, limits.requests_per_hour - int(hour_count)),
-                "day": max(0, limits.requests_per_day - int(day_count)),
+            "remaining": {name: window.remaining for name, window in windows.items()},
+            "reset_seconds": {
+                name: round(window.reset_after, 3) for name, window in windows.items()
             },
-        }
+        },
+        headers=quota.headers(),
     )
@@ -15,7 +15,7 @@ from app.config.logging import get_logger
 from app.config.settings import settings
 from app.core.cost_tracker import CostTracker
 from app.models.customer import Customer, Subscription
-from app.services.api_key_service import APIKeyService
+from app.services.api_key_service import get_api_key_service
 
 logger = get_logger(__name__)
 
@@ -97,7 +97,7 @@ class PaymentService:
         self.test_mode = test_mode
         self.live_mode = settings.stripe_live_mode and not test_mode
         self.cost_tracker = CostTracker()
-        self.api_key_service = APIKeyService()
+        self.api_key_service = get_api_key_service()
 
         if not test_mode:
             stripe.api_key = settings.stripe_api_key or os.getenv("STRIPE_API_KEY")
@@ -13,7 +13,7 @@ from pydantic import BaseModel
 
 from app.config.logging import get_logger
 from app.models.customer import Customer, Subscription
-from app.services.api_key_service import APIKeyService
+from app.services.api_key_service import get_api_key_service
 from app.services.payment_service import PaymentService
 
 logger = get_logger(__name__)
@@ -67,7 +67,7 @@ class StripeCheckoutService:
         """Initialize checkout service"""
         self.test_mode = test_mode
         self.payment_service = PaymentService(test_mode=test_mode)
-        self.api_key_service = APIKeyService()
+        self.api_key_service = get_api_key_service()
 
         if not test_mode:
             stripe.api_key = os.getenv("STRIPE_API_KEY")
@@ -18,6 +18,7 @@ from pydantic import BaseModel, Field
 from app.config.logging import get_logger
 from app.core.cfo_revenue_pipeline import get_cfo_revenue_pipeline
 from app.core.token_monitor import track_api_call
+from app.services.stripe_gateway import get_stripe_gateway
 
 logger = get_logger(__name__)
 
@@ -85,6 +86,7 @@ class StripeEnterpriseService:
 
     def __init__(self):
         self.cfo_pipeline = get_cfo_revenue_pipeline()
+        self.gateway = get_stripe_gateway()
         self.subscription_plans = self._initialize_enterprise_plans()
         self.webhook_endpoints = {
             "customer.subscription.created": self._handle_subscription_created,
@@ -238,7 +240,9 @@ class StripeEnterpriseService:
         """Create or retrieve Stripe customer with enterprise metadata"""
 
         # Check if customer already exists
-        existing_customers = stripe.Customer.list(email=email, limit=1)
+        existing_customers = await self.gateway.call(
+            stripe.Customer.list, email=email, limit=1
+        )
 
         if existing_customers.data:
             customer = existing_customers.data[0]
@@ -254,7 +258,8 @@ class StripeEnterpriseService:
             **metadata,
         }
 
-        customer = stripe.Customer.create(
+        customer = await self.gateway.call(
+            stripe.Customer.create,
             email=email,
             name=name,
             description=f"Enterprise customer from {company}",
@@ -303,7 +308,9 @@ class StripeEnterpriseService:
         if payment_method_id:
             subscription_params["default_payment_method"] = payment_method_id
 
-        subscription = stripe.Subscription.create(**subscription_params)
+        subscription = await self.gateway.call(
+            stripe.Subscription.create, **subscription_params
+        )
 
         return subscription
 
@@ -312,12 +319,24 @@ class StripeEnterpriseService:
     ) -> str:
         """Ensure Stripe price object exists for the plan"""
 
+        return await self.gateway.cached(
+            ("price", f"{plan_id}_{billing_cycle}", amount),
+            lambda: self._find_or_create_price(plan_id, amount, billing_cycle),
+        )
+
+    async def _find_or_create_price(
+        self, plan_id: str, amount: int, billing_cycle: str
+    ) -> str:
+        """Look up the plan's price by lookup key, creating it if missing"""
+
         interval = "year" if billing_cycle == "yearly" else "month"
         price_lookup_key = f"{plan_id}_{billing_cycle}"
 
         # Try to find existing price
         try:
-            prices = stripe.Price.list(lookup_keys=[price_lookup_key], limit=1)
+            prices = await self.gateway.call(
+                stripe.Price.list, lookup_keys=[price_lookup_key], limit=1
+            )
             if prices.data:
                 return prices.data[0].id
         except stripe.error.StripeError:
@@ -326,7 +345,8 @@ class StripeEnterpriseService:
         # Create new price
         product_id = await self._ensure_product_exists(plan_id)
 
-        price = stripe.Price.create(
+        price = await self.gateway.call(
+            stripe.Price.create,
             unit_amount=amount,
             currency="usd",
             recurring={"interval": interval},
@@ -340,18 +360,28 @@ class StripeEnterpriseService:
     async def _ensure_product_exists(self, plan_id: str) -> str:
         """Ensure Stripe product exists for the plan"""
 
+        return await self.gateway.cached(
+            ("product", plan_id), lambda: self._find_or_create_product(plan_id)
+        )
+
+    async def _find_or_create_product(self, plan_id: str) -> str:
+        """Look up the plan's product by metadata, creating it if missing"""
+
         plan = self.subscription_plans[plan_id]
 
         # Try to find existing product
         try:
-            products = stripe.Product.list(metadata={"plan_id": plan_id}, limit=1)
+            products = await self.gateway.call(
+                stripe.Product.list, metadata={"plan_id": plan_id}, limit=1
+            )
             if products.data:
                 return products.data[0].id
         except stripe.error.StripeError:
             pass
 
         # Create new product
-        product = stripe.Product.create(
+        product = await self.gateway.call(
+            stripe.Product.create,
             name=f"Enterprise {plan.name} Plan",
             description=f"Enterprise automation platform - {plan.name} tier",
             metadata={"plan_id": plan_id, "features": json.dumps(plan.features)},
@@ -697,7 +727,7 @@ async def get_revenue_analytics_endpoint() -> JSONResponse:
     """Get revenue analytics for CFO reporting"""
 
     service = get_stripe_enterprise_service()
-    analytics = service.get_revenue_analytics()
+    analytics = await service.gateway.call(service.get_revenue_analytics)
 
     return JSONResponse(content=analytics)
 
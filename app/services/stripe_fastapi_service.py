@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field
 from supabase import Client, create_client
 
 from app.config.logging import get_logger
+from app.services.stripe_gateway import get_stripe_gateway
 
 logger = get_logger(__name__)
 
@@ -56,6 +57,7 @@ class StripeSupabaseService:
 
     def __init__(self):
         self.db_pool = None
+        self.gateway = get_stripe_gateway()
         self.subscription_plans = {
             "starter": {
                 "price_monthly": 9900,
@@ -138,11 +140,12 @@ class StripeSupabaseService:
         """Create Stripe customer with enterprise metadata"""
 
         # Check for existing customer
-        existing = stripe.Customer.list(email=email, limit=1)
+        existing = await self.gateway.call(stripe.Customer.list, email=email, limit=1)
         if existing.data:
             return existing.data[0]
 
-        return stripe.Customer.create(
+        return await self.gateway.call(
+            stripe.Customer.create,
             email=email,
             name=name,
             description=f"Enterprise customer: {company}",
@@ -168,7 +171,8 @@ class StripeSupabaseService:
 
         trial_end = int((datetime.now() + timedelta(days=trial_days)).timestamp())
 
-        return stripe.Subscription.create(
+        return await self.gateway.call(
+            stripe.Subscription.create,
             customer=customer_id,
             items=[{"price": price_id}],
             trial_end=trial_end,
@@ -186,8 +190,18 @@ class StripeSupabaseService:
     async def _ensure_price_exists(self, plan_id: str, amount: int) -> str:
         """Ensure Stripe price exists for plan"""
 
+        return await self.gateway.cached(
+            ("price", f"{plan_id}_monthly", amount),
+            lambda: self._find_or_create_price(plan_id, amount),
+        )
+
+    async def _find_or_create_price(self, plan_id: str, amount: int) -> str:
+        """Look up the plan's monthly price, creating it if missing"""
+
         try:
-            prices = stripe.Price.list(lookup_keys=[f"{plan_id}_monthly"], limit=1)
+            prices = await self.gateway.call(
+                stripe.Price.list, lookup_keys=[f"{plan_id}_monthly"], limit=1
+            )
             if prices.data:
                 return prices.data[0].id
         except (stripe.error.StripeError, Exception) as e:
@@ -195,14 +209,16 @@ class StripeSupabaseService:
             # Continue to create a new price if lookup fails
 
         # Create product first
-        product = stripe.Product.create(
+        product = await self.gateway.call(
+            stripe.Product.create,
             name=f"Enterprise {plan_id.title()} Plan",
             description=f"Enterprise automation platform - {plan_id} tier",
             metadata={"plan_id": plan_id},
         )
 
         # Create price
-        price = stripe.Price.create(
+        price = await self.gateway.call(
+            stripe.Price.create,
             unit_amount=amount,
             currency="usd",
             recurring={"interval": "month"},
@@ -0,0 +1,93 @@
+"""
+Stripe Gateway
+Runs blocking Stripe SDK calls off the event loop for the async Stripe
+services, and memoizes catalog lookups such as plan prices and products.
+"""
+
+import asyncio
+import functools
+import os
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, TypeVar
+
+from app.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class StripeGateway:
+    """
+    Async front for the synchronous Stripe SDK.
+
+    Features:
+    - ``call`` runs an SDK function on a bounded thread pool, so a Stripe
+      round trip never blocks the event loop and at most ``max_workers``
+      requests are in flight at once
+    - ``cached`` memoizes lookups for the life of the process; concurrent
+      misses for the same key share one in-flight lookup, and failures are
+      not cached
+    """
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="stripe"
+        )
+        self._cache: dict[Hashable, Any] = {}
+        self._pending: dict[Hashable, asyncio.Future] = {}
+
+    async def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` on the gateway's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def cached(self, key: Hashable, lookup: Callable[[], Awaitable[T]]) -> T:
+        """Return the memoized value for ``key``, running ``lookup`` once"""
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            value = await lookup()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            self._cache[key] = value
+            future.set_result(value)
+            return value
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_gateway: Optional[StripeGateway] = None
+
+
+def get_stripe_gateway() -> StripeGateway:
+    """Get the process-wide gateway shared by the Stripe services"""
+    global _gateway
+    if _gateway is None:
+        _gateway = StripeGateway(int(os.getenv("STRIPE_MAX_WORKERS", "16")))
+    return _gateway
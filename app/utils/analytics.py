@@ -8,6 +8,11 @@ from datetime import datetime
 from functools import wraps
 from typing import Any
 
+from app.utils.keyword_classifier import (
+    COMPLAINT_INTENSITY,
+    PAIN_POINT_LABEL_CATEGORIES,
+)
+
 
 def performance_monitor(func: Callable) -> Callable:
     """
@@ -79,45 +84,17 @@ def calculate_pain_point_metrics(results: list[dict[str, Any]]) -> dict[str, Any
                     label = pain_point["pain_point_label"].lower()
 
                     # Categorize pain points
-                    if any(
-                        word in label for word in ["ai", "automation", "artificial"]
-                    ):
-                        category = "AI & Automation"
-                    elif any(
-                        word in label
-                        for word in ["cost", "price", "expensive", "budget"]
-                    ):
-                        category = "Cost & Pricing"
-                    elif any(
-                        word in label for word in ["integration", "api", "connect"]
-                    ):
-                        category = "Integration Issues"
-                    elif any(word in label for word in ["support", "help", "customer"]):
-                        category = "Support & Service"
-                    elif any(
-                        word in label for word in ["usability", "complex", "difficult"]
-                    ):
-                        category = "Usability Issues"
-                    else:
-                        category = "Other"
+                    category = PAIN_POINT_LABEL_CATEGORIES.classify(label)
 
                     pain_point_categories[category] = (
                         pain_point_categories.get(category, 0) + 1
                     )
 
                     # Simple sentiment analysis based on keywords
-                    explanation = pain_point.get("explanation", "").lower()
-                    if any(
-                        word in explanation
-                        for word in ["terrible", "awful", "hate", "frustrated"]
-                    ):
-                        sentiment_scores["high"] += 1
-                    elif any(
-                        word in explanation for word in ["annoying", "problem", "issue"]
-                    ):
-                        sentiment_scores["medium"] += 1
-                    else:
-                        sentiment_scores["low"] += 1
+                    intensity = COMPLAINT_INTENSITY.classify(
+                        pain_point.get("explanation", "")
+                    )
+                    sentiment_scores[intensity] += 1
 
     return {
         "scraping_metrics": {
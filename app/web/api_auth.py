@@ -3,12 +3,16 @@
 import time
 from typing import Optional
 
-from fastapi import HTTPException, Request, status
+from fastapi import HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.config.logging import get_logger
 from app.models.api_key import APIKeyUsage
-from app.services.api_key_service import APIKeyService, RateLimitExceeded
+from app.services.api_key_service import (
+    APIKeyService,
+    RateLimitExceeded,
+    get_api_key_service,
+)
 
 logger = get_logger(__name__)
 
@@ -16,11 +20,15 @@ logger = get_logger(__name__)
 class APIKeyAuth(HTTPBearer):
     """API key authentication handler."""
 
-    def __init__(self, auto_error: bool = True):
+    def __init__(
+        self, auto_error: bool = True, api_key_service: Optional[APIKeyService] = None
+    ):
         super().__init__(auto_error=auto_error)
-        self.api_key_service = APIKeyService()
+        self.api_key_service = api_key_service or get_api_key_service()
 
-    async def __call__(self, request: Request) -> Optional[str]:
+    async def __call__(
+        self, request: Request, response: Response = None
+    ) -> Optional[str]:
         """Validate API key from request."""
         # Try to get API key from header
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
@@ -52,14 +60,25 @@ class APIKeyAuth(HTTPBearer):
 
         # Check rate limits
         try:
-            self.api_key_service.check_rate_limit(api_key_obj, str(request.url.path))
+            rate_limit = self.api_key_service.check_rate_limit(
+                api_key_obj, str(request.url.path)
+            )
         except RateLimitExceeded as e:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=str(e),
-                headers={"Retry-After": "60"},  # Retry after 60 seconds
+                headers=(
+                    e.result.headers()
+                    if e.result is not None
+                    else {"Retry-After": "60"}
+                ),
             )
 
+        # Report remaining quota on successful responses
+        request.state.rate_limit = rate_limit
+        if response is not None:
+            response.headers.update(rate_limit.headers())
+
         # Store API key info in request state for later use
         request.state.api_key = api_key_obj
         request.state.start_time = time.time()
@@ -92,5 +111,4 @@ async def track_api_usage(request: Request, response):
             usage.tokens_used = response.tokens_used
 
         # Track usage
-        api_key_service = APIKeyService()
-        api_key_service.track_usage(api_key, usage)
+        get_api_key_service().track_usage(api_key, usage)
@@ -208,9 +208,9 @@ async def get_usage_stats(api_key: str = Depends(api_key_auth)):
             api_key_obj = request.state.api_key
 
             # Get usage stats
-            from app.services.api_key_service import APIKeyService
+            from app.services.api_key_service import get_api_key_service
 
-            api_key_service = APIKeyService()
+            api_key_service = get_api_key_service()
 
             stats = api_key_service.get_usage_stats(api_key_obj.customer_id)
 
@@ -1,5 +1,6 @@
 """FastAPI web application for SaaS Market Intelligence Platform."""
 
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, Optional
 
@@ -10,16 +11,35 @@ from pydantic import BaseModel
 
 from app.api.auth import router as auth_router
 from app.api.batch_endpoints import router as batch_router
+from app.api.stripe_webhooks import process_stripe_event
 from app.api.stripe_webhooks import router as stripe_router
 from app.core.cost_tracker import CostTracker, RevenueEvent
+from app.core.http_client import close_http_clients, get_http_client_registry
+from app.core.webhook_queue import get_webhook_dispatcher
+from app.services.api_key_service import get_api_key_service
 from app.services.payment_service import PaymentService
 from app.web.customer_dashboard import router as dashboard_router
 from app.web.stripe_funnel import router as funnel_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open HTTP clients and webhook workers; close them and flush usage on shutdown"""
+    get_http_client_registry().get("llm")
+    webhooks = get_webhook_dispatcher()
+    webhooks.register("stripe", process_stripe_event)
+    await webhooks.start()
+    yield
+    await webhooks.stop()
+    await close_http_clients()
+    get_api_key_service().flush()
+
+
 app = FastAPI(
     title="SaaS Market Intelligence Platform",
     description="AI-powered agentic RAG system for market intelligence",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -10,7 +10,7 @@ from fastapi.security import HTTPBearer
 from fastapi.templating import Jinja2Templates
 
 from app.config.logging import get_logger
-from app.services.api_key_service import APIKeyService
+from app.services.api_key_service import get_api_key_service
 from app.services.stripe_checkout_service import StripeCheckoutService
 
 logger = get_logger(__name__)
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/dashboard", tags=["customer-dashboard"])
 templates = Jinja2Templates(directory="app/data/templates")
 
 # Initialize services
-api_key_service = APIKeyService()
+api_key_service = get_api_key_service()
 stripe_service = StripeCheckoutService()
 security = HTTPBearer()
 
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Load test: Redis traffic and latency of API key authentication
+
+Replays N authenticated requests over a pool of API keys through the same
+steps as APIKeyAuth and track_api_usage (validate, rate-limit check, track
+usage) and counts Redis round trips and writes per request; pipelined
+commands count as writes but share one round trip. For comparison it
+replays the legacy path, which re-stored the key on every validation and
+opened a new service (and connection) to record each request's usage. Uses
+fakeredis, so latencies exclude network time; the round-trip counts are
+what a networked Redis would see.
+
+Usage:
+    python scripts/benchmark_api_auth.py --requests 20000 --keys 200
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import fakeredis
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limiter import limits_from_config  # noqa: E402
+from app.models.api_key import APIKey, APIKeyUsage  # noqa: E402
+from app.services.api_key_service import APIKeyService  # noqa: E402
+
+WRITES = {
+    "set",
+    "setex",
+    "hset",
+    "expire",
+    "zadd",
+    "incr",
+    "incrby",
+    "incrbyfloat",
+}
+
+
+RATE_LIMIT_PREFIX = "legacy_rate_limit:"
+
+
+class CountingRedis:
+    """Proxy that counts round trips, writes and rate-limit calls"""
+
+    def __init__(self, client):
+        self.client = client
+        self.reset()
+
+    def reset(self) -> None:
+        self.round_trips = 0
+        self.writes = 0
+        self.rate_limit_calls = 0
+
+    def _count(self, name: str, args: tuple = (), pipelined: bool = False) -> None:
+        if name == "evalsha" or (args and str(args[0]).startswith(RATE_LIMIT_PREFIX)):
+            self.rate_limit_calls += 1
+        elif name in WRITES:
+            self.writes += 1
+        if not pipelined:
+            self.round_trips += 1
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._count(name, args)
+            return attr(*args, **kwargs)
+
+        return call
+
+    def register_script(self, script):
+        registered = self.client.register_script(script)
+
+        def call(*args, **kwargs):
+            self._count("evalsha")
+            return registered(*args, **kwargs)
+
+        return call
+
+    def pipeline(self, *args, **kwargs):
+        return CountingPipeline(self, self.client.pipeline(*args, **kwargs))
+
+
+class CountingPipeline:
+    def __init__(self, counter: CountingRedis, pipe):
+        self.counter = counter
+        self.pipe = pipe
+
+    def __getattr__(self, name):
+        attr = getattr(self.pipe, name)
+
+        def call(*args, **kwargs):
+            self.counter._count(name, args, pipelined=name != "execute")
+            return attr(*args, **kwargs)
+
+        return call
+
+
+def make_usage(api_key: APIKey, i: int) -> APIKeyUsage:
+    return APIKeyUsage(
+        api_key=api_key.key,
+        customer_id=api_key.customer_id,
+        endpoint=f"/api/v1/endpoint_{i % 5}",
+        status_code=200,
+        response_time_ms=10.0,
+    )
+
+
+def run_current(client: CountingRedis, keys: list[APIKey], requests: int) -> list:
+    service = APIKeyService(client)
+    for api_key in keys:
+        service._store_api_key(api_key)
+    service._validated.clear()
+    client.reset()
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        api_key = service.validate_api_key(keys[i % len(keys)].key)
+        service.check_rate_limit(api_key, "/api/v1/endpoint")
+        service.track_usage(api_key, make_usage(api_key, i))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    service.flush()
+    return latencies
+
+
+def run_legacy(client: CountingRedis, keys: list[APIKey], requests: int) -> list:
+    """Validate, rate-limit and track usage as before the caches"""
+    cache = {api_key.key: api_key for api_key in keys}
+    client.reset()
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        now = datetime.now()
+        api_key = cache[keys[i % len(keys)].key]
+
+        # validate_api_key: re-store the key to update last_used
+        api_key.last_used = now
+        client.setex(f"api_key:{api_key.key}", timedelta(days=30), api_key.json())
+        client.set(f"customer_api_key:{api_key.customer_id}", api_key.key)
+
+        # check_rate_limit: INCR + EXPIRE per window
+        limits = api_key.get_rate_limits()
+        for name, fmt, ttl in (
+            ("minute", "%Y-%m-%d-%H-%M", 60),
+            ("hour", "%Y-%m-%d-%H", 3600),
+            ("day", "%Y-%m-%d", 86400),
+        ):
+            key = f"{RATE_LIMIT_PREFIX}{api_key.key}:{name}:{now.strftime(fmt)}"
+            client.incr(key)
+            client.expire(key, ttl)
+            assert limits[f"requests_per_{name}"]
+
+        # track_api_usage: new service, connection check, three writes
+        client.ping()
+        usage = make_usage(api_key, i)
+        month = now.strftime("%Y-%m")
+        client.zadd(
+            f"usage:{api_key.customer_id}:{month}",
+            {usage.json(): usage.timestamp.timestamp()},
+        )
+        client.incr(f"usage_count:{api_key.customer_id}:{month}")
+        client.incrbyfloat(
+            f"usage_cost:{api_key.customer_id}:{month}", usage.calculate_cost()
+        )
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(name: str, client: CountingRedis, latencies: list, requests: int):
+    latencies.sort()
+    print(f"{name}:")
+    print(
+        f"  p50 {latencies[len(latencies) // 2]:8.1f} us"
+        f"   p99 {latencies[int(len(latencies) * 0.99)]:8.1f} us"
+    )
+    print(f"  round trips per request:        {client.round_trips / requests:6.3f}")
+    print(f"  key/usage writes per request:   {client.writes / requests:6.3f}")
+    print(
+        f"  rate-limit calls per request:   {client.rate_limit_calls / requests:6.3f}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=200)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+    logging.getLogger("app.services.api_key_service").setLevel(logging.WARNING)
+
+    keys = [
+        APIKey(customer_id=f"cus_{i}", subscription_id=f"sub_{i}", tier="enterprise")
+        for i in range(args.keys)
+    ]
+    # Keep the benchmark under the enterprise per-minute limit
+    assert (
+        args.requests / args.keys
+        <= limits_from_config(keys[0].get_rate_limits())[0].limit
+    )
+
+    print(f"{args.requests:,} requests over {args.keys} API keys (fakeredis)")
+    client = CountingRedis(fakeredis.FakeRedis(decode_responses=True))
+    latencies = run_current(client, keys, args.requests)
+    report("cached validation, batched writes", client, latencies, args.requests)
+
+    client = CountingRedis(fakeredis.FakeRedis(decode_responses=True))
+    latencies = run_legacy(client, keys, args.requests)
+    report("legacy", client, latencies, args.requests)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
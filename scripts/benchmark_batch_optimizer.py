@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BatchAPIOptimizer throughput and latency under varying arrival rates
+
+Calls arrive as a Poisson process and are dispatched through the local
+FakeAdapter, whose cost per batch is a fixed round trip plus a small per-call
+term. Compares micro-batching against dispatching every call on its own.
+
+Usage:
+    python scripts/benchmark_batch_optimizer.py --calls 2000 --rates 50 200 1000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.batch_api_optimizer import (  # noqa: E402
+    APICall,
+    BatchAPIOptimizer,
+    FakeAdapter,
+)
+
+
+async def run_load(
+    optimizer: BatchAPIOptimizer, calls: int, rate: float, seed: int
+) -> tuple[float, list[float]]:
+    """Submit calls at the given mean rate; return wall time and per-call latency"""
+    rng = random.Random(seed)
+    latencies: list[float] = []
+
+    async def submit(i: int) -> None:
+        start = time.perf_counter()
+        await optimizer.submit(
+            APICall(
+                endpoint="fake/chat/completions",
+                method="POST",
+                payload={"messages": [{"role": "user", "content": f"prompt {i}"}]},
+            )
+        )
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(calls):
+        tasks.append(asyncio.create_task(submit(i)))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started, latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--rates", type=float, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-timeout", type=float, default=0.1)
+    parser.add_argument("--batch-latency", type=float, default=0.08)
+    parser.add_argument("--per-call-latency", type=float, default=0.0005)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    header = f"{'rate/s':>8} {'mode':>10} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batches':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for rate in args.rates:
+        for mode, batch_size in (("batched", args.batch_size), ("unbatched", 1)):
+            adapter = FakeAdapter(args.batch_latency, args.per_call_latency)
+            optimizer = BatchAPIOptimizer(
+                max_batch_size=batch_size,
+                batch_timeout=args.batch_timeout,
+                adapters={"fake": adapter},
+            )
+            wall, latencies = asyncio.run(
+                run_load(optimizer, args.calls, rate, args.seed)
+            )
+            print(
+                f"{rate:>8.0f} {mode:>10} {args.calls / wall:>9.1f} "
+                f"{statistics.median(latencies) * 1000:>8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.1f} "
+                f"{len(adapter.batches):>8}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
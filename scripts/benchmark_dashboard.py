@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load test: /api/dashboard over a million revenue and cost events
+
+Bulk-loads N synthetic events spread over 60 days into the web app's
+CostTracker, then issues repeated GET /api/dashboard requests through the
+FastAPI test client and reports latency percentiles. The first request
+includes building the in-memory time index. For comparison it also times
+the legacy metric path, which scanned the full event lists once per metric.
+
+Usage:
+    python scripts/benchmark_dashboard.py --events 1000000 --requests 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.web.app import app, cost_tracker  # noqa: E402
+
+SERVICES = ["claude_api", "openai", "gemini_api", "serpapi", "anthropic"]
+TIERS = ["basic", "pro", "enterprise"]
+WINDOW = 60 * 24 * 3600
+
+
+def make_events(count: int, seed: int) -> tuple[list[tuple], list[tuple]]:
+    rng = random.Random(seed)
+    now = time.time()
+    revenue, costs = [], []
+    for i in range(count):
+        ts = now - rng.random() * WINDOW
+        timestamp = datetime.fromtimestamp(ts).isoformat()
+        if i % 2:
+            tier = rng.choice(TIERS)
+            amount = rng.choice([29.0, 99.0, 299.0])
+            record = {
+                "customer_id": f"customer_{i}",
+                "amount": amount,
+                "tier": tier,
+                "event_type": "subscription",
+                "timestamp": timestamp,
+            }
+            revenue.append((ts, tier, amount, record))
+        else:
+            service = rng.choice(SERVICES)
+            cost = rng.random() * 0.05
+            record = {
+                "service": service,
+                "cost": cost,
+                "timestamp": timestamp,
+                "metadata": {},
+            }
+            costs.append((ts, service, cost, record))
+    return revenue, costs
+
+
+def legacy_metrics(revenue: list[tuple], costs: list[tuple]) -> float:
+    """One pass per metric over the full lists, as before the time index"""
+    now = datetime.now()
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    end_of_day = start_of_day + 86400
+    growth_start = (now - timedelta(days=30)).timestamp()
+    end = now.timestamp()
+
+    sum(a for ts, _, a, _ in revenue if start_of_day <= ts < end_of_day)
+    sum(c for ts, _, c, _ in costs if start_of_day <= ts < end_of_day)
+    sum(a for ts, _, a, _ in revenue if growth_start <= ts < growth_start + 86400)
+    sum(a for ts, _, a, _ in revenue if end - 86400 <= ts < end)
+    return sum(c for _, service, c, _ in costs if service in SERVICES)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    revenue, costs = make_events(args.events, args.seed)
+    start = time.perf_counter()
+    cost_tracker.store.append_many("revenue", revenue)
+    cost_tracker.store.append_many("cost", costs)
+    load_seconds = time.perf_counter() - start
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer test_token"}
+
+    start = time.perf_counter()
+    response = client.get("/api/dashboard", headers=headers)
+    first_ms = (time.perf_counter() - start) * 1000
+    response.raise_for_status()
+
+    latencies = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        client.get("/api/dashboard", headers=headers).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    legacy_times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        legacy_metrics(revenue, costs)
+        legacy_times.append((time.perf_counter() - start) * 1000)
+
+    print(f"events loaded: {args.events:,} in {load_seconds:.1f} s")
+    print(f"first request (builds index): {first_ms:9.2f} ms")
+    print(f"/api/dashboard p50:           {statistics.median(latencies):9.2f} ms")
+    print(f"/api/dashboard p95:           {latencies[int(len(latencies) * 0.95) - 1]:9.2f} ms")
+    print(f"legacy metric scans only:     {statistics.median(legacy_times):9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
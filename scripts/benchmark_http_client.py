@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled HTTP client registry vs a new client per request
+
+Starts a local keep-alive HTTP server that counts accepted TCP connections,
+then issues the same number of requests two ways: opening a fresh
+httpx.AsyncClient per call (what the integrations used to do) and going
+through the shared HTTPClientRegistry. Pass --url to time a real endpoint
+instead; over TLS the per-request handshake dominates the fresh-client column.
+
+Usage:
+    python scripts/benchmark_http_client.py --requests 500 --concurrency 20
+    python scripts/benchmark_http_client.py --url https://api.anthropic.com/ --requests 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_client import HTTPClientRegistry  # noqa: E402
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with CountingHandler.lock:
+            CountingHandler.connections += 1
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/health"
+
+
+async def fresh_client_per_request(url: str) -> None:
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await client.get(url)
+
+
+async def run_mode(mode: str, url: str, requests: int, concurrency: int) -> dict:
+    registry = HTTPClientRegistry()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "pooled":
+                await registry.request("GET", url)
+            else:
+                await fresh_client_per_request(url)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - started
+    await registry.aclose()
+
+    return {
+        "wall": wall,
+        "p50": statistics.median(latencies),
+        "p99": sorted(latencies)[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", help="Time a remote endpoint instead of the local server")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server()
+
+    header = f"{'mode':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6}"
+    print(f"{args.requests} requests to {url}, concurrency {args.concurrency}")
+    print(header)
+    print("-" * len(header))
+
+    for mode in ("fresh", "pooled"):
+        CountingHandler.connections = 0
+        stats = asyncio.run(run_mode(mode, url, args.requests, args.concurrency))
+        conns = str(CountingHandler.connections) if server else "n/a"
+        print(
+            f"{mode:>8} {args.requests / stats['wall']:>9.1f} "
+            f"{stats['p50'] * 1000:>8.2f} {stats['p99'] * 1000:>8.2f} {conns:>6}"
+        )
+
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
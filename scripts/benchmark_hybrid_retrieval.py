@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hybrid BM25 + vector retrieval vs vector-only search
+
+Builds a synthetic labeled corpus where every document pairs four topic
+words with one product name. Two query kinds are generated:
+
+- jargon: a product name plus a topic word; exactly one relevant document
+- semantic: synonyms of a document's topic words; every document with the
+  same topic words is relevant, and no query token appears in the corpus
+
+The default embedder is a hashing bag-of-words that knows the synonyms but
+down-weights out-of-vocabulary tokens such as product names, mimicking how
+small embedding models treat rare jargon. Pass --model all-MiniLM-L6-v2 to
+use sentence-transformers instead.
+
+Reports recall@k and per-query latency for the vector, lexical and hybrid
+modes of VectorStoreManager.search_documents.
+
+Usage:
+    python scripts/benchmark_hybrid_retrieval.py --docs 2000 --queries 200
+    python scripts/benchmark_hybrid_retrieval.py --lexical-weight 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Optional
+
+import numpy as np
+from llama_index.core import Document
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lexical_index import tokenize  # noqa: E402
+from app.core.vector_store import VectorStoreManager  # noqa: E402
+
+TOPICS = {
+    "billing": "invoice payment subscription refund charge pricing plan card",
+    "onboarding": "setup signup tutorial activation welcome trial account guide",
+    "integrations": "webhook sync connector import export api crm pipeline",
+    "reporting": "dashboard chart metrics export analytics report kpi filter",
+    "support": "ticket response agent chat escalation helpdesk queue sla",
+    "security": "sso password permission audit role login compliance token",
+}
+SYNONYMS = {
+    "invoice": "bill",
+    "payment": "remittance",
+    "subscription": "membership",
+    "refund": "reimbursement",
+    "charge": "fee",
+    "pricing": "cost",
+    "plan": "tier",
+    "card": "visa",
+    "setup": "configuration",
+    "signup": "registration",
+    "tutorial": "walkthrough",
+    "activation": "enablement",
+    "welcome": "greeting",
+    "trial": "pilot",
+    "account": "profile",
+    "guide": "manual",
+    "webhook": "callback",
+    "sync": "mirroring",
+    "connector": "adapter",
+    "import": "ingest",
+    "export": "download",
+    "api": "endpoint",
+    "crm": "contacts",
+    "pipeline": "workflow",
+    "dashboard": "overview",
+    "chart": "graph",
+    "metrics": "measurements",
+    "analytics": "insights",
+    "report": "summary",
+    "kpi": "target",
+    "filter": "segment",
+    "ticket": "case",
+    "response": "reply",
+    "agent": "rep",
+    "chat": "messaging",
+    "escalation": "handoff",
+    "helpdesk": "servicedesk",
+    "queue": "backlog",
+    "sla": "commitment",
+    "sso": "federation",
+    "password": "passphrase",
+    "permission": "access",
+    "audit": "review",
+    "role": "group",
+    "login": "signin",
+    "compliance": "regulation",
+    "token": "credential",
+}
+FILLER = "our team keeps running into this and it slows everyone down every week"
+SYLLABLES = "ka zo vi ra lu mex tor qua nix bel dro fen sy gar pil".split()
+
+
+class HashingEmbedding(BaseEmbedding):
+    """Hashed bag-of-words; tokens outside the common vocabulary barely count"""
+
+    dim: int = 256
+    jargon_weight: float = 0.05
+    vocabulary: set[str] = set()
+    synonyms: dict[str, str] = {}
+
+    def _vector(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            token = self.synonyms.get(token, token)
+            slot = int(hashlib.md5(token.encode()).hexdigest()[:8], 16) % self.dim
+            weight = 1.0 if token in self.vocabulary else self.jargon_weight
+            vector[slot] += weight
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._vector(text)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+
+class SentenceTransformerEmbedding(BaseEmbedding):
+    """Thin LlamaIndex wrapper around a sentence-transformers model"""
+
+    model: Any = None
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self.model.encode(texts, normalize_embeddings=True).tolist()
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._get_text_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._get_text_embedding(query)
+
+
+def make_corpus(
+    docs: int, queries: int, seed: int
+) -> tuple[list[Document], dict[str, list[tuple[str, set[str]]]]]:
+    """Documents plus (query, relevant_doc_ids) pairs per query kind"""
+    rng = random.Random(seed)
+    products: set[str] = set()
+    while len(products) < docs:
+        products.add("".join(rng.choices(SYLLABLES, k=3)).capitalize())
+
+    documents = []
+    for i, product in enumerate(sorted(products)):
+        topic = rng.choice(list(TOPICS))
+        words = rng.sample(TOPICS[topic].split(), 4)
+        text = f"{product} {' '.join(words)} problem. {FILLER}."
+        documents.append(
+            Document(
+                id_=f"doc-{i}",
+                text=text,
+                metadata={"topic": topic, "words": " ".join(sorted(words))},
+                excluded_embed_metadata_keys=["topic", "words"],
+            )
+        )
+
+    by_words: dict[str, set[str]] = {}
+    for doc in documents:
+        by_words.setdefault(doc.metadata["words"], set()).add(doc.doc_id)
+
+    labeled: dict[str, list[tuple[str, set[str]]]] = {"jargon": [], "semantic": []}
+    for doc in rng.sample(documents, min(queries, len(documents))):
+        product = doc.text.split()[0]
+        topic_word = rng.choice(TOPICS[doc.metadata["topic"]].split())
+        labeled["jargon"].append((f"{product} {topic_word} issues", {doc.doc_id}))
+
+        paraphrase = [SYNONYMS[word] for word in doc.metadata["words"].split()]
+        rng.shuffle(paraphrase)
+        labeled["semantic"].append(
+            (" ".join(paraphrase), by_words[doc.metadata["words"]])
+        )
+    return documents, labeled
+
+
+def make_embedding(model_name: Optional[str]) -> BaseEmbedding:
+    if model_name is None:
+        vocabulary = set(tokenize(" ".join(TOPICS.values()) + " " + FILLER))
+        vocabulary.update(["problem", "issues"])
+        return HashingEmbedding(
+            vocabulary=vocabulary,
+            synonyms={v: k for k, v in SYNONYMS.items()},
+            embed_batch_size=512,
+        )
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformerEmbedding(
+        model=SentenceTransformer(model_name), embed_batch_size=256
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    documents, labeled = make_corpus(args.docs, args.queries, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = VectorStoreManager(
+            persist_dir=tmp, embed_model=make_embedding(args.model)
+        )
+        await manager.create_index("benchmark_corpus", documents)
+        ks = sorted({1, 5, args.top_k})
+        labeled["all"] = labeled["jargon"] + labeled["semantic"]
+
+        for kind, queries in labeled.items():
+            print(f"\n{kind} queries: {len(queries)}  docs: {len(documents)}")
+            header = "".join(f"recall@{k:<5}" for k in ks)
+            print(f"{'mode':<9}{header}{'p50 ms':>9}{'p95 ms':>9}")
+
+            for mode in ("vector", "lexical", "hybrid"):
+                hits = dict.fromkeys(ks, 0)
+                latencies = []
+                for query, relevant in queries:
+                    start = time.perf_counter()
+                    results = await manager.search_documents(
+                        "benchmark_corpus",
+                        query,
+                        top_k=max(ks),
+                        mode=mode,
+                        lexical_weight=args.lexical_weight,
+                    )
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    ranked = [r["metadata"].get("document_id") for r in results]
+                    for k in ks:
+                        hits[k] += bool(relevant & set(ranked[:k]))
+
+                recalls = "".join(f"{hits[k] / len(queries):<12.3f}" for k in ks)
+                p50 = statistics.median(latencies)
+                p95 = statistics.quantiles(latencies, n=20)[-1]
+                print(f"{mode:<9}{recalls}{p50:>9.2f}{p95:>9.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--lexical-weight", type=float, default=1.0)
+    parser.add_argument("--model", default=None, help="sentence-transformers model")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized keyword classification vs the per-row any() chains
+
+Generates synthetic pain-point rows, labels them with the legacy per-row
+functions (copied verbatim from KnowledgeBaseBuilder before the shared
+classifier existed) and with classify_frame, checks the outputs agree, and
+reports the speedup.
+
+Usage:
+    python scripts/benchmark_keyword_classifier.py --rows 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.keyword_classifier import classify_frame  # noqa: E402
+
+VOCABULARY = (
+    "our team needs a better api integration for billing and the manual workflow "
+    "is terrible we are a bootstrapped startup growing fast urgent help with "
+    "customer support dashboard reporting gdpr compliance invoice pricing great "
+    "love the product but sync breaks at enterprise scale critical issue problem "
+    "amazing small business data analytics automate everything asap soon"
+).split()
+
+
+def legacy_category(text: str) -> str:
+    text = text.lower()
+    if any(word in text for word in ["integration", "api", "connect", "sync"]):
+        return "integration"
+    elif any(word in text for word in ["automation", "manual", "automate", "workflow"]):
+        return "automation"
+    elif any(word in text for word in ["data", "analytics", "reporting", "dashboard"]):
+        return "data_analytics"
+    elif any(word in text for word in ["customer", "user", "client", "support"]):
+        return "customer_management"
+    elif any(word in text for word in ["payment", "billing", "invoice", "pricing"]):
+        return "payments"
+    elif any(word in text for word in ["security", "auth", "compliance", "gdpr"]):
+        return "security"
+    return "general"
+
+
+def legacy_urgency(text: str) -> str:
+    text = text.lower()
+    if any(word in text for word in ["urgent", "critical", "breaking", "emergency", "asap"]):
+        return "high"
+    elif any(word in text for word in ["need", "important", "soon", "help"]):
+        return "medium"
+    return "low"
+
+
+def legacy_company_size(text: str) -> str:
+    text = text.lower()
+    if any(word in text for word in ["startup", "founding", "early stage", "bootstrapped"]):
+        return "startup"
+    elif any(word in text for word in ["team", "small business", "smb", "growing"]):
+        return "smb"
+    elif any(word in text for word in ["enterprise", "large", "corporation", "scale"]):
+        return "enterprise"
+    return "unknown"
+
+
+def legacy_sentiment(text: str) -> str:
+    positive_words = ["good", "great", "excellent", "love", "amazing", "perfect"]
+    negative_words = ["bad", "terrible", "hate", "awful", "frustrat", "problem", "issue"]
+    text = text.lower()
+    positive = sum(1 for word in positive_words if word in text)
+    negative = sum(1 for word in negative_words if word in text)
+    if positive > negative:
+        return "positive"
+    elif negative > positive:
+        return "negative"
+    return "neutral"
+
+
+def make_frame(rows: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    texts = [
+        " ".join(rng.choices(VOCABULARY, k=rng.randint(4, 20))).capitalize()
+        for _ in range(rows)
+    ]
+    return pd.DataFrame({"pain_point": texts})
+
+
+def legacy_frame(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    records = []
+    for _, row in df.iterrows():
+        text = row[column]
+        records.append(
+            {
+                "category": legacy_category(text),
+                "urgency": legacy_urgency(text),
+                "company_size": legacy_company_size(text),
+                "sentiment": legacy_sentiment(text),
+            }
+        )
+    return pd.DataFrame(records, index=df.index)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.seed)
+
+    start = time.perf_counter()
+    expected = legacy_frame(df, "pain_point")
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = classify_frame(df, "pain_point")
+    vectorized_time = time.perf_counter() - start
+
+    mismatches = int((expected != actual).any(axis=1).sum())
+
+    print(f"rows:        {args.rows}")
+    print(f"per-row:     {legacy_time:.2f}s")
+    print(f"vectorized:  {vectorized_time:.2f}s")
+    print(f"speedup:     {legacy_time / vectorized_time:.1f}x")
+    print(f"mismatches:  {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    exit(main())
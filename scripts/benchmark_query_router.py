@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark: routing accuracy of EmbeddingRouterSelector on labeled queries
+
+Routes a held-out set of hand-labeled analyst questions (none of them
+reuse the route descriptions) across the five knowledge-base indices with
+the production embedder, CachedOpenAIEmbedding over text-embedding-3-large,
+and the ROUTER_* settings from the environment. Index centroids are not
+blended in, so the numbers are a lower bound for a populated store.
+
+Reports top-1 accuracy, the share of queries whose label is among the
+fanned-out selections, the fan-out rate, the rate at which the LLM
+fallback would have been called, per-index accuracy and per-query latency.
+Requires OPENAI_API_KEY.
+
+Usage:
+    python scripts/benchmark_query_router.py
+    python scripts/benchmark_query_router.py --min-similarity 0.3 --min-accuracy 0.8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.tools.types import ToolMetadata
+from pydantic import Field
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.query_router import (  # noqa: E402
+    INDEX_DESCRIPTIONS,
+    EmbeddingRouterSelector,
+    router_settings_from_env,
+)
+
+# Held-out analyst questions by the index that should answer them
+LABELED_QUERIES: dict[str, list[str]] = {
+    "reddit_pain_points": [
+        "What do founders hate most about their current invoicing tools?",
+        "Why are small agencies complaining about project management software?",
+        "Which onboarding problems make early-stage startups churn from CRMs?",
+        "What frustrates solo developers about deploying side projects?",
+        "Common complaints from bootstrappers about payment processors",
+        "What are people ranting about when they talk about help desk tools?",
+        "Which workflow annoyances do indie hackers mention the most?",
+        "What problems do customers say they would pay to have solved?",
+    ],
+    "market_trends": [
+        "How many monthly searches are there for AI meeting note takers?",
+        "Is search interest in no-code automation growing year over year?",
+        "What is the total addressable market for employee scheduling apps?",
+        "Which expense management keywords have high volume and low difficulty?",
+        "Estimate demand for a compliance checklist product in the EU",
+        "Show Google Trends data for vertical SaaS in construction",
+        "How big is the market for invoice financing software?",
+        "Which niches show rising keyword volume over the last 12 months?",
+    ],
+    "github_insights": [
+        "Which open-source libraries would a real-time collaborative editor need?",
+        "How hard is it to implement end-to-end encryption for file sharing?",
+        "What SDKs are developers starring for building Slack bots?",
+        "Are there mature repositories for PDF parsing we could build on?",
+        "How active is development on vector database client libraries?",
+        "How much engineering does a browser extension with offline sync take?",
+        "Which developer tools are gaining stars and pull requests this quarter?",
+        "Is the technical stack for webhook retry infrastructure well supported?",
+    ],
+    "competitor_analysis": [
+        "How do Notion and Coda price their team plans?",
+        "Who are the main rivals to Calendly and how do they differentiate?",
+        "What positioning gap exists between HubSpot and Pipedrive?",
+        "Compare the freemium tiers of the leading email marketing tools",
+        "Which incumbents dominate the applicant tracking space?",
+        "How should we position against Zapier for small businesses?",
+        "What do competing churn analytics products charge per seat?",
+        "Map the players offering AI customer support agents",
+    ],
+    "historical_reports": [
+        "What did our report from last quarter conclude about fintech tools?",
+        "Have we seen this spike in demand for HR software before?",
+        "Summarize the patterns from our previous market intelligence briefs",
+        "How did our earlier predictions about creator economy tools play out?",
+        "What recurring themes appear across our past weekly insight reports?",
+        "Compare this month's findings with the analysis we did in January",
+        "Which opportunities did we flag historically that later took off?",
+        "Give me context from prior reports on the legal tech segment",
+    ],
+}
+
+
+class PrecomputedQueries(BaseEmbedding):
+    """Serves query vectors computed up front; descriptions go to ``inner``"""
+
+    inner: Any = None
+    queries: dict[str, list[float]] = Field(default_factory=dict)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self.queries[query]
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self.queries[query]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self.inner.get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.get_text_embedding_batch(texts)
+
+
+def make_embedder(model: str = "text-embedding-3-large") -> BaseEmbedding:
+    """The embedder SaaSMarketIntelligenceRAG routes with"""
+    from app.core.rag_engine import CachedOpenAIEmbedding
+
+    return CachedOpenAIEmbedding(model=model, api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def evaluate(
+    embed_model: BaseEmbedding,
+    labeled: dict[str, list[str]] = LABELED_QUERIES,
+    **selector_kwargs: Any,
+) -> dict[str, Any]:
+    """Route every labeled query and summarize how often the label won"""
+    pairs = [(query, label) for label, queries in labeled.items() for query in queries]
+    choices = [
+        ToolMetadata(name=name, description=description)
+        for name, description in INDEX_DESCRIPTIONS.items()
+    ]
+    settings = {**router_settings_from_env(), **selector_kwargs}
+
+    query_vectors = {}
+    embed_ms = []
+    for query, _ in pairs:
+        start = time.perf_counter()
+        query_vectors[query] = embed_model.get_query_embedding(query)
+        embed_ms.append((time.perf_counter() - start) * 1000)
+
+    # No fallback selector: every query gets the embedding decision, and
+    # low-confidence ones are counted as the LLM calls they would trigger
+    router = EmbeddingRouterSelector(
+        PrecomputedQueries(inner=embed_model, queries=query_vectors), **settings
+    )
+    correct = hits = fanned_out = low_confidence = 0
+    per_index: dict[str, list[int]] = {name: [0, 0] for name in INDEX_DESCRIPTIONS}
+    misrouted = []
+    route_ms = []
+    for query, label in pairs:
+        start = time.perf_counter()
+        selected = [choices[i].name for i in router.select(choices, query).inds]
+        route_ms.append((time.perf_counter() - start) * 1000)
+
+        best = float(router.score(choices, query_vectors[query]).max())
+        low_confidence += best < settings["min_similarity"]
+        fanned_out += len(selected) > 1
+        hits += label in selected
+        correct += selected[0] == label
+        per_index[label][0] += selected[0] == label
+        per_index[label][1] += 1
+        if selected[0] != label:
+            misrouted.append((query, label, selected))
+
+    total = len(pairs)
+    return {
+        "queries": total,
+        "accuracy": correct / total,
+        "hit_rate": hits / total,
+        "fanout_rate": fanned_out / total,
+        "fallback_rate": low_confidence / total,
+        "per_index": {name: ok / n for name, (ok, n) in per_index.items() if n},
+        "embed_ms_p50": statistics.median(embed_ms),
+        "embed_ms_p95": statistics.quantiles(embed_ms, n=20)[-1],
+        "route_ms_mean": statistics.mean(route_ms),
+        "misrouted": misrouted,
+        "settings": settings,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="text-embedding-3-large")
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--min-similarity", type=float, default=None)
+    parser.add_argument("--fanout-margin", type=float, default=None)
+    parser.add_argument(
+        "--min-accuracy",
+        type=float,
+        default=0.0,
+        help="exit non-zero when top-1 accuracy is below this",
+    )
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is required to run the production embedder")
+        return 2
+
+    overrides = {
+        key: value
+        for key, value in {
+            "top_k": args.top_k,
+            "min_similarity": args.min_similarity,
+            "fanout_margin": args.fanout_margin,
+        }.items()
+        if value is not None
+    }
+    report = evaluate(make_embedder(args.model), **overrides)
+
+    print(f"embedding router, {report['queries']} labeled queries ({args.model}):")
+    print(f"  settings:       {report['settings']}")
+    print(f"  top-1 accuracy: {report['accuracy']:.3f}")
+    print(f"  label selected: {report['hit_rate']:.3f}")
+    print(f"  fan-out rate:   {report['fanout_rate']:.3f}")
+    print(f"  fallback rate:  {report['fallback_rate']:.3f}")
+    print(
+        f"  query embed:    p50 {report['embed_ms_p50']:.1f} ms, "
+        f"p95 {report['embed_ms_p95']:.1f} ms"
+    )
+    print(f"  routing:        {report['route_ms_mean']:.3f} ms/query")
+    for name, accuracy in report["per_index"].items():
+        print(f"  {name:<22}{accuracy:.3f}")
+    for query, label, selected in report["misrouted"]:
+        print(f"  misrouted: {query!r} -> {selected} (expected {label})")
+
+    return 0 if report["accuracy"] >= args.min_accuracy else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency added by a rate-limit check
+
+Times N checks against minute/hour/day windows spread over a pool of API
+keys and reports p50/p99 per check for the GCRA script, the in-process
+fallback, and the legacy check (INCR + EXPIRE per window, six round trips).
+Uses a local Redis when --redis-url is given, otherwise fakeredis; fakeredis
+has no network hop, so against a real server the gap grows by roughly five
+round-trip times per check.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py --checks 20000 --keys 100
+    python scripts/benchmark_rate_limiter.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limiter import RateLimiter, limits_from_config  # noqa: E402
+
+LIMITS = {
+    "requests_per_minute": 10**9,
+    "requests_per_hour": 10**9,
+    "requests_per_day": 10**9,
+}
+
+
+def legacy_check(client, key: str) -> bool:
+    """The per-window INCR + EXPIRE check APIKeyService used before"""
+    now = datetime.now()
+    for name, suffix, ttl in (
+        ("minute", now.strftime("%Y-%m-%d-%H-%M"), 60),
+        ("hour", now.strftime("%Y-%m-%d-%H"), 3600),
+        ("day", now.strftime("%Y-%m-%d"), 86400),
+    ):
+        window_key = f"legacy_rate_limit:{key}:{name}:{suffix}"
+        count = client.incr(window_key)
+        client.expire(window_key, ttl)
+        if count > LIMITS[f"requests_per_{name}"]:
+            return False
+    return True
+
+
+def measure(check: Callable[[str], object], checks: int, keys: int) -> list[float]:
+    latencies = []
+    for i in range(checks):
+        start = time.perf_counter()
+        check(f"sk_bench_{i % keys}")
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    return latencies
+
+
+def percentile(latencies: list[float], p: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    if args.redis_url:
+        import redis
+
+        client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+        backend = args.redis_url
+    else:
+        import fakeredis
+
+        client = fakeredis.FakeRedis(decode_responses=True)
+        backend = "fakeredis"
+
+    limits = limits_from_config(LIMITS)
+    redis_limiter = RateLimiter(client, prefix="bench_rate_limit")
+    local_limiter = RateLimiter()
+
+    rows = [
+        ("GCRA script (1 round trip)", lambda k: redis_limiter.hit(k, limits)),
+        ("in-process fallback", lambda k: local_limiter.hit(k, limits)),
+        ("legacy (6 round trips)", lambda k: legacy_check(client, k)),
+    ]
+
+    print(f"{args.checks:,} checks over {args.keys} keys, backend: {backend}")
+    for name, check in rows:
+        measure(check, min(1000, args.checks), args.keys)  # warm up
+        latencies = measure(check, args.checks, args.keys)
+        print(
+            f"  {name:28s} p50 {percentile(latencies, 0.5):8.1f} us"
+            f"   p99 {percentile(latencies, 0.99):8.1f} us"
+        )
+
+    for pattern in ("bench_rate_limit:*", "legacy_rate_limit:*"):
+        keys = list(client.scan_iter(pattern))
+        if keys:
+            client.delete(*keys)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial RedditScraper.run vs concurrent RedditScraper.arun
+
+SerpAPI, praw and OpenAI are replaced by stubs that sleep for a configurable
+latency, so the benchmark runs offline and measures only pipeline overlap.
+
+Usage:
+    python scripts/benchmark_reddit_scraper.py --posts 50 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SERPAPI_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.scrapers import reddit_scraper  # noqa: E402
+from app.scrapers.reddit_scraper import RedditScraper  # noqa: E402
+
+
+def build_stubs(posts: int, api_latency: float, llm_latency: float) -> dict:
+    """Create latency-simulating stand-ins for the external clients."""
+
+    def fake_search(params):
+        time.sleep(api_latency)
+        return {
+            "organic_results": [
+                {
+                    "title": f"Post {i}",
+                    "link": f"https://www.reddit.com/r/saas/comments/{i}/post_{i}/",
+                }
+                for i in range(posts)
+            ]
+        }
+
+    class FakeRedditClient:
+        def fetch_comments(self, post_url, limit=10):
+            time.sleep(api_latency)
+            return [f"Comment {i} on {post_url}" for i in range(limit)]
+
+    class FakeGPT4Client:
+        def simple_json(self, prompt):
+            time.sleep(llm_latency)
+            return [
+                {
+                    "pain_point_label": "Manual reporting",
+                    "explanation": "Teams lose hours every week.",
+                    "gsheet_link": "",
+                }
+            ]
+
+    def fake_completion(**kwargs):
+        time.sleep(llm_latency)
+        completion = MagicMock()
+        completion.choices[0].message.content = "Stub summary"
+        return completion
+
+    openai_client = MagicMock()
+    openai_client.chat.completions.create.side_effect = fake_completion
+
+    return {
+        "search": fake_search,
+        "reddit_client": FakeRedditClient,
+        "gpt_client": FakeGPT4Client,
+        "openai_client": openai_client,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--api-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stubs = build_stubs(args.posts, args.api_latency, args.llm_latency)
+
+    with (
+        patch.object(reddit_scraper.serpapi, "search", stubs["search"]),
+        patch("app.core.reddit_api.RedditClient", stubs["reddit_client"]),
+        patch.object(reddit_scraper, "GPT4Client", stubs["gpt_client"]),
+        patch.object(reddit_scraper, "OpenAI", return_value=stubs["openai_client"]),
+        patch(
+            "app.utils.top_insights.append_daily_metrics_row", return_value=True
+        ),
+        patch("builtins.print"),
+    ):
+        scraper = RedditScraper("crm pain points", max_results=args.posts)
+
+        start = time.perf_counter()
+        serial_results = scraper.run()
+        serial_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent_results = asyncio.run(scraper.arun(concurrency=args.concurrency))
+        concurrent_seconds = time.perf_counter() - start
+
+    assert len(serial_results) == len(concurrent_results)
+
+    print(f"Posts:           {args.posts}")
+    print(f"Serial run():    {serial_seconds:.2f}s")
+    print(
+        f"Concurrent arun: {concurrent_seconds:.2f}s (concurrency={args.concurrency})"
+    )
+    print(f"Speedup:         {serial_seconds / concurrent_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
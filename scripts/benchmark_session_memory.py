@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: indexed SQLite memory store vs the full-file JSON rewrite
+
+For each store size, pre-populates both formats with N status-log nodes,
+then measures startup (constructing SessionMemoryManager, or json.load for
+the legacy file) and the mean cost of one more store_memory_node call.
+The legacy write path is copied from SessionMemoryManager before the
+store existed: it re-serializes every node on each write.
+
+Usage:
+    python scripts/benchmark_session_memory.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.session_memory import MemoryNode, SessionMemoryManager  # noqa: E402
+
+
+def make_node(i: int) -> MemoryNode:
+    now = datetime.now()
+    return MemoryNode(
+        id=f"mcp_status_log:{i:016x}",
+        content={"timestamp": now.isoformat(), "message": f"Job {i} completed"},
+        category="mcp_status_log",
+        created_at=now,
+        updated_at=now,
+        tags=["mcp", "status", "coordination"],
+        importance_score=0.5,
+    )
+
+
+def legacy_persist(nodes: dict[str, MemoryNode], memory_file: Path) -> None:
+    serializable_nodes = [node.to_record() for node in nodes.values()]
+    with open(memory_file, "w") as f:
+        json.dump(serializable_nodes, f, indent=2)
+
+
+def bench_legacy(size: int, writes: int, tmp: Path) -> tuple[float, float]:
+    memory_file = tmp / "memory_nodes.json"
+    nodes = {node.id: node for node in map(make_node, range(size))}
+    legacy_persist(nodes, memory_file)
+
+    start = time.perf_counter()
+    with open(memory_file) as f:
+        nodes = {r["id"]: MemoryNode.from_record(r) for r in json.load(f)}
+    startup = time.perf_counter() - start
+
+    latencies = []
+    for i in range(size, size + writes):
+        node = make_node(i)
+        start = time.perf_counter()
+        nodes[node.id] = node
+        legacy_persist(nodes, memory_file)
+        latencies.append(time.perf_counter() - start)
+    return startup, statistics.mean(latencies)
+
+
+def bench_store(size: int, writes: int, tmp: Path) -> tuple[float, float]:
+    manager = SessionMemoryManager(memory_dir=str(tmp))
+    manager.store.upsert_many(make_node(i).to_record() for i in range(size))
+    manager.store.close()
+
+    start = time.perf_counter()
+    manager = SessionMemoryManager(memory_dir=str(tmp))
+    startup = time.perf_counter() - start
+
+    latencies = []
+    for i in range(size, size + writes):
+        start = time.perf_counter()
+        manager.store_memory_node(
+            "mcp_status_log",
+            {"message": f"Job {i} completed"},
+            tags=["mcp", "status", "coordination"],
+            importance_score=0.5,
+        )
+        latencies.append(time.perf_counter() - start)
+    return startup, statistics.mean(latencies)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument(
+        "--skip-legacy-above",
+        type=int,
+        default=100000,
+        help="skip the JSON rewrite for larger sizes (it takes seconds per write)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'format':<8} {'startup ms':>11} {'write ms':>10}")
+    for size in args.sizes:
+        formats = [("sqlite", bench_store)]
+        if size <= args.skip_legacy_above:
+            formats.insert(0, ("json", bench_legacy))
+        for name, bench in formats:
+            with tempfile.TemporaryDirectory() as tmp:
+                startup, write = bench(size, args.writes, Path(tmp))
+            print(f"{size:>8} {name:<8} {startup * 1000:>11.2f} {write * 1000:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
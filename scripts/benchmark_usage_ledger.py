@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: usage ledger rollups vs scanning in-memory usage records
+
+Loads N synthetic calls spread over 30 days into a UsageLedger, then times a
+30-day summary (rollups plus the partial first hour) against the legacy
+approach of filtering a Python list of records and aggregating it in
+three passes. Also reports the mean cost of recording one call.
+
+Usage:
+    python scripts/benchmark_usage_ledger.py --calls 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.usage_ledger import UsageLedger  # noqa: E402
+
+MODELS = ["claude-4", "claude-4-sonnet", "claude-3.5-sonnet", "claude-3-opus"]
+TASKS = ["market_research", "code_generation", "data_analysis", "support", "qa"]
+WINDOW = 30 * 24 * 3600
+
+
+def legacy_summary(records: list[tuple], since: float) -> dict:
+    filtered = [r for r in records if r[0] >= since]
+    by_model: dict = defaultdict(lambda: [0, 0, 0.0])
+    by_task: dict = defaultdict(lambda: [0, 0, 0.0])
+    by_day: dict = defaultdict(lambda: [0, 0, 0.0])
+    for _ts, model, _task, tokens_in, tokens_out, cost in filtered:
+        by_model[model][0] += 1
+        by_model[model][1] += tokens_in + tokens_out
+        by_model[model][2] += cost
+    for _ts, _model, task, tokens_in, tokens_out, cost in filtered:
+        by_task[task][0] += 1
+        by_task[task][1] += tokens_in + tokens_out
+        by_task[task][2] += cost
+    for ts, _model, _task, tokens_in, tokens_out, cost in filtered:
+        day = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+        by_day[day][0] += 1
+        by_day[day][1] += tokens_in + tokens_out
+        by_day[day][2] += cost
+    return {"calls": len(filtered), "by_day": by_day}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    records = sorted(
+        (
+            now - rng.random() * WINDOW * 1.2,
+            rng.choice(MODELS),
+            rng.choice(TASKS),
+            rng.randint(200, 8000),
+            rng.randint(50, 2000),
+            rng.random() * 0.05,
+        )
+        for _ in range(args.calls)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = UsageLedger(f"{tmp}/ledger.db", flush_size=10_000)
+        start = time.perf_counter()
+        for ts, model, task, tokens_in, tokens_out, cost in records:
+            ledger.record("benchmark", model, tokens_in, tokens_out, cost, task, None, None, ts)
+        ledger.flush()
+        load_seconds = time.perf_counter() - start
+
+        since = now - WINDOW
+        ledger_times, legacy_times = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            summary = ledger.summarize(since=since)
+            ledger_times.append((time.perf_counter() - start) * 1000)
+        for _ in range(max(1, args.repeats // 10)):
+            start = time.perf_counter()
+            legacy = legacy_summary(records, since)
+            legacy_times.append((time.perf_counter() - start) * 1000)
+        ledger.close()
+
+    assert summary["calls"] == legacy["calls"]
+    print(f"calls loaded: {args.calls:,}  in window: {summary['calls']:,}")
+    print(f"record(): {load_seconds / args.calls * 1e6:.2f} us/call (batched)")
+    print(f"30-day summary, ledger:      {statistics.median(ledger_times):9.2f} ms")
+    print(f"30-day summary, list scans:  {statistics.median(legacy_times):9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
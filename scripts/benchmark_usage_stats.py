@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: APIKeyService.get_usage_stats over a month of traffic
+
+Records N requests for one customer spread over 28 days and 20 endpoints
+through track_usage, then times get_usage_stats, which reads the
+day/endpoint counter hashes. For comparison it times the legacy read (the
+latest 100 raw records, parsed one by one) and an exact breakdown parsed
+from every raw record, and reports how many requests each accounts for.
+Uses fakeredis.
+
+Usage:
+    python scripts/benchmark_usage_stats.py --requests 100000 --reads 200
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import fakeredis
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.api_key import APIKey, APIKeyUsage  # noqa: E402
+from app.services.api_key_service import APIKeyService  # noqa: E402
+
+PERIOD = "2025-02"
+
+
+def make_usage(api_key: APIKey, i: int, start: datetime) -> APIKeyUsage:
+    return APIKeyUsage(
+        api_key=api_key.key,
+        customer_id=api_key.customer_id,
+        timestamp=start + timedelta(seconds=i * 28 * 86400 // 10**6 % (28 * 86400)),
+        endpoint=f"/api/v1/endpoint_{i % 20}",
+        status_code=200,
+        response_time_ms=10.0,
+        tokens_used=i % 1000,
+    )
+
+
+def legacy_stats(client, customer_id: str, limit: int = 100) -> dict:
+    """get_usage_stats as it was: parse the latest ``limit`` raw records"""
+    records = client.zrevrange(f"usage:{customer_id}:{PERIOD}", 0, limit - 1)
+    by_endpoint: dict[str, int] = {}
+    for record in records:
+        usage = APIKeyUsage.parse_raw(record)
+        by_endpoint[usage.endpoint] = by_endpoint.get(usage.endpoint, 0) + 1
+    return by_endpoint
+
+
+def time_reads(read, reads: int) -> list[float]:
+    latencies = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+    logging.getLogger("app.services.api_key_service").setLevel(logging.WARNING)
+
+    client = fakeredis.FakeRedis(decode_responses=True)
+    service = APIKeyService(client, raw_event_limit=args.requests)
+    api_key = APIKey(customer_id="cus_bench", subscription_id="sub", tier="pro")
+    start_of_month = datetime(2025, 2, 1)
+
+    start = time.perf_counter()
+    for i in range(args.requests):
+        usage = make_usage(api_key, i * (10**6 // args.requests), start_of_month)
+        service.track_usage(api_key, usage)
+    service.flush()
+    write_seconds = time.perf_counter() - start
+
+    stats = service.get_usage_stats(api_key.customer_id, period=PERIOD)
+    counted = sum(endpoint["count"] for endpoint in stats["by_endpoint"].values())
+    legacy_counted = sum(legacy_stats(client, api_key.customer_id).values())
+
+    current = time_reads(
+        lambda: service.get_usage_stats(api_key.customer_id, period=PERIOD),
+        args.reads,
+    )
+    legacy = time_reads(lambda: legacy_stats(client, api_key.customer_id), args.reads)
+    full_parse = time_reads(
+        lambda: legacy_stats(client, api_key.customer_id, limit=0), 3
+    )
+
+    print(f"{args.requests:,} requests recorded in {write_seconds:.1f} s")
+    print(
+        f"day/endpoint hashes: p50 {statistics.median(current):7.2f} ms"
+        f"   breakdown covers {counted:,} requests over {len(stats['by_day'])} days"
+    )
+    print(
+        f"legacy last 100:    p50 {statistics.median(legacy):7.2f} ms"
+        f"   breakdown covers {legacy_counted:,} requests"
+    )
+    print(
+        f"parse every record: p50 {statistics.median(full_parse):7.2f} ms"
+        f"   breakdown covers {args.requests:,} requests"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Stripe webhook burst replay, queued vs inline processing
+
+Replays a burst of N signed checkout.session.completed events spread over
+C customers against the /api/stripe/webhooks endpoint, with all events in
+flight at once as during a Stripe redelivery. The Sheets, email and Supabase
+side effects are stubbed with fixed latencies and fail for the first
+--outage seconds (a downstream outage) and at --failure-rate afterwards.
+
+Reports the time to acknowledge each webhook and, for the queue, how long
+it takes to drain, how many handler attempts were made and the peak attempts
+in any one second (the retry storm). The burst is then replayed to show
+redeliveries are acknowledged as duplicates. For comparison it replays the
+legacy inline handler, which ran side effects before responding and dropped
+the ones that failed.
+
+Usage:
+    python scripts/benchmark_webhook_queue.py --events 500 --customers 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI, Request
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STRIPE_API_KEY", "sk_test_benchmark")
+
+from app.api import stripe_webhooks
+from app.core.webhook_queue import WebhookDispatcher, WebhookQueue
+
+SECRET = "whsec_benchmark"
+LATENCIES = {"sheets": 0.08, "email": 0.15, "supabase": 0.03}
+
+
+class SideEffects:
+    """Stubbed downstream services with latency, an outage and random errors"""
+
+    def __init__(self, outage: float, failure_rate: float, swallow: bool):
+        self.outage = outage
+        self.failure_rate = failure_rate
+        self.swallow = swallow  # legacy helpers logged errors and returned False
+        self.started = time.perf_counter()
+        self.completed = Counter()
+        self.lost = Counter()
+        self.attempt_times: list[float] = []
+
+    def stub(self, name: str):
+        async def side_effect(*args, **kwargs):
+            await asyncio.sleep(LATENCIES[name])
+            elapsed = time.perf_counter() - self.started
+            if elapsed < self.outage or random.random() < self.failure_rate:
+                if self.swallow:
+                    self.lost[name] += 1
+                    return False
+                raise ConnectionError(f"{name} unavailable")
+            self.completed[name] += 1
+            return True
+
+        return side_effect
+
+    def install(self) -> None:
+        stripe_webhooks.log_payment_to_sheets = self.stub("sheets")
+        stripe_webhooks.send_payment_confirmation_email = self.stub("email")
+        stripe_webhooks.update_supabase_subscription = self.stub("supabase")
+
+
+def make_burst(events: int, customers: int) -> list[tuple[str, str]]:
+    burst = []
+    for i in range(events):
+        payload = json.dumps(
+            {
+                "id": f"evt_{i}",
+                "object": "event",
+                "type": "checkout.session.completed",
+                "data": {
+                    "object": {
+                        "object": "checkout.session",
+                        "customer": f"cus_{i % customers}",
+                        "customer_email": f"user{i % customers}@example.com",
+                        "amount_total": 2900,
+                        "mode": "subscription",
+                    }
+                },
+            }
+        )
+        timestamp = int(time.time())
+        signature = hmac.new(
+            SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+        ).hexdigest()
+        burst.append((payload, f"t={timestamp},v1={signature}"))
+    return burst
+
+
+async def replay(app: FastAPI, burst: list[tuple[str, str]]) -> tuple[list, Counter]:
+    """POST every event concurrently; returns ack latencies (ms) and statuses"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+
+        async def post(payload: str, signature: str):
+            start = time.perf_counter()
+            response = await c.post(
+                "/api/stripe/webhooks",
+                content=payload,
+                headers={"stripe-signature": signature},
+            )
+            status = response.json().get("status", response.status_code)
+            return (time.perf_counter() - start) * 1000, status
+
+        results = await asyncio.gather(*(post(*event) for event in burst))
+    return sorted(r[0] for r in results), Counter(r[1] for r in results)
+
+
+def percentiles(latencies: list[float]) -> str:
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return f"ack p50 {statistics.median(latencies):8.1f} ms   p99 {p99:8.1f} ms"
+
+
+def peak_per_second(times: list[float]) -> int:
+    return max(Counter(int(t) for t in times).values(), default=0)
+
+
+async def run_queued(args, burst) -> None:
+    effects = SideEffects(args.outage, args.failure_rate, swallow=False)
+    effects.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WebhookQueue(
+            os.path.join(tmp, "webhooks.db"), base_delay=args.base_delay
+        )
+        dispatcher = WebhookDispatcher(queue, workers=args.workers)
+        dispatcher.register("stripe", counted(stripe_webhooks, effects))
+        stripe_webhooks.get_webhook_dispatcher = lambda: dispatcher
+
+        app = FastAPI()
+        app.include_router(stripe_webhooks.router)
+        await dispatcher.start()
+        start = time.perf_counter()
+        latencies, statuses = await replay(app, burst)
+        await dispatcher.drain(timeout=600)
+        drained = time.perf_counter() - start
+        redelivery, duplicates = await replay(app, burst)
+        await dispatcher.stop()
+        stats = queue.stats()
+        queue.close()
+
+    attempts = len(effects.attempt_times)
+    print(f"queued ({args.workers} workers, durable SQLite queue):")
+    print(f"  {percentiles(latencies)}   statuses {dict(statuses)}")
+    print(f"  drained in {drained:.2f} s   done {stats['done']}   dead {stats['dead']}")
+    print(
+        f"  handler attempts {attempts} ({attempts / len(burst):.2f} per event)"
+        f"   peak {peak_per_second(effects.attempt_times)}/s"
+    )
+    print(f"  side effects completed {dict(effects.completed)}")
+    print(f"  redelivered burst: {percentiles(redelivery)}   {dict(duplicates)}")
+
+
+def counted(module, effects: SideEffects):
+    async def handler(event):
+        effects.attempt_times.append(time.perf_counter() - effects.started)
+        await module.process_stripe_event(event)
+
+    return handler
+
+
+async def run_inline(args, burst) -> None:
+    effects = SideEffects(args.outage, args.failure_rate, swallow=True)
+    effects.install()
+    app = FastAPI()
+
+    @app.post("/api/stripe/webhooks")
+    async def legacy_webhook(request: Request):
+        """The endpoint as it was: verify, then run every side effect inline"""
+        payload = await request.body()
+        stripe_webhooks.stripe.Webhook.construct_event(
+            payload, request.headers["stripe-signature"], SECRET
+        )
+        event = stripe_webhooks.WebhookEvent(
+            0, "stripe", "", "checkout.session.completed", "", json.loads(payload)
+        )
+        await stripe_webhooks.process_stripe_event(event)
+        return {"status": "success"}
+
+    start = time.perf_counter()
+    latencies, statuses = await replay(app, burst)
+    elapsed = time.perf_counter() - start
+    print("legacy inline:")
+    print(f"  {percentiles(latencies)}   statuses {dict(statuses)}")
+    print(f"  finished in {elapsed:.2f} s (every redelivery repeats the side effects)")
+    print(f"  side effects completed {dict(effects.completed)}")
+    print(f"  side effects lost      {dict(effects.lost)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--outage", type=float, default=1.0)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--base-delay", type=float, default=0.5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+    logging.disable(logging.WARNING)
+    random.seed(0)
+    stripe_webhooks.STRIPE_WEBHOOK_SECRET = SECRET
+
+    burst = make_burst(args.events, args.customers)
+    print(
+        f"{args.events} checkout events over {args.customers} customers,"
+        f" {args.outage:.1f} s downstream outage, {args.failure_rate:.0%} errors after"
+    )
+    asyncio.run(run_queued(args, burst))
+    asyncio.run(run_inline(args, burst))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
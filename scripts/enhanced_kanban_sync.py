@@ -13,13 +13,17 @@ This script provides a comprehensive solution for:
 import logging
 import os
 import sys
-import time
 from dataclasses import dataclass
 from typing import Optional
 
 import requests
 from dotenv import load_dotenv
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.politeness_scheduler import get_politeness_scheduler
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -59,6 +63,7 @@ class EnhancedGitHubProjectManager:
             }
         )
 
+        self.scheduler = get_politeness_scheduler()
         self.graphql_url = "https://api.github.com/graphql"
         self.graphql_headers = {
             "Authorization": f"Bearer {token}",
@@ -168,9 +173,6 @@ class EnhancedGitHubProjectManager:
                 else:
                     logger.error(f"❌ Failed to create issue: {issue.title}")
 
-                # Rate limiting
-                time.sleep(1)
-
         logger.info(
             f"📊 Successfully created {len(created_issues)}/{len(issues)} issues"
         )
@@ -185,7 +187,9 @@ class EnhancedGitHubProjectManager:
                 "labels": issue.labels,
             }
 
-            response = self.session.post(
+            response = self.scheduler.request(
+                self.session,
+                "POST",
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/issues",
                 json=issue_data,
             )
@@ -219,9 +223,6 @@ class EnhancedGitHubProjectManager:
                         f"❌ Failed to add issue #{issue_number} to project board"
                     )
 
-                # Rate limiting
-                time.sleep(0.5)
-
         logger.info(
             f"📊 Added {success_count}/{len(issue_numbers)} issues to project board"
         )
@@ -231,8 +232,10 @@ class EnhancedGitHubProjectManager:
         """Add a single issue to project board"""
         try:
             # Get issue node ID
-            response = self.session.get(
-                f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{issue_number}"
+            response = self.scheduler.request(
+                self.session,
+                "GET",
+                f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{issue_number}",
             )
 
             if response.status_code != 200:
@@ -259,7 +262,9 @@ class EnhancedGitHubProjectManager:
 
             variables = {"projectId": project_id, "contentId": issue_node_id}
 
-            response = requests.post(
+            response = self.scheduler.request(
+                requests,
+                "POST",
                 self.graphql_url,
                 json={"query": mutation, "variables": variables},
                 headers=self.graphql_headers,
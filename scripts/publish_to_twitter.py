@@ -6,6 +6,7 @@ Publishes daily insights to Twitter via API
 
 import csv
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -13,6 +14,11 @@ from typing import Optional
 import requests
 from dotenv import load_dotenv
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.politeness_scheduler import get_politeness_scheduler
+
 load_dotenv()
 
 
@@ -193,6 +199,7 @@ What SaaS opportunities are you exploring? 👇
                 "Content-Type": "application/json",
             }
 
+            scheduler = get_politeness_scheduler()
             tweet_ids = []
             reply_to_id = None
 
@@ -203,8 +210,12 @@ What SaaS opportunities are you exploring? 👇
                 if reply_to_id:
                     payload["reply"] = {"in_reply_to_tweet_id": reply_to_id}
 
-                response = requests.post(
-                    "https://api.twitter.com/2/tweets", headers=headers, json=payload
+                response = scheduler.request(
+                    requests,
+                    "POST",
+                    "https://api.twitter.com/2/tweets",
+                    headers=headers,
+                    json=payload,
                 )
 
                 if response.status_code == 201:
@@ -213,11 +224,6 @@ What SaaS opportunities are you exploring? 👇
                     tweet_ids.append(tweet_id)
                     reply_to_id = tweet_id  # Next tweet replies to this one
                     print(f"✅ Published tweet {i+1}/{len(tweets)}: {tweet_id}")
-
-                    # Small delay between tweets
-                    import time
-
-                    time.sleep(2)
                 else:
                     print(f"❌ Error publishing tweet {i+1}: {response.status_code}")
                     print(f"Response: {response.text}")
@@ -0,0 +1,198 @@
+"""Unit tests for cached API key validation and batched usage writes."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from app.models.api_key import APIKey, APIKeyUsage
+from app.services.api_key_service import LAST_USED_KEY, APIKeyService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def service(redis_client):
+    service = APIKeyService(redis_client, flush_interval=3600, flush_size=1000)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def api_key(service):
+    api_key = APIKey(customer_id="cus_1", subscription_id="sub_1", tier="pro")
+    service._store_api_key(api_key)
+    service._validated.clear()
+    service.api_keys.clear()
+    return api_key
+
+
+def make_usage(api_key: APIKey, endpoint: str = "/api/v1/insights") -> APIKeyUsage:
+    return APIKeyUsage(
+        api_key=api_key.key,
+        customer_id=api_key.customer_id,
+        endpoint=endpoint,
+        status_code=200,
+        response_time_ms=12.5,
+    )
+
+
+class TestValidationCache:
+    """Test validation is served from cache between Redis reads"""
+
+    def test_reads_redis_once_per_ttl(self, service, api_key):
+        with patch.object(
+            service, "_load_api_key", wraps=service._load_api_key
+        ) as load:
+            for _ in range(50):
+                assert service.validate_api_key(api_key.key).key == api_key.key
+
+        assert load.call_count == 1
+
+    def test_caches_unknown_keys(self, service):
+        with patch.object(
+            service, "_load_api_key", wraps=service._load_api_key
+        ) as load:
+            for _ in range(50):
+                assert service.validate_api_key("sk_live_unknown") is None
+
+        assert load.call_count == 1
+
+    def test_expired_entries_are_reloaded(self, service, api_key):
+        service.validate_api_key(api_key.key)
+        service._validated[api_key.key] = (0.0, api_key)
+
+        with patch.object(
+            service, "_load_api_key", wraps=service._load_api_key
+        ) as load:
+            service.validate_api_key(api_key.key)
+
+        assert load.call_count == 1
+
+    def test_deactivation_takes_effect_immediately(self, service, api_key):
+        assert service.validate_api_key(api_key.key)
+
+        service.deactivate_api_key(api_key.key)
+
+        assert service.validate_api_key(api_key.key) is None
+
+
+class TestBatchedWrites:
+    """Test last-used times and usage records are written per flush"""
+
+    def test_validation_writes_nothing_until_flush(
+        self, service, api_key, redis_client
+    ):
+        ttl = redis_client.ttl(f"api_key:{api_key.key}")
+        redis_client.expire(f"api_key:{api_key.key}", 60)
+        for _ in range(20):
+            service.validate_api_key(api_key.key)
+
+        last_used_key = f"{LAST_USED_KEY}:{api_key.key}"
+        assert redis_client.get(last_used_key) is None
+        assert service.flush() == 1
+        assert redis_client.get(last_used_key) is not None
+        assert redis_client.ttl(last_used_key) >= ttl - 1
+        assert redis_client.ttl(f"api_key:{api_key.key}") >= ttl - 1
+
+        service._validated.clear()
+        reloaded = service.validate_api_key(api_key.key)
+        assert reloaded.last_used is not None
+
+    def test_usage_is_aggregated_per_flush(self, service, api_key, redis_client):
+        for endpoint in ["/a", "/a", "/b"]:
+            service.track_usage(api_key, make_usage(api_key, endpoint))
+
+        assert redis_client.keys("usage_count:*") == []
+
+        stats = service.get_usage_stats(api_key.customer_id)
+
+        assert stats["total_requests"] == 3
+        assert stats["by_endpoint"]["/a"]["count"] == 2
+        assert stats["total_cost"] == pytest.approx(0.003)
+
+    def test_flushes_when_batch_is_full(self, redis_client, api_key):
+        service = APIKeyService(redis_client, flush_interval=3600, flush_size=3)
+        for _ in range(3):
+            service.track_usage(api_key, make_usage(api_key))
+
+        assert redis_client.keys("usage_count:*") != []
+
+    def test_failed_flush_keeps_batch(self, service, api_key, redis_client):
+        service.validate_api_key(api_key.key)
+        service.track_usage(api_key, make_usage(api_key))
+
+        with patch(
+            "redis.client.Pipeline.execute",
+            side_effect=redis.ConnectionError("down"),
+        ):
+            assert service.flush() == 0
+
+        assert service.flush() == 2
+        assert redis_client.get(f"{LAST_USED_KEY}:{api_key.key}") is not None
+
+    def test_rejected_commands_do_not_replay_the_batch(
+        self, service, api_key, redis_client
+    ):
+        usage = make_usage(api_key)
+        customer_month = f"{api_key.customer_id}:{usage.timestamp:%Y-%m}"
+        redis_client.set(f"usage_requests:{customer_month}", "not a hash")
+        service.track_usage(api_key, usage)
+
+        assert service.flush() == 1
+        assert service.flush() == 0
+        assert redis_client.get(f"usage_count:{customer_month}") == "1"
+
+    def test_background_thread_flushes_without_traffic(self, redis_client, api_key):
+        service = APIKeyService(redis_client, flush_interval=0.01, flush_size=1000)
+        service._usage.append((api_key, make_usage(api_key)))
+
+        for _ in range(100):
+            if redis_client.keys("usage_count:*"):
+                break
+            time.sleep(0.01)
+
+        assert redis_client.keys("usage_count:*") != []
+        service.close()
+        assert not service._flusher.is_alive()
+
+
+class TestUsageStats:
+    """Test monthly statistics come from the per-day counters"""
+
+    def test_stats_are_exact_beyond_raw_retention(self, redis_client, api_key):
+        service = APIKeyService(redis_client, raw_event_limit=10)
+        start = datetime(2025, 3, 1, 12, 0)
+        for i in range(300):
+            usage = make_usage(api_key, f"/endpoint_{i % 3}")
+            usage.timestamp = start + timedelta(days=i % 5)
+            service.track_usage(api_key, usage)
+
+        stats = service.get_usage_stats(api_key.customer_id, period="2025-03")
+
+        assert stats["total_requests"] == 300
+        assert stats["total_cost"] == pytest.approx(0.3)
+        assert {e: s["count"] for e, s in stats["by_endpoint"].items()} == {
+            "/endpoint_0": 100,
+            "/endpoint_1": 100,
+            "/endpoint_2": 100,
+        }
+        assert len(stats["by_day"]) == 5
+        assert stats["by_day"]["2025-03-01"] == {"count": 60, "cost": 0.06}
+        assert redis_client.zcard(f"usage:{api_key.customer_id}:2025-03") == 10
+
+    def test_raw_events_can_be_disabled(self, redis_client, api_key):
+        service = APIKeyService(redis_client, raw_event_limit=0)
+        service.track_usage(api_key, make_usage(api_key))
+
+        stats = service.get_usage_stats(api_key.customer_id)
+
+        assert stats["total_requests"] == 1
+        assert redis_client.keys("usage:*") == []
@@ -0,0 +1,150 @@
+"""Unit tests for the micro-batching API optimizer."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core import batch_api_optimizer
+from app.core.batch_api_optimizer import (
+    APICall,
+    BatchAPIOptimizer,
+    FakeAdapter,
+    ProviderAdapter,
+    batch_openai_calls,
+)
+
+
+def make_call(content: str, priority: str = "normal", endpoint: str = "fake/chat"):
+    return APICall(
+        endpoint=endpoint,
+        method="POST",
+        payload={"messages": [{"role": "user", "content": content}]},
+        priority=priority,
+    )
+
+
+def make_optimizer(**kwargs):
+    adapter = FakeAdapter(batch_latency=0.01)
+    optimizer = BatchAPIOptimizer(adapters={"fake": adapter}, **kwargs)
+    return optimizer, adapter
+
+
+def content_of(result):
+    return result["response"]["choices"][0]["message"]["content"]
+
+
+class TestBatchAPIOptimizer:
+    """Test flushing, deduplication and per-call results"""
+
+    def test_each_call_gets_its_own_result(self):
+        optimizer, _ = make_optimizer(max_batch_size=10, batch_timeout=0.05)
+
+        async def run():
+            futures = [await optimizer.add_call(make_call(f"p{i}")) for i in range(5)]
+            return await asyncio.gather(*futures)
+
+        results = asyncio.run(run())
+        assert [content_of(r) for r in results] == [f"p{i}" for i in range(5)]
+
+    def test_flushes_on_size(self):
+        optimizer, adapter = make_optimizer(max_batch_size=4, batch_timeout=10.0)
+
+        async def run():
+            futures = [await optimizer.add_call(make_call(f"p{i}")) for i in range(8)]
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout=1.0)
+
+        asyncio.run(run())
+        assert adapter.batches == [4, 4]
+
+    def test_flushes_on_deadline(self):
+        optimizer, adapter = make_optimizer(max_batch_size=100, batch_timeout=0.05)
+
+        async def run():
+            future = await optimizer.add_call(make_call("lonely"))
+            return await asyncio.wait_for(future, timeout=1.0)
+
+        result = asyncio.run(run())
+        assert content_of(result) == "lonely"
+        assert adapter.batches == [1]
+
+    def test_identical_in_flight_calls_are_deduplicated(self):
+        optimizer, adapter = make_optimizer(max_batch_size=10, batch_timeout=0.05)
+
+        async def run():
+            first = await optimizer.add_call(make_call("same"))
+            second = await optimizer.add_call(make_call("same"))
+            assert first is second
+            return await first
+
+        asyncio.run(run())
+        assert adapter.batches == [1]
+        assert optimizer.get_performance_stats()["deduplicated_calls"] == 1
+
+    def test_high_priority_lane_is_dispatched_first(self):
+        optimizer, _ = make_optimizer(max_batch_size=2, batch_timeout=10.0)
+
+        async def run():
+            await optimizer.add_call(make_call("low", priority="low"))
+            urgent = await optimizer.add_call(make_call("urgent", priority="high"))
+            result = await asyncio.wait_for(urgent, timeout=1.0)
+            await optimizer.flush_pending()
+            return result
+
+        assert content_of(asyncio.run(run())) == "urgent"
+
+    def test_missing_adapter_fails_call_without_raising(self):
+        optimizer, _ = make_optimizer(max_batch_size=1)
+
+        async def run():
+            return await optimizer.submit(make_call("x", endpoint="unknown/chat"))
+
+        result = asyncio.run(run())
+        assert result["success"] is False
+        assert "unknown" in result["error"]
+
+    def test_callbacks_receive_results(self):
+        optimizer, _ = make_optimizer(max_batch_size=1)
+        received = []
+
+        async def callback(result):
+            received.append(content_of(result))
+
+        async def run():
+            call = make_call("with callback")
+            call.callback = callback
+            await optimizer.submit(call)
+
+        asyncio.run(run())
+        assert received == ["with callback"]
+
+    def test_caller_batch_is_dispatched_without_lingering(self, monkeypatch):
+        optimizer = BatchAPIOptimizer(
+            adapters={"openai": FakeAdapter(batch_latency=0.01)}, batch_timeout=10.0
+        )
+        monkeypatch.setattr(batch_api_optimizer, "_batch_optimizer", optimizer)
+
+        start = time.perf_counter()
+        result = asyncio.run(batch_openai_calls(["a", "b", "c"]))
+
+        assert time.perf_counter() - start < 1.0
+        assert [content_of(r) for r in result.results] == ["a", "b", "c"]
+        assert optimizer.adapters["openai"].batches == [3]
+
+    def test_caller_batch_is_split_at_max_batch_size(self):
+        optimizer, adapter = make_optimizer(max_batch_size=4, batch_timeout=10.0)
+
+        async def run():
+            futures = await optimizer.add_calls([make_call(f"p{i}") for i in range(10)])
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout=1.0)
+
+        results = asyncio.run(run())
+        assert [content_of(r) for r in results] == [f"p{i}" for i in range(10)]
+        assert adapter.batches == [4, 4, 2]
+
+    def test_provider_adapter_requires_execute_one(self):
+        class IncompleteAdapter(ProviderAdapter):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteAdapter()
@@ -0,0 +1,167 @@
+"""Unit tests for offline bulk batch jobs with the local provider stand-in."""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pytest
+
+from app.core.batch_jobs import (
+    STATE_DOWNLOADED,
+    STATE_UPLOADED,
+    BulkJobAdapter,
+    BulkJobError,
+    BulkJobRunner,
+    LocalBulkAdapter,
+)
+
+
+@dataclass
+class Request:
+    """Minimal BatchRequest stand-in"""
+
+    id: str
+    prompt: str
+    model: str = "gpt-4o-mini"
+    max_tokens: int = 100
+    temperature: float = 0.0
+    metadata: Optional[dict[str, Any]] = None
+
+
+def make_requests(count: int):
+    for i in range(count):
+        yield Request(id=f"prospect_{i}", prompt=f"Analyze prospect {i}")
+
+
+@pytest.fixture
+def adapter(tmp_path):
+    return LocalBulkAdapter(root_dir=str(tmp_path / "provider"), polls_until_complete=3)
+
+
+def make_runner(adapter, tmp_path):
+    return BulkJobRunner(adapter, work_dir=str(tmp_path / "jobs"), sleep=lambda _: None)
+
+
+class TestBulkJobRunner:
+    """Test the write → upload → submit → poll → download cycle"""
+
+    def test_results_stream_back_by_custom_id(self, adapter, tmp_path):
+        runner = make_runner(adapter, tmp_path)
+
+        results = list(runner.run("nightly", make_requests(5)))
+
+        assert [r["id"] for r in results] == [f"prospect_{i}" for i in range(5)]
+        assert all(r["success"] for r in results)
+        content = results[2]["response"]["choices"][0]["message"]["content"]
+        assert content == "Analyze prospect 2"
+
+    def test_input_file_uses_batch_line_format(self, adapter, tmp_path):
+        runner = make_runner(adapter, tmp_path)
+        manifest = runner.write_input("format", make_requests(2))
+
+        with open(manifest["input_path"]) as f:
+            first_line = f.readline()
+
+        assert '"custom_id": "prospect_0"' in first_line
+        assert '"url": "/v1/chat/completions"' in first_line
+        assert manifest["request_count"] == 2
+
+    def test_resume_after_crash_does_not_resubmit(self, adapter, tmp_path):
+        runner = make_runner(adapter, tmp_path)
+        original_create = adapter.create_job
+
+        def crash(input_file_id):
+            raise RuntimeError("process killed")
+
+        adapter.create_job = crash
+        with pytest.raises(RuntimeError):
+            runner.submit("crashy", make_requests(3))
+        assert runner.load_manifest("crashy")["state"] == STATE_UPLOADED
+
+        # A fresh process resumes from the manifest without re-uploading
+        adapter.create_job = original_create
+        restarted = make_runner(adapter, tmp_path)
+        results = list(restarted.run("crashy"))
+
+        assert len(results) == 3
+        assert adapter.calls["upload"] == 1
+        assert adapter.calls["create_job"] == 1
+
+    def test_completed_job_is_not_downloaded_twice(self, adapter, tmp_path):
+        runner = make_runner(adapter, tmp_path)
+        list(runner.run("done", make_requests(2)))
+
+        results = list(runner.run("done", make_requests(2)))
+
+        assert len(results) == 2
+        assert adapter.calls["download"] == 1
+        assert runner.load_manifest("done")["state"] == STATE_DOWNLOADED
+
+    def test_reused_job_name_with_other_requests_is_rejected(self, adapter, tmp_path):
+        runner = make_runner(adapter, tmp_path)
+        list(runner.run("nightly", make_requests(2)))
+
+        with pytest.raises(BulkJobError):
+            runner.submit("nightly", make_requests(3))
+        assert runner.load_manifest("nightly")["request_count"] == 2
+        assert adapter.calls["create_job"] == 1
+
+    def test_failed_provider_lines_are_reported(self, tmp_path):
+        adapter = LocalBulkAdapter(root_dir=str(tmp_path / "provider"))
+        runner = make_runner(adapter, tmp_path)
+        runner.submit("partial", make_requests(1))
+        manifest = runner.wait("partial")
+
+        with open(manifest["output_path"], "w") as f:
+            f.write(
+                '{"custom_id": "prospect_0", "response": null, '
+                '"error": {"code": "rate_limited"}}\n'
+            )
+
+        (result,) = list(runner.iter_results("partial"))
+        assert result["success"] is False
+        assert result["error"] == {"code": "rate_limited"}
+
+    def test_error_file_rows_are_reported_as_failures(self, tmp_path):
+        def responder(body):
+            content = body["messages"][-1]["content"]
+            if content.endswith("1"):
+                raise ValueError("context_length_exceeded")
+            return {"choices": [{"message": {"content": content}}]}
+
+        adapter = LocalBulkAdapter(
+            root_dir=str(tmp_path / "provider"), responder=responder
+        )
+        runner = make_runner(adapter, tmp_path)
+
+        results = {r["id"]: r for r in runner.run("errors", make_requests(3))}
+
+        assert set(results) == {"prospect_0", "prospect_1", "prospect_2"}
+        assert results["prospect_1"]["success"] is False
+        assert results["prospect_1"]["error"]["status_code"] == 500
+        assert results["prospect_0"]["success"] and results["prospect_2"]["success"]
+
+    def test_requests_missing_from_results_are_reported(self, tmp_path):
+        adapter = LocalBulkAdapter(root_dir=str(tmp_path / "provider"))
+        runner = make_runner(adapter, tmp_path)
+        runner.submit("missing", make_requests(2))
+        manifest = runner.wait("missing")
+
+        with open(manifest["output_path"]) as f:
+            first_line = f.readline()
+        with open(manifest["output_path"], "w") as f:
+            f.write(first_line)
+
+        results = list(runner.iter_results("missing"))
+        assert [r["id"] for r in results] == ["prospect_0", "prospect_1"]
+        assert results[1] == {
+            "id": "prospect_1",
+            "success": False,
+            "error": {"type": "missing_result"},
+        }
+
+    def test_bulk_job_adapter_is_abstract(self):
+        class IncompleteAdapter(BulkJobAdapter):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteAdapter()
@@ -19,7 +19,7 @@ class TestCostTracker:
     @pytest.fixture
     def cost_tracker(self):
         """Initialize cost tracker with test config"""
-        return CostTracker(test_mode=True)
+        return CostTracker(test_mode=True, db_path=":memory:")
 
     @pytest.fixture
     def sample_revenue_event(self):
@@ -255,3 +255,73 @@ class TestCostTracker:
         assert dashboard_data["last_updated"]
         update_time = datetime.fromisoformat(dashboard_data["last_updated"])
         assert (datetime.now() - update_time).seconds < 60
+
+
+class TestCostEventStore:
+    """Test the time-indexed, persistent event store behind CostTracker"""
+
+    @pytest.fixture
+    def cost_tracker(self):
+        return CostTracker(test_mode=True, db_path=":memory:")
+
+    def test_events_and_subscriptions_survive_restart(self, tmp_path):
+        db_path = str(tmp_path / "cost_tracker.db")
+        tracker = CostTracker(test_mode=True, db_path=db_path)
+        tracker.add_subscription("persist_001", tier="pro", amount=99.00)
+        tracker.add_cost_event("claude_api", 0.25, {"tokens": 1000})
+        tracker.store.close()
+
+        restarted = CostTracker(test_mode=True, db_path=db_path)
+
+        assert restarted.calculate_mrr() == 99.00
+        assert restarted.get_daily_revenue() == 99.00
+        assert restarted.get_daily_costs() == 0.25
+        assert len(restarted.revenue_events) == 1
+        assert restarted.cost_events[0].metadata == {"tokens": 1000}
+        assert restarted.subscriptions["persist_001"]["tier"] == "pro"
+
+    def test_trackers_sharing_a_database_see_each_others_events(self, tmp_path):
+        db_path = str(tmp_path / "cost_tracker.db")
+        writer = CostTracker(test_mode=True, db_path=db_path)
+        reader = CostTracker(test_mode=True, db_path=db_path)
+        writer.add_cost_event("claude_api", 0.25, {})
+        assert reader.get_daily_costs() == 0.25
+
+        writer.add_cost_event("claude_api", 0.50, {})
+
+        assert reader.get_daily_costs() == 0.75
+        assert len(reader.cost_events) == 2
+
+    def test_range_totals_with_late_events(self, cost_tracker):
+        now = datetime.now()
+        # Recorded out of time order, as a backfill would be
+        for days_ago, amount in [(1, 10.0), (30, 5.0), (3, 20.0), (30, 2.0)]:
+            cost_tracker.add_revenue_event(
+                RevenueEvent(
+                    customer_id=f"late_{days_ago}",
+                    amount=amount,
+                    timestamp=now - timedelta(days=days_ago, minutes=-1),
+                )
+            )
+
+        index = cost_tracker.store.index("revenue")
+        start = (now - timedelta(days=4)).timestamp()
+        assert index.total(start, now.timestamp()) == 30.0
+        assert cost_tracker.get_daily_revenue(now - timedelta(days=3)) == 20.0
+        assert cost_tracker.calculate_growth_rate(period_days=30) == pytest.approx(
+            ((10.0 - 7.0) / 7.0) * 100
+        )
+
+    def test_ai_cost_breakdown_uses_service_totals(self, cost_tracker):
+        for service, cost in [("claude_api", 0.5), ("openai", 0.25), ("serpapi", 1)]:
+            cost_tracker.add_cost_event(service, cost)
+        cost_tracker.add_cost_event("anthropic", 0.5)
+
+        breakdown = cost_tracker.get_dashboard_metrics()["ai_costs"]
+
+        assert breakdown == {
+            "claude": 1.0,
+            "openai": 0.25,
+            "gemini": 0.0,
+            "total": 1.25,
+        }
@@ -0,0 +1,116 @@
+"""Unit tests for the memory-mapped embedding cache."""
+
+import numpy as np
+import pytest
+
+from app.core.embedding_cache import EmbeddingCache
+
+
+def fake_encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array(
+            [[len(t), i, 1.0] for i, t in enumerate(texts)], dtype=np.float32
+        )
+
+    return encode
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(root_dir=str(tmp_path), initial_capacity=2)
+    yield cache
+    cache.close()
+
+
+class TestEmbeddingCache:
+    """Test lookups, persistence, growth and eviction"""
+
+    def test_only_missing_texts_are_computed(self, cache):
+        calls = []
+        cache.get_or_compute("m", ["a", "bb"], fake_encoder(calls))
+
+        vectors = cache.get_or_compute(
+            "m", ["bb", "ccc", "a", "ccc"], fake_encoder(calls)
+        )
+
+        assert calls == [["a", "bb"], ["ccc"]]
+        assert vectors.shape == (4, 3)
+        assert vectors[0][0] == 2 and vectors[1][0] == 3 and vectors[2][0] == 1
+
+    def test_models_are_cached_separately(self, cache):
+        calls = []
+        cache.get_or_compute("small", ["text"], fake_encoder(calls))
+        cache.get_or_compute("large", ["text"], fake_encoder(calls))
+
+        assert len(calls) == 2
+
+    def test_vectors_persist_across_instances(self, tmp_path):
+        first = EmbeddingCache(root_dir=str(tmp_path))
+        first.put_many("m", ["x", "y"], np.array([[1, 2], [3, 4]]))
+        first.close()
+
+        reopened = EmbeddingCache(root_dir=str(tmp_path))
+        x, missing, y = reopened.get_many("m", ["x", "z", "y"])
+
+        assert x.tolist() == [1, 2] and y.tolist() == [3, 4]
+        assert missing is None
+        reopened.close()
+
+    def test_matrix_grows_then_evicts_least_recently_used(self, tmp_path):
+        cache = EmbeddingCache(
+            root_dir=str(tmp_path), max_entries=3, initial_capacity=1
+        )
+        for i, text in enumerate(["a", "b", "c"]):
+            cache.put_many("m", [text], np.array([[i, i]]))
+        cache.get_many("m", ["a"])  # refresh "a" so "b" is the oldest
+
+        cache.put_many("m", ["d"], np.array([[9, 9]]))
+
+        a, b, c, d = cache.get_many("m", ["a", "b", "c", "d"])
+        assert b is None
+        assert a.tolist() == [0, 0] and c.tolist() == [2, 2] and d.tolist() == [9, 9]
+        assert cache.get_stats()["entries"] == {"m": 3}
+        cache.close()
+
+    def test_float16_storage_and_dimension_check(self, tmp_path):
+        cache = EmbeddingCache(root_dir=str(tmp_path), dtype="float16")
+        cache.put_many("m", ["x"], np.array([[0.5, 0.25]]))
+
+        (x,) = cache.get_many("m", ["x"])
+        assert x.dtype == np.float32 and x.tolist() == [0.5, 0.25]
+        with pytest.raises(ValueError):
+            cache.put_many("m", ["y"], np.array([[1.0, 2.0, 3.0]]))
+        cache.close()
+
+    def test_switching_dtype_does_not_return_rows_from_other_format(self, tmp_path):
+        first = EmbeddingCache(root_dir=str(tmp_path), dtype="float32")
+        first.put_many("m", ["x"], np.array([[0.5, 0.25]]))
+        first.close()
+
+        switched = EmbeddingCache(root_dir=str(tmp_path), dtype="float16")
+        assert switched.get_many("m", ["x"]) == [None]
+        switched.put_many("m", ["x"], np.array([[1.0, 2.0]]))
+        switched.close()
+
+        reopened = EmbeddingCache(root_dir=str(tmp_path), dtype="float32")
+        (x,) = reopened.get_many("m", ["x"])
+        assert x.tolist() == [0.5, 0.25]
+        reopened.close()
+
+    def test_rows_without_entries_are_reclaimed_when_full(self, tmp_path):
+        cache = EmbeddingCache(
+            root_dir=str(tmp_path), max_entries=2, initial_capacity=2
+        )
+        cache.put_many("m", ["a", "b"], np.array([[1, 1], [2, 2]]))
+        # Orphan a row, as an interrupted write could
+        cache._conn.execute(
+            "DELETE FROM entries WHERE text_hash = ?", (cache.make_key("b"),)
+        )
+
+        cache.put_many("m", ["c", "d"], np.array([[3, 3], [4, 4]]))
+
+        a, c, d = cache.get_many("m", ["a", "c", "d"])
+        assert a is None
+        assert c.tolist() == [3, 3] and d.tolist() == [4, 4]
+        cache.close()
@@ -0,0 +1,229 @@
+"""Unit tests for batched, deduplicated ingest in EnterpriseRAGSystem."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.embedding_cache import EmbeddingCache
+from app.core.enhanced_rag_system import EnterpriseRAGSystem, RAGQuery
+from app.core.lexical_index import BM25Index
+
+
+class FakeModel:
+    """Records how many texts each encode call received"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.calls.append(len(texts))
+        return np.ones((len(texts), 4), dtype=np.float64)
+
+
+class FakeCollection:
+    """Implements the slice of the Chroma collection API used by ingest"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, embeddings, documents, metadatas, ids):
+        for i, row_id in enumerate(ids):
+            self.rows[row_id] = metadatas[i]
+
+    def get(self, where, include):
+        wanted = set(where["content_hash"]["$in"])
+        return {
+            "metadatas": [m for m in self.rows.values() if m["content_hash"] in wanted]
+        }
+
+
+@pytest.fixture
+def make_system(tmp_path, monkeypatch):
+    """Build systems with Chroma under tmp_path and no model download"""
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "false")
+
+    def make(batch_size=8, model=None, cache_namespace=None):
+        system = EnterpriseRAGSystem(
+            embedding_batch_size=batch_size,
+            persist_dir=str(tmp_path / "chroma"),
+            embedding_model=model or FakeModel(),
+            cache_namespace=cache_namespace,
+        )
+        system.collection = FakeCollection()
+        system.lexical_index = None
+        return system
+
+    return make
+
+
+# Long enough to fill a whole chunk on its own
+SHARED_SECTION = "".join(
+    f"Disclaimer clause {i}: figures are unaudited and subject to revision. "
+    for i in range(15)
+)
+
+
+class TestBatchedIngest:
+    """Test chunk batching, content-hash dedup and bulk ingest"""
+
+    def test_document_is_encoded_in_one_call(self, make_system):
+        system = make_system()
+        content = ". ".join(f"Sentence number {i} about pricing" * 5 for i in range(20))
+
+        result = asyncio.run(system.ingest_document(content, {"title": "doc"}))
+
+        assert result["chunks_created"] > 1
+        assert system.embedding_model.calls == [result["chunks_created"]]
+
+    def test_identical_chunks_are_not_re_embedded(self, make_system):
+        system = make_system()
+        first = asyncio.run(
+            system.ingest_document(SHARED_SECTION + "Q1 churn fell.", {})
+        )
+        second = asyncio.run(
+            system.ingest_document(SHARED_SECTION + "Q2 churn rose.", {})
+        )
+
+        assert first["chunks_embedded"] == first["chunks_created"] == 2
+        assert second["chunks_created"] == 2
+        assert second["chunks_embedded"] == 1
+        assert system.embedding_model.calls == [2, 1]
+
+    def test_known_hashes_are_looked_up_in_collection(self, make_system):
+        system = make_system()
+        asyncio.run(system.ingest_document("Stored before restart.", {}))
+
+        restarted = make_system()
+        restarted.collection = system.collection
+        result = asyncio.run(
+            restarted.ingest_document("Stored before restart.", {"v": 2})
+        )
+
+        assert result["chunks_embedded"] == 0
+        assert restarted.embedding_model.calls == []
+
+    def test_bulk_ingest_consumes_generator_in_bounded_batches(self, make_system):
+        system = make_system(batch_size=4)
+        documents = (
+            (f"Report {i} shows MRR growth of {i}%.", {"n": i}) for i in range(30)
+        )
+
+        result = asyncio.run(system.ingest_documents(documents, flush_size=10))
+
+        assert result["documents"] == 30
+        assert result["embedded"] == len(system.collection.rows) == 30
+        assert system.embedding_model.calls == [10, 10, 10]
+
+    def test_rebuild_is_served_from_embedding_cache(self, make_system, tmp_path):
+        cache = EmbeddingCache(root_dir=str(tmp_path))
+        documents = [(f"Competitor {i} cut prices.", {}) for i in range(5)]
+
+        first = make_system(cache_namespace="fake")
+        first.embedding_cache = cache
+        asyncio.run(first.ingest_documents(iter(documents)))
+
+        # Fresh collection, e.g. after deleting the index to rebuild it
+        rebuilt = make_system(cache_namespace="fake")
+        rebuilt.embedding_cache = cache
+        result = asyncio.run(rebuilt.ingest_documents(iter(documents)))
+
+        assert result["embedded"] == 5
+        assert rebuilt.embedding_model.calls == []
+        cache.close()
+
+    def test_cache_is_keyed_by_the_model_in_use(self, make_system, tmp_path):
+        cache = EmbeddingCache(root_dir=str(tmp_path))
+        documents = [(f"Competitor {i} cut prices.", {}) for i in range(5)]
+        first = make_system(cache_namespace="fake")
+        first.embedding_cache = cache
+        asyncio.run(first.ingest_documents(iter(documents)))
+
+        other = make_system(cache_namespace="other")
+        unnamed = make_system()
+        for system in (other, unnamed):
+            system.embedding_cache = cache
+            asyncio.run(system.ingest_documents(iter(documents)))
+
+        assert other.embedding_model.calls == [5]
+        assert unnamed.embedding_model.calls == [5]
+        assert cache.get_stats()["entries"] == {"fake": 5, "other": 5}
+        cache.close()
+
+
+class JargonBlindModel:
+    """Embeds every query and every non-Zapier text onto the same axis"""
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return np.array([1.0, 0.0])
+        return np.array(
+            [[0.0, 1.0] if "zapier" in t.lower() else [1.0, 0.0] for t in texts]
+        )
+
+
+class TestHybridQuery:
+    """Test BM25 fusion and metadata pre-filtering on a real collection"""
+
+    @pytest.fixture
+    def system(self, make_system, tmp_path):
+        pytest.importorskip("chromadb")
+        system = make_system(model=JargonBlindModel())
+        system.collection = system.chroma_client.create_collection("hybrid_test")
+        system.lexical_index = BM25Index(str(tmp_path / "bm25.db"))
+        asyncio.run(
+            system.ingest_document(
+                "Our pricing page confuses buyers.",
+                {"source": "reddit"},
+                "market_analysis",
+            )
+        )
+        asyncio.run(
+            system.ingest_document(
+                "Zapier zaps keep failing overnight.",
+                {"source": "reddit"},
+                "technical",
+            )
+        )
+        return system
+
+    def test_exact_name_is_only_found_by_hybrid(self, system):
+        vector_only = asyncio.run(
+            system.query_knowledge_base(RAGQuery("Zapier failing", hybrid=False))
+        )
+        hybrid = asyncio.run(system.query_knowledge_base(RAGQuery("Zapier failing")))
+
+        assert all("Zapier" not in s["content"] for s in vector_only.sources)
+        assert any(s["content"].startswith("Zapier") for s in hybrid.sources)
+
+    def test_filters_apply_to_both_sides(self, system):
+        response = asyncio.run(
+            system.query_knowledge_base(
+                RAGQuery("Zapier failing", document_types=["market_analysis"])
+            )
+        )
+
+        assert [s["metadata"]["document_type"] for s in response.sources] == [
+            "market_analysis"
+        ]
+
+
+class TestQueryCache:
+    """Test query caching in query_knowledge_base"""
+
+    def test_cache_keys_on_full_query_and_clears_on_ingest(self, make_system):
+        system = make_system()
+        system.collection = None  # mock mode: answers come from an empty store
+
+        asyncio.run(system.query_knowledge_base(RAGQuery("MRR trends")))
+        asyncio.run(system.query_knowledge_base(RAGQuery("MRR trends")))
+        asyncio.run(
+            system.query_knowledge_base(RAGQuery("MRR trends", user_role="ceo"))
+        )
+        assert system.query_cache.get_stats()["hits"] == 1
+        assert system.performance_metrics["cache_hit_rate"] == 1 / 3
+
+        system.collection = FakeCollection()
+        asyncio.run(system.ingest_document("New MRR report.", {}))
+
+        assert len(system.query_cache) == 0
@@ -0,0 +1,136 @@
+"""Unit tests for the shared pooled HTTP client registry."""
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.core.http_client import HTTPClientConfig, HTTPClientRegistry  # noqa: E402
+
+
+def make_registry(handler, **config):
+    registry = HTTPClientRegistry(
+        {"default": HTTPClientConfig(backoff_base=0.0, **config)}
+    )
+    registry._build_client = lambda name: httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    return registry
+
+
+class TestHTTPClientRegistry:
+    """Test client reuse, retries and shutdown"""
+
+    def test_client_is_shared_within_a_loop(self):
+        registry = make_registry(lambda request: httpx.Response(200))
+
+        async def run():
+            first = registry.get()
+            second = registry.get()
+            await registry.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert first.is_closed
+
+    def test_client_is_rebuilt_for_a_new_loop(self):
+        registry = make_registry(lambda request: httpx.Response(200))
+
+        first = asyncio.run(self._get(registry))
+        second = asyncio.run(self._get(registry))
+        assert first is not second
+
+    @staticmethod
+    async def _get(registry):
+        return registry.get()
+
+    def test_retries_retryable_status(self):
+        statuses = iter([503, 429, 200])
+        registry = make_registry(
+            lambda request: httpx.Response(next(statuses), headers={"Retry-After": "0"})
+        )
+
+        response = asyncio.run(registry.request("GET", "https://api.example.com/"))
+
+        assert response.status_code == 200
+        assert registry.get_stats()["retries"] == 2
+
+    def test_returns_last_response_when_retries_exhausted(self):
+        registry = make_registry(lambda request: httpx.Response(503), max_retries=1)
+
+        response = asyncio.run(registry.request("GET", "https://api.example.com/"))
+
+        assert response.status_code == 503
+        assert registry.get_stats()["retries"] == 1
+
+    def test_post_is_not_resent_after_a_gateway_error(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        registry = make_registry(handler)
+
+        response = asyncio.run(registry.request("POST", "https://api.example.com/"))
+
+        assert response.status_code == 502
+        assert len(calls) == 1
+
+    def test_post_is_retried_when_it_never_reached_the_server(self):
+        outcomes = iter([httpx.ConnectError("refused"), httpx.Response(200)])
+
+        def handler(request):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        registry = make_registry(handler)
+
+        response = asyncio.run(registry.request("POST", "https://api.example.com/"))
+
+        assert response.status_code == 200
+        assert registry.get_stats()["retries"] == 1
+
+    def test_post_is_retried_on_rate_limit_or_when_marked_safe(self):
+        statuses = iter([429, 200, 503, 200])
+        registry = make_registry(
+            lambda request: httpx.Response(next(statuses), headers={"Retry-After": "0"})
+        )
+
+        async def run():
+            limited = await registry.request("POST", "https://api.example.com/")
+            unsafe = await registry.request(
+                "POST", "https://api.example.com/", retry_unsafe=True
+            )
+            return limited, unsafe
+
+        limited, unsafe = asyncio.run(run())
+
+        assert limited.status_code == 200 and unsafe.status_code == 200
+        assert registry.get_stats()["retries"] == 2
+
+    def test_host_slot_is_released_while_backing_off(self, monkeypatch):
+        statuses = iter([503, 200])
+        registry = make_registry(
+            lambda request: httpx.Response(
+                next(statuses), headers={"Retry-After": "0"}
+            ),
+            per_host_limit=1,
+        )
+        slot_held = []
+        sleep = asyncio.sleep
+
+        async def watching_sleep(delay):
+            host = registry._host_limit("default", "https://api.example.com/")
+            slot_held.append(host.locked())
+            await sleep(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", watching_sleep)
+        response = asyncio.run(registry.request("GET", "https://api.example.com/"))
+
+        assert response.status_code == 200
+        assert slot_held == [False]
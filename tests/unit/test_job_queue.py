@@ -0,0 +1,198 @@
+"""Unit tests for the durable job queue and MCPCoordinator dispatch."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core.job_queue import DurableJobQueue
+from app.core.mcp_multi_agent_coordinator import (
+    AgentType,
+    JobPriority,
+    JobStatus,
+    MCPCoordinator,
+)
+from app.core.session_memory import SessionMemoryManager
+
+
+class TestDurableJobQueue:
+    """Test priority order, dependency release and restart recovery"""
+
+    def test_priority_then_submission_order(self):
+        queue = DurableJobQueue()
+        queue.push("low", "claude", 1, {})
+        queue.push("high_1", "gemini", 3, {})
+        queue.push("high_2", "claude", 3, {})
+
+        assert [queue.pop(), queue.pop(), queue.pop(), queue.pop()] == [
+            "high_1",
+            "high_2",
+            "low",
+            None,
+        ]
+
+    def test_pop_skips_full_lanes(self):
+        queue = DurableJobQueue()
+        queue.push("claude_job", "claude", 4, {})
+        queue.push("gemini_job", "gemini", 1, {})
+
+        assert queue.pop(["gemini", "chatgpt"]) == "gemini_job"
+        assert queue.pop(["gemini"]) is None
+
+    def test_dependents_release_when_indegree_reaches_zero(self):
+        queue = DurableJobQueue()
+        queue.push("a", "claude", 2, {})
+        queue.push("b", "claude", 2, {})
+        assert queue.push("c", "claude", 2, {}, dependencies=["a", "b"]) is False
+
+        assert queue.pop() == "a"
+        assert queue.complete("a", {}) == []
+        assert queue.pop() == "b"
+        assert queue.complete("b", {}) == ["c"]
+        assert queue.pop() == "c"
+
+    def test_failure_cancels_transitive_dependents(self):
+        queue = DurableJobQueue()
+        queue.push("a", "claude", 2, {})
+        queue.push("b", "claude", 2, {})
+        queue.push("c", "claude", 2, {}, dependencies=["a", "b"])
+        queue.push("d", "gemini", 2, {}, dependencies=["c"])
+
+        assert queue.pop() == "a"
+        assert queue.fail("a", {}) == ["c", "d"]
+        assert queue.status("d") == "cancelled"
+        assert queue.pop() == "b"
+        assert queue.complete("b", {}) == []
+        assert queue.push("late", "claude", 2, {}, dependencies=["a"]) is False
+        assert queue.status("late") == "cancelled"
+        assert queue.stats() == {
+            "pending": 0,
+            "ready": 0,
+            "blocked": 0,
+            "completed": 1,
+        }
+
+    def test_restart_restores_unfinished_jobs(self, tmp_path):
+        db_path = tmp_path / "jobs.db"
+        queue = DurableJobQueue(db_path)
+        queue.push("done", "claude", 2, {"id": "done"})
+        queue.push("running", "claude", 2, {"id": "running"})
+        queue.push("waiting", "claude", 2, {"id": "waiting"}, dependencies=["done"])
+        queue.complete(queue.pop(), {"id": "done"})
+        assert queue.pop() == "running"
+        queue.close()
+
+        restored = DurableJobQueue(db_path)
+
+        assert [r["id"] for r in restored.pending_records()] == ["running", "waiting"]
+        assert restored.stats() == {
+            "pending": 2,
+            "ready": 2,
+            "blocked": 0,
+            "completed": 1,
+        }
+
+
+class TestMCPCoordinatorDispatch:
+    """Test continuous dispatch with per-agent concurrency limits"""
+
+    @pytest.fixture
+    def coordinator(self, tmp_path):
+        memory = SessionMemoryManager(memory_dir=str(tmp_path / "memory"))
+        with patch(
+            "app.core.mcp_multi_agent_coordinator.get_session_memory_manager",
+            return_value=memory,
+        ):
+            return MCPCoordinator(data_dir=str(tmp_path))
+
+    async def _submit(self, coordinator, agent, name, **kwargs):
+        return await coordinator.submit_job(
+            agent_type=agent,
+            job_type="test",
+            title=name,
+            description=name,
+            payload={},
+            **kwargs,
+        )
+
+    def test_runs_dependency_chain_and_respects_agent_limits(self, coordinator):
+        running = dict.fromkeys(AgentType, 0)
+        peak = dict.fromkeys(AgentType, 0)
+        order = []
+
+        async def stub(job):
+            running[job.agent_type] += 1
+            peak[job.agent_type] = max(peak[job.agent_type], running[job.agent_type])
+            await asyncio.sleep(0.001)
+            running[job.agent_type] -= 1
+            order.append(job.title)
+            return {"agent": job.agent_type.value}
+
+        async def scenario():
+            first = await self._submit(coordinator, AgentType.GEMINI, "first")
+            await self._submit(
+                coordinator, AgentType.CLAUDE, "second", dependencies=[first]
+            )
+            for i in range(12):
+                await self._submit(coordinator, AgentType.GEMINI, f"gemini_{i}")
+            return await coordinator.execute_parallel_jobs(max_concurrent=10)
+
+        with (
+            patch.object(coordinator, "_execute_claude_job", side_effect=stub),
+            patch.object(coordinator, "_execute_gemini_job", side_effect=stub),
+        ):
+            results = asyncio.run(scenario())
+
+        stats = results["execution_stats"]
+        assert stats["jobs_completed"] == 14
+        assert stats["remaining_queue_size"] == 0
+        assert order.index("first") < order.index("second")
+        assert (
+            peak[AgentType.GEMINI]
+            == coordinator.agents[AgentType.GEMINI]["max_concurrent"]
+        )
+
+    def test_retries_then_fails_and_cancels_dependents(self, coordinator):
+        async def scenario():
+            flaky = await self._submit(
+                coordinator, AgentType.CHATGPT, "flaky", priority=JobPriority.HIGH
+            )
+            await self._submit(
+                coordinator, AgentType.CLAUDE, "after", dependencies=[flaky]
+            )
+            return await coordinator.execute_parallel_jobs()
+
+        with patch.object(
+            coordinator, "_execute_chatgpt_job", side_effect=RuntimeError("boom")
+        ) as chatgpt:
+            results = asyncio.run(scenario())
+
+        assert chatgpt.call_count == 4  # first attempt plus max_retries
+        assert results["failed"][0]["error"] == "boom"
+        assert coordinator.completed_jobs[0].status == JobStatus.FAILED
+        assert results["cancelled"][0]["dependency"] == results["failed"][0]["job_id"]
+        assert coordinator.completed_jobs[1].status == JobStatus.CANCELLED
+        assert coordinator.get_queue_status()["blocked_jobs"] == 0
+        assert not coordinator.pending_jobs
+
+    def test_legacy_queue_file_is_migrated(self, tmp_path):
+        (tmp_path / "mcp_job_queue.json").write_text("""[
+            {"id": "legacy_done", "agent_type": "AgentType.CLAUDE",
+             "job_type": "t", "title": "t", "description": "d", "payload": {},
+             "priority": "JobPriority.HIGH", "status": "JobStatus.COMPLETED",
+             "created_at": "2025-06-06 18:51:00"},
+            {"id": "legacy_pending", "agent_type": "AgentType.GEMINI",
+             "job_type": "t", "title": "t", "description": "d", "payload": {},
+             "priority": "JobPriority.LOW", "status": "JobStatus.PENDING",
+             "created_at": "2025-06-06 18:51:00"}
+            ]""")
+        memory = SessionMemoryManager(memory_dir=str(tmp_path / "memory"))
+        with patch(
+            "app.core.mcp_multi_agent_coordinator.get_session_memory_manager",
+            return_value=memory,
+        ):
+            coordinator = MCPCoordinator(data_dir=str(tmp_path))
+
+        assert list(coordinator.pending_jobs) == ["legacy_pending"]
+        assert coordinator.queue.pop() == "legacy_pending"
+        assert (tmp_path / "mcp_job_queue.json.migrated").exists()
@@ -0,0 +1,59 @@
+"""Unit tests for the shared compiled keyword classifier."""
+
+import pandas as pd
+
+from app.utils.keyword_classifier import (
+    PAIN_POINT_CATEGORIES,
+    URGENCY_LEVELS,
+    analyze_sentiment,
+    classify_frame,
+    count_keywords,
+)
+
+TEXTS = [
+    "Urgent: our API sync breaks every night",
+    "Manual invoicing workflow eats our team's week",
+    "Great dashboard, love it",
+    "Terrible billing problem at enterprise scale",
+    "",
+    "We are a bootstrapped startup and need help with GDPR",
+]
+
+
+class TestKeywordClassifier:
+    """Test first-match semantics and the vectorized frame path"""
+
+    def test_first_matching_rule_wins(self):
+        # "api" (integration) outranks "workflow" (automation)
+        assert PAIN_POINT_CATEGORIES.classify("API workflow pain") == "integration"
+        assert PAIN_POINT_CATEGORIES.classify("Workflow pain") == "automation"
+        assert PAIN_POINT_CATEGORIES.classify("Nothing relevant") == "general"
+
+    def test_substring_matching_is_preserved(self):
+        # The legacy checks were plain substring tests, so "rapid" contains "api"
+        assert PAIN_POINT_CATEGORIES.classify("rapid growth") == "integration"
+        assert URGENCY_LEVELS.classify("NEEDS attention") == "medium"
+
+    def test_sentiment_and_counts(self):
+        assert analyze_sentiment("Great tool but one problem") == "neutral"
+        assert analyze_sentiment("frustrating and awful") == "negative"
+        assert count_keywords("MRR and ARR churn", ["mrr", "arr", "churn", "roi"]) == 3
+
+    def test_classify_frame_matches_scalar_rules(self):
+        df = pd.DataFrame({"pain_point": TEXTS + [None]}, index=range(10, 17))
+
+        result = classify_frame(df, "pain_point")
+
+        assert list(result.index) == list(df.index)
+        assert list(result.columns) == ["category", "urgency", "company_size", "sentiment"]
+        for text, row in zip(TEXTS, result.itertuples(), strict=False):
+            assert row.category == PAIN_POINT_CATEGORIES.classify(text)
+            assert row.urgency == URGENCY_LEVELS.classify(text)
+            assert row.sentiment == analyze_sentiment(text)
+        assert result.iloc[-1].to_dict() == {
+            "category": "general",
+            "urgency": "low",
+            "company_size": "unknown",
+            "sentiment": "neutral",
+        }
+        assert result.loc[15, "company_size"] == "startup"
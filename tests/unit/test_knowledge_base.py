@@ -0,0 +1,89 @@
+"""Unit tests for incremental KnowledgeBaseBuilder builds."""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from app.core.knowledge_base import KnowledgeBaseBuilder  # noqa: E402
+
+CSV_HEADER = "date,subreddit,score,comment_count,pain_point\n"
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "reports").mkdir()
+    return KnowledgeBaseBuilder(manifest_path=str(tmp_path / "manifest.json"))
+
+
+def write_csv(path, rows, mtime=None):
+    path.write_text(CSV_HEADER + "".join(f"{row}\n" for row in rows))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def sync(builder, index_name="reddit_pain_points", full=False):
+    update = asyncio.run(builder.build_incremental(index_name, full=full))
+    builder.commit_incremental(update, full=full)
+    return update
+
+
+class TestIncrementalBuild:
+    """Test manifest-driven change detection"""
+
+    def test_first_build_emits_every_row_with_stable_ids(self, builder, tmp_path):
+        write_csv(
+            tmp_path / "data" / "metrics-2024-01-01.csv",
+            ["2024-01-01,SaaS,10,3,Manual invoicing", "2024-01-01,SaaS,5,1,API sync"],
+        )
+
+        update = sync(builder, full=True)
+
+        assert len(update.upserts) == 2
+        assert all(
+            doc.doc_id.startswith("data/metrics-2024-01-01.csv#")
+            for doc in update.upserts
+        )
+        assert update.deletes == []
+
+    def test_unchanged_files_produce_no_work(self, builder, tmp_path):
+        write_csv(tmp_path / "data" / "metrics-a.csv", ["2024,SaaS,1,1,Churn"])
+        sync(builder, full=True)
+
+        update = sync(builder)
+
+        assert update.upserts == [] and update.deletes == []
+        assert update.unchanged_files == 1
+
+    def test_only_new_and_changed_rows_are_emitted(self, builder, tmp_path):
+        path = tmp_path / "data" / "metrics-a.csv"
+        write_csv(path, ["2024,SaaS,1,1,Churn", "2024,SaaS,2,2,Pricing"], mtime=1000)
+        first = sync(builder, full=True)
+        pricing_id = next(d.doc_id for d in first.upserts if "Pricing" in d.text)
+
+        write_csv(
+            path,
+            ["2024,SaaS,1,1,Churn", "2024,SaaS,9,2,Pricing", "2024,SaaS,3,0,Onboarding"],
+            mtime=2000,
+        )
+        update = sync(builder)
+
+        assert sorted("Pricing" in d.text for d in update.upserts) == [False, True]
+        assert update.deletes == [pricing_id]
+
+    def test_removed_files_delete_their_documents(self, builder, tmp_path):
+        path = tmp_path / "data" / "reddit_export.json"
+        path.write_text(json.dumps([{"text": "Need automation", "subreddit": "SaaS"}]))
+        first = sync(builder, full=True)
+
+        path.unlink()
+        update = sync(builder)
+
+        assert update.deletes == [first.upserts[0].doc_id]
+        assert update.removed_files == ["data/reddit_export.json"]
+        assert builder.manifest.files("reddit_pain_points") == {}
@@ -0,0 +1,86 @@
+"""Unit tests for the BM25 sidecar and rank fusion."""
+
+import pytest
+
+from app.core.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.upsert(
+        ["hubspot", "zapier", "generic", "long"],
+        [
+            "HubSpot sync drops contacts",
+            "Zapier zaps fail and the sync drops rows",
+            "Sync issues everywhere",
+            "Sync " + "filler words " * 50 + "HubSpot",
+        ],
+        [
+            {"source": "reddit", "score": 10},
+            {"source": "reddit", "score": 3},
+            {"source": "github", "score": 7},
+            {"source": "reddit", "score": 1, "_node_content": "{...}"},
+        ],
+    )
+    yield index
+    index.close()
+
+
+class TestBM25Index:
+    """Test ranking, filters, deletes and persistence"""
+
+    def test_rare_terms_and_short_documents_rank_first(self, index):
+        ranked = [doc_id for doc_id, _ in index.search("HubSpot sync")]
+
+        assert ranked[0] == "hubspot"
+        assert ranked.index("hubspot") < ranked.index("long")
+        assert index.search("the and of") == []
+        assert tokenize("MRR/ARR for the Node.js API") == [
+            "mrr",
+            "arr",
+            "node",
+            "js",
+            "api",
+        ]
+
+    def test_metadata_filters_are_applied_before_ranking(self, index):
+        reddit = index.search("sync", where={"source": "reddit", "score": {"$gte": 3}})
+        either = index.search(
+            "sync", where={"$or": [{"source": "github"}, {"score": {"$in": [1]}}]}
+        )
+
+        assert {doc_id for doc_id, _ in reddit} == {"hubspot", "zapier"}
+        assert {doc_id for doc_id, _ in either} == {"generic", "long"}
+        with pytest.raises(ValueError):
+            index.search("sync", where={"score": {"$regex": "x"}})
+
+    def test_filter_keys_are_bound_not_interpolated(self, index):
+        index.upsert(["quoted"], ["Sync owner's notes"], [{"owner's": "ops"}])
+        injected = "x') IS NULL OR 1=1 OR json_extract(metadata, '$.x"
+
+        assert index.search("sync", where={"owner's": "ops"})[0][0] == "quoted"
+        assert index.search("sync", where={injected: {"$in": ["ops"]}}) == []
+
+    def test_upsert_replaces_and_delete_by_filter(self, index):
+        index.upsert(["zapier"], ["Make.com replaced it"], [{"source": "reddit"}])
+        assert "zapier" not in dict(index.search("zaps"))
+
+        index.delete(where={"source": "reddit"})
+
+        assert index.count() == 1
+        assert [doc_id for doc_id, _ in index.search("sync")] == ["generic"]
+
+    def test_index_persists_across_instances(self, index, tmp_path):
+        reopened = BM25Index(str(tmp_path / "bm25.db"))
+
+        assert reopened.count() == 4
+        assert reopened.search("zapier")[0][0] == "zapier"
+        reopened.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "c"]])
+
+    assert [doc_id for doc_id, _ in fused] == ["b", "c", "a", "d"]
+    assert fused[0][1] == pytest.approx(2 / 62)
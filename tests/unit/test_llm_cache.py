@@ -0,0 +1,152 @@
+"""Unit tests for the LLM response cache."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.enterprise_batch_client import BatchRequest, EnterpriseBatchClient
+from app.core.llm_cache import LLMResponseCache
+
+MESSAGES = [
+    {"role": "system", "content": "Respond in JSON."},
+    {"role": "user", "content": "Summarize   this\nthread"},
+]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(db_path=str(tmp_path / "llm.db"), max_entries=3)
+    yield cache
+    cache.close()
+
+
+class TestLLMResponseCache:
+    """Test keying, expiry and eviction"""
+
+    def test_miss_then_hit(self, cache):
+        assert cache.get("gpt-4", MESSAGES, 0.3, 300) is None
+
+        cache.set("gpt-4", MESSAGES, '{"ok": true}', 0.3, 300)
+
+        assert cache.get("gpt-4", MESSAGES, 0.3, 300) == '{"ok": true}'
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_key_normalizes_whitespace(self, cache):
+        reformatted = [
+            {"role": "system", "content": " Respond in JSON. "},
+            {"role": "user", "content": "Summarize this thread"},
+        ]
+        cache.set("gpt-4", MESSAGES, "cached", 0.3, 300)
+
+        assert cache.get("gpt-4", reformatted, 0.3, 300) == "cached"
+
+    def test_key_includes_sampling_parameters(self, cache):
+        cache.set("gpt-4", MESSAGES, "cached", 0.3, 300)
+
+        assert cache.get("gpt-4-turbo", MESSAGES, 0.3, 300) is None
+        assert cache.get("gpt-4", MESSAGES, 0.7, 300) is None
+        assert cache.get("gpt-4", MESSAGES, 0.3, 1000) is None
+
+    def test_entries_expire_after_ttl(self, cache):
+        with patch("app.core.llm_cache.time.time", return_value=1000.0):
+            cache.set("gpt-4", MESSAGES, "cached")
+
+        with patch(
+            "app.core.llm_cache.time.time",
+            return_value=1000.0 + cache.ttl_seconds + 1,
+        ):
+            assert cache.get("gpt-4", MESSAGES) is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        prompts = [[{"role": "user", "content": f"prompt {i}"}] for i in range(4)]
+        base = time.time() - 10
+        for i in range(3):
+            with patch("app.core.llm_cache.time.time", return_value=base + i):
+                cache.set("gpt-4", prompts[i], f"response {i}")
+
+        # Touch the oldest entry so the second one becomes least recently used
+        with patch("app.core.llm_cache.time.time", return_value=base + 3):
+            cache.get("gpt-4", prompts[0])
+        with patch("app.core.llm_cache.time.time", return_value=base + 4):
+            cache.set("gpt-4", prompts[3], "response 3")
+
+        assert cache.get("gpt-4", prompts[0]) == "response 0"
+        assert cache.get("gpt-4", prompts[1]) is None
+        assert cache.get_stats()["entries"] == 3
+
+    def test_persists_across_instances(self, tmp_path):
+        db_path = str(tmp_path / "shared.db")
+        first = LLMResponseCache(db_path=db_path)
+        first.set("gemini-1.5-pro", MESSAGES, {"pain_points": []})
+        first.close()
+
+        second = LLMResponseCache(db_path=db_path)
+        assert second.get("gemini-1.5-pro", MESSAGES) == {"pain_points": []}
+        second.close()
+
+
+class TestBatchClientCache:
+    """Test cached and fresh batch results come back in request order"""
+
+    def test_results_follow_request_order(self, tmp_path):
+        cache = LLMResponseCache(db_path=str(tmp_path / "llm.db"))
+        client = EnterpriseBatchClient(use_cache=False)
+        client.cache = cache
+        # Alternate models and prompt lengths so the requests span several groups
+        requests = [
+            BatchRequest(
+                id=f"req_{i}",
+                prompt=f"prompt {i}" + (" long" * 200 if i % 3 == 0 else ""),
+                model="claude-3-haiku" if i % 2 else "claude-3-sonnet",
+            )
+            for i in range(8)
+        ]
+        for request in requests[1::3]:
+            model, messages = client._cache_args(request, "anthropic")
+            cache.set(
+                model,
+                messages,
+                {"content": f"cached {request.id}"},
+                request.temperature,
+                request.max_tokens,
+            )
+
+        result = asyncio.run(client.process_batch_prompts(requests, "anthropic"))
+        cache.close()
+
+        assert [r["id"] for r in result["results"]] == [r.id for r in requests]
+        assert [bool(r.get("cached")) for r in result["results"]] == [
+            i % 3 == 1 for i in range(8)
+        ]
+        assert result["cache_hits"] == 3
+
+    @pytest.mark.parametrize("provider", ["anthropic", "openai", "gemini"])
+    def test_simulated_responses_are_not_cached(self, tmp_path, provider):
+        cache = LLMResponseCache(db_path=str(tmp_path / "llm.db"))
+        client = EnterpriseBatchClient(use_cache=False)
+        client.cache = cache
+        requests = [BatchRequest(id="req_1", prompt="hello", model="model-x")]
+
+        asyncio.run(client.process_batch_prompts(requests, provider))
+        rerun = asyncio.run(client.process_batch_prompts(requests, provider))
+
+        assert rerun["cache_hits"] == 0
+        assert cache.get_stats()["entries"] == 0
+        cache.close()
+
+    def test_bulk_job_name_depends_only_on_requests(self):
+        requests = [
+            BatchRequest(id=f"req_{i}", prompt=f"prompt {i}", model="claude-3-haiku")
+            for i in range(3)
+        ]
+
+        name = EnterpriseBatchClient.bulk_job_name("nightly", requests)
+
+        # No date component, so a run resumed after midnight finds its job
+        assert name.count("_") == 1
+        assert EnterpriseBatchClient.bulk_job_name("nightly", requests) == name
+        assert EnterpriseBatchClient.bulk_job_name("nightly", requests[:2]) != name
@@ -0,0 +1,118 @@
+"""Unit tests for concurrent multi-index retrieval."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from llama_index.core import MockEmbedding  # noqa: E402
+from llama_index.core.base.base_retriever import BaseRetriever  # noqa: E402
+from llama_index.core.schema import NodeWithScore, TextNode  # noqa: E402
+
+from app.core.multi_index_retriever import (  # noqa: E402
+    SOURCE_KEY,
+    MultiIndexRetriever,
+)
+
+
+class FixedRetriever(BaseRetriever):
+    """Returns canned (text, score) hits after a delay; records query bundles"""
+
+    def __init__(self, hits, delay=0.0, fail=False):
+        super().__init__()
+        self.hits = hits
+        self.delay = delay
+        self.fail = fail
+        self.bundles = []
+
+    def _nodes(self, query_bundle):
+        self.bundles.append(query_bundle)
+        if self.fail:
+            raise RuntimeError("index offline")
+        return [NodeWithScore(node=TextNode(text=t), score=s) for t, s in self.hits]
+
+    def _retrieve(self, query_bundle):
+        return self._nodes(query_bundle)
+
+    async def _aretrieve(self, query_bundle):
+        await asyncio.sleep(self.delay)
+        return self._nodes(query_bundle)
+
+
+class TestMultiIndexRetriever:
+    """Test fan-out, normalization, deduplication and the agent tool"""
+
+    def test_sources_are_queried_concurrently(self):
+        retrievers = {
+            f"index_{i}": FixedRetriever([(f"doc {i}", 0.5)], delay=0.2)
+            for i in range(5)
+        }
+        multi = MultiIndexRetriever(retrievers, embed_model=MockEmbedding(embed_dim=8))
+
+        start = time.perf_counter()
+        hits = asyncio.run(multi.aretrieve_sources("churn drivers"))
+        elapsed = time.perf_counter() - start
+
+        assert len(hits) == 5
+        assert elapsed < 0.5  # sequential retrieval would take a full second
+        assert multi.get_stats()["sources_queried"] == 5
+        # The query is embedded once and shared with every source
+        assert all(r.bundles[0].embedding == [0.5] * 8 for r in retrievers.values())
+
+    def test_scores_are_normalized_per_source_and_duplicates_merged(self):
+        retrievers = {
+            # Distances-like scale vs cosine-like scale
+            "reddit_pain_points": FixedRetriever([("shared", 40.0), ("reddit", 10.0)]),
+            "market_trends": FixedRetriever(
+                [("market", 0.9), ("shared", 0.6), ("tail", 0.3)]
+            ),
+        }
+        multi = MultiIndexRetriever(retrievers, top_k=10)
+
+        hits = asyncio.run(multi.aretrieve_sources("pricing"))
+        by_text = {hit.node.get_content(): hit for hit in hits}
+
+        assert len(hits) == 4
+        assert by_text["shared"].score == 1.0
+        assert by_text["shared"].node.metadata[SOURCE_KEY] == [
+            "reddit_pain_points",
+            "market_trends",
+        ]
+        assert by_text["market"].score == 1.0
+        assert by_text["tail"].score == 0.0
+        assert multi.get_stats()["duplicates"] == 1
+
+    def test_subset_selection_and_failed_sources(self):
+        retrievers = {
+            "github_insights": FixedRetriever([("repo", 0.8)]),
+            "competitor_analysis": FixedRetriever([], fail=True),
+            "historical_reports": FixedRetriever([("report", 0.7)]),
+        }
+        multi = MultiIndexRetriever(retrievers)
+
+        hits = asyncio.run(
+            multi.aretrieve_sources(
+                "stack", sources=["github_insights", "competitor_analysis"]
+            )
+        )
+
+        assert [hit.node.get_content() for hit in hits] == ["repo"]
+        assert retrievers["historical_reports"].bundles == []
+        with pytest.raises(ValueError):
+            multi.retrieve_sources("stack", sources=["unknown_index"])
+
+    def test_tool_returns_one_tagged_observation(self):
+        retrievers = {
+            "reddit_pain_points": FixedRetriever([("Zapier keeps failing", 0.8)]),
+            "market_trends": FixedRetriever([("Search volume up 40%", 0.7)]),
+        }
+        tool = MultiIndexRetriever(retrievers).as_tool()
+
+        output = asyncio.run(tool.acall(query="integration pain"))
+
+        assert tool.metadata.name == "multi_source_retrieve"
+        assert "reddit_pain_points" in tool.metadata.description
+        assert "(reddit_pain_points; score 1.00) Zapier keeps failing" in str(output)
+        assert "(market_trends; score 1.00) Search volume up 40%" in str(output)
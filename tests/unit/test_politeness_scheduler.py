@@ -0,0 +1,159 @@
+"""Unit tests for the politeness scheduler, driven by a fake clock."""
+
+import asyncio
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.politeness_scheduler import PolitenessScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only advances when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return PolitenessScheduler(
+        domain_limits={"example.com": (2.0, 2)},
+        clock=clock,
+        sleep=clock.sleep,
+        async_sleep=clock.async_sleep,
+        rng=random.Random(7),
+    )
+
+
+class TestPolitenessScheduler:
+    """Test token bucket timing against a fake clock"""
+
+    def test_domain_normalization(self):
+        assert PolitenessScheduler.domain_for("https://www.reddit.com/r/saas") == (
+            "reddit.com"
+        )
+        assert PolitenessScheduler.domain_for("api.github.com") == "github.com"
+        assert PolitenessScheduler.domain_for("http://localhost:8000/x") == "localhost"
+
+    def test_burst_then_steady_rate(self, scheduler, clock):
+        request_times = []
+        for _ in range(6):
+            scheduler.acquire("https://example.com/page")
+            request_times.append(clock.now)
+
+        # Two burst tokens go immediately, then one request every 0.5s
+        assert request_times == pytest.approx([0.0, 0.0, 0.5, 1.0, 1.5, 2.0])
+
+    def test_tokens_refill_while_idle(self, scheduler, clock):
+        scheduler.acquire("example.com")
+        scheduler.acquire("example.com")
+        clock.now += 10.0
+
+        assert scheduler.reserve("example.com") == 0.0
+        assert scheduler.reserve("example.com") == 0.0
+        assert scheduler.reserve("example.com") == pytest.approx(0.5)
+
+    def test_domains_are_independent(self, scheduler):
+        scheduler.acquire("example.com")
+        scheduler.acquire("example.com")
+
+        assert scheduler.reserve("other.org") == 0.0
+
+    def test_retry_after_pauses_domain(self, scheduler, clock):
+        response = MagicMock(status_code=429, headers={"Retry-After": "5"})
+
+        assert scheduler.observe_response("https://example.com/api", response) is True
+        assert scheduler.reserve("example.com") == pytest.approx(5.0)
+        assert scheduler.reserve("example.com") == pytest.approx(5.5)
+        assert scheduler.throttled_responses == 1
+
+    def test_successful_response_is_not_retried(self, scheduler):
+        response = MagicMock(status_code=200, headers={})
+
+        assert scheduler.observe_response("example.com", response) is False
+        assert scheduler.throttled_responses == 0
+
+    def test_backoff_is_jittered_and_capped(self, scheduler):
+        for attempt in range(10):
+            delay = scheduler.backoff_delay(attempt)
+            ceiling = min(scheduler.backoff_cap, 2**attempt)
+            assert ceiling / 2 <= delay <= ceiling
+
+    def test_parse_retry_after(self):
+        assert PolitenessScheduler.parse_retry_after("12") == 12.0
+        assert PolitenessScheduler.parse_retry_after(None) is None
+        assert PolitenessScheduler.parse_retry_after("not a date") is None
+        assert (
+            PolitenessScheduler.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+            == 0.0
+        )
+
+    def test_request_retries_after_429(self, scheduler, clock):
+        session = MagicMock()
+        session.request.side_effect = [
+            MagicMock(status_code=429, headers={"Retry-After": "3"}),
+            MagicMock(status_code=201, headers={}),
+        ]
+
+        response = scheduler.request(session, "POST", "https://example.com/issues")
+
+        assert response.status_code == 201
+        assert session.request.call_count == 2
+        assert clock.now == pytest.approx(3.0)
+
+    def test_request_does_not_retry_post_after_503(self, scheduler, clock):
+        session = MagicMock()
+        session.request.side_effect = [
+            MagicMock(status_code=503, headers={"Retry-After": "3"}),
+            MagicMock(status_code=201, headers={}),
+        ]
+
+        response = scheduler.request(session, "POST", "https://example.com/issues")
+
+        assert response.status_code == 503
+        assert session.request.call_count == 1
+        # The domain is still paused for other callers
+        assert scheduler.acquire("example.com") == pytest.approx(3.0)
+
+    @pytest.mark.parametrize(
+        "method, retry_unsafe", [("GET", False), ("put", False), ("POST", True)]
+    )
+    def test_request_retries_after_503(self, scheduler, method, retry_unsafe):
+        session = MagicMock()
+        session.request.side_effect = [
+            MagicMock(status_code=503, headers={"Retry-After": "1"}),
+            MagicMock(status_code=200, headers={}),
+        ]
+
+        response = scheduler.request(
+            session, method, "https://example.com/a", retry_unsafe=retry_unsafe
+        )
+
+        assert response.status_code == 200
+        assert session.request.call_count == 2
+
+    def test_async_acquire_shares_state(self, scheduler, clock):
+        async def burst():
+            for _ in range(4):
+                await scheduler.aacquire("example.com")
+
+        asyncio.run(burst())
+        assert clock.now == pytest.approx(1.0)
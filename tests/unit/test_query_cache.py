@@ -0,0 +1,63 @@
+"""Unit tests for the bounded RAG query result cache."""
+
+from app.core.query_cache import QueryResultCache
+
+PARAMS = {"max_results": 5, "document_types": None, "user_role": "general"}
+
+
+class TestQueryResultCache:
+    """Test keying, bounds, invalidation and near-duplicate matching"""
+
+    def test_key_covers_every_parameter(self):
+        cache = QueryResultCache()
+        cache.set("kb", "Churn drivers?", PARAMS, "general answer")
+
+        assert cache.get("kb", "  churn   DRIVERS? ", PARAMS) == "general answer"
+        assert cache.get("kb", "Churn drivers?", {**PARAMS, "user_role": "ceo"}) is None
+        assert cache.get("other_kb", "Churn drivers?", PARAMS) is None
+        assert cache.hit_rate == 1 / 3
+
+    def test_lru_and_ttl_bounds(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("app.core.query_cache.time.time", lambda: clock[0])
+        cache = QueryResultCache(max_entries=2, ttl_seconds=60)
+        cache.set("kb", "a", PARAMS, 1)
+        cache.set("kb", "b", PARAMS, 2)
+        cache.get("kb", "a", PARAMS)  # refresh "a" so "b" is evicted next
+        cache.set("kb", "c", PARAMS, 3)
+
+        assert cache.get("kb", "b", PARAMS) is None
+        assert cache.get("kb", "a", PARAMS) == 1
+
+        clock[0] += 61
+        assert cache.get("kb", "a", PARAMS) is None
+        assert len(cache) == 1
+
+    def test_invalidation_is_per_collection(self):
+        cache = QueryResultCache()
+        cache.set("kb", "q", PARAMS, "stale")
+        cache.set("docs", "q", PARAMS, "kept")
+
+        assert cache.invalidate("kb") == 1
+        assert cache.get("kb", "q", PARAMS) is None
+        assert cache.get("docs", "q", PARAMS) == "kept"
+
+    def test_near_duplicate_queries_match_above_threshold(self):
+        cache = QueryResultCache(similarity_threshold=0.95)
+        cache.set("kb", "pricing pain points", PARAMS, "answer", [1.0, 0.0, 0.1])
+
+        close = cache.get("kb", "pain points around pricing", PARAMS, [0.9, 0.0, 0.1])
+        far = cache.get("kb", "onboarding friction", PARAMS, [0.0, 1.0, 0.0])
+        other_scope = cache.get(
+            "kb", "pricing pains", {**PARAMS, "max_results": 9}, [1.0, 0.0, 0.1]
+        )
+
+        assert close == "answer"
+        assert far is None and other_scope is None
+        assert cache.get_stats()["semantic_hits"] == 1
+
+    def test_semantic_matching_is_off_by_default(self):
+        cache = QueryResultCache()
+        cache.set("kb", "pricing pain points", PARAMS, "answer", [1.0, 0.0])
+
+        assert cache.get("kb", "pricing pains", PARAMS, [1.0, 0.0]) is None
@@ -0,0 +1,152 @@
+"""Unit tests for embedding-based index routing."""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from llama_index.core.base.base_selector import (  # noqa: E402
+    BaseSelector,
+    SelectorResult,
+    SingleSelection,
+)
+from llama_index.core.base.embeddings.base import BaseEmbedding  # noqa: E402
+from llama_index.core.tools.types import ToolMetadata  # noqa: E402
+from pydantic import Field  # noqa: E402
+
+from app.core.query_router import EmbeddingRouterSelector  # noqa: E402
+
+# Each route description embeds onto its own axis
+CHOICES = [
+    ToolMetadata(name="pain_points", description="pain points route"),
+    ToolMetadata(name="market", description="market route"),
+    ToolMetadata(name="competitors", description="competitors route"),
+]
+AXES = {
+    "pain points route": [1.0, 0.0, 0.0],
+    "market route": [0.0, 1.0, 0.0],
+    "competitors route": [0.0, 0.0, 1.0],
+}
+
+
+class TableEmbedding(BaseEmbedding):
+    """Looks vectors up in a fixed table; counts text embeddings"""
+
+    vectors: dict[str, list[float]] = Field(default_factory=dict)
+    text_calls: int = 0
+
+    def _vector(self, text: str) -> list[float]:
+        return self.vectors.get(text) or AXES[text]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        self.text_calls += 1
+        return self._vector(text)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+
+def make_embedding(**queries: list[float]) -> TableEmbedding:
+    return TableEmbedding(vectors=queries)
+
+
+class RecordingSelector(BaseSelector):
+    """Stand-in for the LLM selector fallback"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _select(self, choices, query):
+        self.calls += 1
+        return SelectorResult(selections=[SingleSelection(index=2, reason="llm")])
+
+    async def _aselect(self, choices, query):
+        return self._select(choices, query)
+
+    def _get_prompts(self):
+        return {}
+
+    def _update_prompts(self, prompts):
+        pass
+
+
+def routed(selector, query):
+    return [CHOICES[i].name for i in selector.select(CHOICES, query).inds]
+
+
+class TestEmbeddingRouter:
+    """Test nearest-prototype selection, fan-out and the LLM fallback"""
+
+    def test_query_goes_to_most_similar_description(self):
+        embed_model = make_embedding(
+            churn=[0.9, 0.3, 0.1], demand=[0.2, 0.8, 0.3], pricing=[0.1, 0.4, 0.7]
+        )
+        selector = EmbeddingRouterSelector(embed_model, top_k=1)
+
+        assert routed(selector, "churn") == ["pain_points"]
+        assert routed(selector, "demand") == ["market"]
+        assert routed(selector, "pricing") == ["competitors"]
+        # Descriptions are embedded once, then only queries are embedded
+        assert embed_model.text_calls == len(CHOICES)
+
+    def test_async_selection_matches_sync(self):
+        selector = EmbeddingRouterSelector(make_embedding(demand=[0.2, 0.8, 0.3]))
+
+        result = asyncio.run(selector.aselect(CHOICES, "demand"))
+
+        assert [CHOICES[i].name for i in result.inds] == ["market"]
+
+    def test_ambiguous_queries_fan_out_to_top_k(self):
+        selector = EmbeddingRouterSelector(
+            make_embedding(both=[0.1, 0.7, 0.69], single=[0.1, 0.3, 0.9]),
+            top_k=2,
+            fanout_margin=0.05,
+        )
+
+        assert sorted(routed(selector, "both")) == ["competitors", "market"]
+        assert routed(selector, "single") == ["competitors"]
+        assert selector.stats["fanout"] == 1
+
+    def test_low_confidence_falls_back_to_llm_selector(self):
+        fallback = RecordingSelector()
+        selector = EmbeddingRouterSelector(
+            make_embedding(vague=[-1.0, -1.0, 0.1], clear=[0.0, 1.0, 0.0]),
+            min_similarity=0.2,
+            fallback_selector=fallback,
+        )
+
+        assert routed(selector, "vague") == ["competitors"]
+        assert fallback.calls == 1 and selector.stats["fallback"] == 1
+        assert routed(selector, "clear") == ["market"]
+        assert fallback.calls == 1
+
+    def test_centroids_pull_queries_towards_index_content(self):
+        query = [0.8, 0.6, 0.0]
+        selector = EmbeddingRouterSelector(
+            make_embedding(webhooks=query), centroid_weight=0.8
+        )
+        assert routed(selector, "webhooks") == ["pain_points"]
+
+        selector.set_centroids({"market": query})
+
+        assert routed(selector, "webhooks") == ["market"]
+
+
+@pytest.mark.skipif(
+    not os.getenv("OPENAI_API_KEY"), reason="needs the production embedder"
+)
+class TestRoutingAccuracy:
+    """Route held-out labeled queries with the production embedder"""
+
+    def test_labeled_queries_reach_their_index(self):
+        from scripts.benchmark_query_router import evaluate, make_embedder
+
+        report = evaluate(make_embedder())
+
+        assert report["accuracy"] >= 0.75, report["misrouted"]
+        assert report["fallback_rate"] <= 0.25
@@ -0,0 +1,105 @@
+"""Unit tests for analysis bookkeeping in the agentic RAG engine."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("llama_index.llms.openai")
+pytest.importorskip("llama_index.vector_stores.chroma")
+
+from llama_index.core.base.embeddings.base import BaseEmbedding  # noqa: E402
+from llama_index.core.llms import MockLLM  # noqa: E402
+from llama_index.core.query_engine import (  # noqa: E402
+    CustomQueryEngine,
+    RouterQueryEngine,
+)
+from llama_index.core.tools import QueryEngineTool  # noqa: E402
+
+from app.core import rag_engine  # noqa: E402
+from app.core.query_router import (  # noqa: E402
+    INDEX_DESCRIPTIONS,
+    EmbeddingRouterSelector,
+)
+
+ROUTES = ["reddit_pain_points", "market_trends"]
+
+
+class AxisEmbedding(BaseEmbedding):
+    """Puts each route description on its own axis; queries name their axes"""
+
+    def _vector(self, text: str) -> list[float]:
+        return [
+            1.0 if name in text or INDEX_DESCRIPTIONS[name] == text else 0.0
+            for name in ROUTES
+        ]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._vector(text)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+
+class CannedQueryEngine(CustomQueryEngine):
+    """Answers every query with a fixed string"""
+
+    answer: str
+
+    def custom_query(self, query_str: str) -> str:
+        return self.answer
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # Keep the constructor away from the global Settings and data/ stores
+    monkeypatch.setattr(rag_engine, "Settings", SimpleNamespace())
+    monkeypatch.setattr(rag_engine, "VectorStoreManager", lambda: None)
+    monkeypatch.setattr(rag_engine, "KnowledgeBaseBuilder", lambda: None)
+    engine = rag_engine.SaaSMarketIntelligenceRAG(openai_api_key="sk-test")
+
+    tools = [
+        QueryEngineTool.from_defaults(
+            query_engine=CannedQueryEngine(answer=f"{name} answer"),
+            name=name,
+            description=INDEX_DESCRIPTIONS[name],
+        )
+        for name in ROUTES
+    ]
+    engine.router_query_engine = RouterQueryEngine(
+        selector=EmbeddingRouterSelector(AxisEmbedding(), top_k=2, fanout_margin=0.1),
+        query_engine_tools=tools,
+        llm=MockLLM(),
+    )
+    return engine
+
+
+class TestRouterAnalysis:
+    """Test iteration counts and sources for router-path analyses"""
+
+    def test_single_route_counts_one_query_and_the_answer(self, engine):
+        analysis = asyncio.run(
+            engine.analyze_market_opportunity("market_trends", use_agent=False)
+        )
+
+        assert analysis["response"] == "market_trends answer"
+        assert analysis["sources_used"] == ["market_trends"]
+        assert analysis["iterations"] == 2
+
+    def test_fan_out_counts_every_queried_index(self, engine):
+        analysis = asyncio.run(
+            engine.analyze_market_opportunity(
+                "reddit_pain_points and market_trends", use_agent=False
+            )
+        )
+
+        assert sorted(analysis["sources_used"]) == sorted(ROUTES)
+        assert analysis["iterations"] == 3
+        assert engine.analysis_stats == {
+            "calls": 1,
+            "iterations": 3,
+            "wall_time": pytest.approx(analysis["wall_time_seconds"], abs=1e-3),
+        }
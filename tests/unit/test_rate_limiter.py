@@ -0,0 +1,146 @@
+"""Unit tests for the GCRA rate limiter and its API key integration."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.rate_limiter import (
+    LocalGCRA,
+    RateLimit,
+    RateLimiter,
+    limits_from_config,
+)
+from app.models.api_key import APIKey
+from app.services.api_key_service import APIKeyService, RateLimitExceeded
+
+LIMITS = [RateLimit("minute", 5, 60), RateLimit("hour", 7, 3600)]
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    limiter = RateLimiter()
+    limiter.local = LocalGCRA(clock)
+    return limiter
+
+
+class TestLocalGCRA:
+    """Test burst, replenishment and multi-window semantics"""
+
+    def test_allows_burst_up_to_limit(self, limiter):
+        results = [limiter.hit("user", LIMITS) for _ in range(6)]
+
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        assert [r.tightest.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+        assert results[-1].retry_after == pytest.approx(12)
+
+    def test_rejected_requests_consume_no_quota(self, limiter, clock):
+        for _ in range(5):
+            limiter.hit("user", LIMITS)
+        for _ in range(10):
+            assert not limiter.hit("user", LIMITS)
+
+        clock.now += 12
+        assert limiter.hit("user", LIMITS)
+        # minute window refilled one slot, hour window has 1 left
+        assert limiter.peek("user", LIMITS).tightest.remaining == 0
+        assert limiter.hit("user", LIMITS).allowed is False
+
+    def test_tightest_window_rejects(self, limiter, clock):
+        for _ in range(5):
+            limiter.hit("user", LIMITS)
+        clock.now += 60
+        assert [limiter.hit("user", LIMITS).allowed for _ in range(3)] == [
+            True,
+            True,
+            False,
+        ]
+
+        result = limiter.hit("user", LIMITS)
+        assert result.message() == "Rate limit exceeded: 7 requests per hour"
+        assert int(result.headers()["Retry-After"]) > 60
+
+    def test_identities_are_independent(self, limiter):
+        for _ in range(5):
+            limiter.hit("a", LIMITS)
+
+        assert not limiter.hit("a", LIMITS)
+        assert limiter.hit("b", LIMITS)
+
+    def test_headers(self, limiter):
+        headers = limiter.hit("user", LIMITS).headers()
+
+        assert headers == {
+            "X-RateLimit-Limit": "5",
+            "X-RateLimit-Remaining": "4",
+            "X-RateLimit-Reset": "12",
+        }
+
+    def test_limits_from_config_skips_missing_windows(self):
+        limits = limits_from_config({"requests_per_minute": 10, "requests_per_day": 0})
+
+        assert limits == [RateLimit("minute", 10, 60)]
+
+
+class TestRedisGCRA:
+    """Test the Lua script matches the in-process limiter"""
+
+    @pytest.fixture
+    def redis_client(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeRedis(decode_responses=True)
+
+    def test_matches_local_semantics(self, redis_client):
+        redis_limiter = RateLimiter(redis_client)
+        local_limiter = RateLimiter()
+
+        for _ in range(9):
+            remote = redis_limiter.hit("user", LIMITS)
+            local = local_limiter.hit("user", LIMITS)
+            assert remote.allowed == local.allowed
+            assert [w.remaining for w in remote.windows] == [
+                w.remaining for w in local.windows
+            ]
+
+    def test_peek_does_not_write(self, redis_client):
+        limiter = RateLimiter(redis_client)
+
+        assert limiter.peek("user", LIMITS).tightest.remaining == 5
+        assert redis_client.keys("rate_limit:*") == []
+
+    def test_falls_back_to_local_when_redis_fails(self, redis_client):
+        limiter = RateLimiter(redis_client)
+        redis_client.connected = False
+
+        assert [limiter.hit("user", LIMITS).allowed for _ in range(6)] == [True] * 5 + [
+            False
+        ]
+
+
+class TestAPIKeyServiceRateLimit:
+    """Test APIKeyService raises with the rejected result attached"""
+
+    def test_raises_with_retry_headers(self):
+        with patch.object(APIKeyService, "_init_redis", return_value=None):
+            service = APIKeyService()
+        api_key = APIKey(customer_id="cus_1", subscription_id="sub_1", tier="basic")
+
+        for _ in range(10):
+            assert service.check_rate_limit(api_key, "/api/v1/test")
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            service.check_rate_limit(api_key, "/api/v1/test")
+
+        assert str(exc_info.value) == "Rate limit exceeded: 10 requests per minute"
+        assert exc_info.value.result.headers()["Retry-After"] in {"6", "7"}
@@ -1,12 +1,20 @@
 """Unit tests for the Reddit scraper."""
 
+import asyncio
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import gspread
 
 from app.scrapers.reddit_scraper import RedditScraper, main
 
+# Posts alternate between two hosts so per-host limits can be observed
+POST_URLS = [
+    f"https://host{i % 2}.example.com/r/test/comments/{i}/post_{i}" for i in range(8)
+]
+
 
 class TestRedditScraper(unittest.TestCase):
     """Test suite for the RedditScraper class."""
@@ -297,10 +305,7 @@ class TestRedditScraper(unittest.TestCase):
     @patch("app.scrapers.reddit_scraper.RedditScraper.scrape_reddit_post")
     @patch("app.scrapers.reddit_scraper.RedditScraper.summarize_pain_points")
     @patch("app.scrapers.reddit_scraper.RedditScraper.log_to_spreadsheet")
-    @patch("app.scrapers.reddit_scraper.time.sleep")
-    def test_run_method(
-        self, mock_sleep, mock_log, mock_summarize, mock_scrape, mock_search
-    ):
+    def test_run_method(self, mock_log, mock_summarize, mock_scrape, mock_search):
         """Test the run method."""
         mock_search.return_value = [{"url": "https://reddit.com/test"}]
         mock_scrape.return_value = {
@@ -314,7 +319,6 @@ class TestRedditScraper(unittest.TestCase):
         results = self.scraper.run()
         assert len(results) == 1
         assert results[0]["summary"] == "Test summary"
-        mock_sleep.assert_called_once_with(2)
 
     @patch("argparse.ArgumentParser.parse_args")
     @patch("app.scrapers.reddit_scraper.RedditScraper")
@@ -323,6 +327,7 @@ class TestRedditScraper(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.search_term = "test"
         mock_args.max_results = 5
+        mock_args.concurrency = 0
         mock_parse_args.return_value = mock_args
 
         mock_scraper = MagicMock()
@@ -333,6 +338,28 @@ class TestRedditScraper(unittest.TestCase):
 
         result = main()
         assert result == 0
+        mock_scraper.arun.assert_not_called()
+
+    @patch("argparse.ArgumentParser.parse_args")
+    @patch("app.scrapers.reddit_scraper.RedditScraper")
+    def test_main_function_concurrent(self, mock_scraper_class, mock_parse_args):
+        """Test main function uses the concurrent pipeline when asked to."""
+        mock_args = MagicMock()
+        mock_args.search_term = "test"
+        mock_args.max_results = 5
+        mock_args.concurrency = 4
+        mock_parse_args.return_value = mock_args
+
+        mock_scraper = MagicMock()
+        mock_scraper.arun = AsyncMock(
+            return_value=[{"post": {"title": "Test", "url": "test"}, "summary": "Test"}]
+        )
+        mock_scraper_class.return_value = mock_scraper
+
+        result = main()
+        assert result == 0
+        mock_scraper.arun.assert_awaited_once_with(concurrency=4)
+        mock_scraper.run.assert_not_called()
 
     @patch("argparse.ArgumentParser.parse_args")
     @patch("app.scrapers.reddit_scraper.RedditScraper")
@@ -349,5 +376,94 @@ class TestRedditScraper(unittest.TestCase):
         assert result == 1
 
 
+class TestRedditScraperConcurrent(unittest.TestCase):
+    """Test suite for the concurrent RedditScraper.arun pipeline."""
+
+    @patch("app.scrapers.reddit_scraper.SERPAPI_KEY", "test_key")
+    @patch("app.scrapers.reddit_scraper.OPENAI_API_KEY", "test_key")
+    @patch("app.scrapers.reddit_scraper.OpenAI")
+    def setUp(self, mock_openai):
+        """Stub every blocking stage and record how many run at once."""
+        self.scraper = RedditScraper("test search", max_results=len(POST_URLS))
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.peak_per_host: dict[str, int] = {}
+        self.in_flight_per_host: dict[str, int] = {}
+
+        def fetch(url):
+            host = url.split("/")[2]
+            with self.lock:
+                self.in_flight += 1
+                self.in_flight_per_host[host] = self.in_flight_per_host.get(host, 0) + 1
+                self.peak = max(self.peak, self.in_flight)
+                self.peak_per_host[host] = max(
+                    self.peak_per_host.get(host, 0), self.in_flight_per_host[host]
+                )
+            # Later posts finish first, so gather order must not follow completion
+            time.sleep(0.02 * (len(POST_URLS) - POST_URLS.index(url)))
+            with self.lock:
+                self.in_flight -= 1
+                self.in_flight_per_host[host] -= 1
+            return [f"comment on {url}"]
+
+        self.scraper.search_reddit_urls = lambda: [
+            {"title": f"Post {i}", "url": url} for i, url in enumerate(POST_URLS)
+        ]
+        self.scraper.fetch_post_comments = fetch
+        self.scraper.extract_pain_points = lambda comments: [
+            {"pain_point_label": comments[0], "explanation": "", "gsheet_link": ""}
+        ]
+        self.scraper.summarize_pain_points = lambda post: f"summary of {post['url']}"
+        self.scraper._log_daily_metrics = MagicMock()
+
+    def test_arun_bounds_concurrency(self):
+        """Test arun never exceeds its overall or per-host limits."""
+        asyncio.run(self.scraper.arun(concurrency=3, per_host_limit=1))
+
+        # One request per host at a time, but both hosts in parallel
+        assert max(self.peak_per_host.values()) == 1
+        assert self.peak == 2
+
+    def test_arun_overlaps_posts(self):
+        """Test arun fetches several posts at once when allowed to."""
+        asyncio.run(self.scraper.arun(concurrency=4, per_host_limit=2))
+
+        assert self.peak == 4
+
+    def test_arun_preserves_search_order(self):
+        """Test arun returns results in search order, not completion order."""
+        results = asyncio.run(self.scraper.arun(concurrency=8, per_host_limit=4))
+
+        assert [r["post"]["url"] for r in results] == POST_URLS
+        assert [r["summary"] for r in results] == [
+            f"summary of {url}" for url in POST_URLS
+        ]
+        self.scraper._log_daily_metrics.assert_called_once_with(results)
+
+    def test_arun_falls_back_to_html_per_post(self):
+        """Test a failing post falls back to HTML scraping in its own slot."""
+        failing = POST_URLS[3]
+        fetch = self.scraper.fetch_post_comments
+
+        def flaky_fetch(url):
+            if url == failing:
+                raise RuntimeError("praw unavailable")
+            return fetch(url)
+
+        self.scraper.fetch_post_comments = flaky_fetch
+        self.scraper.scrape_post_html = lambda url: {
+            "title": "HTML",
+            "url": url,
+            "comments": [],
+            "pain_point_summaries": [],
+        }
+
+        results = asyncio.run(self.scraper.arun(concurrency=4))
+
+        assert [r["post"]["url"] for r in results] == POST_URLS
+        assert results[3]["post"]["title"] == "HTML"
+
+
 if __name__ == "__main__":
     unittest.main()
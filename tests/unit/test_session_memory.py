@@ -0,0 +1,88 @@
+"""Unit tests for session memory persistence."""
+
+import json
+
+from app.core.memory_store import MemoryNodeStore
+from app.core.session_memory import SessionMemoryManager
+
+
+class TestSessionMemoryStorage:
+    """Test the indexed store behind SessionMemoryManager"""
+
+    def test_nodes_survive_restart(self, tmp_path):
+        manager = SessionMemoryManager(memory_dir=str(tmp_path))
+        node_id = manager.store_memory_node(
+            "mcp_status_log", {"message": "job started"}, tags=["mcp", "status"]
+        )
+
+        reopened = SessionMemoryManager(memory_dir=str(tmp_path))
+        node = reopened.memory_nodes[node_id]
+
+        assert node.content == {"message": "job started"}
+        assert node.tags == ["mcp", "status"]
+        assert node_id in reopened.memory_nodes
+        assert len(reopened.memory_nodes) == 1
+        assert reopened.memory_nodes.get("missing") is None
+
+    def test_category_and_tag_lookups(self, tmp_path):
+        manager = SessionMemoryManager(memory_dir=str(tmp_path))
+        for i in range(3):
+            manager.store_memory_node("mcp_status_log", {"i": i}, tags=["mcp"])
+        manager.store_memory_node("stripe_embeddings", {"i": 0}, tags=["mcp", "x"])
+
+        assert len(manager.find_memory_nodes(category="mcp_status_log")) == 3
+        assert len(manager.find_memory_nodes(tag="mcp")) == 4
+        only = manager.find_memory_nodes(category="stripe_embeddings", tag="x")
+        assert [node.content for node in only] == [{"i": 0}]
+        assert len(manager.find_memory_nodes(tag="mcp", limit=2)) == 2
+
+    def test_restoring_a_node_replaces_its_tags(self, tmp_path):
+        manager = SessionMemoryManager(memory_dir=str(tmp_path))
+        manager.store_memory_node("prefs", {"theme": "dark"}, tags=["old"])
+        manager.store_memory_node("prefs", {"theme": "dark"}, tags=["new"])
+
+        assert manager.find_memory_nodes(tag="old") == []
+        assert len(manager.find_memory_nodes(tag="new")) == 1
+        assert len(manager.memory_nodes) == 1
+
+    def test_legacy_json_is_migrated_once(self, tmp_path):
+        legacy = [
+            {
+                "id": "prefs:abc",
+                "content": {"theme": "dark"},
+                "category": "prefs",
+                "created_at": "2025-01-01T09:00:00",
+                "updated_at": "2025-01-02T09:00:00",
+                "access_count": 4,
+                "importance_score": 0.5,
+                "tags": ["ui"],
+            }
+        ]
+        (tmp_path / "memory_nodes.json").write_text(json.dumps(legacy))
+
+        manager = SessionMemoryManager(memory_dir=str(tmp_path))
+
+        node = manager.memory_nodes["prefs:abc"]
+        assert node.access_count == 4 and node.updated_at.day == 2
+        assert not (tmp_path / "memory_nodes.json").exists()
+        assert (tmp_path / "memory_nodes.json.migrated").exists()
+        assert len(SessionMemoryManager(memory_dir=str(tmp_path)).memory_nodes) == 1
+
+    def test_store_compacts_every_n_writes(self, tmp_path):
+        store = MemoryNodeStore(tmp_path / "nodes.db", compact_every=3)
+        record = {
+            "id": "prefs:abc",
+            "category": "prefs",
+            "created_at": "2025-01-01T09:00:00",
+            "updated_at": "2025-01-01T09:00:00",
+            "content": {"payload": "x" * 4096},
+        }
+
+        store.upsert_many([record, {**record, "id": "prefs:def"}])
+        assert store._writes_since_compact == 2
+        store.upsert(record)
+
+        assert store._writes_since_compact == 0
+        assert (tmp_path / "nodes.db-wal").stat().st_size == 0
+        assert store.count() == 2
+        store.close()
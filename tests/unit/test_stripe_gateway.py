@@ -0,0 +1,125 @@
+"""Unit tests for the Stripe gateway against a stubbed Stripe server."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import stripe
+
+from app.services.stripe_gateway import StripeGateway
+
+STRIPE_LATENCY = 0.2
+
+
+class StubStripeHandler(BaseHTTPRequestHandler):
+    """Answers every request with an empty list after a fixed delay"""
+
+    def do_GET(self):
+        time.sleep(STRIPE_LATENCY)
+        body = json.dumps(
+            {"object": "list", "data": [], "has_more": False, "url": self.path}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubStripeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64  # accept a burst of connections without SYN retries
+
+
+@pytest.fixture
+def stripe_server(monkeypatch):
+    server = StubStripeServer(("127.0.0.1", 0), StubStripeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(stripe, "api_base", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(stripe, "api_key", "sk_test_stub")
+    monkeypatch.setattr(stripe, "max_network_retries", 0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def max_loop_lag(until: asyncio.Future, interval: float = 0.005) -> float:
+    """Largest delay beyond ``interval`` seen by a ticking coroutine"""
+    lag = 0.0
+    while not until.done():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, time.perf_counter() - start - interval)
+    return lag
+
+
+class TestStripeGateway:
+    """Test Stripe calls stay off the event loop and lookups are memoized"""
+
+    def test_event_loop_stays_responsive_under_load(self, stripe_server):
+        gateway = StripeGateway(max_workers=8)
+
+        async def scenario():
+            start = time.perf_counter()
+            calls = asyncio.gather(
+                *(
+                    gateway.call(stripe.Customer.list, email=f"user{i}@example.com")
+                    for i in range(32)
+                )
+            )
+            lag = await max_loop_lag(calls)
+            results = await calls
+            return results, lag, time.perf_counter() - start
+
+        results, lag, elapsed = asyncio.run(scenario())
+        gateway.shutdown()
+
+        assert len(results) == 32
+        assert all(result.data == [] for result in results)
+        # 32 calls through 8 workers take about 4 round trips, not 32
+        assert elapsed < 32 * STRIPE_LATENCY / 2
+        assert lag < STRIPE_LATENCY / 2
+
+    def test_concurrent_misses_share_one_lookup(self):
+        gateway = StripeGateway()
+        lookups = 0
+
+        async def lookup():
+            nonlocal lookups
+            lookups += 1
+            await asyncio.sleep(0.01)
+            return "price_123"
+
+        async def scenario():
+            first = await asyncio.gather(
+                *(gateway.cached(("price", "pro_monthly"), lookup) for _ in range(10))
+            )
+            return first + [await gateway.cached(("price", "pro_monthly"), lookup)]
+
+        assert asyncio.run(scenario()) == ["price_123"] * 11
+        assert lookups == 1
+
+    def test_failed_lookups_are_not_cached(self):
+        gateway = StripeGateway()
+        attempts = []
+
+        async def lookup():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise stripe.error.APIConnectionError("down")
+            return "prod_123"
+
+        async def scenario():
+            with pytest.raises(stripe.error.APIConnectionError):
+                await gateway.cached(("product", "pro"), lookup)
+            return await gateway.cached(("product", "pro"), lookup)
+
+        assert asyncio.run(scenario()) == "prod_123"
+        assert len(attempts) == 2
@@ -0,0 +1,118 @@
+"""Unit tests for the shared token usage ledger."""
+
+import json
+
+import pytest
+
+from app.core.claude_token_monitor import ClaudeTokenMonitor
+from app.core.cost_tracker import CostTracker
+from app.core.token_monitor import TokenMonitor
+from app.core.usage_ledger import UsageLedger
+
+HOUR = 3600
+BASE = 1_750_000_000 // HOUR * HOUR  # on an hour boundary
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = UsageLedger(tmp_path / "ledger.db", flush_size=50, flush_interval=3600)
+    yield ledger
+    ledger.close()
+
+
+def record(ledger, ts, model="claude-4-sonnet", task="research", cost=0.01):
+    ledger.record("test", model, 1000, 200, cost, task_type=task, timestamp=ts)
+
+
+class TestUsageLedger:
+    """Test batching, durability and rollup-backed summaries"""
+
+    def test_buffered_events_are_visible_before_flush(self, ledger):
+        for i in range(10):
+            record(ledger, BASE + i)
+
+        assert ledger._buffer  # not flushed yet
+        before = ledger.summarize()
+        assert ledger.flush() == 10
+        after = ledger.summarize()
+
+        assert before == after
+        assert after["calls"] == 10 and after["tokens"] == 12000
+        assert after["by_model"]["claude-4-sonnet"]["cost"] == pytest.approx(0.1)
+
+    def test_window_start_is_exact_within_the_first_hour(self, ledger):
+        record(ledger, BASE + 1000)  # before the window
+        record(ledger, BASE + 2000)  # partial first hour, read from raw events
+        record(ledger, BASE + 2 * HOUR)  # whole hour, read from rollups
+        record(ledger, BASE + 3 * HOUR)  # still buffered
+        ledger.flush()
+        record(ledger, BASE + 3 * HOUR + 5)
+
+        summary = ledger.summarize(since=BASE + 1800)
+
+        assert summary["calls"] == 4
+        assert ledger.summarize()["calls"] == 5
+
+    def test_nothing_is_truncated_and_breakdowns_filter(self, tmp_path, ledger):
+        for i in range(1500):
+            task = "research" if i % 3 else "codegen"
+            model = "claude-4" if i % 2 else "claude-4-sonnet"
+            record(ledger, BASE + i * 60, model=model, task=task)
+        ledger.close()
+
+        reopened = UsageLedger(tmp_path / "ledger.db")
+        summary = reopened.summarize()
+        codegen = reopened.summarize(task_type="codegen")
+        reopened.close()
+
+        assert summary["calls"] == 1500
+        assert summary["by_task"]["codegen"]["calls"] == 500
+        assert summary["by_model"]["claude-4"]["calls"] == 750
+        assert sum(day["calls"] for day in summary["by_day"].values()) == 1500
+        assert codegen["calls"] == 500 and set(codegen["by_task"]) == {"codegen"}
+
+
+class TestMonitorsShareLedger:
+    """TokenMonitor and ClaudeTokenMonitor read and write one ledger"""
+
+    def test_monitors_record_into_one_ledger(self, tmp_path, ledger):
+        token_monitor = TokenMonitor(data_dir=str(tmp_path), ledger=ledger)
+        claude_monitor = ClaudeTokenMonitor(
+            CostTracker(test_mode=True, db_path=":memory:"), ledger
+        )
+
+        token_monitor.record_token_usage("claude-4-sonnet", 2000, 500, task_type="qa")
+        claude_monitor.track_usage("claude-4-opus", 1000, 100, session_id="s1")
+
+        summary = token_monitor.get_usage_summary(period_days=1)
+        analytics = claude_monitor.get_usage_analytics(days=1)
+
+        assert summary["period_summary"]["total_api_calls"] == 1
+        assert summary["task_breakdown"]["qa"]["tokens"] == 2500
+        assert analytics["total_requests"] == 1
+        assert analytics["model_breakdown"]["claude-4-opus"]["tokens"] == 1100
+        assert claude_monitor.get_daily_spend() == pytest.approx(0.0225)
+        assert ledger.summarize()["calls"] == 2
+        assert ledger.session_tokens("s1") == 1100
+
+    def test_legacy_usage_file_is_migrated(self, tmp_path, ledger):
+        legacy = [
+            {
+                "timestamp": "2025-06-01T10:00:00",
+                "model": "claude-4",
+                "input_tokens": 100,
+                "output_tokens": 50,
+                "total_tokens": 150,
+                "cost_usd": 0.005,
+                "session_id": None,
+                "task_type": "code_generation",
+                "user_id": None,
+            }
+        ]
+        (tmp_path / "token_usage.json").write_text(json.dumps(legacy))
+
+        monitor = TokenMonitor(data_dir=str(tmp_path), ledger=ledger)
+
+        result = monitor.optimize_token_usage("code_generation")
+        assert result["current_metrics"]["total_calls_analyzed"] == 1
+        assert (tmp_path / "token_usage.json.migrated").exists()
@@ -0,0 +1,317 @@
+"""Unit tests for bulk upserts into persistent Chroma collections."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("llama_index.vector_stores.chroma")
+
+from llama_index.core import Document  # noqa: E402
+from llama_index.core.base.embeddings.base import BaseEmbedding  # noqa: E402
+from llama_index.core.node_parser import SentenceSplitter  # noqa: E402
+from llama_index.core.vector_stores.types import VectorStoreQuery  # noqa: E402
+from pydantic import Field  # noqa: E402
+
+from app.core.vector_store import (  # noqa: E402
+    VectorStoreManager,
+    chunk_node_id,
+    stable_doc_id,
+)
+
+
+class CountingEmbedding(BaseEmbedding):
+    """Deterministic 3-d embedding that records every text it embeds"""
+
+    embedded: list[str] = Field(default_factory=list)
+    batches: list[int] = Field(default_factory=list)
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(len(text)), float(text.count("a")), 1.0]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        self.batches.append(len(texts))
+        return [self._vector(text) for text in texts]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._get_text_embeddings(texts)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._vector(query)
+
+
+def make_manager(path, **kwargs: Any) -> tuple[VectorStoreManager, CountingEmbedding]:
+    embed_model = CountingEmbedding(embed_batch_size=1000)
+    manager = VectorStoreManager(
+        persist_dir=str(path), embed_model=embed_model, **kwargs
+    )
+    manager.node_parser = SentenceSplitter(
+        chunk_size=64, chunk_overlap=0, id_func=chunk_node_id
+    )
+    return manager, embed_model
+
+
+def long_text(word: str, words: int = 120) -> str:
+    return " ".join(f"{word}{i}." for i in range(words))
+
+
+def docs() -> list[Document]:
+    return [
+        Document(id_="reddit#1", text=long_text("alpha")),
+        Document(id_="reddit#2", text="Short pain point about manual invoicing"),
+        Document(id_="reddit#3", text=long_text("beta", 60)),
+    ]
+
+
+class TestBulkUpsert:
+    """Test batching, idempotence and persistence of the bulk path"""
+
+    def test_bulk_upsert_batches_embeddings_and_is_idempotent(self, tmp_path):
+        manager, embed_model = make_manager(tmp_path, embed_batch_size=4)
+        asyncio.run(manager.create_index("reddit_kb", []))
+
+        first = asyncio.run(manager.upsert_documents("reddit_kb", docs()))
+        collection = manager.collections["reddit_kb"]
+
+        assert first.chunks > 3 and first.embedded == first.chunks
+        assert collection.count() == first.chunks
+        assert max(embed_model.batches) <= 4
+        assert sorted(collection.get()["ids"])[0] == "reddit#1:0"
+
+        embed_model.embedded.clear()
+        second = asyncio.run(manager.add_documents("reddit_kb", docs()))
+
+        assert second.embedded == 0 and second.unchanged == first.chunks
+        assert embed_model.embedded == []
+        assert collection.count() == first.chunks
+
+    def test_changed_document_only_reembeds_its_chunks(self, tmp_path):
+        manager, embed_model = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", docs()))
+        before = manager.collections["reddit_kb"].count()
+
+        embed_model.embedded.clear()
+        updated = docs()
+        updated[0] = Document(id_="reddit#1", text="Now a single short chunk")
+        report = asyncio.run(manager.upsert_documents("reddit_kb", updated))
+
+        assert embed_model.embedded == ["Now a single short chunk"]
+        assert report.deleted > 0
+        collection = manager.collections["reddit_kb"]
+        chunks = collection.get(where={"document_id": "reddit#1"})
+        assert chunks["ids"] == ["reddit#1:0"]
+        assert collection.count() == before - report.deleted
+
+    def test_persisted_rows_reload_and_stay_queryable(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", docs()))
+
+        reopened, embed_model = make_manager(tmp_path)
+        asyncio.run(reopened.load_index("reddit_kb"))
+        report = asyncio.run(reopened.upsert_documents("reddit_kb", docs()))
+        assert report.embedded == 0 and embed_model.embedded == []
+
+        query = VectorStoreQuery(
+            query_embedding=embed_model.get_query_embedding(docs()[1].text),
+            similarity_top_k=1,
+        )
+        result = reopened.vector_stores["reddit_kb"].query(query)
+        assert result.nodes[0].ref_doc_id == "reddit#2"
+        assert result.nodes[0].get_content() == docs()[1].text
+
+    def test_anonymous_documents_dedupe_and_delete(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", []))
+        anonymous = [Document(text="Same text", metadata={"source": "reddit"})]
+
+        asyncio.run(manager.upsert_documents("reddit_kb", anonymous))
+        asyncio.run(
+            manager.upsert_documents(
+                "reddit_kb", [Document(text="Same text", metadata={"source": "reddit"})]
+            )
+        )
+        assert manager.collections["reddit_kb"].count() == 1
+
+        assert anonymous[0].doc_id != stable_doc_id(anonymous[0])
+        asyncio.run(
+            manager.delete_documents("reddit_kb", [stable_doc_id(anonymous[0])])
+        )
+        assert manager.collections["reddit_kb"].count() == 0
+
+    def test_duplicate_documents_in_one_window_are_written_once(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", []))
+        repeated = [
+            Document(text="Same text", metadata={"source": "reddit"}),
+            Document(id_="reddit#2", text="First version"),
+            Document(text="Same text", metadata={"source": "reddit"}),
+            Document(id_="reddit#2", text="Second version"),
+        ]
+
+        report = asyncio.run(manager.upsert_documents("reddit_kb", repeated))
+
+        collection = manager.collections["reddit_kb"]
+        assert report.documents == 2 and collection.count() == 2
+        assert collection.get(ids=["reddit#2:0"])["documents"] == ["Second version"]
+
+
+def snapshot(collection) -> dict[str, Any]:
+    rows = collection.get(include=["documents", "metadatas", "embeddings"])
+    return {
+        chunk_id: (document, metadata, [round(float(x), 6) for x in embedding])
+        for chunk_id, document, metadata, embedding in zip(
+            rows["ids"],
+            rows["documents"],
+            rows["metadatas"],
+            rows["embeddings"],
+            strict=True,
+        )
+    }
+
+
+class TestBackupRestore:
+    """Test the paged binary backup format"""
+
+    def test_round_trip_preserves_collection_without_reembedding(self, tmp_path):
+        manager, _ = make_manager(tmp_path / "source")
+        asyncio.run(manager.create_index("reddit_kb", docs()))
+        original = manager.collections["reddit_kb"]
+
+        backup_dir = asyncio.run(
+            manager.backup_index("reddit_kb", str(tmp_path / "backups"), page_size=2)
+        )
+        assert (backup_dir / "embeddings.npy").exists()
+
+        restored_manager, embed_model = make_manager(tmp_path / "restored")
+        name = asyncio.run(restored_manager.restore_index(str(backup_dir), page_size=3))
+
+        restored = restored_manager.collections[name]
+        assert name == "reddit_kb"
+        assert embed_model.embedded == []
+        assert restored.metadata == original.metadata
+        assert snapshot(restored) == snapshot(original)
+
+    def test_empty_index_round_trips(self, tmp_path):
+        manager, _ = make_manager(tmp_path / "source")
+        asyncio.run(manager.create_index("empty_kb", []))
+        backup_dir = asyncio.run(manager.backup_index("empty_kb", str(tmp_path / "b")))
+
+        name = asyncio.run(manager.restore_index(str(backup_dir), "empty_copy"))
+
+        assert manager.collections[name].count() == 0
+
+    def test_rows_added_while_paging_are_backed_up(self, tmp_path):
+        manager, _ = make_manager(tmp_path / "source")
+        asyncio.run(manager.create_index("reddit_kb", docs()))
+        collection = manager.collections["reddit_kb"]
+
+        class GrowingCollection:
+            """Adds a row after the first page is read, like a live writer"""
+
+            def __init__(self):
+                self.grown = False
+                self.metadata = collection.metadata
+
+            def get(self, **kwargs):
+                page = collection.get(**kwargs)
+                if not self.grown:
+                    self.grown = True
+                    collection.upsert(
+                        ids=["late:0"],
+                        embeddings=[[1.0, 2.0, 3.0]],
+                        documents=["Added during backup"],
+                        metadatas=[{"source": "reddit"}],
+                    )
+                return page
+
+        manager.collections["reddit_kb"] = GrowingCollection()
+        backup_dir = asyncio.run(
+            manager.backup_index("reddit_kb", str(tmp_path / "backups"), page_size=2)
+        )
+
+        restored_manager, _ = make_manager(tmp_path / "restored")
+        name = asyncio.run(restored_manager.restore_index(str(backup_dir)))
+        assert snapshot(restored_manager.collections[name]) == snapshot(collection)
+
+    def test_restore_removes_rows_missing_from_backup(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", docs()))
+        collection = manager.collections["reddit_kb"]
+        before = snapshot(collection)
+        backup_dir = asyncio.run(
+            manager.backup_index("reddit_kb", str(tmp_path / "backups"))
+        )
+
+        extra = Document(id_="github#9", text="HubSpot contact sync drops deals")
+        asyncio.run(manager.upsert_documents("reddit_kb", [extra]))
+        asyncio.run(manager.restore_index(str(backup_dir)))
+
+        assert snapshot(manager.collections["reddit_kb"]) == before
+        assert (
+            asyncio.run(
+                manager.search_documents("reddit_kb", "HubSpot", mode="lexical")
+            )
+            == []
+        )
+
+
+class TestHybridSearch:
+    """Test the BM25 sidecar stays in sync and fuses with vector search"""
+
+    def hubspot_docs(self) -> list[Document]:
+        return docs() + [
+            Document(
+                id_="github#9",
+                text="HubSpot contact sync drops deals",
+                metadata={"source": "github"},
+            )
+        ]
+
+    def test_hybrid_search_fuses_lexical_and_vector_hits(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", self.hubspot_docs()))
+
+        lexical = asyncio.run(
+            manager.search_documents("reddit_kb", "HubSpot", mode="lexical")
+        )
+        hybrid = asyncio.run(manager.search_documents("reddit_kb", "HubSpot deals"))
+        filtered = asyncio.run(
+            manager.search_documents(
+                "reddit_kb", "HubSpot", where={"source": "reddit"}, mode="lexical"
+            )
+        )
+
+        assert [r["id"] for r in lexical] == ["github#9:0"]
+        top = next(r for r in hybrid if r["id"] == "github#9:0")
+        assert top["bm25_score"] > 0 and top["distance"] is not None
+        assert filtered == []
+        with pytest.raises(ValueError):
+            asyncio.run(manager.search_documents("reddit_kb", "x", mode="fuzzy"))
+
+    def test_sidecar_follows_deletes_and_rebuilds_when_missing(self, tmp_path):
+        manager, _ = make_manager(tmp_path)
+        asyncio.run(manager.create_index("reddit_kb", self.hubspot_docs()))
+        asyncio.run(manager.delete_documents("reddit_kb", ["github#9"]))
+
+        assert (
+            asyncio.run(
+                manager.search_documents("reddit_kb", "HubSpot", mode="lexical")
+            )
+            == []
+        )
+
+        manager.lexical_indices.pop("reddit_kb").close()
+        (tmp_path / "bm25" / "reddit_kb.db").unlink()
+        reopened, _ = make_manager(tmp_path)
+        asyncio.run(reopened.load_index("reddit_kb"))
+
+        rebuilt = reopened.lexical_indices["reddit_kb"]
+        assert rebuilt.count() == reopened.collections["reddit_kb"].count()
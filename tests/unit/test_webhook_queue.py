@@ -0,0 +1,297 @@
+"""Unit tests for the durable webhook queue and the Stripe webhook endpoint."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.webhook_queue import DEAD, WebhookDispatcher, WebhookQueue, run_step
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def push(queue: WebhookQueue, event_id: str, customer: str) -> bool:
+    return queue.push("stripe", event_id, "invoice.paid", {"id": event_id}, customer)
+
+
+def sign(payload: str, secret: str = WEBHOOK_SECRET) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class TestWebhookQueue:
+    """Test deduplication, per-key ordering, retries and recovery"""
+
+    def test_redelivered_events_are_not_queued_twice(self):
+        queue = WebhookQueue()
+
+        assert push(queue, "evt_1", "cus_a")
+        assert not push(queue, "evt_1", "cus_a")
+        assert queue.stats()["pending"] == 1
+
+    def test_events_for_one_customer_run_one_at_a_time_in_order(self):
+        queue = WebhookQueue()
+        push(queue, "evt_1", "cus_a")
+        push(queue, "evt_2", "cus_a")
+        push(queue, "evt_3", "cus_b")
+
+        first = queue.claim()
+        second = queue.claim()
+        assert (first.event_id, second.event_id) == ("evt_1", "evt_3")
+        assert queue.claim() is None  # evt_2 waits for evt_1
+
+        queue.complete(first)
+        assert queue.claim().event_id == "evt_2"
+
+    def test_failed_event_backs_off_and_holds_back_its_customer(self):
+        clock = FakeClock()
+        queue = WebhookQueue(base_delay=2.0, clock=clock)
+        push(queue, "evt_1", "cus_a")
+        push(queue, "evt_2", "cus_a")
+
+        assert queue.fail(queue.claim(), "timeout")
+        assert queue.claim() is None
+
+        clock.now += 2.0
+        retried = queue.claim()
+        assert (retried.event_id, retried.attempts) == ("evt_1", 1)
+        assert queue.fail(retried, "timeout")
+        clock.now += 2.0
+        assert queue.claim() is None  # second backoff is 4s
+        clock.now += 2.0
+        assert queue.claim().event_id == "evt_1"
+
+    def test_exhausted_event_is_dead_lettered_and_unblocks_customer(self):
+        queue = WebhookQueue(max_attempts=1)
+        push(queue, "evt_1", "cus_a")
+        push(queue, "evt_2", "cus_a")
+
+        assert not queue.fail(queue.claim(), "boom")
+        assert queue.claim().event_id == "evt_2"
+        assert queue.stats()["dead"] == 1
+        row = queue._conn.execute(
+            "SELECT status, last_error FROM webhook_events WHERE event_id = 'evt_1'"
+        ).fetchone()
+        assert row == (DEAD, "boom")
+
+    def test_pending_and_in_flight_events_survive_restart(self, tmp_path):
+        db_path = tmp_path / "webhooks.db"
+        queue = WebhookQueue(db_path)
+        push(queue, "evt_1", "cus_a")
+        push(queue, "evt_2", "cus_a")
+        push(queue, "evt_3", "cus_b")
+        queue.complete(queue.claim())
+        queue.claim()  # evt_3 in flight when the process dies
+        queue.close()
+
+        restored = WebhookQueue(db_path)
+        claimed = {restored.claim().event_id, restored.claim().event_id}
+        assert claimed == {"evt_2", "evt_3"}
+        assert not push(restored, "evt_1", "cus_a")
+
+
+class TestWebhookDispatcher:
+    """Test workers retry failures without repeating completed steps"""
+
+    def test_retry_skips_steps_that_already_succeeded(self):
+        queue = WebhookQueue(base_delay=0.01)
+        dispatcher = WebhookDispatcher(queue, workers=2)
+        calls = []
+
+        async def log_payment():
+            calls.append("sheets")
+
+        async def send_email():
+            calls.append("email")
+            if calls.count("email") == 1:
+                raise ConnectionError("SMTP unavailable")
+
+        async def handler(event):
+            await run_step("sheets", log_payment)
+            await run_step("email", send_email)
+
+        dispatcher.register("stripe", handler)
+
+        async def scenario():
+            await dispatcher.start()
+            dispatcher.enqueue("stripe", "evt_1", "invoice.paid", {}, "cus_a")
+            await dispatcher.drain(timeout=5)
+            await dispatcher.stop()
+
+        asyncio.run(scenario())
+
+        assert calls == ["sheets", "email", "email"]
+        assert queue.stats() == {"pending": 0, "in_flight": 0, "done": 1, "dead": 0}
+
+    def test_stopping_mid_event_does_not_use_up_an_attempt(self):
+        queue = WebhookQueue(max_attempts=1)
+        dispatcher = WebhookDispatcher(queue, workers=1)
+        started = asyncio.Event()
+
+        async def handler(event):
+            started.set()
+            await asyncio.sleep(60)
+
+        dispatcher.register("stripe", handler)
+
+        async def scenario():
+            await dispatcher.start()
+            dispatcher.enqueue("stripe", "evt_1", "invoice.paid", {}, "cus_a")
+            await asyncio.wait_for(started.wait(), timeout=5)
+            await dispatcher.stop()
+
+        asyncio.run(scenario())
+
+        assert queue.stats() == {"pending": 1, "in_flight": 0, "done": 0, "dead": 0}
+        assert queue.claim().attempts == 0
+
+    def test_customer_events_are_processed_in_arrival_order(self):
+        dispatcher = WebhookDispatcher(WebhookQueue(), workers=8)
+        processed = []
+
+        async def handler(event):
+            await asyncio.sleep(0.001 * (event.payload["n"] % 3))
+            processed.append((event.ordering_key, event.payload["n"]))
+
+        dispatcher.register("stripe", handler)
+
+        async def scenario():
+            await dispatcher.start()
+            for n in range(30):
+                dispatcher.enqueue(
+                    "stripe", f"evt_{n}", "invoice.paid", {"n": n}, f"cus_{n % 3}"
+                )
+            await dispatcher.drain(timeout=5)
+            await dispatcher.stop()
+
+        asyncio.run(scenario())
+
+        for customer in range(3):
+            key = f"stripe:cus_{customer}"
+            assert [n for k, n in processed if k == key] == list(range(customer, 30, 3))
+
+
+class TestStripeWebhookEndpoint:
+    """Test the endpoint verifies, queues and acknowledges without side effects"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app.api import stripe_webhooks
+
+        dispatcher = WebhookDispatcher(WebhookQueue())
+        monkeypatch.setattr(stripe_webhooks, "STRIPE_WEBHOOK_SECRET", WEBHOOK_SECRET)
+        monkeypatch.setattr(
+            stripe_webhooks, "get_webhook_dispatcher", lambda: dispatcher
+        )
+        app = FastAPI()
+        app.include_router(stripe_webhooks.router)
+        return TestClient(app), dispatcher
+
+    def test_signed_event_is_queued_once(self, client):
+        client, dispatcher = client
+        payload = json.dumps(
+            {
+                "id": "evt_1",
+                "object": "event",
+                "type": "invoice.payment_succeeded",
+                "data": {"object": {"object": "invoice", "customer": "cus_a"}},
+            }
+        )
+        headers = {"stripe-signature": sign(payload)}
+
+        first = client.post("/api/stripe/webhooks", content=payload, headers=headers)
+        second = client.post("/api/stripe/webhooks", content=payload, headers=headers)
+
+        assert first.json() == {
+            "status": "queued",
+            "event_type": "invoice.payment_succeeded",
+        }
+        assert second.json()["status"] == "duplicate"
+        event = dispatcher.queue.claim()
+        assert event.ordering_key == "stripe:cus_a"
+        assert event.payload["data"]["object"]["object"] == "invoice"
+
+    def test_bad_signature_is_rejected_and_not_queued(self, client):
+        client, dispatcher = client
+        payload = json.dumps({"id": "evt_1", "type": "x", "data": {"object": {}}})
+
+        response = client.post(
+            "/api/stripe/webhooks",
+            content=payload,
+            headers={"stripe-signature": sign(payload, "whsec_other")},
+        )
+
+        assert response.status_code == 400
+        assert dispatcher.queue.stats()["pending"] == 0
+
+
+class TestPaymentSucceeded:
+    """Test which customer lookup failures are retried"""
+
+    @pytest.fixture
+    def steps(self, monkeypatch):
+        from app.api import stripe_webhooks
+
+        calls = []
+
+        async def record(name, *args):
+            calls.append(name)
+            return True
+
+        monkeypatch.setattr(
+            stripe_webhooks, "log_payment_to_sheets", lambda *a: record("sheets", *a)
+        )
+        monkeypatch.setattr(
+            stripe_webhooks,
+            "send_payment_confirmation_email",
+            lambda *a: record("email", *a),
+        )
+        return calls
+
+    def retrieve_raising(self, monkeypatch, error):
+        import stripe
+
+        def retrieve(customer_id):
+            raise error
+
+        monkeypatch.setattr(stripe.Customer, "retrieve", retrieve)
+
+    def test_missing_customer_logs_payment_without_email(self, steps, monkeypatch):
+        import stripe
+
+        from app.api.stripe_webhooks import handle_payment_succeeded
+
+        asyncio.run(handle_payment_succeeded({"id": "in_1", "amount_paid": 900}))
+        self.retrieve_raising(
+            monkeypatch, stripe.error.InvalidRequestError("No such customer", "id")
+        )
+        asyncio.run(handle_payment_succeeded({"id": "in_2", "customer": "cus_x"}))
+
+        assert steps == ["sheets", "sheets"]
+
+    def test_transient_stripe_errors_are_retried(self, steps, monkeypatch):
+        import stripe
+
+        from app.api.stripe_webhooks import handle_payment_succeeded
+
+        self.retrieve_raising(monkeypatch, stripe.error.APIConnectionError("down"))
+
+        with pytest.raises(stripe.error.APIConnectionError):
+            asyncio.run(handle_payment_succeeded({"id": "in_3", "customer": "cus_a"}))
+        assert steps == []